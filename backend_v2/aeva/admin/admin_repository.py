@@ -403,6 +403,7 @@ class AdminRepository:
         )
         if not res.data:
             raise CustomError(ERROR_CODES["NOT_FOUND"])
+        self.supabase.invalidate_profile(user_id)
         logger.info(
             "Admin %s Developer Mode for user %s",
             "enabled" if enabled else "disabled",
@@ -591,6 +592,7 @@ class AdminRepository:
         )
         if not res.data:
             raise CustomError(ERROR_CODES["NOT_FOUND"])
+        self.supabase.invalidate_profile(user_id)
         self._audit(
             admin,
             "profile.edit",
@@ -103,6 +103,12 @@ def load_env_vars(app: Flask) -> None:  # noqa: PLR0915 - flat config loader
     app.config["OPENAI_REASONING_EFFORT"] = os.environ.get(
         "OPENAI_REASONING_EFFORT", ""
     )
+    # Send a prompt_cache_key derived from the prompt's static prefix, so
+    # OpenAI routes calls sharing it to the same prompt cache. Off by default
+    # because OpenAI-compatible gateways (OPENAI_BASE_URL) may reject it.
+    app.config["OPENAI_PROMPT_CACHE_KEY"] = (
+        os.environ.get("OPENAI_PROMPT_CACHE_KEY", "false").lower() == "true"
+    )
     default_model = os.environ.get("LLM_MODEL", "gemini-2.5-flash")
     app.config["LLM_MODEL"] = default_model
     # Per-capability models (fall back to LLM_MODEL when unset).
@@ -149,6 +155,34 @@ def load_env_vars(app: Flask) -> None:  # noqa: PLR0915 - flat config loader
     app.config["PRODUCT_INFO_LLM_MODELS"] = os.environ.get(
         "PRODUCT_INFO_LLM_MODELS", ""
     )
+    # Resilience layer for LLM calls (see aeva.llm.resilience): on a
+    # transient error or a slow attempt, move to the tool's other candidate
+    # models, then to LLM_FAILOVER_MODELS ("provider:model", comma-separated,
+    # other vendors). Breakers skip a provider/model after repeated failures;
+    # LLM_HEDGE_AFTER_MS > 0 races a second attempt against a slow first one.
+    app.config["LLM_FAILOVER"] = (
+        os.environ.get("LLM_FAILOVER", "false").lower() == "true"
+    )
+    app.config["LLM_FAILOVER_MODELS"] = [
+        m.strip()
+        for m in os.environ.get("LLM_FAILOVER_MODELS", "").split(",")
+        if m.strip()
+    ]
+    app.config["LLM_CALL_BUDGET_SECONDS"] = float(
+        os.environ.get("LLM_CALL_BUDGET_SECONDS", "90")
+    )
+    app.config["LLM_ATTEMPT_TIMEOUT_SECONDS"] = float(
+        os.environ.get("LLM_ATTEMPT_TIMEOUT_SECONDS", "45")
+    )
+    app.config["LLM_HEDGE_AFTER_MS"] = int(
+        os.environ.get("LLM_HEDGE_AFTER_MS", "0")
+    )
+    app.config["LLM_BREAKER_FAILURES"] = int(
+        os.environ.get("LLM_BREAKER_FAILURES", "5")
+    )
+    app.config["LLM_BREAKER_COOLDOWN_SECONDS"] = float(
+        os.environ.get("LLM_BREAKER_COOLDOWN_SECONDS", "30")
+    )
     # Cap on GET /media/ rows (newest first). Bounds the serverless response
     # size — see media_repository.list_media.
     app.config["MEDIA_LIST_LIMIT"] = int(
@@ -225,12 +259,73 @@ def load_env_vars(app: Flask) -> None:  # noqa: PLR0915 - flat config loader
         os.environ.get("RAG_EMBEDDING_DIM", "768")
     )
     app.config["RAG_TOP_K"] = int(os.environ.get("RAG_TOP_K", "8"))
+    # Token budget for the packed DOCUMENT_CONTEXT (adjacent hits merged,
+    # chunk overlap removed); 0 = no budget.
+    app.config["RAG_CONTEXT_TOKENS"] = int(
+        os.environ.get("RAG_CONTEXT_TOKENS", "3072")
+    )
+    # "vector" (cosine only) or "hybrid": vector + full-text ranks fused by
+    # RRF over RAG_HYBRID_CANDIDATES (migration 028), then an MMR pick of
+    # RAG_TOP_K with RAG_MMR_DIVERSITY (0 = fused order, no diversification).
+    app.config["RAG_RETRIEVAL"] = os.environ.get("RAG_RETRIEVAL", "vector")
+    app.config["RAG_HYBRID_CANDIDATES"] = int(
+        os.environ.get("RAG_HYBRID_CANDIDATES", "40")
+    )
+    app.config["RAG_MMR_DIVERSITY"] = float(
+        os.environ.get("RAG_MMR_DIVERSITY", "0.3")
+    )
+    # Scoped nearest-neighbour search (migration 029): scopes of at most
+    # RAG_ANN_EXACT_LIMIT chunks are scanned exactly, larger ones use HNSW
+    # with RAG_ANN_EF_SEARCH candidates (0 = server default) and, on pgvector
+    # >= 0.8, iterative scans so the user/media filter cannot starve results.
+    app.config["RAG_ANN_SCOPED"] = (
+        os.environ.get("RAG_ANN_SCOPED", "false").lower() == "true"
+    )
+    app.config["RAG_ANN_EF_SEARCH"] = int(
+        os.environ.get("RAG_ANN_EF_SEARCH", "100")
+    )
+    app.config["RAG_ANN_EXACT_LIMIT"] = int(
+        os.environ.get("RAG_ANN_EXACT_LIMIT", "20000")
+    )
     app.config["RAG_CHUNK_TOKENS"] = int(
         os.environ.get("RAG_CHUNK_TOKENS", "512")
     )
     app.config["RAG_CHUNK_OVERLAP"] = int(
         os.environ.get("RAG_CHUNK_OVERLAP", "64")
     )
+    # Chunks embedded and inserted together while indexing a document. Bounds
+    # peak memory per upload; keep it a multiple of the 100-text embed batch
+    # so EMBED_MAX_IN_FLIGHT batches can overlap within a window.
+    app.config["RAG_INDEX_WINDOW"] = int(
+        os.environ.get("RAG_INDEX_WINDOW", "400")
+    )
+    # How embeddings travel to Postgres: "text" pgvector literals, or "packed"
+    # base64 float32 decoded server-side (4x smaller, far cheaper to encode;
+    # needs migration 026).
+    app.config["VECTOR_TRANSPORT"] = os.environ.get("VECTOR_TRANSPORT", "text")
+    # Embedding batches sent concurrently per embed call, and how many times a
+    # batch is retried (jittered exponential backoff) after a 429/5xx.
+    app.config["EMBED_MAX_IN_FLIGHT"] = int(
+        os.environ.get("EMBED_MAX_IN_FLIGHT", "4")
+    )
+    app.config["EMBED_MAX_RETRIES"] = int(
+        os.environ.get("EMBED_MAX_RETRIES", "3")
+    )
+    # Embedding cache: per-worker LRU entries (float32, ~3 KB each at 768
+    # dims) and whether vectors are also stored in the embedding_cache table
+    # (migration 023) so identical text is never embedded twice across
+    # workers/deploys.
+    app.config["EMBED_CACHE_SIZE"] = int(
+        os.environ.get("EMBED_CACHE_SIZE", "2048")
+    )
+    app.config["EMBED_CACHE_PERSIST"] = (
+        os.environ.get("EMBED_CACHE_PERSIST", "true").lower() == "true"
+    )
+    # Clone an identical, already-indexed document (same bytes, same index
+    # settings; migration 025) instead of re-parsing and re-embedding it.
+    app.config["MEDIA_DEDUP"] = (
+        os.environ.get("MEDIA_DEDUP", "true").lower() == "true"
+    )
     # When a doc is not yet indexed, answer it from raw file attachments (the
     # pre-RAG behavior) instead of refusing. Disable once everything is indexed.
     app.config["RAG_ATTACHMENT_FALLBACK"] = (
@@ -275,6 +370,52 @@ def load_env_vars(app: Flask) -> None:  # noqa: PLR0915 - flat config loader
     app.config["CHAT_HISTORY_LIMIT"] = int(
         os.environ.get("CHAT_HISTORY_LIMIT", "20")
     )
+    # Planner decision cache (per worker): repeated, context-free messages
+    # (follow-up chips, popover prompts) reuse a recent plan instead of a
+    # planner LLM call. Size 0 disables it.
+    app.config["PLAN_CACHE_SIZE"] = int(
+        os.environ.get("PLAN_CACHE_SIZE", "512")
+    )
+    app.config["PLAN_CACHE_TTL_SECONDS"] = int(
+        os.environ.get("PLAN_CACHE_TTL_SECONDS", "600")
+    )
+    # Optional local intent classifier between the small-talk fast path and
+    # the planner LLM (JSON model from benchmarks/intent_replay.py). Empty
+    # path = off; routes only at or above the posterior threshold.
+    app.config["INTENT_CLASSIFIER_PATH"] = os.environ.get(
+        "INTENT_CLASSIFIER_PATH", ""
+    )
+    app.config["INTENT_CLASSIFIER_THRESHOLD"] = float(
+        os.environ.get("INTENT_CLASSIFIER_THRESHOLD", "0.9")
+    )
+    # Answer streams batch token-sized deltas into one SSE frame per window
+    # (ms) or per SSE_COALESCE_CHARS buffered, whichever comes first. The
+    # first token is always sent at once; 0 ms frames every delta.
+    app.config["SSE_COALESCE_MS"] = int(
+        os.environ.get("SSE_COALESCE_MS", "30")
+    )
+    app.config["SSE_COALESCE_CHARS"] = int(
+        os.environ.get("SSE_COALESCE_CHARS", "512")
+    )
+    # Size of the shared background I/O pool (aeva.common.concurrency) that
+    # overlaps independent round-trips inside one request, e.g. the chat
+    # turn's session/profile/history reads. Caps concurrent outbound sockets
+    # per worker process.
+    app.config["IO_POOL_MAX_WORKERS"] = int(
+        os.environ.get("IO_POOL_MAX_WORKERS", "8")
+    )
+    # Per-worker auth caches: verified JWTs (bounded by each token's exp) and
+    # profile rows. PROFILE_CACHE_TTL_SECONDS is how long a profile edit made
+    # on ANOTHER worker can take to show up; 0 disables the row cache.
+    app.config["AUTH_TOKEN_CACHE_SIZE"] = int(
+        os.environ.get("AUTH_TOKEN_CACHE_SIZE", "1024")
+    )
+    app.config["PROFILE_CACHE_SIZE"] = int(
+        os.environ.get("PROFILE_CACHE_SIZE", "1024")
+    )
+    app.config["PROFILE_CACHE_TTL_SECONDS"] = float(
+        os.environ.get("PROFILE_CACHE_TTL_SECONDS", "30")
+    )
 
     origins = os.environ.get(
         "ALLOWED_ORIGINS",
@@ -286,6 +427,34 @@ def load_env_vars(app: Flask) -> None:  # noqa: PLR0915 - flat config loader
     app.config["MAX_UPLOAD_MB"] = int(
         os.environ.get("MAX_UPLOAD_MB", "10")
     )
+    # Total size of the files one turn downloads as LLM attachments; files
+    # past it are left out (the first always goes).
+    app.config["ATTACHMENT_BUDGET_MB"] = int(
+        os.environ.get("ATTACHMENT_BUDGET_MB", "50")
+    )
+    # Per-worker LRU of attachment bytes keyed by storage path, so the same
+    # file on consecutive turns is not downloaded again. 0 disables it.
+    app.config["ATTACHMENT_CACHE_MB"] = int(
+        os.environ.get("ATTACHMENT_CACHE_MB", "64")
+    )
+    # Per-worker registry of Gemini Files API uploads keyed by content hash,
+    # so an attachment sent again within its 48h retention goes by URI
+    # instead of being uploaded again. 0 disables reuse.
+    app.config["GEMINI_FILE_CACHE_SIZE"] = int(
+        os.environ.get("GEMINI_FILE_CACHE_SIZE", "256")
+    )
+    # Serve the static system-prompt prefix from a Gemini explicit context
+    # cache (billed at the cached rate, created once per model and TTL).
+    # Prefixes under MIN_CHARS are below Gemini's minimum cacheable size.
+    app.config["GEMINI_CONTEXT_CACHE"] = (
+        os.environ.get("GEMINI_CONTEXT_CACHE", "false").lower() == "true"
+    )
+    app.config["GEMINI_CONTEXT_CACHE_TTL_SECONDS"] = int(
+        os.environ.get("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600")
+    )
+    app.config["GEMINI_CONTEXT_CACHE_MIN_CHARS"] = int(
+        os.environ.get("GEMINI_CONTEXT_CACHE_MIN_CHARS", "4000")
+    )
 
     app.config["FRONTEND_URL"] = os.environ.get(
         "FRONTEND_URL", "http://localhost:5173"
@@ -13,6 +13,7 @@ from aeva.common.decorators import user_required
 from aeva.common.errors import CustomError
 from aeva.common.schema import ResponseEnvelopeSchema, UserData
 from aeva.llm.llm_client import LLMClient
+from aeva.supabase.supabase_service import request_profile_cache
 
 blueprint = Blueprint(
     "assistant",
@@ -83,9 +84,13 @@ class AssistantStreamEndpoint(MethodView):
     ) -> Response:
         """Stream assistant response via SSE."""
         app = current_app._get_current_object()  # noqa: SLF001
+        # The generator runs in a fresh app context (new ``flask.g``); carry
+        # the profile row ``user_required`` already loaded across with it.
+        profiles = request_profile_cache().copy()
 
         def generate() -> Generator[str, None, None]:
             with app.app_context():
+                request_profile_cache().update(profiles)
                 try:
                     yield from AssistantRepository.process_stream(
                         current_user, request_data
@@ -12,6 +12,7 @@ from aeva.chat.chat_repository import ChatRepository
 from aeva.chat.schema.chat_schema import ChatRequestSchema
 from aeva.common.decorators import user_required
 from aeva.common.schema import ResponseEnvelopeSchema, UserData
+from aeva.supabase.supabase_service import request_profile_cache
 
 blueprint = Blueprint(
     "chat",
@@ -48,9 +49,13 @@ class ChatStreamEndpoint(MethodView):
     ) -> Response:
         """Stream a chat response via SSE."""
         app = current_app._get_current_object()  # noqa: SLF001
+        # The generator runs in a fresh app context (new ``flask.g``); carry
+        # the profile row ``user_required`` already loaded across with it.
+        profiles = request_profile_cache().copy()
 
         def generate() -> Generator[str, None, None]:
             with app.app_context():
+                request_profile_cache().update(profiles)
                 try:
                     yield from ChatRepository.process_chat_stream(
                         current_user, request_data
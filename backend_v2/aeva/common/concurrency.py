@@ -0,0 +1,79 @@
+"""Bounded background I/O for fan-out inside a single request.
+
+Most hot paths here are a handful of independent PostgREST / storage / LLM
+round-trips issued one after another. ``submit`` runs such calls on ONE
+process-wide thread pool so a request can overlap them, while the pool size
+(``IO_POOL_MAX_WORKERS``) caps how many sockets a worker process opens at once.
+
+Every task runs inside a fresh app context of the submitting app, so code that
+reads ``current_app.config`` (``SupabaseService``, the providers) works
+unchanged. ``SupabaseService`` keeps one client per thread, so pooled threads
+never share an HTTP/2 connection with the request thread.
+
+Only submit from a request/app thread, never from a task already on the pool:
+a pooled task that blocks on another pooled task can exhaust the pool.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Used when no app config is available (unit tests, scripts).
+_DEFAULT_MAX_WORKERS = 8
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def _max_workers() -> int:
+    """Return the configured pool size (read once, when the pool is built)."""
+    if not has_app_context():
+        return _DEFAULT_MAX_WORKERS
+    return max(
+        1,
+        int(
+            current_app.config.get(
+                "IO_POOL_MAX_WORKERS", _DEFAULT_MAX_WORKERS
+            )
+        ),
+    )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Lazily build the shared pool (thread-safe, once per process)."""
+    global _executor  # noqa: PLW0603 - process-wide shared pool
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = _max_workers()
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="aeva-io"
+                )
+                logger.info("I/O pool ready | workers=%d", workers)
+    return _executor
+
+
+def submit(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> Future[T]:
+    """Run ``fn(*args, **kwargs)`` on the shared pool.
+
+    The task runs inside an app context of the submitting app (when there is
+    one), so it sees the same config. Request-scoped state (``flask.g``) is NOT
+    carried over — pass whatever the task needs as arguments.
+    """
+    app = current_app._get_current_object() if has_app_context() else None  # noqa: SLF001
+
+    def _call() -> T:
+        if app is None:
+            return fn(*args, **kwargs)
+        with app.app_context():
+            return fn(*args, **kwargs)
+
+    return _get_executor().submit(_call)
@@ -13,7 +13,12 @@ F = TypeVar("F", bound=Callable[..., Any])
 
 
 def user_required(func: F) -> F:
-    """Verify Supabase JWT and inject current_user."""
+    """Verify Supabase JWT and inject current_user.
+
+    ``verify_token`` selects the caller's full profile row; it is kept in the
+    request-scoped profile cache so later ``get_profile`` calls in the same
+    request (orchestrator, quiz analysis, revision) reuse it.
+    """
 
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any) -> Any:
@@ -0,0 +1,137 @@
+"""Incremental helpers for token streams.
+
+Answers arrive as thousands of small deltas. Anything that re-reads the whole
+accumulated text per delta (``raw += chunk`` then ``raw.find(...)``) costs
+quadratic time as answers grow, so these keep a list of parts and only ever
+look at a bounded window around the newest delta. Framing every delta as its
+own SSE event is similarly wasteful, so ``DeltaCoalescer`` batches them and
+``StreamMeter`` records what actually went over the wire.
+"""
+
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class SentinelSplitter:
+    """Split a stream at the first occurrence of ``sentinel``.
+
+    ``feed`` returns the part of each delta that is safe to show: everything
+    before the sentinel, minus a short held-back tail (``len(sentinel) - 1``
+    chars) that could still turn out to be the start of a sentinel straddling
+    two deltas. After the sentinel is seen nothing more is released. Each
+    call scans only the held tail plus the new delta, so per-delta cost is
+    independent of how much text came before.
+    """
+
+    def __init__(self, sentinel: str) -> None:
+        self.sentinel = sentinel
+        self.found = False
+        self._hold = len(sentinel) - 1
+        self._parts: list[str] = []
+        self._pending = ""
+
+    def feed(self, chunk: str) -> str:
+        """Record ``chunk`` and return the newly releasable visible text."""
+        self._parts.append(chunk)
+        if self.found:
+            return ""
+        window = self._pending + chunk
+        idx = window.find(self.sentinel)
+        if idx != -1:
+            self.found = True
+            self._pending = ""
+            return window[:idx]
+        safe = max(len(window) - self._hold, 0)
+        self._pending = window[safe:]
+        return window[:safe]
+
+    def flush(self) -> str:
+        """Release the held tail at end of stream (if no sentinel came)."""
+        tail, self._pending = self._pending, ""
+        return "" if self.found else tail
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far, sentinel and trailer included."""
+        return "".join(self._parts)
+
+
+class DeltaCoalescer:
+    """Batch small text deltas into fewer, larger SSE frames.
+
+    The first delta is released at once (time to first token is what the
+    user feels). After that deltas are held until ``window`` seconds have
+    passed since the last release or ``max_chars`` are buffered. The stream
+    is pull-based, so a batch goes out when the delta that crosses a limit
+    arrives, never on a timer; ``flush`` releases the remainder at the end.
+    A zero window releases every delta unbatched.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        max_chars: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = window
+        self.max_chars = max_chars
+        self.deltas = 0
+        self._clock = clock
+        self._parts: list[str] = []
+        self._size = 0
+        self._last_release: float | None = None
+
+    def push(self, delta: str) -> str:
+        """Buffer ``delta``; return a batch when one is due, else ``""``."""
+        if not delta:
+            return ""
+        self.deltas += 1
+        self._parts.append(delta)
+        self._size += len(delta)
+        now = self._clock()
+        if (
+            self._last_release is None
+            or self.window <= 0
+            or self._size >= self.max_chars
+            or now - self._last_release >= self.window
+        ):
+            self._last_release = now
+            return self.flush()
+        return ""
+
+    def flush(self) -> str:
+        """Release everything buffered."""
+        batch = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return batch
+
+
+class StreamMeter:
+    """Count the frames and bytes of one response stream."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._start = clock()
+        self.frames = 0
+        self.bytes = 0
+
+    def record(self, frame: str) -> str:
+        """Count ``frame`` and hand it back (so it can be yielded inline)."""
+        self.frames += 1
+        self.bytes += len(frame.encode("utf-8"))
+        return frame
+
+    def summary(self, deltas: int | None = None) -> dict[str, Any]:
+        """Totals and per-second rates since the meter was created."""
+        seconds = max(self._clock() - self._start, 1e-6)
+        summary: dict[str, Any] = {
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "frames_per_s": round(self.frames / seconds, 1),
+            "bytes_per_s": round(self.bytes / seconds),
+        }
+        if deltas is not None:
+            summary["deltas"] = deltas
+        return summary
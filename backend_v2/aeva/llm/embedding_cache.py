@@ -0,0 +1,198 @@
+"""Content-addressed embedding cache (process LRU + database table).
+
+A vector is fully determined by ``(model, dimensions, task_type, text)``, so
+it is cached under exactly that key with the text reduced to its SHA-256.
+Lookups go through two tiers:
+
+1. a per-process ``TTLCache`` (``EMBED_CACHE_SIZE`` entries) — repeated
+   queries within a worker never leave the process;
+2. the ``embedding_cache`` table (migration 023) — shared by every worker and
+   surviving deploys, so re-processing or re-uploading the same document
+   costs zero embedding calls.
+
+The table tier is best-effort: if it is unreachable (or the migration is not
+applied yet) the cache degrades to the in-process tier and embedding proceeds
+normally. It is also skipped for ``RETRIEVAL_QUERY``: a query embed sits on
+the critical path of a chat turn, and a table select plus upsert around it
+would cost more than the single embed call it could save. Queries still hit
+the in-process tier. ``LLMClient.embed`` is the only caller.
+
+The memory tier holds compact float32 arrays (``vectors.float32``), about an
+eighth of a Python list's footprint, and every lookup hands out a fresh list,
+so a caller mutating a returned vector cannot corrupt later hits. Values come
+back rounded to float32, the precision pgvector stores anyway.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import TYPE_CHECKING, Any
+
+from flask import current_app, has_app_context
+
+from aeva.common.ttl_cache import TTLCache
+from aeva.llm.vectors import float32
+from aeva.supabase.supabase_service import SupabaseService
+
+if TYPE_CHECKING:
+    from array import array
+
+logger = logging.getLogger(__name__)
+
+# Fallbacks when no app config is available (scripts, tests). A 768-dim
+# vector held as float32 costs ~3 KB, so 2048 entries is ~6 MB.
+_DEFAULT_MAX_SIZE = 2048
+# Vectors never change for a given key; the TTL only ages out cold entries.
+_MEMORY_TTL_SECONDS = 24 * 3600.0
+# Latency-critical tasks that never touch the table tier (see module doc).
+_MEMORY_ONLY_TASKS = frozenset({"RETRIEVAL_QUERY"})
+
+_cache: "EmbeddingCache | None" = None
+_lock = threading.Lock()
+
+
+def text_sha256(text: str) -> str:
+    """Hex SHA-256 of a text, the content half of a cache key."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier vector cache keyed by model, dimensions, task and content."""
+
+    def __init__(
+        self,
+        max_size: int = _DEFAULT_MAX_SIZE,
+        *,
+        persist: bool = True,
+        supabase: SupabaseService | None = None,
+    ) -> None:
+        self._memory: TTLCache[array] = TTLCache(
+            max_size, _MEMORY_TTL_SECONDS
+        )
+        self._persist = persist
+        self._supabase = supabase
+        self._stats_lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    @property
+    def supabase(self) -> SupabaseService:
+        """Lazy Supabase client."""
+        return self._supabase or SupabaseService()
+
+    def lookup(
+        self,
+        model: str,
+        dimensions: int,
+        task_type: str,
+        texts: list[str],
+    ) -> list[list[float] | None]:
+        """Return the cached vector per text (``None`` if both tiers miss)."""
+        hashes = [text_sha256(text) for text in texts]
+        found: list[list[float] | None] = []
+        for h in hashes:
+            held = self._memory.get((model, dimensions, task_type, h))
+            found.append(held.tolist() if held is not None else None)
+        memory_hits = sum(v is not None for v in found)
+        missing = sorted({
+            h for h, v in zip(hashes, found, strict=True) if v is None
+        })
+
+        stored: dict[str, list[float]] = {}
+        if missing and self._uses_table(task_type):
+            try:
+                stored = self.supabase.get_cached_embeddings(
+                    model, dimensions, task_type, missing
+                )
+            except Exception:  # the table tier is optional
+                logger.warning(
+                    "Embedding cache table unavailable; using memory only",
+                    exc_info=True,
+                )
+        for index, h in enumerate(hashes):
+            if found[index] is None and h in stored:
+                vector = stored[h]
+                found[index] = list(vector)
+                self._memory.set(
+                    (model, dimensions, task_type, h), float32(vector)
+                )
+
+        store_hits = sum(v is not None for v in found) - memory_hits
+        with self._stats_lock:
+            self.memory_hits += memory_hits
+            self.store_hits += store_hits
+            self.misses += len(texts) - memory_hits - store_hits
+        return found
+
+    def store(
+        self,
+        model: str,
+        dimensions: int,
+        task_type: str,
+        texts: list[str],
+        vectors: list[list[float]],
+    ) -> None:
+        """Remember freshly computed vectors in both tiers."""
+        rows: list[dict[str, Any]] = []
+        for text, vector in zip(texts, vectors, strict=True):
+            h = text_sha256(text)
+            self._memory.set(
+                (model, dimensions, task_type, h), float32(vector)
+            )
+            rows.append({
+                "model": model,
+                "dimensions": dimensions,
+                "task_type": task_type,
+                "text_sha256": h,
+                "embedding": vector,
+            })
+        if not rows or not self._uses_table(task_type):
+            return
+        try:
+            self.supabase.save_cached_embeddings(rows)
+        except Exception:  # the table tier is optional
+            logger.warning("Could not persist embeddings", exc_info=True)
+
+    def _uses_table(self, task_type: str) -> bool:
+        """Whether this task type reads/writes the shared table tier."""
+        return self._persist and task_type not in _MEMORY_ONLY_TASKS
+
+    def stats(self) -> dict[str, Any]:
+        """Per-tier hit counters and the overall hit rate."""
+        with self._stats_lock:
+            hits = self.memory_hits + self.store_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory": self._memory.stats(),
+            }
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide cache, built from config on first use."""
+    global _cache  # noqa: PLW0603 - process-wide shared cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                config = current_app.config if has_app_context() else {}
+                _cache = EmbeddingCache(
+                    int(config.get("EMBED_CACHE_SIZE", _DEFAULT_MAX_SIZE)),
+                    persist=bool(config.get("EMBED_CACHE_PERSIST", True)),
+                )
+    return _cache
+
+
+def embedding_cache_stats() -> dict[str, Any]:
+    """Hit-rate metrics for the process-wide embedding cache."""
+    return get_embedding_cache().stats()
+
+
+def reset_embedding_cache(cache: EmbeddingCache | None = None) -> None:
+    """Replace (or drop, when ``None``) the process-wide cache (tests)."""
+    global _cache  # noqa: PLW0603 - process-wide shared cache
+    with _lock:
+        _cache = cache
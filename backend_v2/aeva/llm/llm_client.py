@@ -2,31 +2,55 @@
 
 ``LLMClient`` is the stable interface the app calls. It resolves a concrete
 provider from config and delegates to it, so swapping models or vendors never
-touches call sites. ``format_sse_chunk`` lives here because SSE framing is
-transport, not vendor, specific.
+touches call sites. With ``LLM_FAILOVER`` on, text calls go through the
+resilience layer (``aeva.llm.resilience``): fallback models, circuit breakers,
+a latency budget and hedged requests. ``format_sse_chunk`` lives here because
+SSE framing is transport, not vendor, specific.
 """
 
+import itertools
 import json
 import logging
+import threading
 import time
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Iterator, Sequence
 from contextlib import contextmanager
-from typing import Any
+from functools import partial
+from typing import Any, TypeVar
 
 from aeva.common.logging_config import log_full_llm_requests, preview
 from aeva.llm import prompts
+from aeva.llm.embedding_cache import get_embedding_cache
 from aeva.llm.providers.base import LLMProvider
-from aeva.llm.providers.factory import create_provider
+from aeva.llm.providers.factory import get_named_provider, get_provider
+from aeva.llm.resilience import (
+    Attempt,
+    ResiliencePolicy,
+    attempt_name,
+    build_attempts,
+    run_with_failover,
+)
+from aeva.llm.usage import cached_share, record_usage
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class LLMClient:
     """Facade over a config-selected :class:`LLMProvider`.
 
+    The provider comes from the process-wide pool, so constructing an
+    ``LLMClient`` per turn (as ``BaseTool.resolve_llm`` and the lazy ``llm``
+    properties do) reuses a warm SDK client instead of building a new one.
     Every call is logged here — the one choke point all capabilities share —
-    with the model, provider, input size, and duration at INFO, and the prompt
-    and result previews at DEBUG.
+    with the model, provider, input size, duration and token usage (with the
+    prompt-cache hit share) at INFO, and the prompt and result previews at
+    DEBUG.
+
+    ``fallback_models`` are other models of the same capability (the tool's
+    candidates) that failover may switch to. They only matter when
+    ``LLM_FAILOVER`` is on.
     """
 
     def __init__(
@@ -35,13 +59,21 @@ class LLMClient:
         *,
         config_key: str = "LLM_MODEL",
         provider_key: str | None = None,
+        fallback_models: Sequence[str] = (),
     ) -> None:
         self._config_key = config_key
-        self._provider: LLMProvider = create_provider(
+        self._provider_key = provider_key
+        self._provider: LLMProvider = get_provider(
             config_key=config_key,
             model=model,
             provider_key=provider_key,
         )
+        self._fallback_models = tuple(fallback_models)
+        self._policy = ResiliencePolicy.from_config()
+        self._attempts: list[Attempt] | None = None
+        # The provider that served this thread's latest call (failover may
+        # have picked another than ``_provider``).
+        self._local = threading.local()
         logger.debug(
             "LLMClient ready | key=%s model=%s provider=%s",
             config_key,
@@ -57,7 +89,107 @@ class LLMClient:
     @property
     def _provider_name(self) -> str:
         """Short vendor name for logs (e.g. 'gemini', 'groq')."""
-        return type(self._provider).__name__.replace("Provider", "").lower()
+        return attempt_name(self._provider)
+
+    @property
+    def _active(self) -> LLMProvider:
+        """The provider that served this thread's latest call."""
+        provider: LLMProvider = getattr(
+            self._local, "provider", self._provider
+        )
+        return provider
+
+    def _failover_attempts(self) -> list[Attempt]:
+        """Return the attempts: own provider, fallback models, cross-vendor."""
+        if self._attempts is None:
+            name = self._provider_name
+            fallbacks: list[tuple[str, Callable[[], LLMProvider]]] = [
+                (
+                    f"{name}:{model}",
+                    partial(
+                        get_provider,
+                        config_key=self._config_key,
+                        model=model,
+                        provider_key=self._provider_key,
+                    ),
+                )
+                for model in self._fallback_models
+            ]
+            fallbacks.extend(
+                (
+                    f"{vendor}:{model}",
+                    partial(get_named_provider, vendor, model),
+                )
+                for vendor, model in self._policy.failover_models
+            )
+            self._attempts = build_attempts(self._provider, fallbacks)
+        return self._attempts
+
+    def _adopt(
+        self,
+        provider: LLMProvider,
+        sources: list[dict[str, str]],
+        usage: dict[str, int],
+    ) -> None:
+        """Make ``provider`` this thread's active one, with its call state.
+
+        Failover attempts run on worker threads, so the state they left in
+        the provider's thread-local storage is copied to the caller's.
+        """
+        provider.last_sources = sources
+        provider.last_usage = usage
+        self._local.provider = provider
+
+    def _invoke(self, call: Callable[[LLMProvider], T]) -> T:
+        """Run ``call`` on the provider, or through failover when enabled."""
+        self._local.provider = self._provider
+        if not self._policy.failover:
+            return call(self._provider)
+
+        def captured(
+            provider: LLMProvider,
+        ) -> tuple[T, list[dict[str, str]], dict[str, int]]:
+            value = call(provider)
+            return value, provider.last_sources, provider.last_usage
+
+        attempt, (value, sources, usage) = run_with_failover(
+            self._failover_attempts(), captured, policy=self._policy
+        )
+        self._adopt(attempt.provider, sources, usage)
+        return value
+
+    def _open_stream(
+        self, open_stream: Callable[[LLMProvider], Iterator[str]]
+    ) -> Iterator[str]:
+        """Start a stream, failing over until one yields its first chunk."""
+        self._local.provider = self._provider
+        if not self._policy.failover:
+            return open_stream(self._provider)
+
+        def first_chunk(
+            provider: LLMProvider,
+        ) -> tuple[
+            str | None, Iterator[str], list[dict[str, str]], dict[str, int]
+        ]:
+            stream = open_stream(provider)
+            first = next(stream, None)
+            return first, stream, provider.last_sources, provider.last_usage
+
+        def close(
+            opened: tuple[str | None, Iterator[str], Any, Any],
+        ) -> None:
+            close_stream = getattr(opened[1], "close", None)
+            if close_stream is not None:
+                close_stream()
+
+        attempt, (first, stream, sources, usage) = run_with_failover(
+            self._failover_attempts(),
+            first_chunk,
+            policy=self._policy,
+            discard=close,
+        )
+        self._adopt(attempt.provider, sources, usage)
+        return itertools.chain(() if first is None else (first,), stream)
 
     @contextmanager
     def _timed(
@@ -72,6 +204,9 @@ class LLMClient:
             len(in_text or ""),
             extra,
         )
+        # Image calls report no usage; don't count the previous call twice.
+        self._provider.last_usage = {}
+        self._local.provider = self._provider
         start = time.perf_counter()
         try:
             yield
@@ -84,10 +219,29 @@ class LLMClient:
             )
             raise
         logger.info(
-            "LLM %s ✓ model=%s (%.0fms)",
+            "LLM %s ✓ model=%s (%.0fms)%s",
             label,
             self.model,
             (time.perf_counter() - start) * 1000,
+            self._usage_suffix(),
+        )
+
+    def _usage_suffix(self) -> str:
+        """Record this thread's last token usage; describe it for the log."""
+        provider = self._active
+        usage = provider.last_usage
+        if not usage:
+            return ""
+        record_usage(attempt_name(provider), provider.model, usage)
+        served = (
+            "" if provider is self._provider
+            else f" via {attempt_name(provider)}:{provider.model}"
+        )
+        return (
+            f"{served}"
+            f" | tokens in={usage['prompt_tokens']}"
+            f" cached={usage['cached_tokens']}"
+            f" ({cached_share(usage):.0%}) out={usage['output_tokens']}"
         )
 
     def _log_request(
@@ -160,7 +314,7 @@ class LLMClient:
     @property
     def last_sources(self) -> list[dict[str, str]]:
         """Grounding citations captured from the most recent call."""
-        return self._provider.last_sources
+        return self._active.last_sources
 
     def generate(
         self,
@@ -186,12 +340,14 @@ class LLMClient:
             use_search=use_search,
         )
         with self._timed(log_label, user_message, extra):
-            result = self._provider.generate(
-                user_message,
-                system_prompt=system_prompt,
-                attachments=attachments,
-                history=history,
-                use_search=use_search,
+            result = self._invoke(
+                lambda provider: provider.generate(
+                    user_message,
+                    system_prompt=system_prompt,
+                    attachments=attachments,
+                    history=history,
+                    use_search=use_search,
+                )
             )
         self._log_response(log_label, result)
         return result
@@ -231,13 +387,15 @@ class LLMClient:
             response_schema=response_schema,
         )
         with self._timed(log_label, user_message, " (json)"):
-            result = self._provider.generate_structured(
-                user_message,
-                response_schema,
-                system_prompt=system_prompt,
-                attachments=attachments,
-                history=history,
-                use_search=use_search,
+            result = self._invoke(
+                lambda provider: provider.generate_structured(
+                    user_message,
+                    response_schema,
+                    system_prompt=system_prompt,
+                    attachments=attachments,
+                    history=history,
+                    use_search=use_search,
+                )
             )
         self._log_response(log_label, result)
         return result
@@ -272,12 +430,14 @@ class LLMClient:
             chunks = 0
             parts: list[str] = []
             try:
-                for chunk in self._provider.generate_stream(
-                    user_message,
-                    system_prompt=system_prompt,
-                    attachments=attachments,
-                    history=history,
-                    use_search=use_search,
+                for chunk in self._open_stream(
+                    lambda provider: provider.generate_stream(
+                        user_message,
+                        system_prompt=system_prompt,
+                        attachments=attachments,
+                        history=history,
+                        use_search=use_search,
+                    )
                 ):
                     chunks += 1
                     parts.append(chunk)
@@ -291,11 +451,12 @@ class LLMClient:
                 raise
             answer = "".join(parts)
             logger.info(
-                "LLM stream ✓ model=%s | %d chunks, %d chars (%.0fms)",
+                "LLM stream ✓ model=%s | %d chunks, %d chars (%.0fms)%s",
                 self.model,
                 chunks,
                 len(answer),
                 (time.perf_counter() - start) * 1000,
+                self._usage_suffix(),
             )
             self._log_response("stream", answer)
 
@@ -307,22 +468,58 @@ class LLMClient:
         *,
         task_type: str = "RETRIEVAL_DOCUMENT",
         output_dimensionality: int = 768,
+        on_progress: Callable[[int, int], None] | None = None,
     ) -> list[list[float]]:
-        """Embed texts via the underlying provider (RAG retrieval layer)."""
+        """Embed texts via the underlying provider (RAG retrieval layer).
+
+        Vectors are served from the content-addressed embedding cache where
+        possible; only texts it has never seen (deduplicated) reach the
+        provider. ``on_progress(done, total)`` counts cached texts as done up
+        front, then is forwarded to the provider, which calls it from its
+        batch worker threads as each batch completes.
+        """
+        cache = get_embedding_cache()
+        model_key = f"{self._provider_name}:{self.model}"
+        found = cache.lookup(
+            model_key, output_dimensionality, task_type, texts
+        )
+        # Unique texts still needing a vector, in first-seen order.
+        pending = list(
+            dict.fromkeys(
+                text
+                for text, vector in zip(texts, found, strict=True)
+                if vector is None
+            )
+        )
         logger.info(
-            "LLM embed → model=%s provider=%s | %d texts, dim=%d, task=%s",
+            "LLM embed → model=%s provider=%s | %d texts (%d cached), "
+            "dim=%d, task=%s",
             self.model,
             self._provider_name,
             len(texts),
+            len(texts) - sum(vector is None for vector in found),
             output_dimensionality,
             task_type,
         )
+        if not pending:
+            if on_progress is not None:
+                on_progress(len(texts), len(texts))
+            return [vector for vector in found if vector is not None]
+
+        cached_count = len(texts) - len(pending)
+        progress = on_progress
+        if on_progress is not None and cached_count:
+
+            def progress(done: int, total: int) -> None:
+                on_progress(cached_count + done, cached_count + total)
+
         start = time.perf_counter()
         try:
-            vectors = self._provider.embed(
-                texts,
+            fresh = self._provider.embed(
+                pending,
                 task_type=task_type,
                 output_dimensionality=output_dimensionality,
+                on_progress=progress,
             )
         except Exception:
             logger.exception(
@@ -334,10 +531,17 @@ class LLMClient:
         logger.info(
             "LLM embed ✓ model=%s | %d vectors (%.0fms)",
             self.model,
-            len(vectors),
+            len(fresh),
             (time.perf_counter() - start) * 1000,
         )
-        return vectors
+        cache.store(
+            model_key, output_dimensionality, task_type, pending, fresh
+        )
+        by_text = dict(zip(pending, fresh, strict=True))
+        return [
+            vector if vector is not None else by_text[text]
+            for text, vector in zip(texts, found, strict=True)
+        ]
 
     @staticmethod
     def format_sse_chunk(
@@ -17,6 +17,8 @@ from aeva.llm.prompts.builder import (
     PromptError,
     PromptTemplate,
     RenderedPrompt,
+    insert_after_static_prefix,
+    split_system_prompt,
 )
 from aeva.llm.prompts.flashcard import (
     FLASHCARD_GENERATION_SCHEMA,
@@ -98,5 +100,7 @@ __all__ = [
     "build_identity_block",
     "build_personalization_block",
     "build_space_block",
+    "insert_after_static_prefix",
+    "split_system_prompt",
     "user_profile_segment",
 ]
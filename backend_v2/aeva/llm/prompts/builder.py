@@ -31,9 +31,23 @@ Substitution is two-phase so it is both recursive and safe:
    excerpts) are injected in a single left-to-right pass, so text a *user*
    typed is never re-scanned for placeholders.
 
+Step 1 and the validation depend only on the template and on *which* names
+the caller supplies, never on their values. Each template therefore compiles
+once per set of supplied names into literal segments and value slots. It
+keeps the result, so a render after the first is one ``str.join``.
+
 Only ``{UPPER_SNAKE}`` tokens are placeholders, so literal JSON braces in the
 metadata trailer (``{"available_actions":[]}``) pass through untouched — which
 is why the trailer no longer needs to be appended after the fact.
+
+Prefix-stable system channel
+----------------------------
+Every system template puts its static blocks first and caller-supplied values
+(``{USER_PROFILE}``) last. The rendered system prompt therefore starts with a
+prefix that is byte-identical across users and turns. Each template registers
+that prefix when it is defined. :func:`split_system_prompt` lets a provider
+separate it from the per-user tail, to register it with the vendor's prompt
+cache or to keep its own additions (a JSON-schema hint) ahead of the tail.
 """
 
 import logging
@@ -54,6 +68,9 @@ _PLACEHOLDER_RE = re.compile(r"\{([A-Z_][A-Z0-9_]*)\}")
 # Guard against a static block that (mis)references itself in a cycle.
 _MAX_STATIC_PASSES = 10
 
+# Template name -> the static prefix of its system channel.
+_STATIC_PREFIXES: dict[str, str] = {}
+
 
 class PromptError(RuntimeError):
     """A template could not be rendered (missing or unresolved placeholder)."""
@@ -95,6 +112,16 @@ class PromptTemplate:
     # channels); they also drive the debug log's "attached" notes.
     uses_history: bool = False
     uses_attachments: bool = False
+    # Compiled channels per set of supplied names (see ``PromptBuilder``).
+    # Callers pass a fixed set of keywords, so this stays a handful of
+    # entries per template.
+    _compiled: dict[frozenset[str], "_CompiledPrompt"] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        """Register the template's static system prefix."""
+        _STATIC_PREFIXES[self.name] = static_system_prefix(self)
 
     def static_names(self, dynamic: set[str]) -> set[str]:
         """Names resolvable without a runtime value (blocks, optionals)."""
@@ -102,6 +129,47 @@ class PromptTemplate:
         return names - dynamic
 
 
+@dataclass(frozen=True)
+class _CompiledChannel:
+    """A channel with its static blocks expanded, split at value slots.
+
+    ``parts`` holds the literal text with ``""`` at each slot; ``slots``
+    pairs each slot's index in ``parts`` with the value name that fills it.
+    """
+
+    parts: tuple[str, ...]
+    slots: tuple[tuple[int, str], ...]
+
+    @classmethod
+    def split(cls, text: str) -> "_CompiledChannel":
+        """Cut expanded text at every remaining placeholder."""
+        parts: list[str] = []
+        slots: list[tuple[int, str]] = []
+        start = 0
+        for match in _PLACEHOLDER_RE.finditer(text):
+            parts.append(text[start : match.start()])
+            slots.append((len(parts), match.group(1)))
+            parts.append("")
+            start = match.end()
+        parts.append(text[start:])
+        return cls(tuple(parts), tuple(slots))
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """Fill the slots from ``values`` and join, in one pass."""
+        parts = list(self.parts)
+        for index, name in self.slots:
+            parts[index] = values[name]
+        return "".join(parts)
+
+
+@dataclass(frozen=True)
+class _CompiledPrompt:
+    """Both channels of a template, compiled for one set of value names."""
+
+    system: _CompiledChannel
+    user: _CompiledChannel
+
+
 @dataclass(frozen=True)
 class RenderedPrompt:
     """The resolved text for each channel the builder owns."""
@@ -116,7 +184,9 @@ class PromptBuilder:
     The one place placeholder substitution happens. It injects the supplied
     values, expands shared blocks, drops omitted optional sections, verifies no
     ``{PLACEHOLDER}`` is left unresolved, and — when ``PROMPT_DEBUG`` is on —
-    logs the fully rendered prompt before it reaches the LLM client.
+    logs the fully rendered prompt before it reaches the LLM client. The
+    expansion and checks run once per template and set of supplied names (see
+    :meth:`_compile`); every later build only fills the slots.
     """
 
     @classmethod
@@ -131,10 +201,30 @@ class PromptBuilder:
         static block cannot be fully expanded, or a supplied value matches no
         placeholder in the template (almost always a typo).
         """
-        dynamic = set(values)
+        dynamic = frozenset(values)
+        compiled = template._compiled.get(dynamic)  # noqa: SLF001
+        if compiled is None:
+            compiled = cls._compile(template, dynamic)
+            template._compiled[dynamic] = compiled  # noqa: SLF001
+        rendered = RenderedPrompt(
+            system_prompt=compiled.system.render(values),
+            user_message=compiled.user.render(values),
+        )
+        cls._debug(template, rendered)
+        return rendered
+
+    @classmethod
+    def _compile(
+        cls, template: PromptTemplate, dynamic: frozenset[str]
+    ) -> _CompiledPrompt:
+        """Expand and validate both channels for the names in ``dynamic``."""
         used: set[str] = set()
-        system = cls._render(template, template.system, values, dynamic, used)
-        user = cls._render(template, template.user, values, dynamic, used)
+        compiled = _CompiledPrompt(
+            system=cls._compile_channel(
+                template, template.system, dynamic, used
+            ),
+            user=cls._compile_channel(template, template.user, dynamic, used),
+        )
         unused = sorted(dynamic - used)
         if unused:
             raise PromptError(
@@ -142,36 +232,22 @@ class PromptBuilder:
                 f"'{template.name}' has no matching placeholder — "
                 f"check for a typo in the build() call or the template.",
             )
-        rendered = RenderedPrompt(system_prompt=system, user_message=user)
-        cls._debug(template, rendered)
-        return rendered
+        return compiled
 
     @classmethod
-    def _render(
+    def _compile_channel(
         cls,
         template: PromptTemplate,
         text: str,
-        values: Mapping[str, str],
-        dynamic: set[str],
+        dynamic: frozenset[str],
         used: set[str],
-    ) -> str:
-        """Two-phase substitution for one channel, validating in between."""
-        static = template.static_names(dynamic)
-
+    ) -> _CompiledChannel:
+        """Expand one channel's static blocks and cut it at value slots."""
         # Phase 1: expand trusted static blocks, repeatedly, so a block may
         # embed another block. Only names known to be static are touched.
-        def resolve_static(match: re.Match[str]) -> str:
-            name = match.group(1)
-            if name in static:
-                return cls._static_value(template, name)
-            return match.group(0)
-
-        for _ in range(_MAX_STATIC_PASSES):
-            text, count = _PLACEHOLDER_RE.subn(resolve_static, text)
-            if not count or not any(
-                m.group(1) in static for m in _PLACEHOLDER_RE.finditer(text)
-            ):
-                break
+        text = cls._expand_static(
+            template, text, template.static_names(set(dynamic))
+        )
 
         # Phase 2: validate BEFORE injecting runtime values, so validation
         # never scans text a user typed. Every placeholder still standing must
@@ -187,15 +263,29 @@ class PromptBuilder:
             )
         used |= remaining
 
-        # Phase 3: inject runtime values in a single left-to-right pass;
-        # injected text is never re-scanned, so user-typed braces are safe.
-        def resolve_dynamic(match: re.Match[str]) -> str:
+        # Phase 3 (every build): values fill the slots and are never
+        # scanned, so user-typed braces are safe.
+        return _CompiledChannel.split(text)
+
+    @classmethod
+    def _expand_static(
+        cls, template: PromptTemplate, text: str, static: set[str]
+    ) -> str:
+        """Expand the ``static`` names in ``text`` until none is left."""
+
+        def resolve_static(match: re.Match[str]) -> str:
             name = match.group(1)
-            if name in dynamic:
-                return values[name]
+            if name in static:
+                return cls._static_value(template, name)
             return match.group(0)
 
-        return _PLACEHOLDER_RE.sub(resolve_dynamic, text)
+        for _ in range(_MAX_STATIC_PASSES):
+            text, count = _PLACEHOLDER_RE.subn(resolve_static, text)
+            if not count or not any(
+                m.group(1) in static for m in _PLACEHOLDER_RE.finditer(text)
+            ):
+                break
+        return text
 
     @staticmethod
     def _static_value(template: PromptTemplate, name: str) -> str:
@@ -229,3 +319,42 @@ class PromptBuilder:
             )
         lines.append(f"── user channel ──\n{rendered.user_message}")
         logger.info("\n".join(lines))
+
+
+def static_system_prefix(template: PromptTemplate) -> str:
+    """Return the system channel up to its first caller-supplied value.
+
+    Shared blocks and markers are expanded. Optional placeholders count as
+    caller-supplied, since a call may fill them with per-user text.
+    """
+    static = set(template.defaults) | set(template.markers)
+    text = PromptBuilder._expand_static(template, template.system, static)  # noqa: SLF001
+    match = _PLACEHOLDER_RE.search(text)
+    return text[: match.start()] if match else text
+
+
+def split_system_prompt(system_prompt: str) -> tuple[str, str]:
+    """Split a rendered system prompt into ``(static prefix, per-call tail)``.
+
+    The prefix is the longest registered template prefix the prompt starts
+    with. A prompt no template produced returns ``("", system_prompt)``, so
+    callers never treat unknown text as shareable.
+    """
+    best = ""
+    for prefix in _STATIC_PREFIXES.values():
+        if len(prefix) > len(best) and system_prompt.startswith(prefix):
+            best = prefix
+    return best, system_prompt[len(best) :]
+
+
+def insert_after_static_prefix(system_prompt: str, block: str) -> str:
+    """Put ``block`` between the static prefix and the per-call tail.
+
+    A block that is the same on every call (a JSON-schema hint) then stays
+    inside the cacheable prefix. Prompts with no known prefix get it
+    appended.
+    """
+    prefix, tail = split_system_prompt(system_prompt)
+    if not prefix:
+        return f"{system_prompt}\n\n{block}"
+    return f"{prefix}\n\n{block}{tail}"
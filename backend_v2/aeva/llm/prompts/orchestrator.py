@@ -17,34 +17,20 @@ The planner never writes an answer, so it does NOT inherit Aeva's answer-facing
 ``{SYSTEM_PROMPT}`` block (identity, formatting, teaching rules) — that would
 be pure wasted context on every turn — and no ``{USER_PROFILE}`` either: the
 planner emits JSON, never prose, so personalization cannot change its output.
-Its system channel is a one-line directive that it is a router returning only
-JSON; all routing knowledge lives in the user channel.
+Its system channel is the router directive plus the whole routing guide
+(decision trees, tool rules, examples). That text is the same on every turn
+and for every user, so it forms a byte-identical prefix that provider prompt
+caching can reuse. The user channel carries only this turn's tool list, hints
+and message.
 """
 
 from aeva.llm.prompts.builder import PromptTemplate
 
 PLAN_TURN_TEMPLATE = PromptTemplate(
     name="plan_turn",
-    system=(
-        "You are a routing layer, not the assistant. Decide the next action "
-        "and return only JSON matching the provided schema. Never write a "
-        "reply to the student."
-    ),
-    user="""{CONVERSATION_CONTEXT}
-You are Aeva's planning layer.
-
-Never answer the student. Decide the next action and return only JSON matching the provided schema.
-
-Available tools:
-{AVAILABLE_TOOLS}
-
-{MEDIA_HINT}
-{CLARIFICATION_HINT}
-
-Student message:
-{USER_MESSAGE}
+    system="""You are a routing layer, not the assistant. Decide the next action and return only JSON matching the provided schema. Never write a reply to the student.
 
-The conversation above is in chronological order (oldest first). Every assistant turn that ran a tool is tagged `[tool: NAME]` at the start of its content, naming the tool that produced that answer — e.g. `[tool: quiz_generator]` or `[tool: media_llm]`. Use these tags to self-determine the tool for the current message:
+The conversation before the student message is in chronological order (oldest first). Every assistant turn that ran a tool is tagged `[tool: NAME]` at the start of its content, naming the tool that produced that answer — e.g. `[tool: quiz_generator]` or `[tool: media_llm]`. Use these tags to self-determine the tool for the current message:
 - Resolve follow-up references ("explain more", "quiz me", "summarize this", "in simpler terms", "another one", "again") against the most recent tagged turns.
 - A keyword-less continuation ("do that again", "one more", "another") should reuse the tool of the most recent tagged assistant turn unless the current message clearly asks for something else.
 - The current message has highest priority, then the recent tagged conversation, then selected media. When the message itself is explicit, follow it even if earlier turns used a different tool.
@@ -197,8 +183,20 @@ When clarifying:
 After the frontend submits the clarification answers, NEVER ask another clarification question. Generate the final answer immediately.
 
 If the user closes or skips clarification, treat it as skipped and continue with reasonable assumptions. Never reopen clarification automatically.
-```
+```""",
+    user="""{CONVERSATION_CONTEXT}
+You are Aeva's planning layer.
+
+Never answer the student. Decide the next action and return only JSON matching the provided schema.
+
+Available tools:
+{AVAILABLE_TOOLS}
+
+{MEDIA_HINT}
+{CLARIFICATION_HINT}
 
+Student message:
+{USER_MESSAGE}
 
 Return only JSON matching the supplied schema.
 """,
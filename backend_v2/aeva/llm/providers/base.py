@@ -8,8 +8,9 @@ it into its own structured-output mechanism so the returned shape stays
 identical across vendors.
 """
 
+import threading
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from typing import Any
 
 
@@ -18,8 +19,37 @@ class LLMProvider(ABC):
 
     def __init__(self, model: str) -> None:
         self.model = model
-        # Grounding citations captured from the most recent call (if any).
-        self.last_sources: list[dict[str, str]] = []
+        # Per-thread call state. Providers are pooled and shared across
+        # request threads (see ``factory.get_provider``), so anything a call
+        # leaves behind for its caller must not leak into another request.
+        self._local = threading.local()
+
+    @property
+    def last_sources(self) -> list[dict[str, str]]:
+        """Grounding citations captured from this thread's most recent call."""
+        sources: list[dict[str, str]] = getattr(
+            self._local, "last_sources", []
+        )
+        return sources
+
+    @last_sources.setter
+    def last_sources(self, value: list[dict[str, str]]) -> None:
+        self._local.last_sources = value
+
+    @property
+    def last_usage(self) -> dict[str, int]:
+        """Token counts reported for this thread's most recent call.
+
+        Keys are ``prompt_tokens``, ``cached_tokens`` (the part of the prompt
+        served from the vendor's prompt cache) and ``output_tokens``. The
+        dict is empty when the vendor reported no usage.
+        """
+        usage: dict[str, int] = getattr(self._local, "last_usage", {})
+        return usage
+
+    @last_usage.setter
+    def last_usage(self, value: dict[str, int]) -> None:
+        self._local.last_usage = value
 
     @abstractmethod
     def generate(
@@ -62,9 +92,11 @@ class LLMProvider(ABC):
         *,
         task_type: str = "RETRIEVAL_DOCUMENT",
         output_dimensionality: int = 768,
+        on_progress: Callable[[int, int], None] | None = None,
     ) -> list[list[float]]:
         """Return one embedding vector per input text.
 
+        ``on_progress(done, total)`` reports embedded texts as batches land.
         Only providers backing the RAG retrieval layer implement this; the
         default refuses so a misconfigured embedding provider fails loudly
         rather than silently returning nothing.
@@ -83,3 +115,16 @@ class LLMProvider(ABC):
         """
         msg = f"{type(self).__name__} does not support image generation"
         raise NotImplementedError(msg)
+
+
+def token_usage(
+    prompt_tokens: int | None,
+    cached_tokens: int | None,
+    output_tokens: int | None,
+) -> dict[str, int]:
+    """Build a ``last_usage`` dict; vendors leave unknown counts as ``None``."""
+    return {
+        "prompt_tokens": prompt_tokens or 0,
+        "cached_tokens": cached_tokens or 0,
+        "output_tokens": output_tokens or 0,
+    }
@@ -0,0 +1,181 @@
+"""Concurrent, retried batch dispatch shared by the embedding providers.
+
+Embedding APIs cap how many texts one call accepts, so a large document is
+split into batches. ``embed_batches`` sends up to ``EMBED_MAX_IN_FLIGHT`` of
+them at once, retries a batch that hit a rate limit or a server error with
+exponential backoff, and puts the vectors back in input order. The provider
+only supplies the single-batch call.
+
+Batches run on a small executor owned by the call rather than on the shared
+I/O pool (``aeva.common.concurrency``): embedding is itself often invoked
+from a pooled task, and a pooled task must never wait on the same pool.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import httpx
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Fallbacks when no app config is available (scripts, tests).
+_DEFAULT_MAX_IN_FLIGHT = 4
+_DEFAULT_MAX_RETRIES = 3
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_CAP_SECONDS = 20.0
+
+# HTTP statuses worth retrying: rate limiting and transient server errors.
+_RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Transport failures worth retrying (not e.g. ``UnsupportedProtocol``).
+_TRANSIENT_HTTPX = (
+    httpx.TimeoutException,
+    httpx.NetworkError,
+    httpx.RemoteProtocolError,
+)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def batched(texts: list[str], size: int) -> Generator[list[str], None, None]:
+    """Yield successive slices of ``texts`` of at most ``size`` items."""
+    for start in range(0, len(texts), size):
+        yield texts[start : start + size]
+
+
+def _status_of(exc: BaseException) -> int | None:
+    """Best-effort HTTP status of an SDK error.
+
+    ``openai`` errors carry ``status_code``; ``google-genai`` ``APIError``
+    carries ``code``. Anything else has no status.
+    """
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether a failed batch is worth sending again.
+
+    Both SDKs sit on httpx. ``google-genai`` lets its transport errors
+    (connect/read timeouts, resets, dropped HTTP/2 streams) escape unwrapped,
+    and they do not subclass the builtin ``ConnectionError``/``TimeoutError``.
+    """
+    if isinstance(exc, (TimeoutError, ConnectionError, *_TRANSIENT_HTTPX)):
+        return True
+    if type(exc).__name__ in {"APIConnectionError", "APITimeoutError"}:
+        return True
+    return _status_of(exc) in _RETRY_STATUSES
+
+
+def _config_int(key: str, default: int) -> int:
+    if not has_app_context():
+        return default
+    return int(current_app.config.get(key, default))
+
+
+def embed_batches(
+    texts: list[str],
+    embed_batch: Callable[[list[str]], list[list[float]]],
+    *,
+    batch_size: int,
+    on_progress: ProgressCallback | None = None,
+) -> list[list[float]]:
+    """Embed ``texts`` batch by batch, concurrently, preserving order.
+
+    ``embed_batch`` embeds one batch and must return one vector per text.
+    ``on_progress(done, total)`` is called (from worker threads) after each
+    batch lands, counting texts. A batch that still fails after the retry
+    budget re-raises its last error and cancels the batches not yet started.
+    """
+    batches = list(batched(texts, batch_size))
+    if not batches:
+        return []
+    max_in_flight = max(
+        1, _config_int("EMBED_MAX_IN_FLIGHT", _DEFAULT_MAX_IN_FLIGHT)
+    )
+    max_retries = max(
+        0, _config_int("EMBED_MAX_RETRIES", _DEFAULT_MAX_RETRIES)
+    )
+    total = len(texts)
+    done = 0
+    progress_lock = threading.Lock()
+
+    def _run(index: int, batch: list[str]) -> list[list[float]]:
+        nonlocal done
+        vectors = _with_retry(embed_batch, batch, index, max_retries)
+        if len(vectors) != len(batch):
+            msg = (
+                f"Embedding batch {index} returned {len(vectors)} vectors "
+                f"for {len(batch)} texts"
+            )
+            raise ValueError(msg)
+        if on_progress is not None:
+            with progress_lock:
+                done += len(batch)
+                on_progress(done, total)
+        return vectors
+
+    if len(batches) == 1 or max_in_flight == 1:
+        results = [_run(i, batch) for i, batch in enumerate(batches)]
+    else:
+        workers = min(max_in_flight, len(batches))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="aeva-embed"
+        ) as executor:
+            futures = [
+                executor.submit(_run, i, batch)
+                for i, batch in enumerate(batches)
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    return [vector for batch_vectors in results for vector in batch_vectors]
+
+
+def _with_retry(
+    embed_batch: Callable[[list[str]], list[list[float]]],
+    batch: list[str],
+    index: int,
+    max_retries: int,
+) -> list[list[float]]:
+    """Call ``embed_batch``, backing off on retryable errors."""
+    attempt = 0
+    while True:
+        try:
+            return embed_batch(batch)
+        except Exception as exc:
+            if attempt >= max_retries or not is_retryable(exc):
+                raise
+            delay = min(
+                _BACKOFF_CAP_SECONDS, _BACKOFF_BASE_SECONDS * 2**attempt
+            )
+            # Full jitter so parallel batches that were throttled together
+            # do not all come back at the same instant.
+            delay = random.uniform(0, delay)  # noqa: S311 - not crypto
+            logger.warning(
+                "Embedding batch %d failed (%s); retry %d/%d in %.1fs",
+                index,
+                _describe(exc),
+                attempt + 1,
+                max_retries,
+                delay,
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+def _describe(exc: BaseException) -> Any:
+    status = _status_of(exc)
+    return status if status is not None else type(exc).__name__
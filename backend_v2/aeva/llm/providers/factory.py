@@ -3,9 +3,21 @@
 A capability picks its provider through a ``LLM_*_PROVIDER`` config key
 (falling back to ``LLM_PROVIDER``) and its model through the matching
 ``LLM_*_MODEL`` key. To add a vendor: implement :class:`LLMProvider`, add it to
-``PROVIDERS``, and set its API key in config.
+``PROVIDERS``, list the config it reads in ``_PROVIDER_CONFIG``, and set its
+API key in config.
+
+Providers are pooled: :func:`get_provider` hands back one warm, shared instance
+per (provider, model, provider config), so its SDK client and HTTP keep-alive
+connections survive across requests instead of paying SDK init and a TLS
+handshake on every turn that routes to a non-default model. Provider instances
+are safe to share between request threads — per-call state lives in
+thread-local storage (see :class:`LLMProvider`).
 """
 
+import hashlib
+import logging
+import threading
+
 from flask import current_app
 
 from aeva.common.errors import ERROR_CODES, CustomError
@@ -21,6 +33,30 @@ PROVIDERS: dict[str, type[LLMProvider]] = {
     "openai": OpenAIProvider,
 }
 
+# Config each provider's constructor reads. Hashed into the pool key, so a
+# rotated API key or a different gateway never reuses a stale client.
+_PROVIDER_CONFIG: dict[str, tuple[str, ...]] = {
+    "gemini": ("GEMINI_API_KEY",),
+    "groq": (
+        "GROQ_API_KEY",
+        "GROQ_BASE_URL",
+        "GROQ_MAX_TOKENS",
+        "GROQ_REASONING_EFFORT",
+    ),
+    "openai": (
+        "OPENAI_API_KEY",
+        "OPENAI_BASE_URL",
+        "OPENAI_MAX_TOKENS",
+        "OPENAI_REASONING_EFFORT",
+    ),
+}
+
+logger = logging.getLogger(__name__)
+
+_pool: dict[tuple[str, str, str], LLMProvider] = {}
+_pool_lock = threading.Lock()
+_pool_stats = {"hits": 0, "misses": 0}
+
 
 def _provider_key_for(config_key: str) -> str:
     """Map a model config key to its provider config key.
@@ -33,13 +69,12 @@ def _provider_key_for(config_key: str) -> str:
     return "LLM_PROVIDER"
 
 
-def create_provider(
-    *,
-    config_key: str = "LLM_MODEL",
-    model: str | None = None,
-    provider_key: str | None = None,
-) -> LLMProvider:
-    """Instantiate the configured provider for a capability."""
+def _resolve(
+    config_key: str,
+    model: str | None,
+    provider_key: str | None,
+) -> tuple[str, str]:
+    """Resolve ``(provider_name, model_name)`` for a capability."""
     provider_key = provider_key or _provider_key_for(config_key)
     provider_name = current_app.config.get(
         provider_key, current_app.config["LLM_PROVIDER"]
@@ -50,11 +85,94 @@ def create_provider(
     # model, so never pass the whole string — use the first entry.
     if model_name and "," in model_name:
         model_name = model_name.split(",", 1)[0].strip()
+    if provider_name not in PROVIDERS:
+        raise CustomError(
+            ERROR_CODES["LLM_ERROR"],
+            details=f"Unknown LLM provider: {provider_name}",
+        )
+    return provider_name, model_name
+
+
+def _config_fingerprint(provider_name: str) -> str:
+    """Short digest of the config a provider is built from."""
+    values = "\x1f".join(
+        str(current_app.config.get(key, ""))
+        for key in _PROVIDER_CONFIG.get(provider_name, ())
+    )
+    return hashlib.sha256(values.encode()).hexdigest()[:16]
+
+
+def create_provider(
+    *,
+    config_key: str = "LLM_MODEL",
+    model: str | None = None,
+    provider_key: str | None = None,
+) -> LLMProvider:
+    """Instantiate a fresh (unpooled) provider for a capability."""
+    provider_name, model_name = _resolve(config_key, model, provider_key)
+    return PROVIDERS[provider_name](model=model_name)
+
+
+def get_provider(
+    *,
+    config_key: str = "LLM_MODEL",
+    model: str | None = None,
+    provider_key: str | None = None,
+) -> LLMProvider:
+    """Return the pooled provider for a capability, building it on a miss.
+
+    Two capabilities that resolve to the same provider + model share one
+    instance (and its connection pool). Construction happens under the pool
+    lock, so concurrent first requests never build duplicate SDK clients.
+    """
+    provider_name, model_name = _resolve(config_key, model, provider_key)
+    return get_named_provider(provider_name, model_name)
 
-    provider_cls = PROVIDERS.get(provider_name)
-    if not provider_cls:
+
+def get_named_provider(provider_name: str, model_name: str) -> LLMProvider:
+    """Return the pooled provider for an explicit vendor and model.
+
+    Used for cross-vendor failover targets (``LLM_FAILOVER_MODELS``), which
+    name their provider directly instead of through a capability's config.
+    """
+    if provider_name not in PROVIDERS:
         raise CustomError(
             ERROR_CODES["LLM_ERROR"],
             details=f"Unknown LLM provider: {provider_name}",
         )
-    return provider_cls(model=model_name)
+    key = (provider_name, model_name, _config_fingerprint(provider_name))
+    provider = _pool.get(key)
+    if provider is not None:
+        with _pool_lock:
+            _pool_stats["hits"] += 1
+        return provider
+    with _pool_lock:
+        provider = _pool.get(key)
+        if provider is not None:
+            _pool_stats["hits"] += 1
+            return provider
+        _pool_stats["misses"] += 1
+        provider = PROVIDERS[provider_name](model=model_name)
+        _pool[key] = provider
+        size = len(_pool)
+    logger.info(
+        "LLM provider pool miss | provider=%s model=%s | pooled=%d",
+        provider_name,
+        model_name,
+        size,
+    )
+    return provider
+
+
+def pool_stats() -> dict[str, int]:
+    """Return pool counters: ``hits``, ``misses``, and pooled ``size``."""
+    with _pool_lock:
+        return {**_pool_stats, "size": len(_pool)}
+
+
+def clear_pool() -> None:
+    """Drop every pooled provider and reset the counters."""
+    with _pool_lock:
+        _pool.clear()
+        _pool_stats["hits"] = 0
+        _pool_stats["misses"] = 0
@@ -1,40 +1,38 @@
-"""Google Gemini provider."""
+"""Google Gemini provider.
 
-import io
+With ``GEMINI_CONTEXT_CACHE`` on, the static prefix of the system prompt is
+served from an explicit context cache (see ``gemini_context_cache``). The
+per-user tail of the system prompt then leads the user turn. Otherwise
+Gemini's implicit prefix caching applies, which needs the same byte-identical
+prefix. ``last_usage`` reports ``cached_content_token_count`` either way.
+"""
+
+import itertools
 import json
-import math
-from collections.abc import Generator
-from typing import Any
+from collections.abc import Callable, Generator, Iterator
+from typing import Any, TypeVar
 
 from flask import current_app
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from aeva.llm import prompts
-from aeva.llm.providers.base import LLMProvider
+from aeva.llm.providers.base import LLMProvider, token_usage
+from aeva.llm.providers.embedding import ProgressCallback, embed_batches
+from aeva.llm.providers.gemini_context_cache import (
+    cached_prefix,
+    forget_prefix,
+)
+from aeva.llm.providers.gemini_files import key_fingerprint, upload_files
+from aeva.llm.vectors import normalize_rows
 
+# Status codes Gemini returns for a cache that no longer exists.
+_MISSING_CACHE_CODES = (403, 404)
 # Gemini caps the number of texts accepted per embed_content call; batch under
 # it so a large document's chunks embed across several requests.
 _EMBED_BATCH_SIZE = 100
 
-
-def _l2_normalize(values: list[float]) -> list[float]:
-    """Scale a vector to unit length.
-
-    Gemini embeddings are pre-normalized only at the default 3072 dimensions;
-    truncated outputs (e.g. 768) are not, so cosine search needs an explicit
-    L2 normalization here to stay correct.
-    """
-    norm = math.sqrt(sum(v * v for v in values))
-    if norm == 0:
-        return values
-    return [v / norm for v in values]
-
-
-def _batched(texts: list[str], size: int) -> Generator[list[str], None, None]:
-    """Yield successive slices of ``texts`` of at most ``size`` items."""
-    for start in range(0, len(texts), size):
-        yield texts[start : start + size]
+T = TypeVar("T")
 
 
 class GeminiProvider(LLMProvider):
@@ -42,8 +40,16 @@ class GeminiProvider(LLMProvider):
 
     def __init__(self, model: str) -> None:
         super().__init__(model)
-        self.client = genai.Client(
-            api_key=current_app.config["GEMINI_API_KEY"]
+        api_key = current_app.config["GEMINI_API_KEY"]
+        self.client = genai.Client(api_key=api_key)
+        self._files_scope = key_fingerprint(api_key)
+        config = current_app.config
+        self._context_cache: bool = config.get("GEMINI_CONTEXT_CACHE", False)
+        self._context_cache_ttl: int = config.get(
+            "GEMINI_CONTEXT_CACHE_TTL_SECONDS", 3600
+        )
+        self._context_cache_min_chars: int = config.get(
+            "GEMINI_CONTEXT_CACHE_MIN_CHARS", 4000
         )
 
     def _contents(
@@ -51,8 +57,15 @@ class GeminiProvider(LLMProvider):
         user_message: str,
         attachments: list[dict[str, Any]] | None = None,
         history: list[dict[str, str]] | None = None,
+        preamble: str = "",
     ) -> list[Any]:
-        """Build contents: history + uploaded files + current message."""
+        """Build contents: history + uploaded files + current message.
+
+        Attachments already uploaded under this API key are referenced by
+        URI; the rest upload concurrently (see ``gemini_files``). A
+        ``preamble`` (the system tail when the prefix is cached) leads the
+        current message.
+        """
         contents: list[Any] = []
 
         for item in history or []:
@@ -64,43 +77,173 @@ class GeminiProvider(LLMProvider):
                 )
             )
 
-        parts: list[Any] = []
-        for att in attachments or []:
-            uploaded = self.client.files.upload(
-                file=io.BytesIO(att["data"]),
-                config=types.UploadFileConfig(mime_type=att["mime_type"]),
-            )
-            parts.append(
-                types.Part.from_uri(
-                    file_uri=uploaded.uri,
-                    mime_type=uploaded.mime_type,
-                )
+        parts: list[Any] = [
+            types.Part.from_uri(file_uri=handle.uri, mime_type=handle.mime_type)
+            for handle in upload_files(
+                self.client, attachments or [], scope=self._files_scope
             )
+        ]
+        if preamble:
+            parts.insert(0, types.Part.from_text(text=preamble))
         parts.append(types.Part.from_text(text=user_message))
         contents.append(types.Content(role="user", parts=parts))
         return contents
 
-    def _config(
+    def _cache_for(
+        self, system: str, tools: list[types.Tool] | None
+    ) -> tuple[str | None, str, str]:
+        """``(cache name, static prefix, tail)`` for a system prompt.
+
+        The name is ``None`` when context caching is off, the prompt has no
+        known prefix, the prefix is too short, or the cache is unavailable.
+        """
+        if not self._context_cache:
+            return None, "", system
+        prefix, tail = prompts.split_system_prompt(system)
+        if not prefix or len(prefix) < self._context_cache_min_chars:
+            return None, "", system
+        name = cached_prefix(
+            self.client,
+            scope=self._files_scope,
+            model=self.model,
+            prefix=prefix,
+            tools=tools,
+            ttl_seconds=self._context_cache_ttl,
+        )
+        return name, prefix, tail
+
+    def _request(
         self,
+        user_message: str,
+        *,
         system_prompt: str | None,
+        attachments: list[dict[str, Any]] | None,
+        history: list[dict[str, str]] | None,
         use_search: bool,
         response_schema: dict[str, Any] | None = None,
-    ) -> types.GenerateContentConfig:
-        """Build generation config."""
+        cache: bool = True,
+    ) -> tuple[list[Any], types.GenerateContentConfig, str]:
+        """Build ``(contents, config, cached prefix)`` for one call.
+
+        With a context cache the config names it instead of carrying the
+        system instruction and tools. The cached prefix is ``""`` when no
+        cache is used.
+        """
+        system = system_prompt or prompts.SYSTEM_PROMPT
         tools = (
             [types.Tool(google_search=types.GoogleSearch())]
             if use_search
             else None
         )
-        kwargs: dict[str, Any] = {
-            "system_instruction": system_prompt or prompts.SYSTEM_PROMPT,
-            "tools": tools,
-        }
+        name, prefix, tail = (
+            self._cache_for(system, tools) if cache else (None, "", system)
+        )
+        if name is None:
+            return (
+                self._contents(user_message, attachments, history),
+                self._config(
+                    {"system_instruction": system, "tools": tools},
+                    response_schema,
+                ),
+                "",
+            )
+        return (
+            self._contents(
+                user_message, attachments, history, preamble=tail.strip()
+            ),
+            self._config({"cached_content": name}, response_schema),
+            prefix,
+        )
+
+    def _send(
+        self,
+        send: Callable[[list[Any], types.GenerateContentConfig], T],
+        user_message: str,
+        **request: Any,
+    ) -> T:
+        """Run ``send``, once more uncached if the cache fails.
+
+        A cache can disappear before its registry entry expires (deleted
+        by hand, or evicted early). Gemini then answers 403/404. The entry is
+        dropped, so the next call creates a new cache.
+        """
+        contents, config, prefix = self._request(user_message, **request)
+        try:
+            return send(contents, config)
+        except errors.ClientError as exc:
+            if not prefix or exc.code not in _MISSING_CACHE_CODES:
+                raise
+        forget_prefix(
+            scope=self._files_scope,
+            model=self.model,
+            prefix=prefix,
+            search=request["use_search"],
+        )
+        contents, config, _ = self._request(
+            user_message, **request, cache=False
+        )
+        return send(contents, config)
+
+    def _generate_content(
+        self, user_message: str, **request: Any
+    ) -> types.GenerateContentResponse:
+        """Run ``generate_content`` (see ``_send``)."""
+
+        def send(
+            contents: list[Any], config: types.GenerateContentConfig
+        ) -> types.GenerateContentResponse:
+            return self.client.models.generate_content(
+                model=self.model, contents=contents, config=config
+            )
+
+        return self._send(send, user_message, **request)
+
+    def _open_stream(
+        self, user_message: str, **request: Any
+    ) -> Iterator[types.GenerateContentResponse]:
+        """Open ``generate_content_stream`` (see ``_send``).
+
+        The request only goes out when the stream is first read, so the
+        first chunk is fetched here. A missing cache then fails before
+        anything reaches the caller and can still be retried uncached.
+        """
+
+        def send(
+            contents: list[Any], config: types.GenerateContentConfig
+        ) -> Iterator[types.GenerateContentResponse]:
+            stream = iter(
+                self.client.models.generate_content_stream(
+                    model=self.model, contents=contents, config=config
+                )
+            )
+            first = next(stream, None)
+            return stream if first is None else itertools.chain([first], stream)
+
+        return self._send(send, user_message, **request)
+
+    @staticmethod
+    def _config(
+        kwargs: dict[str, Any],
+        response_schema: dict[str, Any] | None = None,
+    ) -> types.GenerateContentConfig:
+        """Build generation config from the prompt/cache ``kwargs``."""
         if response_schema:
             kwargs["response_mime_type"] = "application/json"
             kwargs["response_schema"] = response_schema
         return types.GenerateContentConfig(**kwargs)
 
+    @staticmethod
+    def _usage(response: Any) -> dict[str, int]:
+        """``last_usage`` from a response's ``usage_metadata``."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return {}
+        return token_usage(
+            usage.prompt_token_count,
+            usage.cached_content_token_count,
+            usage.candidates_token_count,
+        )
+
     @staticmethod
     def _extract_sources(response: Any) -> list[dict[str, str]]:
         """Pull grounding citations (title + url) from a response."""
@@ -130,12 +273,16 @@ class GeminiProvider(LLMProvider):
     ) -> str:
         """Generate a response (optionally grounded with Google Search)."""
         self.last_sources = []
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=self._contents(user_message, attachments, history),
-            config=self._config(system_prompt, use_search),
+        self.last_usage = {}
+        response = self._generate_content(
+            user_message,
+            system_prompt=system_prompt,
+            attachments=attachments,
+            history=history,
+            use_search=use_search,
         )
         self.last_sources = self._extract_sources(response)
+        self.last_usage = self._usage(response)
         return response.text or ""
 
     def generate_structured(
@@ -150,16 +297,17 @@ class GeminiProvider(LLMProvider):
     ) -> dict[str, Any]:
         """Generate JSON matching the given schema."""
         self.last_sources = []
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=self._contents(user_message, attachments, history),
-            config=self._config(
-                system_prompt,
-                use_search,
-                response_schema=response_schema,
-            ),
+        self.last_usage = {}
+        response = self._generate_content(
+            user_message,
+            system_prompt=system_prompt,
+            attachments=attachments,
+            history=history,
+            use_search=use_search,
+            response_schema=response_schema,
         )
         self.last_sources = self._extract_sources(response)
+        self.last_usage = self._usage(response)
         text = response.text or "{}"
         data: dict[str, Any] = json.loads(text)
         return data
@@ -174,15 +322,21 @@ class GeminiProvider(LLMProvider):
     ) -> Generator[str, None, None]:
         """Stream the response, yielding text chunks as they arrive."""
         self.last_sources = []
-        stream = self.client.models.generate_content_stream(
-            model=self.model,
-            contents=self._contents(user_message, attachments, history),
-            config=self._config(system_prompt, use_search),
+        self.last_usage = {}
+        stream = self._open_stream(
+            user_message,
+            system_prompt=system_prompt,
+            attachments=attachments,
+            history=history,
+            use_search=use_search,
         )
         for chunk in stream:
             sources = self._extract_sources(chunk)
             if sources:
                 self.last_sources = sources
+            usage = self._usage(chunk)
+            if usage:
+                self.last_usage = usage
             if chunk.text:
                 yield chunk.text
 
@@ -221,24 +375,33 @@ class GeminiProvider(LLMProvider):
         *,
         task_type: str = "RETRIEVAL_DOCUMENT",
         output_dimensionality: int = 768,
+        on_progress: ProgressCallback | None = None,
     ) -> list[list[float]]:
         """Embed texts with Gemini, L2-normalized for cosine search.
 
         ``task_type`` is ``RETRIEVAL_DOCUMENT`` when indexing chunks and
         ``RETRIEVAL_QUERY`` for a search query; matching them improves recall.
+        Batches are dispatched concurrently (see ``embed_batches``).
         """
-        vectors: list[list[float]] = []
-        for batch in _batched(texts, _EMBED_BATCH_SIZE):
+        config = types.EmbedContentConfig(
+            task_type=task_type,
+            output_dimensionality=output_dimensionality,
+        )
+
+        def _embed_batch(batch: list[str]) -> list[list[float]]:
             response = self.client.models.embed_content(
                 model=self.model,
                 contents=batch,  # type: ignore[arg-type]
-                config=types.EmbedContentConfig(
-                    task_type=task_type,
-                    output_dimensionality=output_dimensionality,
-                ),
+                config=config,
             )
-            vectors.extend(
-                _l2_normalize(list(embedding.values or []))
-                for embedding in response.embeddings or []
+            # Truncated outputs (e.g. 768 of 3072 dims) are not unit length.
+            return normalize_rows(
+                item.values or [] for item in response.embeddings or []
             )
-        return vectors
+
+        return embed_batches(
+            texts,
+            _embed_batch,
+            batch_size=_EMBED_BATCH_SIZE,
+            on_progress=on_progress,
+        )
@@ -0,0 +1,149 @@
+"""Gemini explicit context caches for the static system prefix.
+
+Every answer and planner call starts with the same few thousand characters:
+``SYSTEM_PROMPT`` and the template's static blocks (see
+``prompts.split_system_prompt``). With ``GEMINI_CONTEXT_CACHE`` on, that
+prefix is registered once per model as a ``CachedContent``. Calls then name
+the cache, and the prefix is billed at the cached-token rate and skips
+prefill. Only the per-user tail of the system prompt is sent with each call.
+
+Entries are keyed by API key fingerprint, model, SHA-256 of the prefix and
+whether Google Search is attached. A cache fixes its tools at creation, and
+``generate_content`` rejects tools next to ``cached_content``. A cache lives
+``GEMINI_CONTEXT_CACHE_TTL_SECONDS`` on Google's side. It is stored here for
+``_EXPIRY_MARGIN_SECONDS`` less, so a call never names a cache that is about
+to expire. A failed ``caches.create`` is remembered for ``_RETRY_SECONDS`` so
+that every call does not retry it. This happens when the model has no
+context caching or the prefix is under the model's minimum token count.
+Callers then send the full system prompt, and implicit caching still applies.
+
+Prefixes shorter than ``GEMINI_CONTEXT_CACHE_MIN_CHARS`` are never
+registered. Gemini 2.5 Flash needs 1,024 tokens (~4,000 characters) and
+Pro needs 4,096.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Any
+
+from google.genai import types
+
+from aeva.common.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Stop naming a cache this long before Google expires it.
+_EXPIRY_MARGIN_SECONDS = 60
+# How long a failed creation is remembered before it is tried again.
+_RETRY_SECONDS = 600
+# Templates x models x search on/off; a few dozen entries at most.
+_MAX_ENTRIES = 64
+_MAX_TTL_SECONDS = 24 * 3600
+
+# Value "" marks a prefix that could not be cached.
+_registry: TTLCache[str] | None = None
+_lock = threading.Lock()
+_key_locks: dict[tuple[str, str, str, bool], threading.Lock] = {}
+
+
+def get_context_registry() -> TTLCache[str]:
+    """Return the process-wide registry of cache names."""
+    global _registry  # noqa: PLW0603 - process-wide shared cache
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = TTLCache(_MAX_ENTRIES, _MAX_TTL_SECONDS)
+    return _registry
+
+
+def context_registry_stats() -> dict[str, Any]:
+    """Counters for the process-wide context-cache registry."""
+    return get_context_registry().stats()
+
+
+def reset_context_registry(registry: TTLCache[str] | None = None) -> None:
+    """Replace (or drop, when ``None``) the process-wide registry (tests)."""
+    global _registry  # noqa: PLW0603 - process-wide shared cache
+    with _lock:
+        _registry = registry
+        _key_locks.clear()
+
+
+def _key_lock(key: tuple[str, str, str, bool]) -> threading.Lock:
+    with _lock:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _key(
+    scope: str, model: str, prefix: str, *, search: bool
+) -> tuple[str, str, str, bool]:
+    digest = hashlib.sha256(prefix.encode()).hexdigest()
+    return scope, model, digest, search
+
+
+def cached_prefix(
+    client: Any,
+    *,
+    scope: str,
+    model: str,
+    prefix: str,
+    tools: list[types.Tool] | None,
+    ttl_seconds: int,
+) -> str | None:
+    """Return the name of a cache holding ``prefix`` (and ``tools``).
+
+    The cache is created on first use. ``scope`` is the API key fingerprint
+    of ``client``. ``None`` means the caller must send the prefix itself.
+    Concurrent first calls for one prefix create a single cache.
+    """
+    registry = get_context_registry()
+    key = _key(scope, model, prefix, search=bool(tools))
+    name = registry.get(key)
+    if name is not None:
+        return name or None
+    with _key_lock(key):
+        name = registry.get(key)
+        if name is not None:
+            return name or None
+        try:
+            created = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=prefix,
+                    tools=tools,
+                    ttl=f"{ttl_seconds}s",
+                ),
+            )
+        except Exception:
+            logger.warning(
+                "Gemini context cache create failed | model=%s chars=%d",
+                model,
+                len(prefix),
+                exc_info=True,
+            )
+            registry.set(key, "", ttl=_RETRY_SECONDS)
+            return None
+        name = created.name or ""
+        registry.set(key, name, ttl=ttl_seconds - _EXPIRY_MARGIN_SECONDS)
+        logger.info(
+            "Gemini context cache created | model=%s chars=%d name=%s",
+            model,
+            len(prefix),
+            name,
+        )
+        return name or None
+
+
+def forget_prefix(
+    *,
+    scope: str,
+    model: str,
+    prefix: str,
+    search: bool,
+) -> None:
+    """Drop the entry for ``prefix``, e.g. after Gemini rejected its cache.
+
+    The next call creates a new cache.
+    """
+    get_context_registry().pop(_key(scope, model, prefix, search=search))
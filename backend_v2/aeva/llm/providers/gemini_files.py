@@ -0,0 +1,165 @@
+"""Reuse of Gemini Files API uploads across calls.
+
+Gemini takes multimodal input as a file URI. ``GeminiProvider._contents`` used
+to upload every attachment on every call, one after another, so a
+quiz-from-media turn re-sent megabytes it had uploaded a minute earlier.
+:func:`upload_files` now looks each attachment up in a registry first and
+only uploads the misses, concurrently.
+
+Entries are keyed by API key fingerprint, SHA-256 of the bytes and MIME type:
+an uploaded file is only visible to the project behind the key, and equal
+bytes make an equal attachment. The Files API deletes a file 48 hours
+after upload. Each entry lives until the file's ``expiration_time`` minus
+``_EXPIRY_MARGIN_SECONDS``, so a URI is never handed out when it is about to
+disappear mid-generation. Uploads that report ``FAILED`` are not kept.
+
+Like every cache here the registry is per worker (``GEMINI_FILE_CACHE_SIZE``
+entries; 0 disables reuse). Uploads run on an executor owned by the call, not
+on the shared I/O pool, because generation is often invoked from a pooled
+task (see ``embedding``).
+"""
+
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from flask import current_app, has_app_context
+from google.genai import types
+
+from aeva.common.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Files API retention, used when an upload reports no expiration_time.
+_FILE_TTL_SECONDS = 48 * 3600
+# Stop handing out a URI this long before Gemini deletes the file.
+_EXPIRY_MARGIN_SECONDS = 15 * 60
+# Fallback when no app config is available (scripts, tests).
+_DEFAULT_SIZE = 256
+# Attachments per turn are bounded by ATTACHMENT_BUDGET_MB; a few uploads in
+# flight cover them.
+_MAX_PARALLEL_UPLOADS = 4
+
+_registry: "TTLCache[FileHandle] | None" = None
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class FileHandle:
+    """An uploaded file, as ``Part.from_uri`` needs it."""
+
+    uri: str
+    mime_type: str
+
+
+def get_file_registry() -> "TTLCache[FileHandle]":
+    """Return the process-wide registry, built from config on first use."""
+    global _registry  # noqa: PLW0603 - process-wide shared cache
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                config = current_app.config if has_app_context() else {}
+                _registry = TTLCache(
+                    int(config.get("GEMINI_FILE_CACHE_SIZE", _DEFAULT_SIZE)),
+                    _FILE_TTL_SECONDS,
+                )
+    return _registry
+
+
+def file_registry_stats() -> dict[str, Any]:
+    """Counters for the process-wide file registry."""
+    return get_file_registry().stats()
+
+
+def reset_file_registry(
+    registry: "TTLCache[FileHandle] | None" = None,
+) -> None:
+    """Replace (or drop, when ``None``) the process-wide registry (tests)."""
+    global _registry  # noqa: PLW0603 - process-wide shared cache
+    with _lock:
+        _registry = registry
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short stable id for the project an upload belongs to."""
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def _lifetime(uploaded: Any) -> float:
+    """Seconds an uploaded file's URI may still be handed out."""
+    expires = getattr(uploaded, "expiration_time", None)
+    if isinstance(expires, datetime):
+        remaining = (expires - datetime.now(UTC)).total_seconds()
+    else:
+        remaining = _FILE_TTL_SECONDS
+    return remaining - _EXPIRY_MARGIN_SECONDS
+
+
+def _failed(uploaded: Any) -> bool:
+    return getattr(uploaded, "state", None) == types.FileState.FAILED
+
+
+def upload_files(
+    client: Any,
+    attachments: list[dict[str, Any]],
+    *,
+    scope: str,
+) -> list[FileHandle]:
+    """Return a handle per attachment, uploading only unknown files.
+
+    ``scope`` is the API key fingerprint of ``client``. Identical attachments
+    in one call are uploaded once. Handles come back in input order.
+    """
+    registry = get_file_registry()
+    keys = [
+        (scope, hashlib.sha256(att["data"]).hexdigest(), att["mime_type"])
+        for att in attachments
+    ]
+    handles: dict[tuple[str, str, str], FileHandle] = {}
+    missing: dict[tuple[str, str, str], dict[str, Any]] = {}
+    for key, att in zip(keys, attachments, strict=True):
+        if key in handles or key in missing:
+            continue
+        handle = registry.get(key)
+        if handle is None:
+            missing[key] = att
+        else:
+            handles[key] = handle
+
+    def _upload(att: dict[str, Any]) -> Any:
+        return client.files.upload(
+            file=io.BytesIO(att["data"]),
+            config=types.UploadFileConfig(mime_type=att["mime_type"]),
+        )
+
+    if missing:
+        workers = min(len(missing), _MAX_PARALLEL_UPLOADS)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="aeva-upload"
+        ) as executor:
+            futures = {
+                key: executor.submit(_upload, att)
+                for key, att in missing.items()
+            }
+            for key, future in futures.items():
+                uploaded = future.result()
+                handle = FileHandle(
+                    uri=uploaded.uri,
+                    mime_type=uploaded.mime_type or key[2],
+                )
+                handles[key] = handle
+                if not _failed(uploaded):
+                    registry.set(key, handle, ttl=_lifetime(uploaded))
+    if attachments:
+        logger.info(
+            "Gemini files | attachments=%d reused=%d uploaded=%d",
+            len(attachments),
+            len(set(keys)) - len(missing),
+            len(missing),
+        )
+    return [handles[key] for key in keys]
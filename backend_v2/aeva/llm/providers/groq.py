@@ -8,7 +8,9 @@ differences are handled here so call sites stay provider-agnostic:
   accepted and ignored, and ``last_sources`` stays empty.
 - Structured output is produced via JSON-object response mode with the target
   JSON Schema embedded in the system prompt, which works across Groq models
-  without relying on per-model strict-schema support.
+  without relying on per-model strict-schema support. The hint sits after the
+  template's static prefix, ahead of the per-user tail, so Groq's automatic
+  prefix caching covers it; ``last_usage`` reports the cached tokens.
 """
 
 import base64
@@ -20,7 +22,7 @@ from flask import current_app
 from openai import OpenAI
 
 from aeva.llm import prompts
-from aeva.llm.providers.base import LLMProvider
+from aeva.llm.providers.base import LLMProvider, token_usage
 
 if TYPE_CHECKING:
     from openai.types.chat import ChatCompletionMessageParam
@@ -55,6 +57,18 @@ class GroqProvider(LLMProvider):
             params["reasoning_effort"] = self.reasoning_effort
         return params
 
+    @staticmethod
+    def _usage(usage: Any) -> dict[str, int]:
+        """``last_usage`` from a Chat Completions ``usage`` object."""
+        if usage is None:
+            return {}
+        details = getattr(usage, "prompt_tokens_details", None)
+        return token_usage(
+            usage.prompt_tokens,
+            getattr(details, "cached_tokens", None),
+            usage.completion_tokens,
+        )
+
     @staticmethod
     def _user_content(
         user_message: str,
@@ -104,7 +118,7 @@ class GroqProvider(LLMProvider):
         """Build OpenAI-style chat messages: system + history + user turn."""
         system = system_prompt or prompts.SYSTEM_PROMPT
         if schema_hint:
-            system = f"{system}\n\n{schema_hint}"
+            system = prompts.insert_after_static_prefix(system, schema_hint)
 
         messages: list[dict[str, Any]] = [
             {"role": "system", "content": system}
@@ -128,6 +142,7 @@ class GroqProvider(LLMProvider):
     ) -> str:
         """Generate a free-text response (search grounding is unavailable)."""
         self.last_sources = []
+        self.last_usage = {}
         response = self.client.chat.completions.create(
             model=self.model,
             messages=cast(
@@ -138,6 +153,7 @@ class GroqProvider(LLMProvider):
             ),
             **self._params(),
         )
+        self.last_usage = self._usage(response.usage)
         return response.choices[0].message.content or ""
 
     def generate_structured(
@@ -152,6 +168,7 @@ class GroqProvider(LLMProvider):
     ) -> dict[str, Any]:
         """Generate JSON matching the given schema via JSON-object mode."""
         self.last_sources = []
+        self.last_usage = {}
         schema_hint = (
             "Respond with a single JSON object that conforms to this JSON "
             "Schema. Output only the JSON object, with no prose and no code "
@@ -174,6 +191,7 @@ class GroqProvider(LLMProvider):
             ),
             **self._params(),
         )
+        self.last_usage = self._usage(response.usage)
         text = response.choices[0].message.content or "{}"
         data: dict[str, Any] = json.loads(text)
         return data
@@ -188,6 +206,7 @@ class GroqProvider(LLMProvider):
     ) -> Generator[str, None, None]:
         """Stream the response, yielding text chunks as they arrive."""
         self.last_sources = []
+        self.last_usage = {}
         stream = self.client.chat.completions.create(
             model=self.model,
             messages=cast(
@@ -197,9 +216,12 @@ class GroqProvider(LLMProvider):
                 ),
             ),
             stream=True,
+            stream_options={"include_usage": True},
             **self._params(),
         )
         for chunk in stream:
+            if chunk.usage is not None:
+                self.last_usage = self._usage(chunk.usage)
             if not chunk.choices:
                 continue
             delta = chunk.choices[0].delta.content
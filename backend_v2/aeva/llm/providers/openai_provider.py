@@ -20,11 +20,18 @@ Structured output uses JSON-object response mode with the target JSON Schema
 embedded in the system prompt (as Groq does) rather than native ``json_schema``
 strict mode, so the app's shared schemas -- which are not all strict-compatible
 (missing ``additionalProperties: false`` / not-all-required) -- work unchanged.
+
+OpenAI caches prompt prefixes automatically (1,024 tokens and up). The schema
+hint therefore goes between the template's static prefix and the per-user
+tail (see ``prompts.insert_after_static_prefix``), so it stays inside the
+shared prefix. With ``OPENAI_PROMPT_CACHE_KEY`` on, each call also sends a
+``prompt_cache_key`` derived from that prefix, so requests sharing it are
+routed to the same cache. ``last_usage`` reports the cached token count.
 """
 
 import base64
+import hashlib
 import json
-import math
 from collections.abc import Generator
 from typing import TYPE_CHECKING, Any, cast
 
@@ -32,7 +39,9 @@ from flask import current_app
 from openai import OpenAI
 
 from aeva.llm import prompts
-from aeva.llm.providers.base import LLMProvider
+from aeva.llm.providers.base import LLMProvider, token_usage
+from aeva.llm.providers.embedding import ProgressCallback, embed_batches
+from aeva.llm.vectors import normalize_rows
 
 if TYPE_CHECKING:
     from openai.types.chat import ChatCompletionMessageParam
@@ -43,25 +52,6 @@ if TYPE_CHECKING:
 _EMBED_BATCH_SIZE = 100
 
 
-def _l2_normalize(values: list[float]) -> list[float]:
-    """Scale a vector to unit length for cosine search.
-
-    OpenAI embeddings are unit-length at their native size, but reducing the
-    dimension via the ``dimensions`` parameter drops that guarantee, so an
-    explicit L2 normalization keeps cosine similarity correct.
-    """
-    norm = math.sqrt(sum(v * v for v in values))
-    if norm == 0:
-        return values
-    return [v / norm for v in values]
-
-
-def _batched(texts: list[str], size: int) -> Generator[list[str], None, None]:
-    """Yield successive slices of ``texts`` of at most ``size`` items."""
-    for start in range(0, len(texts), size):
-        yield texts[start : start + size]
-
-
 class OpenAIProvider(LLMProvider):
     """LLM provider backed by OpenAI (Chat Completions + Embeddings)."""
 
@@ -75,6 +65,9 @@ class OpenAIProvider(LLMProvider):
         self.reasoning_effort: str = current_app.config[
             "OPENAI_REASONING_EFFORT"
         ]
+        self.prompt_cache_key: bool = current_app.config.get(
+            "OPENAI_PROMPT_CACHE_KEY", False
+        )
 
     def _params(self) -> dict[str, Any]:
         """Per-call generation params shared by every endpoint.
@@ -91,6 +84,43 @@ class OpenAIProvider(LLMProvider):
             params["reasoning_effort"] = self.reasoning_effort
         return params
 
+    def _cache_params(self, system_prompt: str | None) -> dict[str, Any]:
+        """``prompt_cache_key`` for the prompt's static prefix, if enabled."""
+        if not self.prompt_cache_key:
+            return {}
+        prefix, _ = prompts.split_system_prompt(
+            system_prompt or prompts.SYSTEM_PROMPT
+        )
+        if not prefix:
+            return {}
+        digest = hashlib.sha256(prefix.encode()).hexdigest()[:16]
+        return {"prompt_cache_key": f"aeva-{digest}"}
+
+    @staticmethod
+    def _chat_usage(usage: Any) -> dict[str, int]:
+        """``last_usage`` from a Chat Completions ``usage`` object."""
+        if usage is None:
+            return {}
+        details = getattr(usage, "prompt_tokens_details", None)
+        return token_usage(
+            usage.prompt_tokens,
+            getattr(details, "cached_tokens", None),
+            usage.completion_tokens,
+        )
+
+    @staticmethod
+    def _responses_usage(response: Any) -> dict[str, int]:
+        """``last_usage`` from a Responses API response."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return {}
+        details = getattr(usage, "input_tokens_details", None)
+        return token_usage(
+            usage.input_tokens,
+            getattr(details, "cached_tokens", None),
+            usage.output_tokens,
+        )
+
     @staticmethod
     def _user_content(
         user_message: str,
@@ -140,7 +170,7 @@ class OpenAIProvider(LLMProvider):
         """Build OpenAI-style chat messages: system + history + user turn."""
         system = system_prompt or prompts.SYSTEM_PROMPT
         if schema_hint:
-            system = f"{system}\n\n{schema_hint}"
+            system = prompts.insert_after_static_prefix(system, schema_hint)
 
         messages: list[dict[str, Any]] = [
             {"role": "system", "content": system}
@@ -218,8 +248,10 @@ class OpenAIProvider(LLMProvider):
             tool_choice={"type": "web_search"},
             instructions=system_prompt or prompts.SYSTEM_PROMPT,
             input=cast("Any", self._search_input(user_message, history)),
+            **self._cache_params(system_prompt),
         )
         self._capture_sources(response)
+        self.last_usage = self._responses_usage(response)
         return response.output_text or ""
 
     def generate(
@@ -237,6 +269,7 @@ class OpenAIProvider(LLMProvider):
         uses plain Chat Completions.
         """
         self.last_sources = []
+        self.last_usage = {}
         if use_search:
             return self._generate_search(user_message, system_prompt, history)
         response = self.client.chat.completions.create(
@@ -248,7 +281,9 @@ class OpenAIProvider(LLMProvider):
                 ),
             ),
             **self._params(),
+            **self._cache_params(system_prompt),
         )
+        self.last_usage = self._chat_usage(response.usage)
         return response.choices[0].message.content or ""
 
     def generate_structured(
@@ -263,6 +298,7 @@ class OpenAIProvider(LLMProvider):
     ) -> dict[str, Any]:
         """Generate JSON matching the given schema via JSON-object mode."""
         self.last_sources = []
+        self.last_usage = {}
         schema_hint = (
             "Respond with a single JSON object that conforms to this JSON "
             "Schema. Output only the JSON object, with no prose and no code "
@@ -284,7 +320,9 @@ class OpenAIProvider(LLMProvider):
                 "ResponseFormatJSONObject", {"type": "json_object"}
             ),
             **self._params(),
+            **self._cache_params(system_prompt),
         )
+        self.last_usage = self._chat_usage(response.usage)
         text = response.choices[0].message.content or "{}"
         data: dict[str, Any] = json.loads(text)
         return data
@@ -308,6 +346,7 @@ class OpenAIProvider(LLMProvider):
             instructions=system_prompt or prompts.SYSTEM_PROMPT,
             input=cast("Any", self._search_input(user_message, history)),
             stream=True,
+            **self._cache_params(system_prompt),
         )
         for event in stream:
             etype = getattr(event, "type", "")
@@ -316,7 +355,9 @@ class OpenAIProvider(LLMProvider):
                 if delta:
                     yield delta
             elif etype == "response.completed":
-                self._capture_sources(getattr(event, "response", None))
+                completed = getattr(event, "response", None)
+                self._capture_sources(completed)
+                self.last_usage = self._responses_usage(completed)
 
     def generate_stream(
         self,
@@ -332,6 +373,7 @@ class OpenAIProvider(LLMProvider):
         ``web_search`` tool (and ``last_sources`` is populated at the end).
         """
         self.last_sources = []
+        self.last_usage = {}
         if use_search:
             yield from self._stream_search(user_message, system_prompt, history)
             return
@@ -344,9 +386,13 @@ class OpenAIProvider(LLMProvider):
                 ),
             ),
             stream=True,
+            stream_options={"include_usage": True},
             **self._params(),
+            **self._cache_params(system_prompt),
         )
         for chunk in stream:
+            if chunk.usage is not None:
+                self.last_usage = self._chat_usage(chunk.usage)
             if not chunk.choices:
                 continue
             delta = chunk.choices[0].delta.content
@@ -383,21 +429,28 @@ class OpenAIProvider(LLMProvider):
         *,
         task_type: str = "RETRIEVAL_DOCUMENT",  # noqa: ARG002 — Gemini-only.
         output_dimensionality: int = 768,
+        on_progress: ProgressCallback | None = None,
     ) -> list[list[float]]:
         """Embed texts with OpenAI, L2-normalized for cosine search.
 
         ``task_type`` is a Gemini concept with no OpenAI equivalent, so it is
         accepted and ignored. ``output_dimensionality`` maps to OpenAI's
         ``dimensions`` parameter (supported by ``text-embedding-3-*``).
+        Batches are dispatched concurrently (see ``embed_batches``).
         """
-        vectors: list[list[float]] = []
-        for batch in _batched(texts, _EMBED_BATCH_SIZE):
+
+        def _embed_batch(batch: list[str]) -> list[list[float]]:
             response = self.client.embeddings.create(
                 model=self.model,
                 input=batch,
                 dimensions=output_dimensionality,
             )
-            vectors.extend(
-                _l2_normalize(list(item.embedding)) for item in response.data
-            )
-        return vectors
+            # Reduced ``dimensions`` outputs are not unit length.
+            return normalize_rows(item.embedding for item in response.data)
+
+        return embed_batches(
+            texts,
+            _embed_batch,
+            batch_size=_EMBED_BATCH_SIZE,
+            on_progress=on_progress,
+        )
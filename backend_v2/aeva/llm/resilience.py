@@ -0,0 +1,446 @@
+"""Failover, circuit breakers and hedged requests for LLM calls.
+
+Without this layer a turn waits on exactly one provider. A 429 or a slow
+region stalls it until the SDK's own timeout, so a turn's tail latency is
+the worst provider's tail. With ``LLM_FAILOVER`` on, ``LLMClient`` runs each
+call through :func:`run_with_failover` over an ordered list of attempts:
+
+1. the client's own provider and model;
+2. the tool's other candidate models (``model_candidates.models_for``), on
+   the same provider;
+3. ``LLM_FAILOVER_MODELS``: cross-vendor ``provider:model`` entries, tried
+   last.
+
+Rules:
+
+- An attempt that fails with a transient error (rate limit, 5xx, transport;
+  see ``embedding.is_retryable``) or gives no answer within
+  ``LLM_ATTEMPT_TIMEOUT_SECONDS`` moves the call to the next attempt. Any
+  other error is a real error (bad request, schema) and is raised at once.
+- The whole call, failovers included, gets ``LLM_CALL_BUDGET_SECONDS``.
+- With ``LLM_HEDGE_AFTER_MS`` set, a second attempt starts when the first has
+  not answered in that time, and whichever answers first wins. For a stream
+  "answered" means its first chunk. Once a chunk has reached the user a
+  stream is never switched.
+- Each provider/model has a :class:`CircuitBreaker`. After
+  ``LLM_BREAKER_FAILURES`` transient failures in a row it is skipped for
+  ``LLM_BREAKER_COOLDOWN_SECONDS``; then a single probe call decides. If
+  every breaker is open the first attempt runs anyway, so breaker state
+  alone never fails a turn.
+
+A losing stream is closed, which closes its HTTP response. A losing
+non-streaming call cannot be interrupted (the SDKs block), so it finishes on
+its own thread and its result is dropped. Attempts run on an executor owned
+by the call, not the shared I/O pool, because LLM calls are often made from
+pooled tasks (see ``embedding``).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from flask import current_app, has_app_context
+
+from aeva.common.errors import ERROR_CODES, CustomError
+from aeva.llm.providers.base import LLMProvider
+from aeva.llm.providers.embedding import is_retryable
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Fallbacks when no app config is available (scripts, tests).
+_DEFAULT_BUDGET_SECONDS = 90.0
+_DEFAULT_ATTEMPT_TIMEOUT_SECONDS = 45.0
+_DEFAULT_BREAKER_FAILURES = 5
+_DEFAULT_BREAKER_COOLDOWN_SECONDS = 30.0
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    """How ``LLMClient`` spreads one call over its attempts."""
+
+    failover: bool = False
+    budget_seconds: float = _DEFAULT_BUDGET_SECONDS
+    attempt_timeout_seconds: float = _DEFAULT_ATTEMPT_TIMEOUT_SECONDS
+    hedge_after_ms: int = 0
+    # Cross-vendor ``(provider, model)`` attempts, after the tool's own.
+    failover_models: tuple[tuple[str, str], ...] = ()
+
+    @classmethod
+    def from_config(cls) -> "ResiliencePolicy":
+        """Build the policy from app config (all off without an app)."""
+        if not has_app_context():
+            return cls()
+        config = current_app.config
+        models = tuple(
+            (provider.strip(), model.strip())
+            for provider, sep, model in (
+                entry.partition(":")
+                for entry in config.get("LLM_FAILOVER_MODELS", [])
+            )
+            if sep and provider.strip() and model.strip()
+        )
+        return cls(
+            failover=bool(config.get("LLM_FAILOVER", False)),
+            budget_seconds=float(
+                config.get("LLM_CALL_BUDGET_SECONDS", _DEFAULT_BUDGET_SECONDS)
+            ),
+            attempt_timeout_seconds=float(
+                config.get(
+                    "LLM_ATTEMPT_TIMEOUT_SECONDS",
+                    _DEFAULT_ATTEMPT_TIMEOUT_SECONDS,
+                )
+            ),
+            hedge_after_ms=int(config.get("LLM_HEDGE_AFTER_MS", 0)),
+            failover_models=models,
+        )
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one provider/model.
+
+    Closed until ``failures`` transient failures in a row. Then open for
+    ``cooldown`` seconds, then half-open: one probe call is let through, and
+    its outcome closes or re-opens the breaker. A probe that never reports
+    back (its call lost a hedge) frees the slot after another cooldown.
+    """
+
+    def __init__(self, failures: int, cooldown: float) -> None:
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: float | None = None
+        self._probe_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half_open``."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return "open"
+            return "half_open"
+
+    def allow(self) -> bool:
+        """Whether a call may go to this provider/model now."""
+        now = time.monotonic()
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if now - self._opened_at < self.cooldown:
+                return False
+            probe_at = self._probe_at
+            if probe_at is not None and now - probe_at < self.cooldown:
+                return False
+            self._probe_at = now
+            return True
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probe_at = None
+
+    def record_failure(self) -> None:
+        """Count a transient failure; open (or re-open) at the threshold."""
+        with self._lock:
+            self._consecutive += 1
+            if self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+                self._probe_at = None
+
+
+_breakers: dict[tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str, model: str) -> CircuitBreaker:
+    """Return the process-wide breaker for ``provider``/``model``."""
+    key = (provider, model)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            config = current_app.config if has_app_context() else {}
+            breaker = CircuitBreaker(
+                int(
+                    config.get(
+                        "LLM_BREAKER_FAILURES", _DEFAULT_BREAKER_FAILURES
+                    )
+                ),
+                float(
+                    config.get(
+                        "LLM_BREAKER_COOLDOWN_SECONDS",
+                        _DEFAULT_BREAKER_COOLDOWN_SECONDS,
+                    )
+                ),
+            )
+            _breakers[key] = breaker
+        return breaker
+
+
+def breaker_stats() -> dict[str, str]:
+    """State of every breaker, keyed ``provider:model``."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {f"{p}:{m}": breaker.state for (p, m), breaker in breakers.items()}
+
+
+def reset_breakers() -> None:
+    """Drop every breaker (tests)."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+@dataclass(frozen=True)
+class Attempt:
+    """One provider/model a call may run on."""
+
+    name: str
+    provider: LLMProvider
+
+    @property
+    def label(self) -> str:
+        """``provider:model``, for logs."""
+        return f"{self.name}:{self.provider.model}"
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """The breaker of this provider and model."""
+        return get_breaker(self.name, self.provider.model)
+
+
+class _Race(Generic[T]):
+    """One call's attempts: launch, fail over, hedge, pick the winner."""
+
+    def __init__(
+        self,
+        attempts: Sequence[Attempt],
+        call: Callable[[LLMProvider], T],
+        *,
+        policy: ResiliencePolicy,
+        discard: Callable[[T], None] | None,
+    ) -> None:
+        self._queue = deque(attempts)
+        self._call = call
+        self._policy = policy
+        self._discard = discard
+        self._pending: dict[Future[T], tuple[Attempt, float]] = {}
+        self._errors: list[BaseException] = []
+        self._launched = 0
+        self._last_launch = 0.0
+        self._app = (
+            current_app._get_current_object()  # noqa: SLF001
+            if has_app_context()
+            else None
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(attempts)), thread_name_prefix="aeva-llm"
+        )
+
+    def run(self) -> tuple[Attempt, T]:
+        deadline = time.monotonic() + self._policy.budget_seconds
+        self._launch()
+        try:
+            while self._pending:
+                done, _ = wait(
+                    self._pending,
+                    timeout=self._wait_seconds(deadline),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    winner = self._settle(future)
+                    if winner is not None:
+                        return winner
+                now = time.monotonic()
+                if now >= deadline:
+                    self._errors.append(
+                        TimeoutError(
+                            "no answer within the "
+                            f"{self._policy.budget_seconds:g}s budget"
+                        )
+                    )
+                    break
+                self._expire(now)
+                self._hedge(now)
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._abandon()
+        raise self._failure()
+
+    def _run(self, attempt: Attempt) -> T:
+        if self._app is None:
+            return self._call(attempt.provider)
+        with self._app.app_context():
+            return self._call(attempt.provider)
+
+    def _next_attempt(self) -> Attempt | None:
+        """Pop the next attempt whose breaker allows a call."""
+        skipped: list[Attempt] = []
+        while self._queue:
+            attempt = self._queue.popleft()
+            if attempt.breaker.allow():
+                return attempt
+            logger.info("LLM skip %s | circuit open", attempt.label)
+            skipped.append(attempt)
+        # With every breaker open, the call still makes one attempt.
+        if skipped and not self._launched:
+            return skipped[0]
+        return None
+
+    def _launch(self) -> None:
+        """Start the next attempt, if any is left."""
+        attempt = self._next_attempt()
+        if attempt is None:
+            return
+        if self._launched:
+            logger.warning("LLM failover → %s", attempt.label)
+        now = time.monotonic()
+        future = self._executor.submit(self._run, attempt)
+        self._pending[future] = (attempt, now)
+        self._launched += 1
+        self._last_launch = now
+
+    def _wait_seconds(self, deadline: float) -> float:
+        now = time.monotonic()
+        limits = [deadline]
+        limits.extend(
+            started + self._policy.attempt_timeout_seconds
+            for _, started in self._pending.values()
+        )
+        if self._can_hedge():
+            limits.append(
+                self._last_launch + self._policy.hedge_after_ms / 1000
+            )
+        return max(0.0, min(limits) - now)
+
+    def _settle(self, future: Future[T]) -> tuple[Attempt, T] | None:
+        attempt, _ = self._pending.pop(future)
+        exc = future.exception()
+        if exc is None:
+            attempt.breaker.record_success()
+            return attempt, future.result()
+        if not is_retryable(exc):
+            raise exc
+        attempt.breaker.record_failure()
+        self._errors.append(exc)
+        logger.warning("LLM %s failed: %s", attempt.label, exc)
+        if not self._pending:
+            self._launch()
+        return None
+
+    def _expire(self, now: float) -> None:
+        """Give up on attempts past the per-attempt timeout."""
+        limit = self._policy.attempt_timeout_seconds
+        for future, (attempt, started) in list(self._pending.items()):
+            if now - started < limit:
+                continue
+            del self._pending[future]
+            self._drop(future)
+            attempt.breaker.record_failure()
+            self._errors.append(
+                TimeoutError(f"{attempt.label} gave no answer in {limit:g}s")
+            )
+            logger.warning("LLM %s timed out after %gs", attempt.label, limit)
+        if not self._pending:
+            self._launch()
+
+    def _can_hedge(self) -> bool:
+        return (
+            self._policy.hedge_after_ms > 0
+            and len(self._pending) == 1
+            and bool(self._queue)
+        )
+
+    def _hedge(self, now: float) -> None:
+        """Start a second attempt next to a slow first one."""
+        hedge_at = self._last_launch + self._policy.hedge_after_ms / 1000
+        if self._can_hedge() and now >= hedge_at:
+            logger.info(
+                "LLM hedge | no answer after %dms",
+                self._policy.hedge_after_ms,
+            )
+            self._launch()
+
+    def _drop(self, future: Future[T]) -> None:
+        """Discard a losing attempt's result whenever it arrives."""
+        discard = self._discard
+        if discard is None:
+            return
+
+        def _discard_result(done: Future[T]) -> None:
+            if not done.cancelled() and done.exception() is None:
+                discard(done.result())
+
+        future.add_done_callback(_discard_result)
+
+    def _abandon(self) -> None:
+        for future in self._pending:
+            self._drop(future)
+        self._pending.clear()
+
+    def _failure(self) -> BaseException:
+        last = self._errors[-1] if self._errors else None
+        if last is None or isinstance(last, TimeoutError):
+            return CustomError(
+                ERROR_CODES["LLM_ERROR"],
+                details=f"LLM call failed: {last or 'no provider available'}",
+            )
+        return last
+
+
+def run_with_failover(
+    attempts: Sequence[Attempt],
+    call: Callable[[LLMProvider], T],
+    *,
+    policy: ResiliencePolicy,
+    discard: Callable[[T], None] | None = None,
+) -> tuple[Attempt, T]:
+    """Run ``call`` on the first attempt that answers; return it and the result.
+
+    ``discard`` receives the result of an attempt that answered too late
+    (lost a hedge, or timed out and then finished), e.g. to close a stream.
+    Raises the last transient error, or an ``LLM_ERROR`` when attempts only
+    timed out. A non-transient error is raised as soon as it happens.
+    """
+    return _Race(attempts, call, policy=policy, discard=discard).run()
+
+
+def attempt_name(provider: LLMProvider) -> str:
+    """Short vendor name of a provider (``gemini``, ``groq``, ``openai``)."""
+    return type(provider).__name__.replace("Provider", "").lower()
+
+
+def build_attempts(
+    primary: LLMProvider,
+    fallbacks: Sequence[tuple[str, Callable[[], LLMProvider]]],
+) -> list[Attempt]:
+    """Primary first, then each fallback that can be built, deduplicated.
+
+    A fallback whose provider cannot be built (no API key configured) is
+    left out with a warning rather than failing the call.
+    """
+    attempts = [Attempt(attempt_name(primary), primary)]
+    seen = {attempts[0].label}
+    for label, build in fallbacks:
+        if label in seen:
+            continue
+        try:
+            provider = build()
+        except Exception:  # noqa: BLE001 - an unusable fallback is skipped
+            logger.warning("LLM failover target %s unavailable", label)
+            continue
+        attempt = Attempt(attempt_name(provider), provider)
+        if attempt.label not in seen:
+            seen.add(attempt.label)
+            attempts.append(attempt)
+    return attempts
+
@@ -0,0 +1,48 @@
+"""Process-wide token totals per provider and model.
+
+``LLMClient`` records each call's ``LLMProvider.last_usage`` here. The
+cached-token share shows whether the static prompt prefix is actually served
+from the vendor's prompt cache. Like the caches, totals are per worker.
+"""
+
+import threading
+from typing import Any
+
+_FIELDS = ("prompt_tokens", "cached_tokens", "output_tokens")
+
+_totals: dict[str, dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def record_usage(provider: str, model: str, usage: dict[str, int]) -> None:
+    """Add one call's ``last_usage`` to the ``provider:model`` totals."""
+    if not usage:
+        return
+    with _lock:
+        totals = _totals.setdefault(
+            f"{provider}:{model}", dict.fromkeys(("calls", *_FIELDS), 0)
+        )
+        totals["calls"] += 1
+        for field in _FIELDS:
+            totals[field] += usage.get(field, 0)
+
+
+def cached_share(usage: dict[str, int]) -> float:
+    """Fraction of the prompt tokens served from the prompt cache."""
+    prompt = usage.get("prompt_tokens", 0)
+    return usage.get("cached_tokens", 0) / prompt if prompt else 0.0
+
+
+def usage_stats() -> dict[str, dict[str, Any]]:
+    """Token totals and cached share per ``provider:model``."""
+    with _lock:
+        return {
+            key: {**totals, "cached_share": round(cached_share(totals), 3)}
+            for key, totals in _totals.items()
+        }
+
+
+def reset_usage_stats() -> None:
+    """Drop all totals (tests)."""
+    with _lock:
+        _totals.clear()
@@ -0,0 +1,47 @@
+"""Embedding post-processing shared by the providers and the cache.
+
+A 5,000-chunk document produces 3.8M floats, so the per-element cost of what
+happens to a vector between the embedding API and Postgres is what counts:
+
+- :func:`l2_normalize` gets the norm from ``math.hypot``, which is a single C
+  call. The old code used a Python generator with ``sum``. The per-element
+  scaling pass is skipped when the vector is already unit length. Gemini at
+  3072 dimensions and OpenAI at native size already return unit vectors, so
+  for them only the norm is computed.
+- :func:`float32` stores a vector as an ``array('f')``: 4 bytes per value in
+  one buffer instead of a boxed float and a pointer (~32 bytes). Long-lived
+  copies such as the embedding cache's memory tier use it. pgvector stores
+  float32, so nothing the database sees is lost.
+
+NumPy is not a dependency of this app, and adding it only for this would be
+heavy. These are the stdlib's C-level paths. Vectors still cross module
+boundaries as ``list[float]``: that is what ``LLMClient.embed`` returns and
+what the JSON-based Supabase client serializes.
+"""
+
+import math
+from array import array
+from collections.abc import Iterable, Sequence
+
+# A norm this close to 1 is left alone: rescaling would change values by
+# less than the float32 precision pgvector stores them at.
+_UNIT_TOLERANCE = 1e-6
+
+
+def l2_normalize(values: Sequence[float]) -> list[float]:
+    """Scale a vector to unit length (zero and unit vectors pass through)."""
+    norm = math.hypot(*values)
+    if norm == 0 or abs(norm - 1.0) <= _UNIT_TOLERANCE:
+        return list(values)
+    scale = 1.0 / norm
+    return [v * scale for v in values]
+
+
+def normalize_rows(rows: Iterable[Sequence[float]]) -> list[list[float]]:
+    """:func:`l2_normalize` each vector of an API response batch."""
+    return [l2_normalize(row) for row in rows]
+
+
+def float32(values: Iterable[float]) -> array:
+    """Pack a vector into a compact float32 ``array``."""
+    return array("f", values)
@@ -122,23 +122,41 @@ class BaseTool(ABC):
         the tool's injected default only when it already runs that model AND no
         config override is in play, else constructing one from the resolved key.
         With no model choice, fall back to the injected default (or a client
-        built from the resolved key).
+        built from the resolved key). Building a client is cheap: its provider
+        comes from the process-wide pool (``factory.get_provider``).
+
+        With ``LLM_FAILOVER`` on, the client also gets the tool's other
+        candidate models to fail over to. They share the tool's provider
+        config, so they are left out when ``ctx.config_key`` overrides it.
 
         ``LLMClient`` is imported lazily: ``aeva.mcp.base`` is pulled in by the
         prompt package, so a module-level import would risk an import cycle.
         """
         from aeva.llm.llm_client import LLMClient
+        from aeva.llm.resilience import ResiliencePolicy
+        from aeva.orchestration.model_candidates import models_for
 
         key = ctx.config_key or config_key
         injected = getattr(self, "_llm", None)
+        fallbacks = (
+            models_for(self.definition.name)
+            if ctx.config_key is None
+            and ResiliencePolicy.from_config().failover
+            else []
+        )
         if ctx.model:
             if (
                 injected is not None
                 and injected.model == ctx.model
                 and ctx.config_key is None
+                and not fallbacks
             ):
                 return injected
-            return LLMClient(model=ctx.model, config_key=key)
+            return LLMClient(
+                model=ctx.model, config_key=key, fallback_models=fallbacks
+            )
+        if fallbacks:
+            return LLMClient(config_key=key, fallback_models=fallbacks)
         return injected or LLMClient(config_key=key)
 
     def execute_stream(
@@ -21,6 +21,8 @@ from aeva.mcp.base import (
     ToolDefinition,
 )
 from aeva.media.attachments import download_attachments
+from aeva.media.context_packer import pack_passages
+from aeva.media.retrieval import mmr_select
 from aeva.supabase.supabase_service import SupabaseService
 
 _SNIPPET_CHARS = 240
@@ -76,11 +78,7 @@ class MediaLLMTool(BaseTool):
     ) -> list[dict[str, Any]]:
         """Resolve the media records in scope for this turn."""
         if media_ids:
-            records = [
-                self.supabase.get_media(media_id, ctx.user_id)
-                for media_id in media_ids
-            ]
-            return [r for r in records if r]
+            return self.supabase.get_media_many(media_ids, ctx.user_id)
         return self.supabase.list_media(ctx.user_id, ctx.session_id)
 
     @staticmethod
@@ -91,48 +89,94 @@ class MediaLLMTool(BaseTool):
             and bool(record.get("chunk_count"))
         )
 
+    def _search(
+        self,
+        ctx: ToolContext,
+        query: str,
+        query_vector: list[float],
+        media_ids: list[str],
+    ) -> list[dict[str, Any]]:
+        """Top ``RAG_TOP_K`` chunks: cosine only, or hybrid + MMR.
+
+        ``RAG_RETRIEVAL=hybrid`` (migration 028) fuses vector and full-text
+        ranks over ``RAG_HYBRID_CANDIDATES`` candidates, then diversifies the
+        pick with ``RAG_MMR_DIVERSITY`` (0 keeps the fused order).
+        """
+        config = current_app.config
+        top_k = config["RAG_TOP_K"]
+        if config.get("RAG_RETRIEVAL", "vector") != "hybrid":
+            return self.supabase.match_chunks(
+                query_vector, ctx.user_id, media_ids=media_ids, top_k=top_k
+            )
+        candidates = self.supabase.match_chunks_hybrid(
+            query_vector,
+            query,
+            ctx.user_id,
+            media_ids=media_ids,
+            top_k=max(top_k, config.get("RAG_HYBRID_CANDIDATES", 40)),
+        )
+        return mmr_select(
+            candidates,
+            top_k,
+            diversity=config.get("RAG_MMR_DIVERSITY", 0.3),
+        )
+
     def _retrieve(
         self,
         ctx: ToolContext,
         query: str,
         ready: list[dict[str, Any]],
     ) -> tuple[str, list[dict[str, Any]]]:
-        """Embed the query, search chunks, build context + sources."""
+        """Embed the query, search chunks, build context + sources.
+
+        Hits are packed by ``pack_passages``: adjacent chunks merged with
+        their overlap removed, same-page hits folded, and the whole capped
+        at ``RAG_CONTEXT_TOKENS``. Sources list every chunk that made it in.
+        """
         query_vector = self.embed_llm.embed(
             [query],
             task_type="RETRIEVAL_QUERY",
             output_dimensionality=current_app.config["RAG_EMBEDDING_DIM"],
         )[0]
-        rows = self.supabase.match_chunks(
-            query_vector,
-            ctx.user_id,
-            media_ids=[r["id"] for r in ready],
-            top_k=current_app.config["RAG_TOP_K"],
-        )
+        rows = self._search(ctx, query, query_vector, [r["id"] for r in ready])
         names = {r["id"]: r["file_name"] for r in ready}
+        config = current_app.config
+        passages = pack_passages(
+            rows,
+            budget_tokens=config.get("RAG_CONTEXT_TOKENS", 3072),
+            overlap_tokens=config["RAG_CHUNK_OVERLAP"],
+        )
 
         context_lines: list[str] = []
         sources: list[dict[str, Any]] = []
-        for index, row in enumerate(rows, start=1):
-            name = names.get(row["media_id"], "document")
-            page = row.get("page_number")
-            section = row.get("section") or ""
-            label = f"{name}, p.{page}" if page else name
-            if section:
-                label += f', "{section}"'
-            # Hand the model the exact inline marker to copy for this excerpt.
-            marker = f"[cite:{name}#{page}]" if page else f"[cite:{name}]"
+        for index, passage in enumerate(passages, start=1):
+            name = names.get(passage.media_id, "document")
+            pages = passage.pages
+            label = name
+            if pages:
+                span = f"{pages[0]}-{pages[-1]}" if len(pages) > 1 else pages[0]
+                label += f", p.{span}"
+            if passage.section:
+                label += f', "{passage.section}"'
+            # Hand the model the exact inline marker(s) to copy for this
+            # excerpt: one per page it spans.
+            marker = " or ".join(
+                f"[cite:{name}#{page}]" for page in pages
+            ) or f"[cite:{name}]"
             context_lines.append(
-                f"[{index}] ({label}) — cite as {marker}\n{row['content']}"
+                f"[{index}] ({label}) — cite as {marker}\n{passage.content}"
+            )
+            sources.extend(
+                {
+                    "document_name": name,
+                    "media_id": row["media_id"],
+                    "page_number": row.get("page_number"),
+                    "chunk_id": row["id"],
+                    "section": row.get("section") or None,
+                    "snippet": row["content"][:_SNIPPET_CHARS].strip(),
+                }
+                for row in passage.rows
             )
-            sources.append({
-                "document_name": name,
-                "media_id": row["media_id"],
-                "page_number": page,
-                "chunk_id": row["id"],
-                "section": section or None,
-                "snippet": row["content"][:_SNIPPET_CHARS].strip(),
-            })
         return "\n\n".join(context_lines), sources
 
     def _fallback_attachments(
@@ -242,16 +286,16 @@ class MediaLLMTool(BaseTool):
                     ctx.personalization
                 ),
             )
-            answer = ""
+            parts: list[str] = []
             for chunk in llm.generate_stream(
                 rendered.user_message,
                 system_prompt=rendered.system_prompt,
                 attachments=attachments,
                 history=ctx.history,
             ):
-                answer += chunk
+                parts.append(chunk)
                 yield chunk
-            return {"answer": answer, "media_count": len(attachments)}
+            return {"answer": "".join(parts), "media_count": len(attachments)}
 
         context, sources = self._retrieve(ctx, query, ready)
         if not sources:
@@ -267,16 +311,16 @@ class MediaLLMTool(BaseTool):
             DOCUMENT_CONTEXT=context,
             USER_PROFILE=prompts.user_profile_segment(ctx.personalization),
         )
-        answer = ""
+        parts = []
         for chunk in llm.generate_stream(
             rendered.user_message,
             system_prompt=rendered.system_prompt,
             history=ctx.history,
         ):
-            answer += chunk
+            parts.append(chunk)
             yield chunk
         return {
-            "answer": answer,
+            "answer": "".join(parts),
             "sources": sources,
             "media_count": len(ready),
         }
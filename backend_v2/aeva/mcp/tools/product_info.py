@@ -83,12 +83,12 @@ class ProductInfoTool(BaseTool):
             USER_MESSAGE=query,
             USER_PROFILE=prompts.user_profile_segment(ctx.personalization),
         )
-        answer = ""
+        parts: list[str] = []
         for chunk in llm.generate_stream(
             rendered.user_message,
             system_prompt=rendered.system_prompt,
             history=ctx.history,
         ):
-            answer += chunk
+            parts.append(chunk)
             yield chunk
-        return {"answer": answer, "sources": []}
+        return {"answer": "".join(parts), "sources": []}
@@ -81,13 +81,13 @@ class WebSearchTool(BaseTool):
             USER_MESSAGE=query,
             USER_PROFILE=prompts.user_profile_segment(ctx.personalization),
         )
-        answer = ""
+        parts: list[str] = []
         for chunk in llm.generate_stream(
             rendered.user_message,
             system_prompt=rendered.system_prompt,
             use_search=True,
             history=ctx.history,
         ):
-            answer += chunk
+            parts.append(chunk)
             yield chunk
-        return {"answer": answer, "sources": llm.last_sources}
+        return {"answer": "".join(parts), "sources": llm.last_sources}
@@ -0,0 +1,118 @@
+"""Process-local byte cache for multimodal attachments.
+
+A quiz-from-media turn, a flashcard set from the same PDF, and the
+not-yet-indexed fallback in ``media_llm`` each used to download the full
+file again from Storage, often for the same file as the previous turn.
+``download_attachments`` now checks this cache first.
+
+Entries are keyed by ``storage_path``. Upload paths embed a fresh UUID and
+objects are never rewritten in place, so a path always names the same bytes.
+As a guard, a hit must still match the ``size_bytes`` the media row declares;
+on a mismatch the entry is dropped and the file is downloaded again. This
+check uses the row the caller already holds, so it costs no extra request,
+unlike an ETag check against Storage. Deleted media needs no invalidation:
+its row is gone, so nothing asks for its path again, and the entry ages out.
+
+The cache is bounded by total bytes (``ATTACHMENT_CACHE_MB``; 0 disables it)
+and evicts least-recently-used entries first. Like every cache here it is
+per worker.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from flask import current_app, has_app_context
+
+# Fallback when no app config is available (scripts, tests).
+_DEFAULT_MAX_MB = 64
+
+_cache: "AttachmentCache | None" = None
+_lock = threading.Lock()
+
+
+class AttachmentCache:
+    """LRU of file bytes keyed by storage path, bounded by total size."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    def get(self, storage_path: str, size_bytes: int | None) -> bytes | None:
+        """Return the cached bytes if present and of the declared size."""
+        with self._lock:
+            data = self._data.get(storage_path)
+            if data is not None and size_bytes and len(data) != size_bytes:
+                self._drop(storage_path)
+                self.stale += 1
+                data = None
+            if data is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(storage_path)
+            self.hits += 1
+            return data
+
+    def put(self, storage_path: str, data: bytes) -> None:
+        """Remember ``data``; a file larger than the whole cache is skipped."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if storage_path in self._data:
+                self._drop(storage_path)
+            self._data[storage_path] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def _drop(self, storage_path: str) -> None:
+        """Remove an entry (caller holds the lock)."""
+        self.size -= len(self._data.pop(storage_path))
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters, evictions, stale drops, and bytes held."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "stale": self.stale,
+                "entries": len(self._data),
+                "bytes": self.size,
+            }
+
+
+def get_attachment_cache() -> AttachmentCache:
+    """Return the process-wide cache, built from config on first use."""
+    global _cache  # noqa: PLW0603 - process-wide shared cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                config = current_app.config if has_app_context() else {}
+                _cache = AttachmentCache(
+                    int(config.get("ATTACHMENT_CACHE_MB", _DEFAULT_MAX_MB))
+                    << 20
+                )
+    return _cache
+
+
+def attachment_cache_stats() -> dict[str, Any]:
+    """Counters for the process-wide attachment cache."""
+    return get_attachment_cache().stats()
+
+
+def reset_attachment_cache(cache: AttachmentCache | None = None) -> None:
+    """Replace (or drop, when ``None``) the process-wide cache (tests)."""
+    global _cache  # noqa: PLW0603 - process-wide shared cache
+    with _lock:
+        _cache = cache
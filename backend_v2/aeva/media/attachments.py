@@ -1,10 +1,50 @@
 """Download uploaded media as multimodal LLM attachments."""
 
+import logging
 from typing import Any
 
+from flask import current_app, has_app_context
+
+from aeva.common import concurrency
+from aeva.media.attachment_cache import get_attachment_cache
 from aeva.media.compression import ALLOWED_PDF_TYPE
 from aeva.supabase.supabase_service import SupabaseService
 
+logger = logging.getLogger(__name__)
+
+# Used when no app config is available (unit tests, scripts).
+_DEFAULT_BUDGET_MB = 50
+
+
+def _budget_bytes() -> int:
+    """Return the attachment bytes one turn may download, from config."""
+    config = current_app.config if has_app_context() else {}
+    return int(config.get("ATTACHMENT_BUDGET_MB", _DEFAULT_BUDGET_MB)) << 20
+
+
+def _within_budget(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep records, in order, while their declared sizes fit the budget.
+
+    The first file is always kept, so a lone upload is never dropped; the
+    upload limit already bounds it.
+    """
+    budget = _budget_bytes()
+    kept: list[dict[str, Any]] = []
+    used = 0
+    for record in records:
+        size = int(record.get("size_bytes") or 0)
+        if kept and used + size > budget:
+            logger.warning(
+                "Attachment %s skipped | %d bytes over the %d-byte budget",
+                record["id"],
+                used + size - budget,
+                budget,
+            )
+            continue
+        kept.append(record)
+        used += size
+    return kept
+
 
 def download_attachments(
     supabase: SupabaseService,
@@ -15,24 +55,47 @@ def download_attachments(
     """Fetch PDF/image bytes for multimodal LLM input.
 
     ``media_ids=None`` means "every media item in the session"; otherwise only
-    the given ids are used. Non-PDF/non-image records are skipped.
+    the given ids are used. Non-PDF/non-image records are skipped. Records
+    resolve in one query and the files download concurrently on the shared
+    I/O pool, so a multi-file turn costs about one round-trip of each; files
+    sent on an earlier turn come from ``attachment_cache`` instead. Files
+    past ``ATTACHMENT_BUDGET_MB`` in total are left out.
     """
     if media_ids is None:
-        items = supabase.list_media(user_id, session_id=session_id)
-        ids = [item["id"] for item in items]
+        records = supabase.list_media(user_id, session_id=session_id)
     else:
-        ids = media_ids
+        records = supabase.get_media_many(media_ids, user_id)
 
+    records = _within_budget([
+        record
+        for record in records
+        if record["mime_type"] == ALLOWED_PDF_TYPE
+        or record["mime_type"].startswith("image/")
+    ])
+    cache = get_attachment_cache()
+    cached = [
+        cache.get(record["storage_path"], record.get("size_bytes"))
+        for record in records
+    ]
+    downloads = {
+        index: concurrency.submit(
+            supabase.download_file, records[index]["storage_path"]
+        )
+        for index, data in enumerate(cached)
+        if data is None
+    }
     attachments: list[dict[str, Any]] = []
-    for media_id in ids:
-        record = supabase.get_media(media_id, user_id)
-        if not record:
-            continue
-        mime_type = record["mime_type"]
-        if mime_type != ALLOWED_PDF_TYPE and not mime_type.startswith(
-            "image/"
-        ):
-            continue
-        file_bytes = supabase.download_file(record["storage_path"])
-        attachments.append({"mime_type": mime_type, "data": file_bytes})
+    for index, record in enumerate(records):
+        data = cached[index]
+        if data is None:
+            data = downloads[index].result()
+            cache.put(record["storage_path"], data)
+        attachments.append({"mime_type": record["mime_type"], "data": data})
+    if records:
+        logger.info(
+            "Attachments | files=%d cached=%d downloaded=%d",
+            len(records),
+            len(records) - len(downloads),
+            len(downloads),
+        )
     return attachments
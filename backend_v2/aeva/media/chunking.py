@@ -6,11 +6,16 @@ heading breadcrumb, starts a fresh chunk at each new heading, and emits tables
 whole (splitting a table destroys it). Every chunk records the page it started
 on and its section, which are the inputs for page-level citations.
 
+``iter_chunks`` yields chunks as the walk produces them, so the indexing
+pipeline can embed and insert a document window by window without holding
+every chunk at once; ``chunk_parsed_document`` is the list form.
+
 Token counts are approximated as ``len(text) // 4`` to avoid pulling in a
 tokenizer; with a 512-token target this stays well under the embedding model's
 per-input ceiling.
 """
 
+from collections.abc import Iterator
 from dataclasses import dataclass
 from typing import Any
 
@@ -67,14 +72,18 @@ class _ChunkBuilder:
     """Accumulates text into chunks split on headings, tables, and size."""
 
     def __init__(self, target_tokens: int, overlap_tokens: int) -> None:
-        self._target_chars = target_tokens * _CHARS_PER_TOKEN
-        self._overlap_chars = overlap_tokens * _CHARS_PER_TOKEN
+        self._target_chars = max(1, target_tokens) * _CHARS_PER_TOKEN
+        # The carried-over tail must be shorter than a full window, or a
+        # split leaves the buffer at the target and never makes progress.
+        self._overlap_chars = min(
+            max(0, overlap_tokens) * _CHARS_PER_TOKEN, self._target_chars // 2
+        )
         self._heading_stack: list[tuple[int, str]] = []
         self._buffer = ""
         self._start_page: int | None = None
         self._start_section: str | None = None
         self._next_index = 0
-        self.chunks: list[Chunk] = []
+        self._ready: list[Chunk] = []
 
     def _section(self) -> str | None:
         """Return the heading breadcrumb, e.g. ``Chapter 3 > Scheduling``."""
@@ -90,7 +99,7 @@ class _ChunkBuilder:
             self._start_page = None
             self._start_section = None
             return
-        self.chunks.append(
+        self._ready.append(
             Chunk(
                 content=content,
                 page_number=self._start_page,
@@ -147,19 +156,23 @@ class _ChunkBuilder:
         """Append a paragraph/list item to the current chunk window."""
         self._append(_item_text(item), page_number)
 
-    def finish(self) -> list[Chunk]:
-        """Flush any remaining buffered text and return all chunks."""
+    def finish(self) -> None:
+        """Flush any remaining buffered text."""
         self._emit(carry_overlap=False)
-        return self.chunks
 
+    def drain(self) -> list[Chunk]:
+        """Return the chunks completed since the last drain."""
+        ready, self._ready = self._ready, []
+        return ready
 
-def chunk_parsed_document(
+
+def iter_chunks(
     doc: ParsedDocument,
     *,
     target_tokens: int = 512,
     overlap_tokens: int = 64,
-) -> list[Chunk]:
-    """Split a parsed document into structure-aware, page-tagged chunks.
+) -> Iterator[Chunk]:
+    """Yield structure-aware, page-tagged chunks in document order.
 
     Falls back to chunking each page's plain text when a page exposes no
     structured items, so a thin parse still yields retrievable chunks.
@@ -175,6 +188,23 @@ def chunk_parsed_document(
                     builder.add_table(item, page.page_number)
                 else:
                     builder.add_text(item, page.page_number)
+                yield from builder.drain()
         elif page.text:
             builder.add_text({"value": page.text}, page.page_number)
-    return builder.finish()
+            yield from builder.drain()
+    builder.finish()
+    yield from builder.drain()
+
+
+def chunk_parsed_document(
+    doc: ParsedDocument,
+    *,
+    target_tokens: int = 512,
+    overlap_tokens: int = 64,
+) -> list[Chunk]:
+    """Split a parsed document into chunks (``iter_chunks`` as a list)."""
+    return list(
+        iter_chunks(
+            doc, target_tokens=target_tokens, overlap_tokens=overlap_tokens
+        )
+    )
@@ -0,0 +1,150 @@
+"""Pack retrieved chunks into a token-budgeted ``DOCUMENT_CONTEXT``.
+
+Retrieval returns chunk rows in rank order, and several of them are often
+neighbours from the same document: ``chunk_index`` 11 and 12 of one PDF. The
+chunker copies the tail of each window into the head of the next
+(``RAG_CHUNK_OVERLAP``), so pasting both rows whole sends that text twice,
+and each excerpt needs its own label. :func:`pack_passages`:
+
+1. merges hits with consecutive ``chunk_index`` in the same document into
+   one passage and drops the overlap repeated at each seam;
+2. folds passages that share a document, page and section into one block,
+   so the label and citation marker appear once;
+3. orders passages by their best-ranked member and adds whole passages
+   until the token budget is spent. A passage that does not fit is skipped
+   and a smaller, lower-ranked one may still go in. The top passage is
+   always kept, truncated if it alone exceeds the budget.
+
+Tokens use the chunker's ``_CHARS_PER_TOKEN`` estimate, so the budget is in
+the same units as ``RAG_CHUNK_TOKENS``.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from aeva.media.chunking import _CHARS_PER_TOKEN
+
+# Shorter suffix/prefix matches are treated as coincidence, not overlap.
+_MIN_OVERLAP_CHARS = 16
+_GAP = "\n…\n"
+
+
+@dataclass
+class Passage:
+    """One labelled block of context built from one or more chunk rows."""
+
+    media_id: str
+    rank: int
+    rows: list[dict[str, Any]] = field(default_factory=list)
+    content: str = ""
+
+    @property
+    def pages(self) -> list[int]:
+        """Distinct page numbers covered, in document order."""
+        return sorted({
+            row["page_number"] for row in self.rows if row.get("page_number")
+        })
+
+    @property
+    def section(self) -> str:
+        """Section of the passage's first chunk."""
+        return self.rows[0].get("section") or ""
+
+    @property
+    def tokens(self) -> int:
+        """Estimated prompt tokens for the passage text."""
+        return len(self.content) // _CHARS_PER_TOKEN
+
+
+def strip_overlap(previous: str, following: str, max_chars: int) -> str:
+    """Drop the head of ``following`` that repeats the tail of ``previous``."""
+    longest = min(len(previous), len(following), max_chars)
+    for size in range(longest, _MIN_OVERLAP_CHARS - 1, -1):
+        if following.startswith(previous[-size:]):
+            return following[size:].lstrip()
+    return following
+
+
+def _runs(
+    rows: list[dict[str, Any]], overlap_chars: int
+) -> list[Passage]:
+    """Merge rank-ordered rows into runs of consecutive chunks per document."""
+    ranked = {row["id"]: rank for rank, row in enumerate(rows)}
+    ordered = sorted(rows, key=lambda r: (r["media_id"], r["chunk_index"]))
+    runs: list[Passage] = []
+    for row in ordered:
+        last = runs[-1] if runs else None
+        if (
+            last is not None
+            and last.media_id == row["media_id"]
+            and last.rows[-1]["chunk_index"] + 1 == row["chunk_index"]
+        ):
+            text = strip_overlap(
+                last.rows[-1]["content"], row["content"], overlap_chars
+            )
+            last.content = f"{last.content}\n{text}" if text else last.content
+            last.rows.append(row)
+            last.rank = min(last.rank, ranked[row["id"]])
+            continue
+        runs.append(
+            Passage(
+                media_id=row["media_id"],
+                rank=ranked[row["id"]],
+                rows=[row],
+                content=row["content"],
+            )
+        )
+    return runs
+
+
+def _fold_same_page(runs: list[Passage]) -> list[Passage]:
+    """Join single-page runs that share document, page and section."""
+    folded: dict[tuple[str, int, str], Passage] = {}
+    passages: list[Passage] = []
+    for run in sorted(runs, key=lambda p: p.rank):
+        pages = run.pages
+        if len(pages) != 1:
+            passages.append(run)
+            continue
+        key = (run.media_id, pages[0], run.section)
+        if key in folded:
+            target = folded[key]
+            target.content = f"{target.content}{_GAP}{run.content}"
+            target.rows.extend(run.rows)
+            continue
+        folded[key] = run
+        passages.append(run)
+    return passages
+
+
+def pack_passages(
+    rows: list[dict[str, Any]],
+    *,
+    budget_tokens: int,
+    overlap_tokens: int,
+) -> list[Passage]:
+    """Merge, de-duplicate and budget rank-ordered chunk rows.
+
+    ``overlap_tokens`` is the chunker's ``RAG_CHUNK_OVERLAP``; it bounds the
+    seam search. ``budget_tokens <= 0`` means no budget. Returns passages
+    best-first.
+    """
+    overlap_chars = max(0, overlap_tokens) * _CHARS_PER_TOKEN
+    passages = sorted(
+        _fold_same_page(_runs(rows, overlap_chars)), key=lambda p: p.rank
+    )
+    if budget_tokens <= 0:
+        return passages
+    packed: list[Passage] = []
+    used = 0
+    for passage in passages:
+        if used + passage.tokens <= budget_tokens:
+            packed.append(passage)
+            used += passage.tokens
+        elif not packed:
+            passage.content = passage.content[
+                : budget_tokens * _CHARS_PER_TOKEN
+            ]
+            packed.append(passage)
+            used = budget_tokens
+    return packed
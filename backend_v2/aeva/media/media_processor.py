@@ -6,22 +6,33 @@ artifacts plus ``media.processing_status`` before moving on. Persisting the
 LlamaParse job id *before* polling makes the run resumable — a dropped SSE
 connection that reconnects re-enters ``process`` and picks up the existing job
 instead of re-parsing, which matters under the serverless request ceiling.
+The chunk/embed/index stage checkpoints the same way: after every window it
+records the chunk high-water mark and the window's batch id on the media row,
+so a reconnect skips the windows already embedded and inserted.
+
+Before any of that, a document whose bytes (``content_sha256``) match one
+already indexed with the current settings is cloned from it — pages, chunks
+and embeddings copied server-side — skipping LlamaParse and embedding.
 
 Progress events are plain dicts ``{stage, pct, msg}``; terminal events use the
 ``ready`` and ``error`` stages.
 """
 
+import hashlib
+import itertools
 import json
 import logging
+import queue
 import time
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from typing import Any
 
 from flask import current_app
 
 from aeva.llm.llm_client import LLMClient
-from aeva.media.chunking import chunk_parsed_document
+from aeva.media.chunking import Chunk, iter_chunks
 from aeva.media.llamaparse_service import (
     STATUS_COMPLETED,
     TERMINAL_STATUSES,
@@ -40,12 +51,24 @@ _MAX_POLL_SECONDS = 240
 # Storage-path suffixes for the artifacts a failed run may have written; cleaned
 # up alongside the original so nothing unusable is ever left behind.
 _PARSED_SUFFIXES = (".parsed.json", ".parsed.md", ".parsed.txt")
+# The media columns holding those artifacts' paths, in the same order.
+_PARSED_PATH_KEYS = ("parsed_json_path", "parsed_md_path", "parsed_text_path")
+
+# The streamed chunk/embed/index stage's slice of the progress bar; each
+# window (and each embedding batch inside it) moves the bar between these.
+_INDEX_PCT_START = 66
+_INDEX_PCT_END = 92
+_EMBED_PROGRESS_POLL_SECONDS = 0.25
 
 # While LlamaParse works, cycle these so a long parse still feels alive.
 _PARSE_HINTS = ("Reading pages…", "Understanding document structure…")
 
 Event = dict[str, Any]
 
+# Held from artifact persistence until ready; only a run in this status has
+# an index checkpoint worth resuming.
+_INDEXING_STATUS = "indexing"
+
 
 class MediaProcessingError(Exception):
     """A processing stage failed; carries a user-facing message.
@@ -212,6 +235,11 @@ class MediaProcessor:
         """Happy-path stages; exceptions bubble to ``process`` for cleanup."""
         media_id = record["id"]
 
+        if record.get("processing_status") != _INDEXING_STATUS:
+            cloned = yield from self._clone_known(user_id, record)
+            if cloned:
+                return
+
         yield self._event("parsing", 12, "Parsing document…")
         logger.info("Stage: parsing | media=%s", media_id)
         job_id = yield from self._parse(user_id, record)
@@ -219,50 +247,264 @@ class MediaProcessor:
         yield self._event("extracting", 45, "Extracting tables and text…")
         logger.info("Stage: extracting | media=%s | job=%s", media_id, job_id)
         doc = self.llamaparse.fetch_result(job_id)
-        self._persist_artifacts(user_id, record, doc)
+        # A run that already reached indexing persisted its artifacts and
+        # holds a checkpoint; re-persisting would wipe the indexed chunks.
+        resume = record.get("processing_status") == _INDEXING_STATUS
+        if resume:
+            batch_ids = list(record.get("indexed_batch_ids") or [])
+            logger.info(
+                "Resuming index | media=%s | %d batches done",
+                media_id,
+                len(batch_ids),
+            )
+        else:
+            self._persist_artifacts(user_id, record, doc)
+            batch_ids = []
 
         yield self._event("chunking", 65, "Creating semantic chunks…")
-        logger.info("Stage: chunking | media=%s", media_id)
-        chunks = chunk_parsed_document(
-            doc,
-            target_tokens=current_app.config["RAG_CHUNK_TOKENS"],
-            overlap_tokens=current_app.config["RAG_CHUNK_OVERLAP"],
+        logger.info("Stage: chunk/embed/index | media=%s", media_id)
+        chunk_count = yield from self._index_stream(
+            user_id, media_id, doc, batch_ids if resume else None
         )
-        if not chunks:
+        if not chunk_count:
             msg = "No readable text was found in this document."
             raise MediaProcessingError(msg)
-        logger.info("Chunked | media=%s | %d chunks", media_id, len(chunks))
+        yield self._event("indexing", 98, "Almost ready…")
 
-        yield self._event("embedding", 82, "Generating embeddings…")
-        logger.info(
-            "Stage: embedding | media=%s | %d chunks", media_id, len(chunks)
+        self.supabase.update_media_processing(
+            media_id,
+            user_id,
+            processing_status="ready",
+            chunk_count=chunk_count,
+            index_signature=_index_signature(),
+            processing_error=None,
+            processed_at=datetime.now(tz=UTC).isoformat(),
         )
-        vectors = self.embed_llm.embed(
-            [c.content for c in chunks],
-            task_type="RETRIEVAL_DOCUMENT",
-            output_dimensionality=current_app.config["RAG_EMBEDDING_DIM"],
+        logger.info(
+            "Media processing done | media=%s | %d chunks, %d pages",
+            media_id,
+            chunk_count,
+            doc.page_count,
         )
+        yield self._event("ready", 100, "Document is ready!")
 
-        yield self._event("indexing", 93, "Building knowledge index…")
-        logger.info("Stage: indexing | media=%s", media_id)
-        self._index(user_id, media_id, chunks, vectors)
-        yield self._event("indexing", 98, "Almost ready…")
+    def _clone_known(
+        self, user_id: str, record: dict[str, Any]
+    ) -> Generator[Event, None, bool]:
+        """Reuse an identical, already-indexed document's parse and index.
+
+        Looks up a ready row with the same content hash and index signature
+        and, if found, copies its parsed artifacts and clones its pages and
+        chunks onto this row. Returns whether the document is now ready; any
+        failure falls back to the full pipeline (which re-persists and
+        re-indexes from scratch, overwriting whatever the clone left).
+        """
+        content_sha256 = record.get("content_sha256")
+        if not content_sha256 or not current_app.config["MEDIA_DEDUP"]:
+            return False
+        media_id = record["id"]
+        signature = _index_signature()
+        try:
+            donor = self.supabase.find_indexed_media(
+                content_sha256, signature, media_id
+            )
+            if not donor:
+                return False
+            yield self._event("indexing", 50, "Reusing an identical document…")
+            base = record["storage_path"].rsplit(".", 1)[0]
+            paths: dict[str, str] = {}
+            for key, suffix in zip(
+                _PARSED_PATH_KEYS, _PARSED_SUFFIXES, strict=True
+            ):
+                if donor.get(key):
+                    paths[key] = f"{base}{suffix}"
+                    # Copy refuses to overwrite; a retried clone may have
+                    # copied this one already.
+                    self.supabase.delete_storage_file(paths[key])
+                    self.supabase.copy_storage_file(donor[key], paths[key])
+            chunk_count = self.supabase.clone_media_index(
+                donor["id"], media_id, user_id
+            )
+        except Exception:  # dedup is an optimisation only
+            logger.warning(
+                "Dedup clone failed; processing normally | media=%s",
+                media_id,
+                exc_info=True,
+            )
+            return False
+        if not chunk_count:  # donor deleted between lookup and clone
+            return False
 
         self.supabase.update_media_processing(
             media_id,
             user_id,
             processing_status="ready",
-            chunk_count=len(chunks),
+            page_count=donor.get("page_count"),
+            chunk_count=chunk_count,
+            index_signature=signature,
             processing_error=None,
             processed_at=datetime.now(tz=UTC).isoformat(),
+            **paths,
         )
         logger.info(
-            "Media processing done | media=%s | %d chunks, %d pages",
+            "Media cloned | media=%s | from=%s | %d chunks",
             media_id,
-            len(chunks),
-            doc.page_count,
+            donor["id"],
+            chunk_count,
         )
         yield self._event("ready", 100, "Document is ready!")
+        return True
+
+    def _index_stream(
+        self,
+        user_id: str,
+        media_id: str,
+        doc: ParsedDocument,
+        done_batches: list[str] | None = None,
+    ) -> Generator[Event, None, int]:
+        """Chunk, embed, and insert the document one window at a time.
+
+        Chunks come off ``iter_chunks`` lazily and are embedded and inserted
+        ``RAG_INDEX_WINDOW`` at a time, so peak memory is one window of chunks
+        and vectors rather than the whole document, and no single insert
+        outgrows the PostgREST payload limit. Progress follows the page of the
+        last chunk in each window. Returns the number of chunks indexed.
+
+        After each window lands, the chunk high-water mark and the window's
+        batch id are checkpointed on the media row. ``done_batches`` is that
+        list from an earlier run: leading windows whose batch id still
+        matches are skipped without re-embedding, anything a killed run
+        inserted past the checkpoint is trimmed, and indexing continues from
+        there. A window whose id no longer matches (the chunking settings
+        changed) ends the skip, so the rest is rebuilt. A failure after a
+        checkpoint is reported as recoverable so a retry resumes it.
+        """
+        chunks = iter_chunks(
+            doc,
+            target_tokens=current_app.config["RAG_CHUNK_TOKENS"],
+            overlap_tokens=current_app.config["RAG_CHUNK_OVERLAP"],
+        )
+        pages = max(doc.page_count, 1)
+        pct = _INDEX_PCT_START
+        indexed = 0
+        checkpoint = list(done_batches or [])
+        trim = done_batches is not None
+        try:
+            for number, window in enumerate(
+                itertools.batched(
+                    chunks, current_app.config["RAG_INDEX_WINDOW"]
+                )
+            ):
+                page = min(window[-1].page_number or pages, pages)
+                next_pct = max(
+                    pct,
+                    _INDEX_PCT_START
+                    + (_INDEX_PCT_END - _INDEX_PCT_START) * page // pages,
+                )
+                batch_id = _batch_id(window)
+                if number < len(checkpoint) and checkpoint[number] == batch_id:
+                    indexed += len(window)
+                    pct = next_pct
+                    continue
+                if trim:
+                    # First window this run embeds: drop what a killed run
+                    # left past the checkpoint (and any stale tail).
+                    del checkpoint[number:]
+                    self.supabase.delete_media_chunks_from(
+                        media_id, user_id, window[0].chunk_index
+                    )
+                    trim = False
+                    if indexed:
+                        yield self._event(
+                            "indexing",
+                            pct,
+                            f"Resuming after {indexed} passages…",
+                        )
+                vectors = yield from self._embed(
+                    [c.content for c in window], pct, next_pct
+                )
+                self._index(user_id, media_id, list(window), vectors)
+                indexed += len(window)
+                checkpoint.append(batch_id)
+                self.supabase.update_media_processing(
+                    media_id,
+                    user_id,
+                    indexed_chunk_count=indexed,
+                    indexed_batch_ids=checkpoint,
+                )
+                pct = next_pct
+                logger.info(
+                    "Indexed window | media=%s | %d chunks so far (page %d/%d)",
+                    media_id,
+                    indexed,
+                    page,
+                    pages,
+                )
+                yield self._event(
+                    "indexing", pct, f"Indexed {indexed} passages…"
+                )
+        except MediaProcessingError:
+            raise
+        except Exception as exc:
+            if not checkpoint:
+                raise
+            msg = "Indexing was interrupted; retry to resume."
+            raise MediaProcessingError(msg, recoverable=True) from exc
+        return indexed
+
+    def _embed(
+        self, texts: list[str], start_pct: int, end_pct: int
+    ) -> Generator[Event, None, list[list[float]]]:
+        """Embed chunk texts, yielding progress events as batches land.
+
+        The provider dispatches batches concurrently and reports through a
+        callback on its worker threads, so the embed call runs on a thread of
+        its own while this generator relays progress (scaled into
+        ``start_pct..end_pct``) from a queue. Not the shared I/O pool: a
+        window takes seconds, and a few concurrent uploads would hold every
+        worker that chat turns fan out on (``concurrency``). The provider's
+        batches already run on their own executor.
+        """
+        updates: queue.SimpleQueue[tuple[int, int]] = queue.SimpleQueue()
+        app = current_app._get_current_object()  # noqa: SLF001
+        dim = current_app.config["RAG_EMBEDDING_DIM"]
+
+        def _run() -> list[list[float]]:
+            with app.app_context():
+                return self.embed_llm.embed(
+                    texts,
+                    task_type="RETRIEVAL_DOCUMENT",
+                    output_dimensionality=dim,
+                    on_progress=lambda done, total: updates.put((done, total)),
+                )
+
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="aeva-embed"
+        )
+        try:
+            future = executor.submit(_run)
+            last_pct = start_pct
+            while not future.done():
+                try:
+                    done, total = updates.get(
+                        timeout=_EMBED_PROGRESS_POLL_SECONDS
+                    )
+                except queue.Empty:
+                    continue
+                pct = start_pct + (end_pct - start_pct) * done // max(total, 1)
+                if pct > last_pct:
+                    last_pct = pct
+                    yield self._event(
+                        "embedding",
+                        pct,
+                        "Generating embeddings… "
+                        f"{done * 100 // max(total, 1)}%",
+                    )
+            return future.result()
+        finally:
+            # A dropped client closes this generator; the embed call still
+            # finishes on its thread, which then exits.
+            executor.shutdown(wait=False)
 
     def _parse(
         self, user_id: str, record: dict[str, Any]
@@ -344,10 +586,14 @@ class MediaProcessor:
             }
             for page in doc.pages
         ])
+        # Entering the index stage with an empty checkpoint; from here on a
+        # reconnect resumes indexing instead of re-persisting (see ``_run``).
         self.supabase.update_media_processing(
             media_id,
             user_id,
-            processing_status="extracting",
+            processing_status=_INDEXING_STATUS,
+            indexed_chunk_count=0,
+            indexed_batch_ids=[],
             page_count=doc.page_count,
             parsed_json_path=json_path,
             parsed_md_path=md_path,
@@ -358,7 +604,7 @@ class MediaProcessor:
         self,
         user_id: str,
         media_id: str,
-        chunks: list[Any],
+        chunks: list[Chunk],
         vectors: list[list[float]],
     ) -> None:
         """Insert chunk rows with their embeddings."""
@@ -376,3 +622,30 @@ class MediaProcessor:
             for chunk, vector in zip(chunks, vectors, strict=False)
         ]
         self.supabase.insert_media_chunks(rows)
+
+
+def _index_signature() -> str:
+    """Describe the settings an index is built with (clones must match)."""
+    config = current_app.config
+    return ":".join(
+        str(config[key])
+        for key in (
+            "LLM_EMBEDDING_MODEL",
+            "RAG_EMBEDDING_DIM",
+            "RAG_CHUNK_TOKENS",
+            "RAG_CHUNK_OVERLAP",
+        )
+    )
+
+
+def _batch_id(window: tuple[Chunk, ...]) -> str:
+    """Stable id of one index window: its first chunk index + content hash.
+
+    Chunking is deterministic for a given parse and settings, so a resumed
+    run rebuilds identical windows; a changed id means they differ.
+    """
+    digest = hashlib.sha256()
+    for chunk in window:
+        digest.update(chunk.content.encode("utf-8"))
+        digest.update(b"\0")
+    return f"{window[0].chunk_index}:{digest.hexdigest()[:16]}"
@@ -1,5 +1,6 @@
 """Media repository."""
 
+import hashlib
 import json
 import logging
 import uuid
@@ -77,6 +78,7 @@ class MediaRepository:
                 size_bytes=len(compressed),
                 session_id=session_id,
                 space_id=resolved_space,
+                content_sha256=hashlib.sha256(compressed).hexdigest(),
             )
             record["signed_url"] = supabase.get_signed_url(storage_path)
             uploaded.append(record)
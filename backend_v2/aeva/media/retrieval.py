@@ -0,0 +1,79 @@
+"""Rank fusion and diversification for media retrieval.
+
+``match_media_chunks_hybrid`` (migration 028) fuses the vector and full-text
+rankings in the database. :func:`reciprocal_rank_fusion` is the same formula
+in Python, used by the offline eval (``benchmarks.rag_retrieval``) so it
+scores exactly what production would.
+
+:func:`mmr_select` then picks the final ``top_k`` from the fused candidates
+with maximal marginal relevance. The redundancy term is word-set overlap
+(Jaccard) between chunk texts, not embedding similarity, so the RPC does not
+need to ship a 768-dim vector per candidate. Overlapping neighbour chunks and
+near-duplicate pages are exactly what it catches.
+"""
+
+import re
+from collections.abc import Hashable, Iterable, Sequence
+from typing import Any
+
+_WORD_RE = re.compile(r"\w+")
+
+# Rank-fusion constant from the original RRF paper; also the SQL default.
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[Hashable]], k: int = RRF_K
+) -> list[tuple[Hashable, float]]:
+    """Fuse best-first rankings: each list adds ``1 / (k + rank)`` per id."""
+    scores: dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda pair: pair[1], reverse=True)
+
+
+def _words(text: str) -> frozenset[str]:
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def mmr_select(
+    rows: list[dict[str, Any]],
+    top_k: int,
+    *,
+    diversity: float = 0.3,
+    score_key: str = "rrf_score",
+) -> list[dict[str, Any]]:
+    """Pick ``top_k`` rows trading relevance against redundancy.
+
+    ``rows`` are best-first; a row's relevance is its ``score_key`` scaled to
+    the best score (rank order when the key is missing). ``diversity`` 0
+    keeps the input order; higher values push near-duplicates down.
+    """
+    if diversity <= 0 or len(rows) <= top_k:
+        return rows[:top_k]
+    scores = [row.get(score_key) for row in rows]
+    if all(isinstance(score, (int, float)) for score in scores):
+        best = max(scores) or 1.0
+        relevance = [score / best for score in scores]
+    else:
+        relevance = [1.0 - index / len(rows) for index in range(len(rows))]
+    words = [_words(row.get("content") or "") for row in rows]
+
+    chosen: list[int] = []
+    remaining = list(range(len(rows)))
+    while remaining and len(chosen) < top_k:
+        pick = max(
+            remaining,
+            key=lambda i: (1 - diversity) * relevance[i]
+            - diversity
+            * max((_jaccard(words[i], words[j]) for j in chosen), default=0.0),
+        )
+        chosen.append(pick)
+        remaining.remove(pick)
+    return [rows[i] for i in chosen]
@@ -5,10 +5,16 @@ import json
 import logging
 import re
 import time
-from collections.abc import Generator
-from typing import Any
+from collections.abc import Callable, Generator
+from typing import TYPE_CHECKING, Any
 
+from aeva.common import concurrency
 from aeva.common.errors import ERROR_CODES, CustomError
+from aeva.common.streaming import (
+    DeltaCoalescer,
+    SentinelSplitter,
+    StreamMeter,
+)
 from aeva.feature_flag import feature_flag_service
 from aeva.llm import prompts
 from aeva.llm.llm_client import LLMClient
@@ -19,6 +25,7 @@ from aeva.mcp.base import (
     ToolDefinition,
 )
 from aeva.mcp.registry import ToolRegistry
+from aeva.orchestration.intent_classifier import get_intent_classifier
 from aeva.orchestration.model_candidates import models_for, resolve_model
 from aeva.orchestration.models import (
     AssistantContext,
@@ -29,9 +36,14 @@ from aeva.orchestration.models import (
     FlashcardOptions,
     QuizOptions,
     RunStatus,
+    TurnPrelude,
 )
+from aeva.orchestration.plan_cache import PlanCache, get_plan_cache
 from aeva.supabase.supabase_service import SupabaseService
 
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
 logger = logging.getLogger(__name__)
 
 # Exact greetings / acknowledgements that never warrant learning-action chips.
@@ -151,6 +163,12 @@ class AssistantOrchestrator:
         # users pay no extra lookup. One orchestrator instance serves one
         # request (see assistant_repository), so instance state is safe.
         self._debug_enabled = False
+        # The user's message insert, running off the critical path while the
+        # turn plans. Joined before any assistant message is written so the
+        # transcript keeps its order (see _await_user_message).
+        self._pending_user_message: Future[Any] | None = None
+        # Per-stage prelude timings for the CURRENT turn (debug + logs).
+        self._prelude_timings: dict[str, int] = {}
 
     @property
     def llm(self) -> LLMClient:
@@ -174,6 +192,22 @@ class AssistantOrchestrator:
 
     def run(self, ctx: AssistantContext) -> AssistantResult:
         """Execute one assistant turn (non-streaming)."""
+        try:
+            return self._run_turn(ctx)
+        finally:
+            self._await_user_message()
+
+    def run_stream(
+        self, ctx: AssistantContext
+    ) -> Generator[str, None, None]:
+        """Execute one assistant turn, streaming the answer as SSE frames."""
+        try:
+            yield from self._run_turn_stream(ctx)
+        finally:
+            self._await_user_message()
+
+    def _run_turn(self, ctx: AssistantContext) -> AssistantResult:
+        """Non-streaming turn body (see ``run``)."""
         t_start = time.perf_counter()
         session, history, enriched_message, plan, personalization = (
             self._setup_and_plan(ctx)
@@ -217,13 +251,15 @@ class AssistantOrchestrator:
             result["debug"] = self._debug_info(
                 plan, ctx, history, tool_name, tool_model, tool_config_key,
                 planning_ms, tool_ms, t_start, streamed=False,
+                prelude=self._prelude_timings,
             )
         badge = self._model_badge(tool_model, debug_enabled)
         if badge:
             result["model"] = tool_model
             display_text += badge
         msg = self._persist_answer(
-            ctx, session, tool_name, result, display_text
+            ctx, session, tool_name, result, display_text,
+            plan_source=plan.get("_source", "planner"),
         )
 
         return AssistantResult(
@@ -234,10 +270,10 @@ class AssistantOrchestrator:
             display_text=display_text,
         )
 
-    def run_stream(
+    def _run_turn_stream(
         self, ctx: AssistantContext
     ) -> Generator[str, None, None]:
-        """Execute one assistant turn, streaming the answer as SSE frames."""
+        """Streaming turn body (see ``run_stream``)."""
         logger.info(
             "Assistant turn (stream) | session=%s | media=%d | msg=%r",
             ctx.session_id,
@@ -299,19 +335,15 @@ class AssistantOrchestrator:
 
         result: dict[str, Any] = {}
         meta: dict[str, Any] | None = None
+        stream_stats: dict[str, Any] | None = None
         t_tool = time.perf_counter()
         if tool.can_stream():
             # Stream only the answer; the follow-up metadata trailer the model
-            # appends is held back here and parsed (no second LLM call).
-            stream = self._stream_answer(
-                tool.execute_stream(tool_ctx, tool_params)
+            # appends is held back here and parsed (no second LLM call), and
+            # token-sized deltas are coalesced into fewer frames.
+            raw, result, stream_stats = yield from self._answer_frames(
+                self._stream_answer(tool.execute_stream(tool_ctx, tool_params))
             )
-            raw = ""
-            try:
-                while True:
-                    yield LLMClient.format_sse_chunk(next(stream))
-            except StopIteration as stop:
-                raw, result = stop.value if stop.value else ("", {})
             if not isinstance(result, dict):
                 result = {}
             answer, meta = self._split_answer_meta(raw)
@@ -328,7 +360,10 @@ class AssistantOrchestrator:
             result["debug"] = self._debug_info(
                 plan, ctx, history, tool_name, tool_model, tool_config_key,
                 planning_ms, tool_ms, t_start, streamed=tool.can_stream(),
+                prelude=self._prelude_timings,
             )
+            if stream_stats:
+                result["debug"]["stream"] = stream_stats
 
         # Optional "powered by: <model>" badge — streamed as a trailing chunk
         # and folded into the persisted display text (never into the answer).
@@ -340,14 +375,25 @@ class AssistantOrchestrator:
 
         # Follow-up chips ride the finished answer's metadata trailer.
         self._attach_actions(tool_name, result, tool, meta)
-        self._persist_answer(ctx, session, tool_name, result, display_text)
+        self._persist_answer(
+            ctx, session, tool_name, result, display_text,
+            plan_source=plan.get("_source", "planner"),
+        )
         logger.info(
             "Turn complete | tool=%s | answer=%dchars | actions=%s | "
-            "followups=%d",
+            "followups=%d%s",
             tool_name,
             len(display_text or ""),
             result.get("available_actions"),
             len(result.get("suggested_followups") or []),
+            (
+                " | stream={deltas} deltas→{frames} frames, "
+                "{frames_per_s} frames/s, {bytes_per_s} B/s".format(
+                    **stream_stats
+                )
+                if stream_stats
+                else ""
+            ),
         )
         yield LLMClient.format_sse_chunk(
             "",
@@ -367,11 +413,12 @@ class AssistantOrchestrator:
         reused for both planning (so clarifications honour the language) and the
         tool execution.
         """
-        session = self.supabase.get_session(ctx.session_id, ctx.user_id)
+        prelude = self._load_prelude(ctx)
+        session = prelude.session
         if not session:
             raise CustomError(ERROR_CODES["NOT_FOUND"])
 
-        profile = self.supabase.get_profile(ctx.user_id)
+        profile = prelude.profile
         # Developer Mode rides the profile row that personalization already
         # needs — deciding it costs normal users nothing extra.
         self._debug_enabled = bool((profile or {}).get("is_debug_user"))
@@ -405,14 +452,13 @@ class AssistantOrchestrator:
         personalization += prompts.build_space_block(
             session.get("study_spaces")
         )
-        history = self._get_history(ctx.session_id)
+        history = prelude.history
         enriched_message = ctx.message
 
         # An action targeting a specific card carries its own content. Ground
-        # the turn ONLY on that content and drop conversation history so the
-        # action never picks up a later, unrelated response.
+        # the turn ONLY on that content; the prelude already skipped loading
+        # history so the action never picks up a later, unrelated response.
         if ctx.source_content:
-            history = []
             enriched_message = (
                 f"{ctx.message}\n\nUse ONLY the following content as the "
                 'source.'
@@ -421,7 +467,7 @@ class AssistantOrchestrator:
 
         media_choice_ids: list[str] | None = None
         if ctx.run_id and ctx.clarification:
-            run = self._get_run(ctx.run_id, ctx.user_id)
+            run = prelude.run
             if not run:
                 raise CustomError(ERROR_CODES["CLARIFICATION_EXPIRED"])
             plan_questions = (
@@ -441,12 +487,17 @@ class AssistantOrchestrator:
         # Clarification replies are invisible: the answers are folded into the
         # enriched message for the tool, but no user bubble is persisted — on
         # reload the answer reads as a direct continuation of the original ask.
+        # The insert runs in the background: nothing below reads it back, and
+        # it is joined before the assistant's reply is written.
         if not (ctx.run_id and ctx.clarification):
-            self.supabase.add_message(ctx.session_id, "user", ctx.message)
+            self._pending_user_message = concurrency.submit(
+                self.supabase.add_message, ctx.session_id, "user", ctx.message
+            )
 
         # Deterministic plans (resolved file choice, popover-driven quiz/flash)
-        # skip LLM planning entirely. Each path stamps `_source` (internal,
-        # never persisted) so Developer Mode can show WHY a tool was chosen.
+        # skip LLM planning entirely. Each path stamps `_source` so Developer
+        # Mode can show WHY a tool was chosen; it is persisted as
+        # ``metadata.plan_source`` on the reply (see ``_persist_answer``).
         forced = self._forced_plan(ctx, media_choice_ids)
         if forced is not None:
             forced["_source"] = "forced"
@@ -470,20 +521,94 @@ class AssistantOrchestrator:
             cont["_source"] = "continuation"
             return session, history, enriched_message, cont, personalization
 
-        # Deterministic outcome -> skip the planner LLM call entirely.
-        fast = self._fast_path_plan(ctx, enriched_message, history)
-        if fast is not None:
-            logger.info("Turn planned deterministically (no plan LLM call)")
-            fast["_source"] = "fast_path"
-            return session, history, enriched_message, fast, personalization
+        # Small talk or a confident local classifier -> no planner LLM call.
+        local = self._local_plan(ctx, enriched_message, history)
+        if local is not None:
+            return session, history, enriched_message, local, personalization
 
-        plan = self._plan_turn(
-            ctx, history, enriched_message, ctx.clarification
-        )
+        plan, source = self._cached_plan_turn(ctx, history, enriched_message)
         plan = self._refine_plan(plan, ctx, enriched_message, history)
-        plan["_source"] = "planner"
+        plan["_source"] = source
         return session, history, enriched_message, plan, personalization
 
+    def _load_prelude(self, ctx: AssistantContext) -> TurnPrelude:
+        """Load the session, profile, history (and pending run) concurrently.
+
+        The reads are independent PostgREST round-trips, so they run together
+        on the shared I/O pool and the prelude costs the slowest one instead of
+        their sum. History is skipped when the turn is grounded on
+        ``source_content`` (it would be discarded), and the clarification run
+        is only fetched for a clarification reply. Each stage's time lands in
+        ``TurnPrelude.timings`` for the turn log and Developer Mode.
+        """
+        t_start = time.perf_counter()
+        stages: dict[str, Callable[[], Any]] = {
+            "session": lambda: self.supabase.get_session(
+                ctx.session_id, ctx.user_id
+            ),
+        }
+        # ``user_required`` usually cached the row already. The cache lives on
+        # this thread's ``flask.g``, which pooled stages do not see, so check
+        # it here and only fan out a read on a miss.
+        cached = SupabaseService.cached_profile(ctx.user_id)
+        if cached is None:
+            stages["profile"] = lambda: self.supabase.get_profile(ctx.user_id)
+        if not ctx.source_content:
+            stages["history"] = lambda: self._get_history(ctx.session_id)
+        if ctx.run_id and ctx.clarification:
+            stages["run"] = lambda: self._get_run(
+                ctx.run_id or "", ctx.user_id
+            )
+        futures = {
+            name: concurrency.submit(self._timed_stage, fn)
+            for name, fn in stages.items()
+        }
+        results: dict[str, Any] = {}
+        timings: dict[str, int] = {}
+        for name, future in futures.items():
+            results[name], timings[name] = future.result()
+        timings["total"] = int((time.perf_counter() - t_start) * 1000)
+        self._prelude_timings = timings
+        logger.info(
+            "Turn prelude | %s",
+            " ".join(f"{name}={ms}ms" for name, ms in timings.items()),
+        )
+        return TurnPrelude(
+            session=results["session"],
+            profile=(
+                cached if cached is not None else results["profile"]
+            ),
+            history=results.get("history") or [],
+            run=results.get("run"),
+            timings=timings,
+        )
+
+    @staticmethod
+    def _timed_stage(fn: Callable[[], Any]) -> tuple[Any, int]:
+        """Run one prelude stage, returning ``(result, elapsed_ms)``."""
+        start = time.perf_counter()
+        result = fn()
+        return result, int((time.perf_counter() - start) * 1000)
+
+    def _await_user_message(self) -> None:
+        """Join the deferred user-message insert, if one is in flight.
+
+        Called before any assistant message is written (so the user bubble
+        always sorts first) and when the turn ends. A failed insert is logged
+        rather than raised: by then the answer exists, and losing the echo of
+        the question beats failing the whole turn.
+        """
+        pending, self._pending_user_message = (
+            self._pending_user_message,
+            None,
+        )
+        if pending is None:
+            return
+        try:
+            pending.result()
+        except Exception:
+            logger.exception("Failed to persist user message")
+
     def _forced_plan(
         self,
         ctx: AssistantContext,
@@ -607,6 +732,7 @@ class AssistantOrchestrator:
         tool_ms: int,
         t_start: float,
         streamed: bool,
+        prelude: dict[str, int] | None = None,
     ) -> dict[str, Any]:
         """Diagnostics block attached to responses for Developer Mode users.
 
@@ -628,6 +754,7 @@ class AssistantOrchestrator:
             "history_messages": len(history),
             "media_count": len(ctx.media_ids or []),
             # Timings
+            "prelude_ms": dict(prelude or {}),
             "planning_ms": planning_ms,
             "tool_ms": tool_ms,
             "total_ms": int((time.perf_counter() - t_start) * 1000),
@@ -711,6 +838,33 @@ class AssistantOrchestrator:
         result["available_actions"] = meta.get("available_actions", [])
         result["suggested_followups"] = meta.get("suggested_followups", [])
 
+    def _answer_frames(
+        self, stream: Generator[str, None, tuple[str, dict[str, Any]]]
+    ) -> Generator[str, None, tuple[str, Any, dict[str, Any]]]:
+        """Frame answer text as SSE, coalescing token-sized deltas.
+
+        Returns ``(raw_text, tool_result, stream_stats)``; the stats (deltas,
+        frames, bytes and their rates) go to the turn log and debug block.
+        An empty delta marks the end of the visible text (``_stream_answer``
+        reached the metadata trailer): the held batch goes out at once
+        instead of waiting for the trailer to finish generating.
+        """
+        coalescer = self._coalescer()
+        meter = StreamMeter()
+        raw, result = "", {}
+        try:
+            while True:
+                delta = next(stream)
+                batch = coalescer.push(delta) if delta else coalescer.flush()
+                if batch:
+                    yield meter.record(LLMClient.format_sse_chunk(batch))
+        except StopIteration as stop:
+            raw, result = stop.value if stop.value else ("", {})
+        tail = coalescer.flush()
+        if tail:
+            yield meter.record(LLMClient.format_sse_chunk(tail))
+        return raw, result, meter.summary(coalescer.deltas)
+
     def _stream_answer(
         self, gen: Generator[str, None, dict[str, Any]]
     ) -> Generator[str, None, tuple[str, dict[str, Any]]]:
@@ -718,37 +872,29 @@ class AssistantOrchestrator:
 
         The answer model appends ``META_SENTINEL`` + JSON after its reply. This
         streams the answer chunks but buffers a short tail so the sentinel is
-        never leaked to the client, even when it straddles two chunks. Returns
+        never leaked to the client, even when it straddles two chunks; each
+        chunk costs the same however long the answer already is. Returns
         ``(raw_text, tool_result)`` — raw_text is the full model output
-        including the trailer, for the caller to split.
+        including the trailer, for the caller to split. Once the sentinel
+        shows up an empty chunk is yielded, so the caller can release what it
+        buffered without waiting for the trailer.
         """
-        sentinel = prompts.META_SENTINEL
-        hold = len(sentinel)
-        raw = ""
-        emitted = 0
-        stopped = False
+        splitter = SentinelSplitter(prompts.META_SENTINEL)
         result: dict[str, Any] = {}
         try:
             while True:
-                raw += next(gen)
-                if stopped:
-                    continue
-                idx = raw.find(sentinel)
-                if idx != -1:
-                    if idx > emitted:
-                        yield raw[emitted:idx]
-                    emitted = idx
-                    stopped = True
-                else:
-                    safe = len(raw) - (hold - 1)
-                    if safe > emitted:
-                        yield raw[emitted:safe]
-                        emitted = safe
+                found = splitter.found
+                visible = splitter.feed(next(gen))
+                if visible:
+                    yield visible
+                if splitter.found and not found:
+                    yield ""
         except StopIteration as stop:
             result = stop.value or {}
-        if not stopped and emitted < len(raw):
-            yield raw[emitted:]
-        return raw, result
+        tail = splitter.flush()
+        if tail:
+            yield tail
+        return splitter.text, result
 
     def _split_answer_meta(
         self, text: str
@@ -801,11 +947,11 @@ class AssistantOrchestrator:
         """Resolve selected media ids to {id, name} (single DB call)."""
         if not ctx.media_ids:
             return []
-        by_id = {m["id"]: m for m in self.supabase.list_media(ctx.user_id)}
         return [
-            {"id": mid, "name": by_id[mid]["file_name"]}
-            for mid in ctx.media_ids
-            if mid in by_id
+            {"id": m["id"], "name": m["file_name"]}
+            for m in self.supabase.get_media_many(
+                ctx.media_ids, ctx.user_id, columns="id,file_name"
+            )
         ]
 
     @staticmethod
@@ -932,8 +1078,16 @@ class AssistantOrchestrator:
         tool_name: str,
         result: dict[str, Any],
         display_text: str,
+        *,
+        plan_source: str,
     ) -> dict[str, Any]:
-        """Persist the assistant message and auto-title a fresh session."""
+        """Persist the assistant message and auto-title a fresh session.
+
+        ``plan_source`` (the plan's ``_source``) is stored on every turn, not
+        just in the Developer Mode trace: the intent classifier trains only
+        on turns the planner itself routed (``intent_classifier._label``).
+        """
+        self._await_user_message()
         msg = self.supabase.add_message(
             ctx.session_id,
             "assistant",
@@ -941,6 +1095,7 @@ class AssistantOrchestrator:
             metadata={
                 "status": "completed",
                 "tool_used": tool_name,
+                "plan_source": plan_source,
                 "content": result,
             },
         )
@@ -1054,6 +1209,21 @@ class AssistantOrchestrator:
         }
         return f"data: {json.dumps(payload)}\n\n"
 
+    @staticmethod
+    def _coalescer() -> DeltaCoalescer:
+        """Delta batcher for answer streams (``SSE_COALESCE_*`` config).
+
+        Falls back to the config defaults outside an app context (tests).
+        """
+        try:
+            from flask import current_app
+
+            window_ms = current_app.config.get("SSE_COALESCE_MS", 30)
+            max_chars = current_app.config.get("SSE_COALESCE_CHARS", 512)
+        except RuntimeError:
+            window_ms, max_chars = 30, 512
+        return DeltaCoalescer(int(window_ms) / 1000, int(max_chars))
+
     @staticmethod
     def _history_limit() -> int:
         """Configured number of recent messages to send as LLM context.
@@ -1172,6 +1342,118 @@ class AssistantOrchestrator:
             plan["model_config_key"] = "LLM_FAST_MODEL"
         return plan
 
+    def _local_plan(
+        self,
+        ctx: AssistantContext,
+        message: str,
+        history: list[dict[str, str]],
+    ) -> dict[str, Any] | None:
+        """Fast-path or classifier plan (``_source`` stamped), else None."""
+        fast = self._fast_path_plan(ctx, message, history)
+        if fast is not None:
+            logger.info("Turn planned deterministically (no plan LLM call)")
+            fast["_source"] = "fast_path"
+            return fast
+        # Off unless INTENT_CLASSIFIER_PATH points at a trained model.
+        routed = self._classified_plan(ctx, message, history)
+        if routed is not None:
+            routed["_source"] = "classifier"
+        return routed
+
+    def _classified_plan(
+        self,
+        ctx: AssistantContext,
+        message: str,
+        history: list[dict[str, str]],
+    ) -> dict[str, Any] | None:
+        """Plan from the offline intent classifier, or None to ask the LLM.
+
+        Only plain text turns qualify: clarification replies, media and
+        card-grounded turns, and unresolved references ("explain this") all
+        need the planner. See ``aeva.orchestration.intent_classifier``.
+        """
+        classifier = get_intent_classifier()
+        if (
+            classifier is None
+            or ctx.clarification is not None
+            or ctx.media_ids
+            or ctx.source_content
+            or self._has_unresolved_reference(message, ctx, history)
+        ):
+            return None
+        flags = feature_flag_service.get_flags()
+        enabled = {
+            t.name
+            for t in self.registry.list_definitions()
+            if self._tool_enabled(t.name, flags)
+        }
+        routed = classifier.route(message, enabled)
+        if routed is None:
+            return None
+        tool_name, confidence = routed
+        logger.info(
+            "Turn planned by intent classifier (no plan LLM call) | tool=%s "
+            "| confidence=%.3f",
+            tool_name,
+            confidence,
+        )
+        key = "topic" if tool_name == "quiz_generator" else "query"
+        return {
+            "action": "run_tool",
+            "tool": {"name": tool_name, "params": {key: message}},
+        }
+
+    def _cached_plan_turn(
+        self,
+        ctx: AssistantContext,
+        history: list[dict[str, str]],
+        enriched_message: str,
+    ) -> tuple[dict[str, Any], str]:
+        """``_plan_turn`` behind the plan cache; returns ``(plan, source)``.
+
+        Clarification replies and card-grounded turns always plan fresh
+        (their message embeds one-off content). The key covers the message,
+        enabled tools, media presence and the last assistant turn's tool;
+        see ``aeva.orchestration.plan_cache`` for what is stored.
+        """
+        if ctx.clarification is not None or ctx.source_content:
+            plan = self._plan_turn(
+                ctx, history, enriched_message, ctx.clarification
+            )
+            return plan, "planner"
+        flags = feature_flag_service.get_flags()
+        last_tool = next(
+            (
+                item.get("tool")
+                for item in reversed(history)
+                if item["role"] == "assistant"
+            ),
+            None,
+        )
+        cache = get_plan_cache()
+        key = PlanCache.key(
+            enriched_message,
+            [
+                t.name
+                for t in self.registry.list_definitions()
+                if self._tool_enabled(t.name, flags)
+            ],
+            has_media=bool(ctx.media_ids),
+            last_tool=last_tool,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            logger.info(
+                "Turn planned from cache (no plan LLM call) | tool=%s | "
+                "planner calls saved=%d",
+                (cached.get("tool") or {}).get("name"),
+                cache.stats()["saved_calls"],
+            )
+            return cached, "plan_cache"
+        plan = self._plan_turn(ctx, history, enriched_message, None)
+        cache.put(key, plan, enriched_message)
+        return plan, "planner"
+
     def _plan_turn(
         self,
         ctx: AssistantContext,
@@ -1409,19 +1691,13 @@ class AssistantOrchestrator:
     def _last_generator_tool(self, session_id: str) -> str | None:
         """Name of the most recent assistant turn's repeatable generator tool.
 
-        Scans messages newest-first and returns the first assistant
-        ``tool_used`` that is a quiz/flashcard generator, or None when the last
-        tool-bearing turn used something else (so "again" does not silently
-        repeat an unrelated web search).
+        Looks up the newest assistant ``tool_used`` (one indexed row, however
+        long the session) and returns it when it is a quiz/flashcard
+        generator, or None when the last tool-bearing turn used something
+        else (so "again" does not silently repeat an unrelated web search).
         """
-        for msg in reversed(self.supabase.get_messages(session_id)):
-            if msg.get("role") != "assistant":
-                continue
-            tool_used = (msg.get("metadata") or {}).get("tool_used")
-            if not tool_used:
-                continue
-            return tool_used if tool_used in _REPEATABLE_TOOLS else None
-        return None
+        tool_used = self.supabase.get_last_tool_used(session_id)
+        return tool_used if tool_used in _REPEATABLE_TOOLS else None
 
     def _handle_clarification(
         self,
@@ -1454,12 +1730,14 @@ class AssistantOrchestrator:
             f"**{clar_req.reason}**\n\n"
             + "\n".join(f"- {q.text}" for q in questions)
         )
+        self._await_user_message()
         self.supabase.add_message(
             ctx.session_id,
             "assistant",
             display,
             metadata={
                 "status": "clarification_required",
+                "plan_source": plan.get("_source", "planner"),
                 "run_id": run["id"],
                 "clarification": {
                     "reason": clar_req.reason,
@@ -0,0 +1,267 @@
+"""Offline intent classifier: a local routing tier ahead of the LLM planner.
+
+``_fast_path_plan`` only settles pure small talk; every other turn pays a
+structured planner call. This tier sits between the two: a multinomial naive
+Bayes model over word unigrams and bigrams, trained on the planner's own
+logged decisions (``messages`` rows: a user message and the ``tool_used`` of
+the reply that followed it), routes a turn when it is confident and falls
+back to the planner otherwise.
+
+Only ``ROUTABLE_TOOLS`` are ever routed. The model is trained on every
+logged label (``media_llm``, ``clarify``, ...) so it knows what it must NOT
+route, but a prediction outside that set always falls through. Routed plans
+carry the same params as ``_fallback_tool_plan`` and no model pick, so
+``resolve_model`` runs the tool's configured default model.
+
+The model is a small JSON file of token counts (``INTENT_CLASSIFIER_PATH``,
+written by ``python -m benchmarks.intent_replay --save``). With no path
+configured, or an unreadable file, the tier is off and every turn plans as
+before. ``INTENT_CLASSIFIER_THRESHOLD`` is the minimum posterior to route;
+pick it from the replay benchmark's agreement table.
+"""
+
+import json
+import logging
+import math
+import threading
+from collections import Counter
+from collections.abc import Collection, Iterable
+from itertools import pairwise
+from pathlib import Path
+from typing import Any
+
+from flask import current_app, has_app_context
+
+from aeva.orchestration.plan_cache import normalize_message
+
+logger = logging.getLogger(__name__)
+
+ROUTABLE_TOOLS = frozenset({"general", "web_search", "quiz_generator"})
+# Label for a logged turn the planner answered with a clarification.
+CLARIFY_LABEL = "clarify"
+# ``plan_source`` values of turns the planner LLM actually decided.
+_PLANNER_SOURCES = frozenset({"planner", "plan_cache"})
+
+# Fallback when no app config is available (scripts, tests).
+_DEFAULT_THRESHOLD = 0.9
+_MODEL_VERSION = 1
+_WORD_PUNCT = ".,!?;:'\"()"
+
+_classifier: "IntentClassifier | None" = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def features(message: str) -> list[str]:
+    """Word unigrams plus adjacent bigrams of the normalised message."""
+    words = [
+        word
+        for raw in normalize_message(message).split()
+        if (word := raw.strip(_WORD_PUNCT))
+    ]
+    return words + [f"{a} {b}" for a, b in pairwise(words)]
+
+
+def turns_from_messages(
+    rows: Iterable[dict[str, Any]],
+) -> list[tuple[str, str]]:
+    """Pair each user message with the planner label of the reply after it.
+
+    ``rows`` are ``messages`` rows ordered by session, then time. The label
+    is the reply's ``metadata.tool_used``, or ``clarify`` for a clarification
+    request. Only replies whose ``metadata.plan_source`` is the planner (or
+    its cache) count. Other sources (forced, fast path, continuation, the
+    classifier itself, ...) say nothing about what the planner would have
+    chosen. Replies that predate ``plan_source`` and carry no Developer Mode
+    trace are skipped too, since their source is unknown.
+    """
+    turns: list[tuple[str, str]] = []
+    previous: dict[str, Any] | None = None
+    for row in rows:
+        if (
+            previous is not None
+            and previous.get("role") == "user"
+            and row.get("role") == "assistant"
+            and previous.get("session_id") == row.get("session_id")
+        ):
+            label = _label(row.get("metadata") or {})
+            if label is not None and previous.get("content"):
+                turns.append((previous["content"], label))
+        previous = row
+    return turns
+
+
+def _label(metadata: dict[str, Any]) -> str | None:
+    """Planner label of a persisted reply, or ``None`` to skip it."""
+    source = metadata.get("plan_source")
+    if source is None:
+        # Older rows only recorded it in the Developer Mode trace.
+        debug = (metadata.get("content") or {}).get("debug") or {}
+        source = debug.get("plan_source")
+    if source not in _PLANNER_SOURCES:
+        return None
+    if metadata.get("status") == "clarification_required":
+        return CLARIFY_LABEL
+    return metadata.get("tool_used") or None
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes over message n-grams, one class per label."""
+
+    def __init__(
+        self,
+        counts: dict[str, dict[str, int]],
+        docs: dict[str, int],
+        *,
+        alpha: float = 1.0,
+        threshold: float = _DEFAULT_THRESHOLD,
+    ) -> None:
+        self.threshold = threshold
+        self.labels = sorted(docs)
+        vocab = {token for tokens in counts.values() for token in tokens}
+        total_docs = sum(docs.values())
+        self._counts = counts
+        self._docs = docs
+        self._alpha = alpha
+        self._log_prior = {
+            label: math.log(docs[label] / total_docs) for label in self.labels
+        }
+        self._log_unseen: dict[str, float] = {}
+        self._log_likelihood: dict[str, dict[str, float]] = {}
+        for label in self.labels:
+            denom = sum(counts.get(label, {}).values()) + alpha * len(vocab)
+            self._log_unseen[label] = math.log(alpha / denom)
+            self._log_likelihood[label] = {
+                token: math.log((n + alpha) / denom)
+                for token, n in counts.get(label, {}).items()
+            }
+        self._vocab = frozenset(vocab)
+
+    @classmethod
+    def train(
+        cls,
+        turns: Iterable[tuple[str, str]],
+        *,
+        alpha: float = 1.0,
+        threshold: float = _DEFAULT_THRESHOLD,
+    ) -> "IntentClassifier":
+        """Fit on ``(message, label)`` pairs."""
+        counts: dict[str, Counter[str]] = {}
+        docs: Counter[str] = Counter()
+        for message, label in turns:
+            docs[label] += 1
+            counts.setdefault(label, Counter()).update(features(message))
+        if not docs:
+            msg = "cannot train an intent classifier on zero turns"
+            raise ValueError(msg)
+        return cls(
+            {label: dict(c) for label, c in counts.items()},
+            dict(docs),
+            alpha=alpha,
+            threshold=threshold,
+        )
+
+    def predict(self, message: str) -> tuple[str, float]:
+        """Return the most likely label and its posterior probability."""
+        # Tokens never seen in training carry no evidence for any class.
+        tokens = [t for t in features(message) if t in self._vocab]
+        scores = {
+            label: self._log_prior[label]
+            + sum(
+                self._log_likelihood[label].get(t, self._log_unseen[label])
+                for t in tokens
+            )
+            for label in self.labels
+        }
+        best = max(scores, key=scores.__getitem__)
+        top = scores[best]
+        norm = sum(math.exp(s - top) for s in scores.values())
+        return best, 1.0 / norm
+
+    def route(
+        self, message: str, enabled_tools: Collection[str]
+    ) -> tuple[str, float] | None:
+        """Return ``(tool, confidence)`` when confident enough to route."""
+        label, confidence = self.predict(message)
+        if (
+            label in ROUTABLE_TOOLS
+            and label in enabled_tools
+            and confidence >= self.threshold
+        ):
+            return label, confidence
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-serialisable model (token counts, not derived weights)."""
+        return {
+            "version": _MODEL_VERSION,
+            "alpha": self._alpha,
+            "docs": self._docs,
+            "counts": self._counts,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], *, threshold: float = _DEFAULT_THRESHOLD
+    ) -> "IntentClassifier":
+        """Rebuild a model written by ``to_dict``."""
+        if data.get("version") != _MODEL_VERSION:
+            msg = f"unsupported intent model version: {data.get('version')}"
+            raise ValueError(msg)
+        return cls(
+            data["counts"],
+            data["docs"],
+            alpha=float(data["alpha"]),
+            threshold=threshold,
+        )
+
+    def save(self, path: str | Path) -> None:
+        """Write the model as JSON."""
+        Path(path).write_text(json.dumps(self.to_dict()), encoding="utf-8")
+
+    @classmethod
+    def load(
+        cls, path: str | Path, *, threshold: float = _DEFAULT_THRESHOLD
+    ) -> "IntentClassifier":
+        """Read a model written by ``save``."""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls.from_dict(data, threshold=threshold)
+
+
+def get_intent_classifier() -> IntentClassifier | None:
+    """Return the process-wide classifier, or ``None`` when the tier is off."""
+    global _classifier, _loaded  # noqa: PLW0603 - process-wide shared model
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                config = current_app.config if has_app_context() else {}
+                path = config.get("INTENT_CLASSIFIER_PATH") or ""
+                if path:
+                    try:
+                        _classifier = IntentClassifier.load(
+                            path,
+                            threshold=float(
+                                config.get(
+                                    "INTENT_CLASSIFIER_THRESHOLD",
+                                    _DEFAULT_THRESHOLD,
+                                )
+                            ),
+                        )
+                    except (OSError, ValueError, KeyError):
+                        logger.warning(
+                            "Intent classifier %s unusable; planner only",
+                            path,
+                            exc_info=True,
+                        )
+                _loaded = True
+    return _classifier
+
+
+def reset_intent_classifier(
+    classifier: IntentClassifier | None = None,
+) -> None:
+    """Install ``classifier`` (tests), or drop it to reload from config."""
+    global _classifier, _loaded  # noqa: PLW0603 - process-wide shared model
+    with _lock:
+        _classifier = classifier
+        _loaded = classifier is not None
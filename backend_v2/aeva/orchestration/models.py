@@ -123,3 +123,19 @@ class AssistantResult:
     content: dict[str, Any] | None = None
     message_id: str | None = None
     display_text: str = ""
+
+
+@dataclass
+class TurnPrelude:
+    """Rows a turn needs before planning, loaded together.
+
+    ``timings`` maps each prelude stage (``session``, ``profile``,
+    ``history``, ``run``) to its own round-trip in ms, plus ``total`` — the
+    wall time of the whole concurrent stage.
+    """
+
+    session: dict[str, Any] | None
+    profile: dict[str, Any] | None
+    history: list[dict[str, str]] = field(default_factory=list)
+    run: dict[str, Any] | None = None
+    timings: dict[str, int] = field(default_factory=dict)
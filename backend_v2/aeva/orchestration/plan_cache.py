@@ -0,0 +1,154 @@
+"""Cache of planner decisions for repeated and templated messages.
+
+Follow-up chips, "explain more" and popover-driven prompts send the same text
+with the same flags over and over, and each one costs a structured planner
+call. A plan is reused when everything the planner saw that can change its
+decision matches: the normalised message, the enabled-tool set, whether media
+is attached, and the tool behind the last assistant turn.
+
+Only plans that are reproducible from the message alone are stored: a
+``run_tool`` plan whose string parameters all appear in the message itself.
+A plan whose parameters the planner rewrote from the conversation ("explain
+more" -> "explain more about osmosis") would be wrong in another session, so
+it is never cached; neither are clarifications. Hits are deep copies and
+still flow through ``_refine_plan`` and ``resolve_model`` clamping like any
+fresh plan.
+
+Process-local (one ``TTLCache`` per worker), bounded by ``PLAN_CACHE_SIZE``
+entries that expire after ``PLAN_CACHE_TTL_SECONDS``.
+"""
+
+import copy
+import hashlib
+import re
+import threading
+from typing import Any
+
+from flask import current_app, has_app_context
+
+from aeva.common.ttl_cache import TTLCache
+
+# Fallbacks when no app config is available (scripts, tests).
+_DEFAULT_MAX_SIZE = 512
+_DEFAULT_TTL_SECONDS = 600.0
+
+_SPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCT = " \t\n.!?,;:"
+
+_cache: "PlanCache | None" = None
+_lock = threading.Lock()
+
+
+def normalize_message(message: str) -> str:
+    """Case-fold, collapse whitespace and trim edge punctuation."""
+    return _SPACE_RE.sub(" ", message.casefold()).strip(_EDGE_PUNCT)
+
+
+def _is_reproducible(plan: dict[str, Any], normalized: str) -> bool:
+    """Whether ``plan`` depends on nothing but the message text."""
+    if plan.get("action", "run_tool") != "run_tool":
+        return False
+    tool = plan.get("tool")
+    if not isinstance(tool, dict) or not tool.get("name"):
+        return False
+    for value in (tool.get("params") or {}).values():
+        if isinstance(value, str):
+            if normalize_message(value) not in normalized:
+                return False
+        elif isinstance(value, (list, dict)):
+            if value:
+                return False
+        elif value is not None and not isinstance(value, (int, float)):
+            return False
+    return True
+
+
+class PlanCache:
+    """LRU of planner outputs keyed by what the planner decided from."""
+
+    def __init__(
+        self,
+        max_size: int = _DEFAULT_MAX_SIZE,
+        ttl: float = _DEFAULT_TTL_SECONDS,
+    ) -> None:
+        self._plans: TTLCache[dict[str, Any]] = TTLCache(max_size, ttl)
+        self._stats_lock = threading.Lock()
+        self.stored = 0
+        self.skipped = 0
+
+    @staticmethod
+    def key(
+        message: str,
+        enabled_tools: list[str],
+        *,
+        has_media: bool,
+        last_tool: str | None,
+    ) -> str:
+        """Digest of every planner input that can change its decision."""
+        parts = [
+            normalize_message(message),
+            ",".join(sorted(enabled_tools)),
+            "media" if has_media else "-",
+            last_tool or "-",
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a private copy of the cached plan, or ``None``."""
+        plan = self._plans.get(key)
+        return copy.deepcopy(plan) if plan is not None else None
+
+    def put(self, key: str, plan: dict[str, Any], message: str) -> bool:
+        """Store ``plan`` if it is reproducible; return whether it was."""
+        cacheable = _is_reproducible(plan, normalize_message(message))
+        if cacheable:
+            self._plans.set(key, copy.deepcopy(plan))
+        with self._stats_lock:
+            if cacheable:
+                self.stored += 1
+            else:
+                self.skipped += 1
+        return cacheable
+
+    def stats(self) -> dict[str, Any]:
+        """Planner calls saved (hits), misses, and store/skip counts."""
+        plans = self._plans.stats()
+        with self._stats_lock:
+            return {
+                "saved_calls": plans["hits"],
+                "misses": plans["misses"],
+                "hit_rate": plans["hit_rate"],
+                "stored": self.stored,
+                "skipped": self.skipped,
+                "size": plans["size"],
+            }
+
+
+def get_plan_cache() -> PlanCache:
+    """Return the process-wide cache, built from config on first use."""
+    global _cache  # noqa: PLW0603 - process-wide shared cache
+    if _cache is None:
+        with _lock:
+            if _cache is None:
+                config = current_app.config if has_app_context() else {}
+                _cache = PlanCache(
+                    int(config.get("PLAN_CACHE_SIZE", _DEFAULT_MAX_SIZE)),
+                    float(
+                        config.get(
+                            "PLAN_CACHE_TTL_SECONDS", _DEFAULT_TTL_SECONDS
+                        )
+                    ),
+                )
+    return _cache
+
+
+def plan_cache_stats() -> dict[str, Any]:
+    """Counters for the process-wide plan cache."""
+    return get_plan_cache().stats()
+
+
+def reset_plan_cache(cache: PlanCache | None = None) -> None:
+    """Replace (or drop, when ``None``) the process-wide cache (tests)."""
+    global _cache  # noqa: PLW0603 - process-wide shared cache
+    with _lock:
+        _cache = cache
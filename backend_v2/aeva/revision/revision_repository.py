@@ -100,7 +100,17 @@ class RevisionRepository:
     # ----------------------------------------------------- seeded marker
 
     def seeded_at(self, user_id: str) -> str | None:
-        """profiles.revision_seeded_at, or None if backfill never ran."""
+        """profiles.revision_seeded_at, or None if backfill never ran.
+
+        A set flag is never cleared, so a cached profile that has it is
+        trusted and the check costs no round-trip. A missing flag is re-read
+        from the table: the profile cache is per worker, and a row cached
+        before another worker ran the backfill would re-run it (resetting
+        review counts and duplicating backfill events).
+        """
+        profile = self.supabase.get_profile(user_id)
+        if profile and profile.get("revision_seeded_at"):
+            return profile["revision_seeded_at"]
         result = (
             self.supabase.client.table("profiles")
             .select("revision_seeded_at")
@@ -117,6 +127,7 @@ class RevisionRepository:
         self.supabase.client.table("profiles").update(
             {"revision_seeded_at": at_iso}
         ).eq("id", user_id).execute()
+        self.supabase.invalidate_profile(user_id)
 
     # -------------------------------------------------- backfill sources
 
@@ -1,17 +1,23 @@
 """Supabase service for DB, storage, and auth."""
 
+import base64
+import hashlib
 import logging
+import struct
 import threading
+import time
 from datetime import UTC, datetime
 from typing import Any
 from urllib.parse import urlencode
 
 import jwt
 import requests
-from flask import current_app
+from flask import current_app, g, has_app_context
 from jwt import PyJWKClient
 from supabase import Client, create_client
 
+from aeva.common.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,8 +27,120 @@ def _vec_to_str(vector: list[float]) -> str:
     PostgREST speaks JSON, which has no vector type, so a raw list does not
     round-trip into a ``vector`` column. Postgres casts the text form
     ``"[0.1,0.2,...]"`` to ``vector`` on insert and as an RPC argument.
+    pgvector stores float32, and nine significant digits round-trip any
+    float32 exactly (a float64 lands within one float32 ulp of its full
+    ``repr``), so the longer ``repr`` digits would be wasted bytes.
+    """
+    return "[" + ",".join(map("%.9g".__mod__, vector)) + "]"
+
+
+def _vec_to_packed(vector: list[float]) -> str:
+    """Serialize an embedding as base64 little-endian float32 bytes.
+
+    The ``packed`` transport (migration 026): a quarter of the text literal's
+    size and one C-level pack instead of a float format per component; the
+    database rebuilds the vector with ``vector_from_f32_b64``.
     """
-    return "[" + ",".join(str(v) for v in vector) + "]"
+    return base64.b64encode(
+        struct.pack(f"<{len(vector)}f", *vector)
+    ).decode("ascii")
+
+
+def _packed_transport() -> bool:
+    """Whether vectors travel packed (``VECTOR_TRANSPORT=packed``)."""
+    return current_app.config.get("VECTOR_TRANSPORT", "text") == "packed"
+
+
+# Rows per media_chunks insert request.
+_CHUNK_INSERT_PAGE = 50
+
+# Rows per embedding-cache lookup/insert request.
+_EMBED_CACHE_PAGE = 100
+
+# Defaults for the process-wide auth caches when no app config is available.
+_DEFAULT_TOKEN_CACHE_SIZE = 1024
+_DEFAULT_PROFILE_CACHE_SIZE = 1024
+_DEFAULT_PROFILE_CACHE_TTL = 30.0
+# Upper bound for a verified token entry; the token's own ``exp`` is usually
+# sooner (Supabase access tokens live for an hour).
+_TOKEN_CACHE_MAX_TTL = 3600.0
+
+_token_cache: TTLCache[dict[str, Any]] | None = None
+_profile_cache: TTLCache[dict[str, Any]] | None = None
+_auth_cache_lock = threading.Lock()
+
+
+def _config_value(key: str, default: float) -> float:
+    if not has_app_context():
+        return default
+    return float(current_app.config.get(key, default))
+
+
+def _auth_caches() -> tuple[
+    TTLCache[dict[str, Any]], TTLCache[dict[str, Any]]
+]:
+    """Lazily build the verified-token and profile-row caches (per process).
+
+    Tokens are keyed by a SHA-256 of the bearer string (never the raw token)
+    and expire no later than the JWT's own ``exp``. Profile rows expire after
+    ``PROFILE_CACHE_TTL_SECONDS`` so edits made on another worker show up
+    within that window; writes on this worker refresh or drop the row.
+    """
+    global _token_cache, _profile_cache  # noqa: PLW0603 - per-process caches
+    if _token_cache is None or _profile_cache is None:
+        with _auth_cache_lock:
+            if _token_cache is None or _profile_cache is None:
+                _token_cache = TTLCache(
+                    int(
+                        _config_value(
+                            "AUTH_TOKEN_CACHE_SIZE", _DEFAULT_TOKEN_CACHE_SIZE
+                        )
+                    ),
+                    _TOKEN_CACHE_MAX_TTL,
+                )
+                _profile_cache = TTLCache(
+                    int(
+                        _config_value(
+                            "PROFILE_CACHE_SIZE", _DEFAULT_PROFILE_CACHE_SIZE
+                        )
+                    ),
+                    _config_value(
+                        "PROFILE_CACHE_TTL_SECONDS", _DEFAULT_PROFILE_CACHE_TTL
+                    ),
+                )
+    return _token_cache, _profile_cache
+
+
+def auth_cache_stats() -> dict[str, dict[str, Any]]:
+    """Hit/miss counters for the token and profile caches."""
+    tokens, profiles = _auth_caches()
+    return {"tokens": tokens.stats(), "profiles": profiles.stats()}
+
+
+def clear_auth_caches() -> None:
+    """Drop every cached token and profile row (tests, key rotation)."""
+    global _token_cache, _profile_cache  # noqa: PLW0603 - per-process caches
+    with _auth_cache_lock:
+        _token_cache = _profile_cache = None
+
+
+def request_profile_cache() -> dict[str, dict[str, Any]]:
+    """Profile rows already loaded during this request, keyed by user id.
+
+    Lives on ``flask.g``: ``user_required`` seeds it with the row
+    ``verify_token`` selects anyway, and every later ``get_profile`` in the
+    same request reads it instead of re-querying. Outside an app context the
+    cache is a throwaway dict, so callers never need to special-case it.
+    Streaming endpoints run their generator in a fresh app context and copy
+    this dict across (see the assistant/chat stream controllers).
+    """
+    if not has_app_context():
+        return {}
+    cache: dict[str, dict[str, Any]] | None = g.get("profile_cache")
+    if cache is None:
+        cache = {}
+        g.profile_cache = cache
+    return cache
 
 
 class SupabaseService:
@@ -129,17 +247,34 @@ class SupabaseService:
         )
 
     def verify_token(self, token: str) -> dict[str, Any] | None:
-        """Verify Supabase JWT and return user payload."""
-        try:
-            payload = self._decode_token(token)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("JWT verification failed: %s", exc)
-            return None
+        """Verify Supabase JWT and return user payload.
+
+        Repeat calls with the same bearer token skip the signature check
+        (until the token's ``exp``) and, while the cached row is fresh, the
+        ``profiles`` select as well.
+        """
+        tokens, _ = _auth_caches()
+        token_key = hashlib.sha256(token.encode()).hexdigest()
+        payload = tokens.get(token_key)
+        if payload is None:
+            try:
+                payload = self._decode_token(token)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("JWT verification failed: %s", exc)
+                return None
+            if "exp" in payload:
+                tokens.set(
+                    token_key, payload, ttl=float(payload["exp"]) - time.time()
+                )
 
         user_id = payload.get("sub")
         if not user_id:
             return None
 
+        cached = self.cached_profile(user_id)
+        if cached is not None:
+            return cached
+
         email = payload.get("email", "")
         try:
             profile = (
@@ -150,6 +285,7 @@ class SupabaseService:
                 .execute()
             )
             if profile and profile.data:
+                self.remember_profile(profile.data)
                 return profile.data
         except Exception:  # noqa: BLE001
             logger.exception("Profile lookup failed for %s", user_id)
@@ -175,10 +311,17 @@ class SupabaseService:
             .upsert(data, on_conflict="id")
             .execute()
         )
-        return result.data[0] if result.data else data
+        if not result.data:
+            self.invalidate_profile(user_id)
+            return data
+        self.remember_profile(result.data[0])
+        return result.data[0]
 
     def get_profile(self, user_id: str) -> dict[str, Any] | None:
-        """Get user profile by ID."""
+        """Get user profile by ID (served from the profile caches if loaded)."""
+        cached = self.cached_profile(user_id)
+        if cached is not None:
+            return cached
         result = (
             self.client.table("profiles")
             .select("*")
@@ -186,19 +329,62 @@ class SupabaseService:
             .maybe_single()
             .execute()
         )
-        return result.data if result else None
+        profile = result.data if result else None
+        if profile:
+            self.remember_profile(profile)
+        return profile
+
+    @staticmethod
+    def cached_profile(user_id: str) -> dict[str, Any] | None:
+        """Return a cached profile row (a copy) without a query.
+
+        Checks this request's cache first, then the short-lived process-wide
+        LRU; a process-level hit is pinned to the request so the rest of the
+        request sees one consistent row.
+        """
+        requested = request_profile_cache()
+        row = requested.get(user_id)
+        if row is None:
+            row = _auth_caches()[1].get(user_id)
+            if row is None:
+                return None
+            requested[user_id] = row
+        return dict(row)
+
+    @staticmethod
+    def remember_profile(profile: dict[str, Any]) -> None:
+        """Store a full profile row in the request and process caches."""
+        if profile.get("id"):
+            user_id = str(profile["id"])
+            row = dict(profile)
+            request_profile_cache()[user_id] = row
+            _auth_caches()[1].set(user_id, row)
+
+    @staticmethod
+    def invalidate_profile(user_id: str) -> None:
+        """Drop a user's cached row after a write the cache cannot mirror."""
+        request_profile_cache().pop(user_id, None)
+        _auth_caches()[1].pop(user_id)
 
     def update_learning_profile(
         self, user_id: str, fields: dict[str, Any]
     ) -> dict[str, Any] | None:
-        """Patch learning-profile columns on the user's profile row."""
+        """Patch learning-profile columns on the user's profile row.
+
+        The updated row PostgREST returns replaces the cached one, so later
+        reads in the same request see the write.
+        """
         result = (
             self.client.table("profiles")
             .update(fields)
             .eq("id", user_id)
             .execute()
         )
-        return result.data[0] if result.data else None
+        if not result.data:
+            self.invalidate_profile(user_id)
+            return None
+        self.remember_profile(result.data[0])
+        return result.data[0]
 
     # --- Sessions ---
 
@@ -320,6 +506,25 @@ class SupabaseService:
         result = query.order("created_at").execute()
         return result.data or []
 
+    def get_last_tool_used(self, session_id: str) -> str | None:
+        """``metadata.tool_used`` of a session's newest tool-bearing reply.
+
+        A single-row query served by the partial index from migration 027,
+        so its cost does not grow with the session's length.
+        """
+        result = (
+            self.client.table("messages")
+            .select("tool_used:metadata->>tool_used")
+            .eq("session_id", session_id)
+            .eq("role", "assistant")
+            .not_.is_("metadata->>tool_used", "null")
+            .neq("metadata->>tool_used", "")
+            .order("created_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return result.data[0]["tool_used"] if result.data else None
+
     # --- Study Spaces ---
 
     def list_spaces(self, user_id: str) -> list[dict[str, Any]]:
@@ -453,12 +658,15 @@ class SupabaseService:
         session_id: str | None = None,
         space_id: str | None = None,
         processing_status: str | None = None,
+        content_sha256: str | None = None,
     ) -> dict[str, Any]:
         """Insert media metadata row.
 
         ``processing_status`` overrides the DB default ('pending') for rows
         that never enter the parse pipeline — Aeva-generated images are born
         'ready', otherwise they'd show a processing spinner forever.
+        ``content_sha256`` (hash of the stored bytes) lets processing reuse
+        an identical document's index.
         """
         row: dict[str, Any] = {
             "user_id": user_id,
@@ -472,6 +680,8 @@ class SupabaseService:
             row["space_id"] = space_id
         if processing_status:
             row["processing_status"] = processing_status
+        if content_sha256:
+            row["content_sha256"] = content_sha256
         result = self.client.table("media").insert(row).execute()
         return result.data[0]
 
@@ -521,6 +731,29 @@ class SupabaseService:
         )
         return result.data if result else None
 
+    def get_media_many(
+        self, media_ids: list[str], user_id: str, columns: str = "*"
+    ) -> list[dict[str, Any]]:
+        """Get several media records in one query, in ``media_ids`` order.
+
+        Ids that do not exist or belong to another user are dropped, as are
+        repeats. No ids means no query.
+        """
+        ids = list(dict.fromkeys(media_ids))
+        if not ids:
+            return []
+        if columns != "*" and "id" not in columns.split(","):
+            columns = f"id,{columns}"
+        result = (
+            self.client.table("media")
+            .select(columns)
+            .in_("id", ids)
+            .eq("user_id", user_id)
+            .execute()
+        )
+        by_id = {row["id"]: row for row in result.data or []}
+        return [by_id[media_id] for media_id in ids if media_id in by_id]
+
     def delete_media_record(self, media_id: str, user_id: str) -> bool:
         """Delete media metadata row."""
         self.client.table("media").delete().eq(
@@ -547,6 +780,48 @@ class SupabaseService:
 
     # --- Media RAG (parsing artifacts, pages, chunks, vector search) ---
 
+    def find_indexed_media(
+        self, content_sha256: str, index_signature: str, exclude_id: str
+    ) -> dict[str, Any] | None:
+        """Find a ready, indexed document with these bytes and settings.
+
+        Any user's row qualifies (see migration 025); the caller only clones
+        its pages and chunks, never hands the row itself to the user.
+        """
+        result = (
+            self.client.table("media")
+            .select(
+                "id,storage_path,page_count,chunk_count,"
+                "parsed_json_path,parsed_md_path,parsed_text_path"
+            )
+            .eq("content_sha256", content_sha256)
+            .eq("index_signature", index_signature)
+            .eq("processing_status", "ready")
+            .gt("chunk_count", 0)
+            .neq("id", exclude_id)
+            .order("processed_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    def clone_media_index(
+        self, source_media_id: str, target_media_id: str, user_id: str
+    ) -> int:
+        """Copy a document's pages and chunks onto another media row."""
+        logger.info(
+            "DB clone media index | %s -> %s", source_media_id, target_media_id
+        )
+        result = self.client.rpc(
+            "clone_media_index",
+            {
+                "p_source_media_id": source_media_id,
+                "p_target_media_id": target_media_id,
+                "p_target_user_id": user_id,
+            },
+        ).execute()
+        return int(result.data or 0)
+
     def update_media_processing(
         self, media_id: str, user_id: str, **fields: Any
     ) -> dict[str, Any] | None:
@@ -568,15 +843,36 @@ class SupabaseService:
         self.client.table("media_pages").insert(rows).execute()
 
     def insert_media_chunks(self, rows: list[dict[str, Any]]) -> None:
-        """Bulk-insert chunk rows, serializing embeddings for pgvector."""
+        """Bulk-insert chunk rows, serializing embeddings for pgvector.
+
+        Rows go out ``_CHUNK_INSERT_PAGE`` at a time: each 768-dim vector is
+        ~15 KB as a text literal, so one request per page keeps the body far
+        below PostgREST's payload limit however large the document. Pages are
+        separate requests, so the insert is NOT atomic: a failure can leave
+        earlier pages behind, and callers must trim the document's chunks
+        past their last checkpoint (``delete_media_chunks_from``) before
+        retrying.
+        """
         if not rows:
             return
-        logger.info("DB insert media_chunks | %d rows", len(rows))
-        payload = [
-            {**row, "embedding": _vec_to_str(row["embedding"])}
-            for row in rows
-        ]
-        self.client.table("media_chunks").insert(payload).execute()
+        packed = _packed_transport()
+        encode = _vec_to_packed if packed else _vec_to_str
+        logger.info(
+            "DB insert media_chunks | %d rows | %s vectors",
+            len(rows),
+            "packed" if packed else "text",
+        )
+        for start in range(0, len(rows), _CHUNK_INSERT_PAGE):
+            payload = [
+                {**row, "embedding": encode(row["embedding"])}
+                for row in rows[start : start + _CHUNK_INSERT_PAGE]
+            ]
+            if packed:
+                self.client.rpc(
+                    "insert_media_chunks_packed", {"p_rows": payload}
+                ).execute()
+            else:
+                self.client.table("media_chunks").insert(payload).execute()
 
     def delete_media_chunks(self, media_id: str, user_id: str) -> None:
         """Drop a document's chunks and pages (for reprocess/cleanup)."""
@@ -588,32 +884,146 @@ class SupabaseService:
             "media_id", media_id
         ).eq("user_id", user_id).execute()
 
+    def delete_media_chunks_from(
+        self, media_id: str, user_id: str, start_index: int
+    ) -> None:
+        """Drop a document's chunks from ``start_index`` on (resume trim).
+
+        Pages are left alone: a resumed index run only discards chunks past
+        its last checkpoint, which a killed run may have half-inserted.
+        """
+        logger.info(
+            "DB trim chunks | media=%s | from index %d", media_id, start_index
+        )
+        self.client.table("media_chunks").delete().eq(
+            "media_id", media_id
+        ).eq("user_id", user_id).gte("chunk_index", start_index).execute()
+
     def match_chunks(
         self,
         query_vector: list[float],
         user_id: str,
         media_ids: list[str] | None = None,
         top_k: int = 8,
+        *,
+        ef_search: int | None = None,
     ) -> list[dict[str, Any]]:
-        """Cosine-similarity search over a user's chunks (optional subset)."""
+        """Cosine-similarity search over a user's chunks (optional subset).
+
+        With ``RAG_ANN_SCOPED`` the search goes through
+        ``match_media_chunks_scoped`` (migration 029). That function scans
+        small scopes exactly and runs the HNSW walk for large ones with
+        ``ef_search`` candidates. ``ef_search`` defaults to
+        ``RAG_ANN_EF_SEARCH``; 0 keeps the server setting.
+        """
+        config = current_app.config
+        scoped = config.get("RAG_ANN_SCOPED", False)
         logger.info(
-            "DB match_chunks (vector search) | top_k=%d | media_ids=%s",
+            "DB match_chunks (vector search) | top_k=%d | media_ids=%s"
+            " | scoped=%s",
             top_k,
             len(media_ids) if media_ids else "all",
+            scoped,
         )
-        result = self.client.rpc(
-            "match_media_chunks",
-            {
-                "query_embedding": _vec_to_str(query_vector),
-                "p_user_id": user_id,
-                "p_media_ids": media_ids or None,
-                "match_count": top_k,
-            },
-        ).execute()
+        params: dict[str, Any] = {
+            "p_user_id": user_id,
+            "p_media_ids": media_ids or None,
+            "match_count": top_k,
+        }
+        name = "match_media_chunks"
+        if scoped:
+            name = "match_media_chunks_scoped"
+            if ef_search is None:
+                ef_search = config.get("RAG_ANN_EF_SEARCH", 0)
+            params["ef_search"] = ef_search or None
+            params["exact_limit"] = config.get("RAG_ANN_EXACT_LIMIT", 20000)
+        if _packed_transport():
+            params["query_packed"] = _vec_to_packed(query_vector)
+            result = self.client.rpc(f"{name}_packed", params).execute()
+        else:
+            params["query_embedding"] = _vec_to_str(query_vector)
+            result = self.client.rpc(name, params).execute()
         rows = result.data or []
         logger.info("DB match_chunks ← %d chunks", len(rows))
         return rows
 
+    def match_chunks_hybrid(
+        self,
+        query_vector: list[float],
+        query_text: str,
+        user_id: str,
+        *,
+        media_ids: list[str] | None = None,
+        top_k: int = 40,
+        rrf_k: int = 60,
+    ) -> list[dict[str, Any]]:
+        """Vector + full-text search fused by reciprocal rank (migration 028).
+
+        Rows come back best-first with ``similarity`` (``None`` for a chunk
+        only the text search found), ``text_rank`` and ``rrf_score``.
+        """
+        logger.info(
+            "DB match_chunks_hybrid | top_k=%d | media_ids=%s",
+            top_k,
+            len(media_ids) if media_ids else "all",
+        )
+        params: dict[str, Any] = {
+            "query_text": query_text,
+            "p_user_id": user_id,
+            "p_media_ids": media_ids or None,
+            "match_count": top_k,
+            "rrf_k": rrf_k,
+        }
+        if _packed_transport():
+            params["query_packed"] = _vec_to_packed(query_vector)
+            function = "match_media_chunks_hybrid_packed"
+        else:
+            params["query_embedding"] = _vec_to_str(query_vector)
+            function = "match_media_chunks_hybrid"
+        rows = self.client.rpc(function, params).execute().data or []
+        logger.info("DB match_chunks_hybrid ← %d chunks", len(rows))
+        return rows
+
+    # --- Embedding cache ---
+
+    def get_cached_embeddings(
+        self,
+        model: str,
+        dimensions: int,
+        task_type: str,
+        text_hashes: list[str],
+    ) -> dict[str, list[float]]:
+        """Fetch stored vectors for the given text hashes (misses omitted)."""
+        found: dict[str, list[float]] = {}
+        # Hashes ride in the URL (``in.(...)``); page them so a large
+        # document's lookup stays well under proxy URL-length limits.
+        for start in range(0, len(text_hashes), _EMBED_CACHE_PAGE):
+            page = text_hashes[start : start + _EMBED_CACHE_PAGE]
+            result = (
+                self.client.table("embedding_cache")
+                .select("text_sha256,embedding")
+                .eq("model", model)
+                .eq("dimensions", dimensions)
+                .eq("task_type", task_type)
+                .in_("text_sha256", page)
+                .execute()
+            )
+            for row in result.data or []:
+                found[row["text_sha256"]] = row["embedding"]
+        logger.info(
+            "DB embedding_cache ← %d/%d hits", len(found), len(text_hashes)
+        )
+        return found
+
+    def save_cached_embeddings(self, rows: list[dict[str, Any]]) -> None:
+        """Store new cache rows; rows already present are left untouched."""
+        for start in range(0, len(rows), _EMBED_CACHE_PAGE):
+            self.client.table("embedding_cache").upsert(
+                rows[start : start + _EMBED_CACHE_PAGE],
+                on_conflict="model,dimensions,task_type,text_sha256",
+                ignore_duplicates=True,
+            ).execute()
+
     # --- Storage ---
 
     def upload_file(
@@ -637,6 +1047,12 @@ class SupabaseService:
         )
         return storage_path
 
+    def copy_storage_file(self, source_path: str, target_path: str) -> None:
+        """Copy a storage object server-side (no bytes through the app)."""
+        bucket = current_app.config["SUPABASE_STORAGE_BUCKET"]
+        logger.info("Storage copy | %s -> %s", source_path, target_path)
+        self.client.storage.from_(bucket).copy(source_path, target_path)
+
     def download_file(self, storage_path: str) -> bytes:
         """Download file from Supabase Storage."""
         bucket = current_app.config["SUPABASE_STORAGE_BUCKET"]
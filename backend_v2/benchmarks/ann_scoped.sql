@@ -0,0 +1,253 @@
+-- Scoped vs global nearest-neighbour search over synthetic media chunks.
+--
+-- Loads :n_chunks synthetic 768-dim chunks for :n_users users
+-- (:media_per_user documents each) into a throwaway ann_bench schema and
+-- builds the same HNSW index as migration 007. It then runs :n_queries
+-- queries through match_media_chunks (007) and match_media_chunks_scoped
+-- (029), in two scopes:
+--
+-- * doc:  one document, the "question about one small PDF" case;
+-- * user: the user's whole library (p_media_ids NULL).
+--
+-- For each function and scope it reports p50/p99 latency, recall@k against
+-- an exact scan, and the share of queries that returned fewer than k rows.
+-- Each document's chunks are its centroid plus noise, so neighbours cluster
+-- the way real documents do. Uniform random vectors would make every
+-- distance nearly equal.
+--
+-- The functions are called unqualified with ann_bench first on the
+-- search_path. They read media / media_chunks from ann_bench and never touch
+-- app data. The database needs migrations 007, 026 and 029 applied, for
+-- example a local `supabase start`:
+--
+--     psql "$DATABASE_URL" -f benchmarks/ann_scoped.sql \
+--         [-v n_chunks=200000 -v n_users=1000 -v n_queries=200 \
+--          -v k=8 -v ef_search=100 -v exact_limit=20000]
+--
+-- The ann_bench schema is dropped at the end.
+
+\set ON_ERROR_STOP on
+\if :{?n_chunks}
+\else
+    \set n_chunks 200000
+\endif
+\if :{?n_users}
+\else
+    \set n_users 1000
+\endif
+\if :{?media_per_user}
+\else
+    \set media_per_user 5
+\endif
+\if :{?n_queries}
+\else
+    \set n_queries 200
+\endif
+\if :{?k}
+\else
+    \set k 8
+\endif
+\if :{?ef_search}
+\else
+    \set ef_search 100
+\endif
+\if :{?exact_limit}
+\else
+    \set exact_limit 20000
+\endif
+
+DROP SCHEMA IF EXISTS ann_bench CASCADE;
+CREATE SCHEMA ann_bench;
+SET search_path = ann_bench, public, extensions;
+SELECT setseed(0.42);
+
+CREATE TABLE ann_bench.media (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL,
+    chunk_count INTEGER NOT NULL DEFAULT 0,
+    centroid REAL[] NOT NULL
+);
+CREATE INDEX ON ann_bench.media (user_id);
+
+CREATE TABLE ann_bench.media_chunks (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    media_id UUID NOT NULL,
+    user_id UUID NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    page_number INTEGER,
+    section TEXT,
+    embedding vector(768) NOT NULL
+);
+
+-- Volatile, so each call (each row) draws new numbers.
+CREATE FUNCTION ann_bench.centroid()
+RETURNS REAL[]
+LANGUAGE sql VOLATILE AS $$
+    SELECT array_agg((random() - 0.5)::real) FROM generate_series(1, 768);
+$$;
+
+CREATE FUNCTION ann_bench.jitter(centroid REAL[], noise REAL)
+RETURNS vector(768)
+LANGUAGE sql VOLATILE AS $$
+    SELECT array_agg(
+        centroid[i] + noise * (random() - 0.5) ORDER BY i
+    )::vector(768)
+    FROM generate_series(1, 768) AS i;
+$$;
+
+\echo 'loading' :n_chunks 'chunks for' :n_users 'users'
+INSERT INTO ann_bench.media (id, user_id, centroid)
+SELECT gen_random_uuid(), u.user_id, ann_bench.centroid()
+FROM (SELECT gen_random_uuid() AS user_id FROM generate_series(1, :n_users)) AS u,
+    generate_series(1, :media_per_user) AS m(n);
+
+-- Skewed document sizes: a few large books, many short handouts.
+WITH weighted AS (
+    SELECT m.*, power(random(), 3) AS weight FROM ann_bench.media m
+),
+sized AS (
+    SELECT
+        w.id,
+        w.user_id,
+        w.centroid,
+        greatest(1, round(
+            :n_chunks::float * w.weight / sum(w.weight) OVER ()
+        ))::int AS chunks
+    FROM weighted w
+)
+INSERT INTO ann_bench.media_chunks
+    (media_id, user_id, chunk_index, content, page_number, embedding)
+SELECT
+    s.id,
+    s.user_id,
+    i,
+    'chunk ' || i,
+    1 + i / 4,
+    ann_bench.jitter(s.centroid, 0.8)
+FROM sized s, generate_series(0, s.chunks - 1) AS i;
+
+UPDATE ann_bench.media m
+SET chunk_count = c.n
+FROM (
+    SELECT media_id, count(*) AS n FROM ann_bench.media_chunks GROUP BY media_id
+) AS c
+WHERE c.media_id = m.id;
+
+CREATE INDEX ON ann_bench.media_chunks (media_id);
+CREATE INDEX ON ann_bench.media_chunks (user_id);
+\echo 'building HNSW index'
+CREATE INDEX ON ann_bench.media_chunks USING hnsw (embedding vector_cosine_ops);
+ANALYZE ann_bench.media;
+ANALYZE ann_bench.media_chunks;
+
+CREATE TABLE ann_bench.queries AS
+SELECT
+    q.n,
+    m.user_id,
+    m.id AS media_id,
+    ann_bench.jitter(m.centroid, 0.8) AS embedding
+FROM generate_series(1, :n_queries) AS q(n),
+    LATERAL (
+        -- q.n makes the subquery correlated: a new document per query.
+        SELECT * FROM ann_bench.media
+        WHERE chunk_count > 0 AND q.n > 0
+        ORDER BY random()
+        LIMIT 1
+    ) AS m;
+
+-- psql does not interpolate :variables inside the DO body.
+CREATE TABLE ann_bench.settings AS
+SELECT :k AS k, :ef_search AS ef_search, :exact_limit AS exact_limit;
+
+CREATE TABLE ann_bench.results (
+    fn TEXT,
+    scope TEXT,
+    ms FLOAT,
+    recall FLOAT,
+    returned INT
+);
+
+\echo 'running' :n_queries 'queries per function and scope'
+DO $bench$
+DECLARE
+    cfg RECORD;
+    q RECORD;
+    scope TEXT;
+    ids UUID[];
+    exact UUID[];
+    started TIMESTAMPTZ;
+    elapsed FLOAT;
+    default_ef TEXT := current_setting('hnsw.ef_search', true);
+    default_iterative TEXT := current_setting('hnsw.iterative_scan', true);
+BEGIN
+    SELECT * INTO cfg FROM ann_bench.settings;
+    FOR q IN SELECT * FROM ann_bench.queries ORDER BY n LOOP
+        FOREACH scope IN ARRAY ARRAY['doc', 'user'] LOOP
+            WITH scoped AS MATERIALIZED (
+                SELECT c.id, c.embedding <=> q.embedding AS distance
+                FROM ann_bench.media_chunks c
+                WHERE c.user_id = q.user_id
+                  AND (scope = 'user' OR c.media_id = q.media_id)
+            )
+            SELECT array_agg(s.id) INTO exact
+            FROM (SELECT id FROM scoped ORDER BY distance LIMIT cfg.k) AS s;
+
+            started := clock_timestamp();
+            SELECT array_agg(r.id) INTO ids
+            FROM match_media_chunks(
+                q.embedding, q.user_id,
+                CASE WHEN scope = 'doc' THEN ARRAY[q.media_id] END, cfg.k
+            ) AS r;
+            elapsed := extract(epoch FROM clock_timestamp() - started) * 1000;
+            INSERT INTO ann_bench.results VALUES (
+                'global', scope, elapsed,
+                cardinality(ARRAY(SELECT unnest(ids) INTERSECT SELECT unnest(exact)))::float
+                    / greatest(cardinality(exact), 1),
+                coalesce(cardinality(ids), 0)
+            );
+
+            started := clock_timestamp();
+            SELECT array_agg(r.id) INTO ids
+            FROM match_media_chunks_scoped(
+                q.embedding, q.user_id,
+                CASE WHEN scope = 'doc' THEN ARRAY[q.media_id] END, cfg.k,
+                cfg.ef_search, cfg.exact_limit
+            ) AS r;
+            elapsed := extract(epoch FROM clock_timestamp() - started) * 1000;
+            INSERT INTO ann_bench.results VALUES (
+                'scoped', scope, elapsed,
+                cardinality(ARRAY(SELECT unnest(ids) INTERSECT SELECT unnest(exact)))::float
+                    / greatest(cardinality(exact), 1),
+                coalesce(cardinality(ids), 0)
+            );
+            -- The scoped function's settings last until the end of this
+            -- transaction; restore them so the next global query runs with
+            -- the server defaults.
+            IF default_ef IS NOT NULL THEN
+                PERFORM set_config('hnsw.ef_search', default_ef, true);
+            END IF;
+            IF default_iterative IS NOT NULL THEN
+                PERFORM set_config(
+                    'hnsw.iterative_scan', default_iterative, true
+                );
+            END IF;
+        END LOOP;
+    END LOOP;
+END;
+$bench$;
+
+SELECT
+    fn,
+    scope,
+    count(*) AS queries,
+    round(percentile_cont(0.5) WITHIN GROUP (ORDER BY ms)::numeric, 2) AS p50_ms,
+    round(percentile_cont(0.99) WITHIN GROUP (ORDER BY ms)::numeric, 2) AS p99_ms,
+    round(avg(recall)::numeric, 3) AS recall_at_k,
+    round(avg((returned < :k)::int)::numeric, 3) AS short_results
+FROM ann_bench.results
+GROUP BY fn, scope
+ORDER BY scope, fn;
+
+RESET search_path;
+DROP SCHEMA ann_bench CASCADE;
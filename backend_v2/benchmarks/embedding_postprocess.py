@@ -0,0 +1,69 @@
+"""Cost of post-processing a document's embeddings, before and after.
+
+Takes a 5,000-chunk document (768-dim vectors) through the work that runs
+between the embedding API and Postgres:
+
+- normalize: the pre-change generator ``sum`` plus a list comprehension,
+  against ``vectors.l2_normalize``. Two inputs are used: raw vectors
+  (truncated Gemini / reduced OpenAI outputs) and vectors that are already
+  unit length (native-size outputs);
+- hold: the bytes per vector kept by the embedding cache's memory tier as a
+  tuple of Python floats (before) and as ``vectors.float32`` (after).
+
+    python -m benchmarks.embedding_postprocess [chunks] [dims]
+"""
+
+import math
+import random
+import sys
+import time
+from collections.abc import Callable
+
+from aeva.llm.vectors import float32, l2_normalize
+
+
+def _legacy_normalize(values: list[float]) -> list[float]:
+    """Run the pre-change ``_l2_normalize``."""
+    norm = math.sqrt(sum(v * v for v in values))
+    if norm == 0:
+        return values
+    return [v / norm for v in values]
+
+
+def _seconds(
+    fn: Callable[[list[float]], object], vectors: list[list[float]]
+) -> float:
+    start = time.perf_counter()
+    for vector in vectors:
+        fn(vector)
+    return time.perf_counter() - start
+
+
+def _tuple_bytes(vector: list[float]) -> int:
+    held = tuple(vector)
+    return sys.getsizeof(held) + sum(sys.getsizeof(v) for v in held)
+
+
+def main(chunks: int = 5_000, dims: int = 768) -> None:
+    """Print normalization time and cached bytes per vector."""
+    rng = random.Random(7)
+    raw = [[rng.gauss(0, 0.036) for _ in range(dims)] for _ in range(chunks)]
+    unit = [_legacy_normalize(vector) for vector in raw]
+    print(f"{chunks} chunks x {dims} dims")
+    for label, vectors in (("raw", raw), ("unit", unit)):
+        before = _seconds(_legacy_normalize, vectors)
+        after = _seconds(l2_normalize, vectors)
+        print(
+            f"  normalize {label:<5} {before:6.3f}s -> {after:6.3f}s  "
+            f"({before / after:4.1f}x)"
+        )
+    before = _tuple_bytes(raw[0])
+    after = sys.getsizeof(float32(raw[0]))
+    print(
+        f"  hold per vector  {before / 1024:6.1f} KB -> {after / 1024:6.1f} KB"
+        f"  ({before / after:4.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
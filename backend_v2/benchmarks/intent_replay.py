@@ -0,0 +1,120 @@
+"""Replay logged turns through the intent classifier; report planner agreement.
+
+Logged turns are ``(message, planner label)`` pairs, read either from a JSONL
+file (one ``{"message": ..., "tool": ...}`` per line) or straight from the
+``messages`` table with ``--supabase`` (needs the app's ``.env``). Turns are
+shuffled with a fixed seed and split; the classifier trains on one part and
+replays the held-out part. For each threshold the table shows:
+
+- ``routed``: share of held-out turns the classifier would take (no planner
+  LLM call);
+- ``agree``: share of routed turns where it picked the planner's tool;
+- ``saved``: planner calls skipped per 1000 turns.
+
+Only ``general``/``web_search``/``quiz_generator`` are ever routed, so the
+other labels count as fall-throughs. ``--save PATH`` then retrains on every
+turn and writes the model for ``INTENT_CLASSIFIER_PATH``.
+
+    python -m benchmarks.intent_replay turns.jsonl
+    python -m benchmarks.intent_replay --supabase --limit 20000 --save m.json
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+from aeva.orchestration.intent_classifier import (
+    ROUTABLE_TOOLS,
+    IntentClassifier,
+    turns_from_messages,
+)
+
+_THRESHOLDS = (0.5, 0.7, 0.8, 0.9, 0.95, 0.99)
+_PAGE = 1000
+
+
+def _from_jsonl(path: str) -> list[tuple[str, str]]:
+    with Path(path).open(encoding="utf-8") as fh:
+        rows = [json.loads(line) for line in fh if line.strip()]
+    return [(row["message"], row["tool"]) for row in rows]
+
+
+def _from_supabase(limit: int) -> list[tuple[str, str]]:
+    # Imported here: building the app needs the full environment.
+    from aeva.app import create_app  # noqa: PLC0415
+    from aeva.supabase.supabase_service import SupabaseService  # noqa: PLC0415
+
+    with create_app().app_context():
+        client = SupabaseService().client
+        rows: list[dict[str, object]] = []
+        while len(rows) < limit:
+            page = (
+                client.table("messages")
+                .select("session_id,role,content,metadata")
+                .order("session_id")
+                .order("created_at")
+                .range(len(rows), min(len(rows) + _PAGE, limit) - 1)
+                .execute()
+            ).data or []
+            rows.extend(page)
+            if len(page) < _PAGE:
+                break
+    return turns_from_messages(rows)
+
+
+def _report(
+    model: IntentClassifier, held_out: list[tuple[str, str]]
+) -> None:
+    predictions = [(model.predict(m), label) for m, label in held_out]
+    exact = sum(pred == label for (pred, _), label in predictions)
+    print(
+        f"held-out turns: {len(held_out)}  "
+        f"top-1 agreement: {exact / len(held_out):.1%}"
+    )
+    print(f"{'threshold':>9} {'routed':>8} {'agree':>8} {'saved/1k':>9}")
+    for threshold in _THRESHOLDS:
+        routed = [
+            (pred, label)
+            for (pred, confidence), label in predictions
+            if pred in ROUTABLE_TOOLS and confidence >= threshold
+        ]
+        agree = sum(pred == label for pred, label in routed)
+        share = len(routed) / len(held_out)
+        print(
+            f"{threshold:>9.2f} {share:>8.1%} "
+            f"{(agree / len(routed) if routed else 0.0):>8.1%} "
+            f"{share * 1000:>9.0f}"
+        )
+
+
+def main() -> None:
+    """Train on part of the logged turns and replay the rest."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("turns", nargs="?", help="JSONL of logged turns")
+    parser.add_argument("--supabase", action="store_true")
+    parser.add_argument("--limit", type=int, default=10_000)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", help="write a model trained on all turns")
+    args = parser.parse_args()
+    if args.supabase == bool(args.turns):
+        parser.error("give either a JSONL file or --supabase")
+
+    turns = (
+        _from_supabase(args.limit) if args.supabase else _from_jsonl(args.turns)
+    )
+    random.Random(args.seed).shuffle(turns)
+    cut = max(1, int(len(turns) * (1 - args.holdout)))
+    if cut >= len(turns):
+        parser.error(f"need more logged turns than {len(turns)}")
+    print(f"logged turns: {len(turns)}  trained on: {cut}")
+    _report(IntentClassifier.train(turns[:cut]), turns[cut:])
+
+    if args.save:
+        IntentClassifier.train(turns).save(args.save)
+        print(f"model written to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Cost of ``PromptBuilder.build`` for every template, before and after.
+
+Renders each template in ``aeva.llm.prompts`` with every runtime value set
+to a 500-character string. It runs the pre-change builder (static-block
+regex passes, a validation scan and a substitution pass per channel, on
+every call) against the compiled builder, which does that work on the first
+call only. Reports microseconds per render and checks that both produce
+the same text.
+
+    python -m benchmarks.prompt_render [renders]
+"""
+
+import re
+import sys
+import time
+from collections.abc import Callable
+
+from aeva.llm import prompts
+from aeva.llm.prompts import PromptBuilder, PromptTemplate, RenderedPrompt
+
+_PLACEHOLDER_RE = re.compile(r"\{([A-Z_][A-Z0-9_]*)\}")
+_MAX_STATIC_PASSES = 10
+_VALUE = "v" * 500
+
+
+def _legacy_channel(
+    template: PromptTemplate, text: str, values: dict[str, str]
+) -> str:
+    """Run the pre-change ``PromptBuilder._render`` for one channel."""
+    dynamic = set(values)
+    static = template.static_names(dynamic)
+
+    def resolve_static(match: re.Match[str]) -> str:
+        name = match.group(1)
+        if name in static:
+            return template.defaults.get(name, "")
+        return match.group(0)
+
+    for _ in range(_MAX_STATIC_PASSES):
+        text, count = _PLACEHOLDER_RE.subn(resolve_static, text)
+        if not count or not any(
+            m.group(1) in static for m in _PLACEHOLDER_RE.finditer(text)
+        ):
+            break
+    remaining = {m.group(1) for m in _PLACEHOLDER_RE.finditer(text)}
+    if remaining - dynamic:
+        raise ValueError(remaining - dynamic)
+
+    def resolve_dynamic(match: re.Match[str]) -> str:
+        name = match.group(1)
+        return values[name] if name in dynamic else match.group(0)
+
+    return _PLACEHOLDER_RE.sub(resolve_dynamic, text)
+
+
+def _legacy_build(
+    template: PromptTemplate, values: dict[str, str]
+) -> RenderedPrompt:
+    return RenderedPrompt(
+        system_prompt=_legacy_channel(template, template.system, values),
+        user_message=_legacy_channel(template, template.user, values),
+    )
+
+
+def _values(template: PromptTemplate) -> dict[str, str]:
+    """Every name the template needs from the caller, set to a dummy."""
+    texts = [template.system, template.user, *template.defaults.values()]
+    names = {
+        m.group(1) for text in texts for m in _PLACEHOLDER_RE.finditer(text)
+    }
+    runtime = names - set(template.defaults) - set(template.markers)
+    return dict.fromkeys(runtime, _VALUE)
+
+
+def _micros(
+    build: Callable[..., RenderedPrompt],
+    template: PromptTemplate,
+    values: dict[str, str],
+    renders: int,
+) -> float:
+    start = time.perf_counter()
+    for _ in range(renders):
+        build(template, values)
+    return (time.perf_counter() - start) / renders * 1e6
+
+
+def main(renders: int = 5_000) -> None:
+    """Print per-render time of every template, before and after."""
+    templates = [
+        value
+        for value in vars(prompts).values()
+        if isinstance(value, PromptTemplate)
+    ]
+    print(f"{renders} renders per template, values of {len(_VALUE)} chars")
+    total_before = total_after = 0.0
+    for template in sorted(templates, key=lambda t: t.name):
+        values = _values(template)
+        compiled = PromptBuilder.build(template, **values)
+        if compiled != _legacy_build(template, values):
+            msg = f"{template.name}: compiled render differs"
+            raise RuntimeError(msg)
+        before = _micros(_legacy_build, template, values, renders)
+        after = _micros(
+            lambda t, v: PromptBuilder.build(t, **v), template, values, renders
+        )
+        total_before += before
+        total_after += after
+        print(
+            f"  {template.name:<22} {before:7.1f}us -> {after:6.1f}us  "
+            f"({before / after:4.1f}x)"
+        )
+    print(
+        f"  {'all templates':<22} {total_before:7.1f}us -> "
+        f"{total_after:6.1f}us  ({total_before / total_after:4.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
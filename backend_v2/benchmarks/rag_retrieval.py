@@ -0,0 +1,196 @@
+"""Offline retrieval eval: recall@k and prompt tokens, vector vs hybrid.
+
+Runs the queries in ``fixtures/rag_corpus.json`` (hand-written study notes
+with the chunk ids that answer each query) through three retrievers at
+several ``k``:
+
+- ``vector``: cosine ranking only (``RAG_RETRIEVAL=vector``);
+- ``hybrid``: vector and lexical ranks fused with
+  ``reciprocal_rank_fusion``, the formula ``match_media_chunks_hybrid`` uses;
+- ``hybrid+mmr``: the fused candidates picked with ``mmr_select``.
+
+For each it reports mean recall@k and mean prompt tokens per query. Tokens
+use the chunker's ``_CHARS_PER_TOKEN`` estimate.
+
+The lexical side stands in for Postgres full-text search: OR-matching of
+query terms minus stopwords (as ``match_media_chunks_hybrid`` does), with a
+plural-stripping stemmer, ranked by term frequency and a section bonus.
+Offline, the vector side uses hashed character-trigram vectors. They only
+exercise the fusion code and are not a stand-in for semantic quality.
+``--live`` embeds with the configured ``LLM_EMBEDDING_MODEL`` instead (needs
+the app's ``.env``).
+
+    python -m benchmarks.rag_retrieval [--live]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from aeva.media.chunking import _CHARS_PER_TOKEN
+from aeva.media.retrieval import mmr_select, reciprocal_rank_fusion
+
+_FIXTURE = Path(__file__).parent / "fixtures" / "rag_corpus.json"
+_DIMS = 768
+_CANDIDATES = 40
+_KS = (2, 4, 8)
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "in", "is", "it", "its", "many", "of", "on", "one",
+    "or", "the", "to", "what", "when", "where", "which", "why", "with",
+})
+# Shortest words the plural stripper touches ("-es" / "-s").
+_MIN_ES_STEM = 5
+_MIN_S_STEM = 4
+_TERM_RE = re.compile(r"\w+")
+
+Embedder = Callable[[list[str], str], list[list[float]]]
+
+
+def _stem(word: str) -> str:
+    if len(word) >= _MIN_ES_STEM and word.endswith("es"):
+        return word[:-2]
+    if len(word) >= _MIN_S_STEM and word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _terms(text: str) -> list[str]:
+    return [
+        _stem(w) for w in _TERM_RE.findall(text.lower()) if w not in _STOPWORDS
+    ]
+
+
+def _lexical_ranking(query: str, chunks: list[dict[str, Any]]) -> list[str]:
+    """Chunk ids matching any query term, best first."""
+    wanted = set(_terms(query))
+    scored: list[tuple[float, str]] = []
+    for chunk in chunks:
+        body = Counter(_terms(chunk["content"]))
+        section = set(_terms(chunk["section"]))
+        if any(t in body or t in section for t in wanted):
+            score = sum(body[t] for t in wanted) + 2 * len(wanted & section)
+            scored.append((score, chunk["id"]))
+    scored.sort(key=lambda pair: -pair[0])
+    return [chunk_id for _, chunk_id in scored[:_CANDIDATES]]
+
+
+def _trigram_embed(texts: list[str], _task: str) -> list[list[float]]:
+    vectors = []
+    for text in texts:
+        padded = f"  {text.lower()} "
+        vector = [0.0] * _DIMS
+        for i in range(len(padded) - 2):
+            digest = hashlib.blake2b(padded[i : i + 3].encode(), digest_size=4)
+            vector[int.from_bytes(digest.digest()) % _DIMS] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        vectors.append([v / norm for v in vector])
+    return vectors
+
+
+def _live_embedder() -> Embedder:
+    # Imported here: building the app needs the full environment.
+    from aeva.app import create_app  # noqa: PLC0415
+    from aeva.llm.llm_client import LLMClient  # noqa: PLC0415
+
+    app = create_app()
+
+    def embed(texts: list[str], task: str) -> list[list[float]]:
+        with app.app_context():
+            return LLMClient(config_key="LLM_EMBEDDING_MODEL").embed(
+                texts,
+                task_type=task,
+                output_dimensionality=app.config["RAG_EMBEDDING_DIM"],
+            )
+
+    return embed
+
+
+def _cosine_ranking(
+    query_vector: list[float], chunk_vectors: dict[str, list[float]]
+) -> list[str]:
+    def similarity(chunk_id: str) -> float:
+        vector = chunk_vectors[chunk_id]
+        dot = sum(a * b for a, b in zip(query_vector, vector, strict=True))
+        norm = math.sqrt(sum(a * a for a in query_vector)) * math.sqrt(
+            sum(b * b for b in vector)
+        )
+        return dot / norm if norm else 0.0
+
+    return sorted(chunk_vectors, key=similarity, reverse=True)[:_CANDIDATES]
+
+
+def main() -> None:
+    """Print recall@k and prompt tokens per retriever."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--diversity", type=float, default=0.3)
+    args = parser.parse_args()
+
+    corpus = json.loads(_FIXTURE.read_text(encoding="utf-8"))
+    chunks = {chunk["id"]: chunk for chunk in corpus["chunks"]}
+    embed = _live_embedder() if args.live else _trigram_embed
+    chunk_vectors = dict(
+        zip(
+            chunks,
+            embed(
+                [f"{c['section']}\n{c['content']}" for c in chunks.values()],
+                "RETRIEVAL_DOCUMENT",
+            ),
+            strict=True,
+        )
+    )
+    queries = corpus["queries"]
+    query_vectors = embed([q["query"] for q in queries], "RETRIEVAL_QUERY")
+
+    def retrievers(
+        query: str, query_vector: list[float]
+    ) -> dict[str, Callable[[int], list[str]]]:
+        vector = _cosine_ranking(query_vector, chunk_vectors)
+        fused = reciprocal_rank_fusion(
+            [vector, _lexical_ranking(query, list(chunks.values()))]
+        )
+        rows = [{**chunks[str(i)], "rrf_score": s} for i, s in fused]
+        return {
+            "vector": lambda k: vector[:k],
+            "hybrid": lambda k: [r["id"] for r in rows[:k]],
+            "hybrid+mmr": lambda k: [
+                r["id"]
+                for r in mmr_select(rows, k, diversity=args.diversity)
+            ],
+        }
+
+    totals: dict[tuple[str, int], list[float]] = {}
+    for query, query_vector in zip(queries, query_vectors, strict=True):
+        relevant = set(query["relevant"])
+        for name, pick in retrievers(query["query"], query_vector).items():
+            for k in _KS:
+                ids = pick(k)
+                recall = len(relevant & set(ids)) / len(relevant)
+                tokens = sum(
+                    len(chunks[i]["content"]) // _CHARS_PER_TOKEN for i in ids
+                )
+                acc = totals.setdefault((name, k), [0.0, 0.0])
+                acc[0] += recall
+                acc[1] += tokens
+
+    print(
+        f"queries: {len(queries)}  chunks: {len(chunks)}  "
+        f"embeddings: {'live' if args.live else 'trigram stand-in'}"
+    )
+    print(f"{'retriever':>11} {'k':>3} {'recall@k':>9} {'tokens/query':>13}")
+    for (name, k), (recall, tokens) in totals.items():
+        print(
+            f"{name:>11} {k:>3} {recall / len(queries):>9.3f} "
+            f"{tokens / len(queries):>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Per-chunk cost of splitting a streamed answer from its metadata trailer.
+
+Feeds synthetic answers of growing length (4-char token deltas, the way
+Groq/OpenAI stream) through the pre-fix ``raw += chunk; raw.find(...)``
+loop and through ``SentinelSplitter``, and reports microseconds per chunk.
+The splitter's column should stay flat as answers grow; the legacy one grows
+with the answer length.
+
+    python -m benchmarks.sentinel_stream
+"""
+
+import time
+from collections.abc import Callable
+
+from aeva.common.streaming import SentinelSplitter
+from aeva.llm.prompts import META_SENTINEL
+
+_CHUNK = "abc "
+
+
+def _legacy(chunks: list[str]) -> int:
+    """Run the pre-fix loop: rescan the whole buffer per chunk."""
+    hold = len(META_SENTINEL)
+    raw, emitted, released = "", 0, 0
+    for chunk in chunks:
+        raw += chunk
+        idx = raw.find(META_SENTINEL)
+        if idx != -1:
+            break
+        safe = len(raw) - (hold - 1)
+        if safe > emitted:
+            released += safe - emitted
+            emitted = safe
+    return released
+
+
+def _splitter(chunks: list[str]) -> int:
+    splitter = SentinelSplitter(META_SENTINEL)
+    released = sum(len(splitter.feed(chunk)) for chunk in chunks)
+    return released + len(splitter.flush())
+
+
+def _per_chunk_us(run: Callable[[list[str]], int], chunks: list[str]) -> float:
+    start = time.perf_counter()
+    run(chunks)
+    return (time.perf_counter() - start) / len(chunks) * 1e6
+
+
+def main() -> None:
+    """Print µs/chunk for each implementation at several stream lengths."""
+    print(f"{'chunks':>8} {'legacy µs/chunk':>16} {'splitter µs/chunk':>18}")
+    for count in (1_000, 2_500, 5_000, 10_000):
+        chunks = [_CHUNK] * count + [META_SENTINEL, '{"x": 1}']
+        print(
+            f"{count:>8} {_per_chunk_us(_legacy, chunks):>16.2f} "
+            f"{_per_chunk_us(_splitter, chunks):>18.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
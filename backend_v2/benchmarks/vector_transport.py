@@ -0,0 +1,83 @@
+"""Client-side cost of shipping chunk embeddings to Postgres.
+
+Builds the ``insert_media_chunks`` request bodies for a 10k-chunk document
+(768-dim vectors, pages of ``_CHUNK_INSERT_PAGE`` rows) under each vector
+transport and reports throughput and payload size. The work measured is
+exactly what the app does per insert: encode every vector, then JSON-encode
+the page the way PostgREST's client does. Database-side decoding is not
+included (no database here).
+
+    python -m benchmarks.vector_transport [chunks] [dims]
+"""
+
+import json
+import random
+import sys
+import time
+from collections.abc import Callable
+
+from aeva.supabase.supabase_service import (
+    _CHUNK_INSERT_PAGE,
+    _vec_to_packed,
+    _vec_to_str,
+)
+
+
+def _legacy_text(vector: list[float]) -> str:
+    """Encode the pre-026 literal: full ``str`` digits per component."""
+    return "[" + ",".join(str(v) for v in vector) + "]"
+
+
+def _run(
+    rows: list[dict[str, object]],
+    vectors: list[list[float]],
+    encode: Callable[[list[float]], str],
+) -> tuple[float, int]:
+    start = time.perf_counter()
+    size = 0
+    for first in range(0, len(rows), _CHUNK_INSERT_PAGE):
+        page = [
+            {**row, "embedding": encode(vector)}
+            for row, vector in zip(
+                rows[first : first + _CHUNK_INSERT_PAGE],
+                vectors[first : first + _CHUNK_INSERT_PAGE],
+                strict=True,
+            )
+        ]
+        size += len(json.dumps(page))
+    return time.perf_counter() - start, size
+
+
+def main(chunks: int = 10_000, dims: int = 768) -> None:
+    """Print chunks/s and payload MB per transport."""
+    rng = random.Random(7)
+    vectors = [
+        [rng.gauss(0, 0.036) for _ in range(dims)] for _ in range(chunks)
+    ]
+    rows: list[dict[str, object]] = [
+        {
+            "media_id": "00000000-0000-0000-0000-000000000001",
+            "user_id": "00000000-0000-0000-0000-000000000002",
+            "chunk_index": i,
+            "content": "lorem ipsum " * 180,
+            "page_number": i // 8,
+            "section": "Chapter",
+            "token_count": 512,
+        }
+        for i in range(chunks)
+    ]
+    print(f"{chunks} chunks x {dims} dims")
+    for name, encode in (
+        ("text (legacy str)", _legacy_text),
+        ("text (%.9g)", _vec_to_str),
+        ("packed (base64 f32)", _vec_to_packed),
+    ):
+        seconds, size = _run(rows, vectors, encode)
+        print(
+            f"  {name:<20} {chunks / seconds:>9,.0f} chunks/s  "
+            f"{seconds:6.2f}s  {size / 1e6:7.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
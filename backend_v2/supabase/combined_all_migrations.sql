@@ -1631,3 +1631,542 @@ UPDATE media
 SET processing_status = 'ready'
 WHERE storage_path LIKE '%/generated/%'
   AND processing_status = 'pending';
+
+-- ----------------------------------------------------------------------------
+-- 023_embedding_cache.sql
+-- ----------------------------------------------------------------------------
+
+-- Content-addressed embedding cache: one vector per (model, dimensions,
+-- task_type, sha256(text)). Re-processing or re-uploading a document, and
+-- repeating a retrieval query, reuse stored vectors instead of calling the
+-- embedding API again. Vectors are stored as REAL[] (not vector(N)) so one
+-- table serves every model/dimension; the app L2-normalizes before storing.
+--
+-- Rows are immutable and shared across users (identical text embeds
+-- identically), so there is no user_id. Safe to truncate at any time: the
+-- cache refills on the next miss. Additive and idempotent.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    task_type TEXT NOT NULL,
+    text_sha256 TEXT NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (model, dimensions, task_type, text_sha256)
+);
+
+-- Only the backend's service-role client touches this table (it bypasses
+-- RLS). Enabling RLS with no policies blocks anon/authenticated access
+-- entirely — defence in depth, same pattern as prior migrations.
+ALTER TABLE embedding_cache ENABLE ROW LEVEL SECURITY;
+
+-- ----------------------------------------------------------------------------
+-- 024_media_index_checkpoint.sql
+-- ----------------------------------------------------------------------------
+
+-- Resumable chunk/embed/index stage. After every indexed window the pipeline
+-- records how many chunks are durably inserted (indexed_chunk_count, the
+-- high-water mark) and the ids of the windows embedded so far
+-- (indexed_batch_ids, "<first chunk_index>:<content hash>"). A reconnecting
+-- /process run that finds processing_status='indexing' skips the windows
+-- whose ids still match instead of re-embedding the whole document.
+--
+-- Additive and idempotent; legacy rows default to an empty checkpoint.
+
+ALTER TABLE media
+    ADD COLUMN IF NOT EXISTS indexed_chunk_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS indexed_batch_ids TEXT[] NOT NULL DEFAULT '{}';
+
+-- The resume trim deletes chunks past the checkpoint by (media_id,
+-- chunk_index); this also serves ordered reads of a document's chunks.
+CREATE INDEX IF NOT EXISTS idx_media_chunks_media_chunk_index
+    ON media_chunks(media_id, chunk_index);
+
+-- ----------------------------------------------------------------------------
+-- 025_media_content_dedup.sql
+-- ----------------------------------------------------------------------------
+
+-- Content dedup for parsed documents. Uploads record the SHA-256 of the stored
+-- bytes; a ready document also records the settings its index was built with
+-- (index_signature: embedding model, dimensions, chunk size and overlap). When
+-- a new upload's hash and the current signature match an already-indexed
+-- document — any user's: the uploader holds the identical file, so nothing is
+-- disclosed — processing clones that document's pages and chunks instead of
+-- re-parsing and re-embedding it.
+--
+-- Additive and idempotent. Legacy rows have no hash and never act as donors.
+
+ALTER TABLE media
+    ADD COLUMN IF NOT EXISTS content_sha256 TEXT,
+    ADD COLUMN IF NOT EXISTS index_signature TEXT;
+
+-- Donor lookup: ready documents by content hash. Partial so pending uploads
+-- and images (which are never indexed) stay out of it.
+CREATE INDEX IF NOT EXISTS idx_media_content_sha256_ready
+    ON media(content_sha256, index_signature)
+    WHERE processing_status = 'ready' AND chunk_count > 0;
+
+-- Copy a donor's pages and chunks (embeddings included) onto another media
+-- row in one statement, so vectors never round-trip through the app. Clears
+-- the target first, so a retried clone is safe. Returns the chunk count.
+CREATE OR REPLACE FUNCTION clone_media_index(
+    p_source_media_id UUID,
+    p_target_media_id UUID,
+    p_target_user_id UUID
+)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    cloned INTEGER;
+BEGIN
+    DELETE FROM media_chunks WHERE media_id = p_target_media_id;
+    DELETE FROM media_pages WHERE media_id = p_target_media_id;
+
+    INSERT INTO media_pages (media_id, user_id, page_number, text, markdown)
+    SELECT p_target_media_id, p_target_user_id, page_number, text, markdown
+    FROM media_pages
+    WHERE media_id = p_source_media_id;
+
+    INSERT INTO media_chunks (
+        media_id, user_id, chunk_index, content, page_number, section,
+        token_count, embedding
+    )
+    SELECT
+        p_target_media_id, p_target_user_id, chunk_index, content,
+        page_number, section, token_count, embedding
+    FROM media_chunks
+    WHERE media_id = p_source_media_id;
+    GET DIAGNOSTICS cloned = ROW_COUNT;
+
+    RETURN cloned;
+END;
+$$;
+
+-- Cloning crosses users, so only the backend's service role may call it.
+REVOKE EXECUTE ON FUNCTION clone_media_index(UUID, UUID, UUID)
+    FROM PUBLIC, anon, authenticated;
+
+-- ----------------------------------------------------------------------------
+-- 026_packed_vector_transport.sql
+-- ----------------------------------------------------------------------------
+
+-- Packed vector transport. PostgREST speaks JSON, so embeddings normally
+-- travel as pgvector text literals ("[0.0123,...]"): ~10-16 KB per 768-dim
+-- vector and a float-to-decimal conversion per component on the app side.
+-- With VECTOR_TRANSPORT=packed the app instead sends each vector as base64 of
+-- its little-endian float32 bytes (4 KB, one struct.pack call), decoded here.
+--
+-- vector_from_f32_b64 rebuilds each IEEE-754 float32 exactly from its bits
+-- (normal and subnormal; embeddings never carry Inf/NaN). Additive and
+-- idempotent (CREATE OR REPLACE); the text-literal path keeps working.
+
+CREATE OR REPLACE FUNCTION vector_from_f32_b64(packed TEXT)
+RETURNS vector
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT array_agg(
+        (CASE WHEN w.bits >> 31 = 1 THEN -1 ELSE 1 END)::float8
+        * CASE
+            WHEN (w.bits >> 23) & 255 = 0
+                THEN (w.bits & 8388607)::float8 * power(2::float8, -149)
+            ELSE (1 + (w.bits & 8388607)::float8 / 8388608)
+                * power(2::float8, ((w.bits >> 23) & 255) - 127)
+          END
+        ORDER BY w.i
+    )::real[]::vector
+    FROM (
+        SELECT
+            i,
+            get_byte(raw, 4 * i)::bigint
+                | (get_byte(raw, 4 * i + 1)::bigint << 8)
+                | (get_byte(raw, 4 * i + 2)::bigint << 16)
+                | (get_byte(raw, 4 * i + 3)::bigint << 24) AS bits
+        FROM decode(packed, 'base64') AS raw,
+            generate_series(0, length(raw) / 4 - 1) AS i
+    ) AS w;
+$$;
+
+-- Bulk chunk insert with packed embeddings (one request per page of rows).
+CREATE OR REPLACE FUNCTION insert_media_chunks_packed(p_rows JSONB)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    INSERT INTO media_chunks (
+        media_id, user_id, chunk_index, content, page_number, section,
+        token_count, embedding
+    )
+    SELECT
+        r.media_id, r.user_id, r.chunk_index, r.content, r.page_number,
+        r.section, r.token_count, vector_from_f32_b64(r.embedding)
+    FROM jsonb_to_recordset(p_rows) AS r(
+        media_id UUID,
+        user_id UUID,
+        chunk_index INTEGER,
+        content TEXT,
+        page_number INTEGER,
+        section TEXT,
+        token_count INTEGER,
+        embedding TEXT
+    );
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+-- match_media_chunks with a packed query vector.
+CREATE OR REPLACE FUNCTION match_media_chunks_packed(
+    query_packed TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 8
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT *
+    FROM match_media_chunks(
+        vector_from_f32_b64(query_packed)::vector(768),
+        p_user_id,
+        p_media_ids,
+        match_count
+    );
+$$;
+
+-- The insert takes user_id from its payload, so only the backend's service
+-- role may call it.
+REVOKE EXECUTE ON FUNCTION insert_media_chunks_packed(JSONB)
+    FROM PUBLIC, anon, authenticated;
+
+-- ----------------------------------------------------------------------------
+-- 027_messages_last_tool_index.sql
+-- ----------------------------------------------------------------------------
+
+-- Continuation routing ("again", "another one") needs the tool that produced
+-- a session's newest tool-bearing assistant reply. This partial index makes
+-- that a single index probe (newest first within the session) instead of a
+-- scan of every message in a long-running study session. Its predicate
+-- mirrors the query in SupabaseService.get_last_tool_used.
+--
+-- Additive and idempotent.
+
+CREATE INDEX IF NOT EXISTS idx_messages_session_last_tool
+    ON messages(session_id, created_at DESC)
+    WHERE role = 'assistant' AND (metadata->>'tool_used') IS NOT NULL;
+
+-- ----------------------------------------------------------------------------
+-- 028_media_chunks_hybrid_search.sql
+-- ----------------------------------------------------------------------------
+
+-- Hybrid (lexical + vector) retrieval for media RAG.
+--
+-- Pure cosine search misses exact terms: formula names, section numbers,
+-- acronyms. Each chunk gets a STORED, GENERATED tsvector (section weighted
+-- 'A', body 'B', as in 008_full_text_search) with a GIN index, and
+-- match_media_chunks_hybrid fuses the two rankings with reciprocal rank
+-- fusion: score = sum over lists of 1 / (rrf_k + rank). Each side contributes
+-- its own top match_count candidates; a chunk found by only one side still
+-- scores. The lexical side matches ANY query term (not all of them, as
+-- websearch_to_tsquery would), ranked by ts_rank_cd. The app picks the final top-k from the fused list (RAG_RETRIEVAL).
+--
+-- Adding a stored generated column rewrites media_chunks once. Additive and
+-- idempotent; match_media_chunks is unchanged.
+
+ALTER TABLE media_chunks
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(section, '')), 'A')
+        || setweight(to_tsvector('english', content), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_media_chunks_search
+    ON media_chunks USING gin (search_vector);
+
+CREATE OR REPLACE FUNCTION match_media_chunks_hybrid(
+    query_embedding vector(768),
+    query_text TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 40,
+    rrf_k INT DEFAULT 60
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT,
+    text_rank FLOAT,
+    rrf_score FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    WITH vec AS (
+        -- Rank after the LIMIT so the HNSW index still drives the scan.
+        SELECT
+            s.id,
+            1 - s.distance AS similarity,
+            row_number() OVER (ORDER BY s.distance) AS rnk
+        FROM (
+            SELECT c.id, c.embedding <=> query_embedding AS distance
+            FROM media_chunks c
+            WHERE c.user_id = p_user_id
+              AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+            ORDER BY c.embedding <=> query_embedding ASC
+            LIMIT match_count
+        ) AS s
+    ),
+    lex AS (
+        SELECT
+            s.id,
+            s.text_rank,
+            row_number() OVER (ORDER BY s.text_rank DESC) AS rnk
+        FROM (
+            -- OR the query's lexemes: questions are conversational, and a
+            -- chunk rarely holds every word of one. ts_rank_cd puts chunks
+            -- matching more (and closer) terms first.
+            SELECT c.id, ts_rank_cd(c.search_vector, q.tsq) AS text_rank
+            FROM media_chunks c,
+                replace(
+                    plainto_tsquery('english', query_text)::text, '&', '|'
+                )::tsquery AS q(tsq)
+            WHERE c.user_id = p_user_id
+              AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+              AND c.search_vector @@ q.tsq
+            ORDER BY text_rank DESC
+            LIMIT match_count
+        ) AS s
+    ),
+    fused AS (
+        SELECT
+            coalesce(v.id, l.id) AS id,
+            v.similarity,
+            l.text_rank,
+            coalesce(1.0 / (rrf_k + v.rnk), 0)
+                + coalesce(1.0 / (rrf_k + l.rnk), 0) AS rrf_score
+        FROM vec v
+        FULL OUTER JOIN lex l ON l.id = v.id
+    )
+    SELECT
+        c.id,
+        c.media_id,
+        c.chunk_index,
+        c.content,
+        c.page_number,
+        c.section,
+        f.similarity,
+        f.text_rank,
+        f.rrf_score
+    FROM fused f
+    JOIN media_chunks c ON c.id = f.id
+    ORDER BY f.rrf_score DESC, f.similarity DESC NULLS LAST
+    LIMIT match_count;
+$$;
+
+-- match_media_chunks_hybrid with a packed query vector (see 026).
+CREATE OR REPLACE FUNCTION match_media_chunks_hybrid_packed(
+    query_packed TEXT,
+    query_text TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 40,
+    rrf_k INT DEFAULT 60
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT,
+    text_rank FLOAT,
+    rrf_score FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT *
+    FROM match_media_chunks_hybrid(
+        vector_from_f32_b64(query_packed)::vector(768),
+        query_text,
+        p_user_id,
+        p_media_ids,
+        match_count,
+        rrf_k
+    );
+$$;
+
+-- ----------------------------------------------------------------------------
+-- 029_media_chunks_scoped_ann.sql
+-- ----------------------------------------------------------------------------
+
+-- Scoped nearest-neighbour search for media RAG.
+--
+-- match_media_chunks (007) walks the one global HNSW index in distance order
+-- and applies user_id / media_ids afterwards. The walk stops after
+-- hnsw.ef_search candidates (default 40), drawn from every user's chunks, so
+-- a question about one small PDF often keeps fewer than match_count rows or
+-- none at all. The planner may instead pick idx_media_chunks_user_id and sort
+-- the whole library; that answer is exact, but it is not a deliberate plan.
+--
+-- match_media_chunks_scoped chooses the plan explicitly:
+--
+-- * Small scope: the sum of media.chunk_count for the user and media subset
+--   is at most exact_limit. The scoped rows are read through the user_id
+--   index and sorted by exact distance. The MATERIALIZED CTE keeps the
+--   planner off the HNSW index. Recall is 1, and a few thousand 768-dim
+--   distances cost less than one HNSW walk over a large table.
+-- * Large scope: the HNSW index is used with a transaction-local
+--   hnsw.ef_search, which the app sets per query (RAG_ANN_EF_SEARCH). On
+--   pgvector >= 0.8, hnsw.iterative_scan = relaxed_order keeps the walk
+--   going until match_count rows survive the filter. Older versions skip
+--   this step. The outer ORDER BY restores exact order over the relaxed
+--   result.
+--
+-- chunk_count is only written when indexing finishes, so a document still
+-- indexing counts as 0. That can only push a query onto the exact path,
+-- which is always correct.
+--
+-- Per-tenant partitioning of media_chunks (one HNSW index per partition)
+-- would also fix small scopes, but it rewrites the table and its policies.
+-- This path fixes them without moving data. Additive and idempotent;
+-- match_media_chunks is unchanged, and the app opts in with RAG_ANN_SCOPED.
+
+CREATE OR REPLACE FUNCTION match_media_chunks_scoped(
+    query_embedding vector(768),
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 8,
+    ef_search INT DEFAULT NULL,
+    exact_limit INT DEFAULT 20000
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql STABLE AS $$
+#variable_conflict use_column
+DECLARE
+    scoped_chunks BIGINT;
+BEGIN
+    SELECT coalesce(sum(m.chunk_count), 0) INTO scoped_chunks
+    FROM media m
+    WHERE m.user_id = p_user_id
+      AND (p_media_ids IS NULL OR m.id = ANY(p_media_ids));
+
+    IF scoped_chunks <= exact_limit THEN
+        RETURN QUERY
+        WITH scoped AS MATERIALIZED (
+            SELECT
+                c.id,
+                c.media_id,
+                c.chunk_index,
+                c.content,
+                c.page_number,
+                c.section,
+                c.embedding <=> query_embedding AS distance
+            FROM media_chunks c
+            WHERE c.user_id = p_user_id
+              AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+        )
+        SELECT
+            s.id,
+            s.media_id,
+            s.chunk_index,
+            s.content,
+            s.page_number,
+            s.section,
+            1 - s.distance
+        FROM scoped s
+        ORDER BY s.distance ASC
+        LIMIT match_count;
+        RETURN;
+    END IF;
+
+    -- set_config(..., true) lasts until the end of the transaction, and each
+    -- PostgREST request runs in its own transaction.
+    IF ef_search IS NOT NULL AND ef_search > 0 THEN
+        PERFORM set_config(
+            'hnsw.ef_search', greatest(ef_search, match_count)::text, true
+        );
+    END IF;
+    -- pgvector < 0.8 has no hnsw.iterative_scan; skip it there. Since 0.5
+    -- pgvector reserves the "hnsw" prefix, so on PG15+ (Supabase) setting an
+    -- unknown hnsw.* name raises invalid_name (42602). Older Postgres raises
+    -- undefined_object or invalid_parameter_value instead. All three mean
+    -- "not supported": the search just runs without iterative scans.
+    BEGIN
+        PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    EXCEPTION
+        WHEN invalid_name OR undefined_object OR invalid_parameter_value THEN
+            NULL;
+    END;
+
+    RETURN QUERY
+    WITH nearest AS MATERIALIZED (
+        SELECT
+            c.id,
+            c.media_id,
+            c.chunk_index,
+            c.content,
+            c.page_number,
+            c.section,
+            c.embedding <=> query_embedding AS distance
+        FROM media_chunks c
+        WHERE c.user_id = p_user_id
+          AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+        ORDER BY c.embedding <=> query_embedding ASC
+        LIMIT match_count
+    )
+    SELECT
+        n.id,
+        n.media_id,
+        n.chunk_index,
+        n.content,
+        n.page_number,
+        n.section,
+        1 - n.distance
+    FROM nearest n
+    ORDER BY n.distance ASC;
+END;
+$$;
+
+-- match_media_chunks_scoped with a packed query vector (see 026).
+CREATE OR REPLACE FUNCTION match_media_chunks_scoped_packed(
+    query_packed TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 8,
+    ef_search INT DEFAULT NULL,
+    exact_limit INT DEFAULT 20000
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT *
+    FROM match_media_chunks_scoped(
+        vector_from_f32_b64(query_packed)::vector(768),
+        p_user_id,
+        p_media_ids,
+        match_count,
+        ef_search,
+        exact_limit
+    );
+$$;
@@ -0,0 +1,24 @@
+-- Content-addressed embedding cache: one vector per (model, dimensions,
+-- task_type, sha256(text)). Re-processing or re-uploading a document, and
+-- repeating a retrieval query, reuse stored vectors instead of calling the
+-- embedding API again. Vectors are stored as REAL[] (not vector(N)) so one
+-- table serves every model/dimension; the app L2-normalizes before storing.
+--
+-- Rows are immutable and shared across users (identical text embeds
+-- identically), so there is no user_id. Safe to truncate at any time: the
+-- cache refills on the next miss. Additive and idempotent.
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model TEXT NOT NULL,
+    dimensions INTEGER NOT NULL,
+    task_type TEXT NOT NULL,
+    text_sha256 TEXT NOT NULL,
+    embedding REAL[] NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (model, dimensions, task_type, text_sha256)
+);
+
+-- Only the backend's service-role client touches this table (it bypasses
+-- RLS). Enabling RLS with no policies blocks anon/authenticated access
+-- entirely — defence in depth, same pattern as prior migrations.
+ALTER TABLE embedding_cache ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,17 @@
+-- Resumable chunk/embed/index stage. After every indexed window the pipeline
+-- records how many chunks are durably inserted (indexed_chunk_count, the
+-- high-water mark) and the ids of the windows embedded so far
+-- (indexed_batch_ids, "<first chunk_index>:<content hash>"). A reconnecting
+-- /process run that finds processing_status='indexing' skips the windows
+-- whose ids still match instead of re-embedding the whole document.
+--
+-- Additive and idempotent; legacy rows default to an empty checkpoint.
+
+ALTER TABLE media
+    ADD COLUMN IF NOT EXISTS indexed_chunk_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS indexed_batch_ids TEXT[] NOT NULL DEFAULT '{}';
+
+-- The resume trim deletes chunks past the checkpoint by (media_id,
+-- chunk_index); this also serves ordered reads of a document's chunks.
+CREATE INDEX IF NOT EXISTS idx_media_chunks_media_chunk_index
+    ON media_chunks(media_id, chunk_index);
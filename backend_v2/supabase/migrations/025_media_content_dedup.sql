@@ -0,0 +1,58 @@
+-- Content dedup for parsed documents. Uploads record the SHA-256 of the stored
+-- bytes; a ready document also records the settings its index was built with
+-- (index_signature: embedding model, dimensions, chunk size and overlap). When
+-- a new upload's hash and the current signature match an already-indexed
+-- document — any user's: the uploader holds the identical file, so nothing is
+-- disclosed — processing clones that document's pages and chunks instead of
+-- re-parsing and re-embedding it.
+--
+-- Additive and idempotent. Legacy rows have no hash and never act as donors.
+
+ALTER TABLE media
+    ADD COLUMN IF NOT EXISTS content_sha256 TEXT,
+    ADD COLUMN IF NOT EXISTS index_signature TEXT;
+
+-- Donor lookup: ready documents by content hash. Partial so pending uploads
+-- and images (which are never indexed) stay out of it.
+CREATE INDEX IF NOT EXISTS idx_media_content_sha256_ready
+    ON media(content_sha256, index_signature)
+    WHERE processing_status = 'ready' AND chunk_count > 0;
+
+-- Copy a donor's pages and chunks (embeddings included) onto another media
+-- row in one statement, so vectors never round-trip through the app. Clears
+-- the target first, so a retried clone is safe. Returns the chunk count.
+CREATE OR REPLACE FUNCTION clone_media_index(
+    p_source_media_id UUID,
+    p_target_media_id UUID,
+    p_target_user_id UUID
+)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    cloned INTEGER;
+BEGIN
+    DELETE FROM media_chunks WHERE media_id = p_target_media_id;
+    DELETE FROM media_pages WHERE media_id = p_target_media_id;
+
+    INSERT INTO media_pages (media_id, user_id, page_number, text, markdown)
+    SELECT p_target_media_id, p_target_user_id, page_number, text, markdown
+    FROM media_pages
+    WHERE media_id = p_source_media_id;
+
+    INSERT INTO media_chunks (
+        media_id, user_id, chunk_index, content, page_number, section,
+        token_count, embedding
+    )
+    SELECT
+        p_target_media_id, p_target_user_id, chunk_index, content,
+        page_number, section, token_count, embedding
+    FROM media_chunks
+    WHERE media_id = p_source_media_id;
+    GET DIAGNOSTICS cloned = ROW_COUNT;
+
+    RETURN cloned;
+END;
+$$;
+
+-- Cloning crosses users, so only the backend's service role may call it.
+REVOKE EXECUTE ON FUNCTION clone_media_index(UUID, UUID, UUID)
+    FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,93 @@
+-- Packed vector transport. PostgREST speaks JSON, so embeddings normally
+-- travel as pgvector text literals ("[0.0123,...]"): ~10-16 KB per 768-dim
+-- vector and a float-to-decimal conversion per component on the app side.
+-- With VECTOR_TRANSPORT=packed the app instead sends each vector as base64 of
+-- its little-endian float32 bytes (4 KB, one struct.pack call), decoded here.
+--
+-- vector_from_f32_b64 rebuilds each IEEE-754 float32 exactly from its bits
+-- (normal and subnormal; embeddings never carry Inf/NaN). Additive and
+-- idempotent (CREATE OR REPLACE); the text-literal path keeps working.
+
+CREATE OR REPLACE FUNCTION vector_from_f32_b64(packed TEXT)
+RETURNS vector
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+    SELECT array_agg(
+        (CASE WHEN w.bits >> 31 = 1 THEN -1 ELSE 1 END)::float8
+        * CASE
+            WHEN (w.bits >> 23) & 255 = 0
+                THEN (w.bits & 8388607)::float8 * power(2::float8, -149)
+            ELSE (1 + (w.bits & 8388607)::float8 / 8388608)
+                * power(2::float8, ((w.bits >> 23) & 255) - 127)
+          END
+        ORDER BY w.i
+    )::real[]::vector
+    FROM (
+        SELECT
+            i,
+            get_byte(raw, 4 * i)::bigint
+                | (get_byte(raw, 4 * i + 1)::bigint << 8)
+                | (get_byte(raw, 4 * i + 2)::bigint << 16)
+                | (get_byte(raw, 4 * i + 3)::bigint << 24) AS bits
+        FROM decode(packed, 'base64') AS raw,
+            generate_series(0, length(raw) / 4 - 1) AS i
+    ) AS w;
+$$;
+
+-- Bulk chunk insert with packed embeddings (one request per page of rows).
+CREATE OR REPLACE FUNCTION insert_media_chunks_packed(p_rows JSONB)
+RETURNS INTEGER LANGUAGE plpgsql AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    INSERT INTO media_chunks (
+        media_id, user_id, chunk_index, content, page_number, section,
+        token_count, embedding
+    )
+    SELECT
+        r.media_id, r.user_id, r.chunk_index, r.content, r.page_number,
+        r.section, r.token_count, vector_from_f32_b64(r.embedding)
+    FROM jsonb_to_recordset(p_rows) AS r(
+        media_id UUID,
+        user_id UUID,
+        chunk_index INTEGER,
+        content TEXT,
+        page_number INTEGER,
+        section TEXT,
+        token_count INTEGER,
+        embedding TEXT
+    );
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+-- match_media_chunks with a packed query vector.
+CREATE OR REPLACE FUNCTION match_media_chunks_packed(
+    query_packed TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 8
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT *
+    FROM match_media_chunks(
+        vector_from_f32_b64(query_packed)::vector(768),
+        p_user_id,
+        p_media_ids,
+        match_count
+    );
+$$;
+
+-- The insert takes user_id from its payload, so only the backend's service
+-- role may call it.
+REVOKE EXECUTE ON FUNCTION insert_media_chunks_packed(JSONB)
+    FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,11 @@
+-- Continuation routing ("again", "another one") needs the tool that produced
+-- a session's newest tool-bearing assistant reply. This partial index makes
+-- that a single index probe (newest first within the session) instead of a
+-- scan of every message in a long-running study session. Its predicate
+-- mirrors the query in SupabaseService.get_last_tool_used.
+--
+-- Additive and idempotent.
+
+CREATE INDEX IF NOT EXISTS idx_messages_session_last_tool
+    ON messages(session_id, created_at DESC)
+    WHERE role = 'assistant' AND (metadata->>'tool_used') IS NOT NULL;
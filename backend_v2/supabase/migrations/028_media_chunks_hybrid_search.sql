@@ -0,0 +1,136 @@
+-- Hybrid (lexical + vector) retrieval for media RAG.
+--
+-- Pure cosine search misses exact terms: formula names, section numbers,
+-- acronyms. Each chunk gets a STORED, GENERATED tsvector (section weighted
+-- 'A', body 'B', as in 008_full_text_search) with a GIN index, and
+-- match_media_chunks_hybrid fuses the two rankings with reciprocal rank
+-- fusion: score = sum over lists of 1 / (rrf_k + rank). Each side contributes
+-- its own top match_count candidates; a chunk found by only one side still
+-- scores. The lexical side matches ANY query term (not all of them, as
+-- websearch_to_tsquery would), ranked by ts_rank_cd. The app picks the final top-k from the fused list (RAG_RETRIEVAL).
+--
+-- Adding a stored generated column rewrites media_chunks once. Additive and
+-- idempotent; match_media_chunks is unchanged.
+
+ALTER TABLE media_chunks
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(section, '')), 'A')
+        || setweight(to_tsvector('english', content), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_media_chunks_search
+    ON media_chunks USING gin (search_vector);
+
+CREATE OR REPLACE FUNCTION match_media_chunks_hybrid(
+    query_embedding vector(768),
+    query_text TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 40,
+    rrf_k INT DEFAULT 60
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT,
+    text_rank FLOAT,
+    rrf_score FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    WITH vec AS (
+        -- Rank after the LIMIT so the HNSW index still drives the scan.
+        SELECT
+            s.id,
+            1 - s.distance AS similarity,
+            row_number() OVER (ORDER BY s.distance) AS rnk
+        FROM (
+            SELECT c.id, c.embedding <=> query_embedding AS distance
+            FROM media_chunks c
+            WHERE c.user_id = p_user_id
+              AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+            ORDER BY c.embedding <=> query_embedding ASC
+            LIMIT match_count
+        ) AS s
+    ),
+    lex AS (
+        SELECT
+            s.id,
+            s.text_rank,
+            row_number() OVER (ORDER BY s.text_rank DESC) AS rnk
+        FROM (
+            -- OR the query's lexemes: questions are conversational, and a
+            -- chunk rarely holds every word of one. ts_rank_cd puts chunks
+            -- matching more (and closer) terms first.
+            SELECT c.id, ts_rank_cd(c.search_vector, q.tsq) AS text_rank
+            FROM media_chunks c,
+                replace(
+                    plainto_tsquery('english', query_text)::text, '&', '|'
+                )::tsquery AS q(tsq)
+            WHERE c.user_id = p_user_id
+              AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+              AND c.search_vector @@ q.tsq
+            ORDER BY text_rank DESC
+            LIMIT match_count
+        ) AS s
+    ),
+    fused AS (
+        SELECT
+            coalesce(v.id, l.id) AS id,
+            v.similarity,
+            l.text_rank,
+            coalesce(1.0 / (rrf_k + v.rnk), 0)
+                + coalesce(1.0 / (rrf_k + l.rnk), 0) AS rrf_score
+        FROM vec v
+        FULL OUTER JOIN lex l ON l.id = v.id
+    )
+    SELECT
+        c.id,
+        c.media_id,
+        c.chunk_index,
+        c.content,
+        c.page_number,
+        c.section,
+        f.similarity,
+        f.text_rank,
+        f.rrf_score
+    FROM fused f
+    JOIN media_chunks c ON c.id = f.id
+    ORDER BY f.rrf_score DESC, f.similarity DESC NULLS LAST
+    LIMIT match_count;
+$$;
+
+-- match_media_chunks_hybrid with a packed query vector (see 026).
+CREATE OR REPLACE FUNCTION match_media_chunks_hybrid_packed(
+    query_packed TEXT,
+    query_text TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 40,
+    rrf_k INT DEFAULT 60
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT,
+    text_rank FLOAT,
+    rrf_score FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT *
+    FROM match_media_chunks_hybrid(
+        vector_from_f32_b64(query_packed)::vector(768),
+        query_text,
+        p_user_id,
+        p_media_ids,
+        match_count,
+        rrf_k
+    );
+$$;
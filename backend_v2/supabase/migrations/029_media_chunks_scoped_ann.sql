@@ -0,0 +1,165 @@
+-- Scoped nearest-neighbour search for media RAG.
+--
+-- match_media_chunks (007) walks the one global HNSW index in distance order
+-- and applies user_id / media_ids afterwards. The walk stops after
+-- hnsw.ef_search candidates (default 40), drawn from every user's chunks, so
+-- a question about one small PDF often keeps fewer than match_count rows or
+-- none at all. The planner may instead pick idx_media_chunks_user_id and sort
+-- the whole library; that answer is exact, but it is not a deliberate plan.
+--
+-- match_media_chunks_scoped chooses the plan explicitly:
+--
+-- * Small scope: the sum of media.chunk_count for the user and media subset
+--   is at most exact_limit. The scoped rows are read through the user_id
+--   index and sorted by exact distance. The MATERIALIZED CTE keeps the
+--   planner off the HNSW index. Recall is 1, and a few thousand 768-dim
+--   distances cost less than one HNSW walk over a large table.
+-- * Large scope: the HNSW index is used with a transaction-local
+--   hnsw.ef_search, which the app sets per query (RAG_ANN_EF_SEARCH). On
+--   pgvector >= 0.8, hnsw.iterative_scan = relaxed_order keeps the walk
+--   going until match_count rows survive the filter. Older versions skip
+--   this step. The outer ORDER BY restores exact order over the relaxed
+--   result.
+--
+-- chunk_count is only written when indexing finishes, so a document still
+-- indexing counts as 0. That can only push a query onto the exact path,
+-- which is always correct.
+--
+-- Per-tenant partitioning of media_chunks (one HNSW index per partition)
+-- would also fix small scopes, but it rewrites the table and its policies.
+-- This path fixes them without moving data. Additive and idempotent;
+-- match_media_chunks is unchanged, and the app opts in with RAG_ANN_SCOPED.
+
+CREATE OR REPLACE FUNCTION match_media_chunks_scoped(
+    query_embedding vector(768),
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 8,
+    ef_search INT DEFAULT NULL,
+    exact_limit INT DEFAULT 20000
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql STABLE AS $$
+#variable_conflict use_column
+DECLARE
+    scoped_chunks BIGINT;
+BEGIN
+    SELECT coalesce(sum(m.chunk_count), 0) INTO scoped_chunks
+    FROM media m
+    WHERE m.user_id = p_user_id
+      AND (p_media_ids IS NULL OR m.id = ANY(p_media_ids));
+
+    IF scoped_chunks <= exact_limit THEN
+        RETURN QUERY
+        WITH scoped AS MATERIALIZED (
+            SELECT
+                c.id,
+                c.media_id,
+                c.chunk_index,
+                c.content,
+                c.page_number,
+                c.section,
+                c.embedding <=> query_embedding AS distance
+            FROM media_chunks c
+            WHERE c.user_id = p_user_id
+              AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+        )
+        SELECT
+            s.id,
+            s.media_id,
+            s.chunk_index,
+            s.content,
+            s.page_number,
+            s.section,
+            1 - s.distance
+        FROM scoped s
+        ORDER BY s.distance ASC
+        LIMIT match_count;
+        RETURN;
+    END IF;
+
+    -- set_config(..., true) lasts until the end of the transaction, and each
+    -- PostgREST request runs in its own transaction.
+    IF ef_search IS NOT NULL AND ef_search > 0 THEN
+        PERFORM set_config(
+            'hnsw.ef_search', greatest(ef_search, match_count)::text, true
+        );
+    END IF;
+    -- pgvector < 0.8 has no hnsw.iterative_scan; skip it there. Since 0.5
+    -- pgvector reserves the "hnsw" prefix, so on PG15+ (Supabase) setting an
+    -- unknown hnsw.* name raises invalid_name (42602). Older Postgres raises
+    -- undefined_object or invalid_parameter_value instead. All three mean
+    -- "not supported": the search just runs without iterative scans.
+    BEGIN
+        PERFORM set_config('hnsw.iterative_scan', 'relaxed_order', true);
+    EXCEPTION
+        WHEN invalid_name OR undefined_object OR invalid_parameter_value THEN
+            NULL;
+    END;
+
+    RETURN QUERY
+    WITH nearest AS MATERIALIZED (
+        SELECT
+            c.id,
+            c.media_id,
+            c.chunk_index,
+            c.content,
+            c.page_number,
+            c.section,
+            c.embedding <=> query_embedding AS distance
+        FROM media_chunks c
+        WHERE c.user_id = p_user_id
+          AND (p_media_ids IS NULL OR c.media_id = ANY(p_media_ids))
+        ORDER BY c.embedding <=> query_embedding ASC
+        LIMIT match_count
+    )
+    SELECT
+        n.id,
+        n.media_id,
+        n.chunk_index,
+        n.content,
+        n.page_number,
+        n.section,
+        1 - n.distance
+    FROM nearest n
+    ORDER BY n.distance ASC;
+END;
+$$;
+
+-- match_media_chunks_scoped with a packed query vector (see 026).
+CREATE OR REPLACE FUNCTION match_media_chunks_scoped_packed(
+    query_packed TEXT,
+    p_user_id UUID,
+    p_media_ids UUID[] DEFAULT NULL,
+    match_count INT DEFAULT 8,
+    ef_search INT DEFAULT NULL,
+    exact_limit INT DEFAULT 20000
+)
+RETURNS TABLE (
+    id UUID,
+    media_id UUID,
+    chunk_index INT,
+    content TEXT,
+    page_number INT,
+    section TEXT,
+    similarity FLOAT
+)
+LANGUAGE sql STABLE AS $$
+    SELECT *
+    FROM match_media_chunks_scoped(
+        vector_from_f32_b64(query_packed)::vector(768),
+        p_user_id,
+        p_media_ids,
+        match_count,
+        ef_search,
+        exact_limit
+    );
+$$;
@@ -0,0 +1,101 @@
+"""Attachment byte cache (``aeva.media.attachment_cache``).
+
+Storage is a fake that counts downloads, so the tests show which turns
+would have re-fetched a file from Supabase Storage.
+"""
+
+from typing import Any
+
+import pytest
+
+from aeva.media.attachment_cache import (
+    AttachmentCache,
+    attachment_cache_stats,
+    reset_attachment_cache,
+)
+from aeva.media.attachments import download_attachments
+
+
+class _FakeSupabase:
+    def __init__(self, files: dict[str, bytes]) -> None:
+        self.files = files
+        self.downloads: list[str] = []
+        self.declared: dict[str, int] = {}
+
+    def get_media_many(
+        self, media_ids: list[str], user_id: str
+    ) -> list[dict[str, Any]]:
+        return [
+            {
+                "id": media_id,
+                "mime_type": "application/pdf",
+                "storage_path": f"{user_id}/{media_id}",
+                "size_bytes": self.declared.get(
+                    media_id, len(self.files[media_id])
+                ),
+            }
+            for media_id in media_ids
+        ]
+
+    def download_file(self, storage_path: str) -> bytes:
+        self.downloads.append(storage_path)
+        return self.files[storage_path.split("/")[-1]]
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    fresh = AttachmentCache(1024)
+    reset_attachment_cache(fresh)
+    yield fresh
+    reset_attachment_cache()
+
+
+def _turn(fake: _FakeSupabase, ids: list[str]) -> list[bytes]:
+    attachments = download_attachments(fake, "u1", "s1", ids)  # type: ignore[arg-type]
+    return [a["data"] for a in attachments]
+
+
+class TestAttachmentCacheInDownloads:
+    def test_repeat_turn_does_not_download(self):
+        fake = _FakeSupabase({"a": b"x" * 100, "b": b"y" * 50})
+        assert _turn(fake, ["a"]) == [b"x" * 100]
+        assert _turn(fake, ["a", "b"]) == [b"x" * 100, b"y" * 50]
+        assert fake.downloads == ["u1/a", "u1/b"]
+        stats = attachment_cache_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_size_mismatch_refetches(self):
+        fake = _FakeSupabase({"a": b"x" * 100})
+        _turn(fake, ["a"])
+        fake.files["a"] = b"z" * 120
+        fake.declared["a"] = 120
+        assert _turn(fake, ["a"]) == [b"z" * 120]
+        assert fake.downloads == ["u1/a", "u1/a"]
+        assert attachment_cache_stats()["stale"] == 1
+
+
+class TestAttachmentCache:
+    def test_evicts_least_recent_by_bytes(self, cache):
+        cache.put("a", b"1" * 400)
+        cache.put("b", b"2" * 400)
+        assert cache.get("a", 400) is not None
+        cache.put("c", b"3" * 400)
+        assert cache.get("b", 400) is None
+        assert cache.get("a", 400) is not None
+        assert cache.stats()["bytes"] == 800
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_file_is_not_cached(self, cache):
+        cache.put("big", b"0" * 2048)
+        assert cache.get("big", 2048) is None
+        assert cache.stats()["bytes"] == 0
+
+    def test_replacing_an_entry_keeps_size_exact(self, cache):
+        cache.put("a", b"1" * 300)
+        cache.put("a", b"1" * 100)
+        assert cache.stats()["bytes"] == 100
+
+    def test_disabled(self):
+        off = AttachmentCache(0)
+        off.put("a", b"1")
+        assert off.get("a", 1) is None
@@ -0,0 +1,143 @@
+"""Token-budgeted context packing (``aeva.media.context_packer``).
+
+Rows come from the real chunker over a synthetic document, so the overlap
+being stripped is exactly what indexing stores.
+"""
+
+from typing import Any
+
+from flask import Flask
+
+from aeva.mcp.base import ToolContext
+from aeva.mcp.tools.media_llm import MediaLLMTool
+from aeva.media.chunking import chunk_parsed_document
+from aeva.media.context_packer import pack_passages, strip_overlap
+from aeva.media.llamaparse_service import ParsedDocument, ParsedPage
+
+_OVERLAP = 16
+
+
+def _rows(media_id: str = "m1") -> list[dict[str, Any]]:
+    items = [
+        {"type": "text", "value": f"Sentence {i} about osmosis and water."}
+        for i in range(80)
+    ]
+    doc = ParsedDocument(
+        pages=[ParsedPage(page_number=1, text="", markdown="", items=items)],
+        markdown="",
+        text="",
+        page_count=1,
+        raw={},
+    )
+    chunks = chunk_parsed_document(
+        doc, target_tokens=64, overlap_tokens=_OVERLAP
+    )
+    return [
+        {
+            "id": f"{media_id}-{c.chunk_index}",
+            "media_id": media_id,
+            "chunk_index": c.chunk_index,
+            "content": c.content,
+            "page_number": c.page_number,
+            "section": c.section,
+        }
+        for c in chunks
+    ]
+
+
+class TestStripOverlap:
+    def test_removes_repeated_tail(self):
+        head = "The quick brown fox jumps over the lazy dog"
+        assert strip_overlap(head, "over the lazy dog\nThen it ran.", 64) == (
+            "Then it ran."
+        )
+
+    def test_short_coincidences_are_kept(self):
+        assert strip_overlap("ends with the", "the start", 64) == "the start"
+
+
+class TestPackPassages:
+    def test_adjacent_hits_merge_without_overlap(self):
+        rows = _rows()
+        hits = [rows[3], rows[2], rows[4]]
+        passages = pack_passages(hits, budget_tokens=0, overlap_tokens=_OVERLAP)
+        assert len(passages) == 1
+        merged = passages[0].content
+        for i in range(20, 40):
+            assert merged.count(f"Sentence {i} ") <= 1
+        assert merged.startswith(rows[2]["content"])
+        assert len(merged) < sum(len(r["content"]) for r in hits)
+        assert [r["id"] for r in passages[0].rows] == ["m1-2", "m1-3", "m1-4"]
+
+    def test_same_page_hits_fold_into_one_block(self):
+        rows = _rows()
+        passages = pack_passages(
+            [rows[1], rows[6]], budget_tokens=0, overlap_tokens=_OVERLAP
+        )
+        assert len(passages) == 1
+        assert "\n…\n" in passages[0].content
+
+    def test_other_documents_stay_separate_in_rank_order(self):
+        a, b = _rows("a"), _rows("b")
+        passages = pack_passages(
+            [b[0], a[5]], budget_tokens=0, overlap_tokens=_OVERLAP
+        )
+        assert [p.media_id for p in passages] == ["b", "a"]
+
+    def test_budget_skips_what_does_not_fit(self):
+        a, b = _rows("a"), _rows("b")
+        passages = pack_passages(
+            [a[0], b[0], a[5]], budget_tokens=70, overlap_tokens=_OVERLAP
+        )
+        assert sum(p.tokens for p in passages) <= 70
+        assert passages[0].media_id == "a"
+
+    def test_top_passage_is_truncated_not_dropped(self):
+        rows = _rows()
+        passages = pack_passages(
+            rows[:4], budget_tokens=10, overlap_tokens=_OVERLAP
+        )
+        assert len(passages) == 1
+        assert passages[0].tokens == 10
+
+
+class _FakeSupabase:
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = rows
+
+    def match_chunks(self, *_: Any, **__: Any) -> list[dict[str, Any]]:
+        return self.rows
+
+
+class _FakeEmbedder:
+    def embed(self, texts: list[str], **_: Any) -> list[list[float]]:
+        return [[0.0] for _ in texts]
+
+
+def test_media_tool_context_uses_packed_passages():
+    rows = _rows()
+    tool = MediaLLMTool(
+        supabase=_FakeSupabase([rows[2], rows[3], rows[9]]),  # type: ignore[arg-type]
+        embed_llm=_FakeEmbedder(),  # type: ignore[arg-type]
+    )
+    ctx = ToolContext(
+        user_id="u1",
+        session_id="s1",
+        message="q",
+        enriched_message="q",
+        media_ids=None,
+    )
+    app = Flask(__name__)
+    app.config.update(
+        RAG_EMBEDDING_DIM=1,
+        RAG_TOP_K=8,
+        RAG_CHUNK_OVERLAP=_OVERLAP,
+        RAG_CONTEXT_TOKENS=0,
+    )
+    with app.app_context():
+        context, sources = tool._retrieve(
+            ctx, "q", [{"id": "m1", "file_name": "bio.pdf"}]
+        )
+    assert context.count("cite as [cite:bio.pdf#1]") == 1
+    assert context.startswith('[1] (bio.pdf, p.1) — cite as')
+    assert [s["chunk_id"] for s in sources] == ["m1-2", "m1-3", "m1-9"]
@@ -0,0 +1,50 @@
+"""Keyword-less "again" follow-ups repeat the last generator tool.
+
+The orchestrator runs against a fake Supabase exposing only the indexed
+``get_last_tool_used`` lookup; the full message history must never be read.
+"""
+
+from typing import Any
+
+from aeva.orchestration.assistant_orchestrator import AssistantOrchestrator
+from aeva.orchestration.models import AssistantContext
+
+
+class _FakeSupabase:
+    def __init__(self, last_tool: str | None) -> None:
+        self.last_tool = last_tool
+        self.lookups: list[str] = []
+
+    def get_last_tool_used(self, session_id: str) -> str | None:
+        self.lookups.append(session_id)
+        return self.last_tool
+
+    def get_messages(self, *_: Any, **__: Any) -> list[dict[str, Any]]:
+        raise AssertionError
+
+
+def _plan(last_tool: str | None, message: str = "another one") -> Any:
+    fake = _FakeSupabase(last_tool)
+    orch = AssistantOrchestrator(supabase=fake)  # type: ignore[arg-type]
+    ctx = AssistantContext(user_id="u1", session_id="s1", message=message)
+    return orch._continuation_plan(ctx, message), fake
+
+
+class TestContinuationPlan:
+    def test_repeats_last_generator(self):
+        plan, fake = _plan("flashcard_generator")
+        assert plan["tool"]["name"] == "flashcard_generator"
+        assert fake.lookups == ["s1"]
+
+    def test_other_last_tool_does_not_repeat(self):
+        plan, _ = _plan("web_search")
+        assert plan is None
+
+    def test_no_tool_history(self):
+        plan, _ = _plan(None)
+        assert plan is None
+
+    def test_without_repeat_cue_skips_lookup(self):
+        plan, fake = _plan("quiz_generator", message="what is osmosis")
+        assert plan is None
+        assert fake.lookups == []
@@ -0,0 +1,160 @@
+"""Concurrent batch dispatch for embedding providers (``embed_batches``).
+
+The batch call is a fake that records concurrency and can fail on demand, so
+ordering, the in-flight cap, retries and progress are checked without an
+embedding API.
+"""
+
+import threading
+import time
+
+import httpx
+import pytest
+from flask import Flask
+
+from aeva.llm.providers import embedding
+from aeva.llm.providers.embedding import embed_batches, is_retryable
+
+
+class _HTTPError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class _FakeBatchCall:
+    """Embeds each text as ``[float(int(text))]``, tracking overlap."""
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.failures: dict[str, list[Exception]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, batch: list[str]) -> list[list[float]]:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            pending = self.failures.get(batch[0])
+            error = pending.pop(0) if pending else None
+        try:
+            time.sleep(self.delay)
+            if error is not None:
+                raise error
+            return [[float(int(text))] for text in batch]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def _no_backoff(monkeypatch):
+    # Zero jitter -> every backoff sleeps 0s.
+    monkeypatch.setattr(embedding.random, "uniform", lambda _a, _b: 0.0)
+
+
+def _texts(n: int) -> list[str]:
+    return [str(i) for i in range(n)]
+
+
+def _app(**config: object) -> Flask:
+    app = Flask(__name__)
+    app.config.update(config)
+    return app
+
+
+class TestEmbedBatches:
+    def test_order_is_preserved(self):
+        fake = _FakeBatchCall()
+        with _app(EMBED_MAX_IN_FLIGHT=4).app_context():
+            vectors = embed_batches(_texts(95), fake, batch_size=10)
+        assert vectors == [[float(i)] for i in range(95)]
+        assert fake.calls == 10
+
+    def test_in_flight_is_capped(self):
+        fake = _FakeBatchCall(delay=0.05)
+        with _app(EMBED_MAX_IN_FLIGHT=3).app_context():
+            embed_batches(_texts(80), fake, batch_size=10)
+        assert fake.peak == 3
+
+    def test_single_in_flight_is_serial(self):
+        fake = _FakeBatchCall()
+        with _app(EMBED_MAX_IN_FLIGHT=1).app_context():
+            embed_batches(_texts(40), fake, batch_size=10)
+        assert fake.peak == 1
+
+    def test_retryable_failure_is_retried(self):
+        fake = _FakeBatchCall()
+        fake.failures["10"] = [_HTTPError(429), _HTTPError(503)]
+        with _app(EMBED_MAX_RETRIES=3).app_context():
+            vectors = embed_batches(_texts(30), fake, batch_size=10)
+        assert vectors == [[float(i)] for i in range(30)]
+        assert fake.calls == 5
+
+    def test_retries_are_bounded(self):
+        fake = _FakeBatchCall()
+        fake.failures["0"] = [_HTTPError(500)] * 5
+        with (
+            _app(EMBED_MAX_RETRIES=2).app_context(),
+            pytest.raises(_HTTPError),
+        ):
+            embed_batches(_texts(10), fake, batch_size=10)
+        assert fake.calls == 3
+
+    def test_client_errors_are_not_retried(self):
+        fake = _FakeBatchCall()
+        fake.failures["0"] = [_HTTPError(400)]
+        with pytest.raises(_HTTPError):
+            embed_batches(_texts(10), fake, batch_size=10)
+        assert fake.calls == 1
+
+    def test_progress_counts_texts(self):
+        seen: list[tuple[int, int]] = []
+        embed_batches(
+            _texts(25),
+            _FakeBatchCall(),
+            batch_size=10,
+            on_progress=lambda done, total: seen.append((done, total)),
+        )
+        # Batches finish in any order; the running count still ends at total.
+        assert len(seen) == 3
+        assert [done for done, _ in seen] == sorted(done for done, _ in seen)
+        assert seen[-1] == (25, 25)
+
+    def test_empty_input(self):
+        fake = _FakeBatchCall()
+        assert embed_batches([], fake, batch_size=10) == []
+        assert fake.calls == 0
+
+
+class TestIsRetryable:
+    @pytest.mark.parametrize("status", [408, 429, 500, 503])
+    def test_transient_statuses(self, status):
+        assert is_retryable(_HTTPError(status))
+
+    def test_gemini_style_code_attribute(self):
+        exc = Exception("quota")
+        exc.code = 429  # type: ignore[attr-defined]
+        assert is_retryable(exc)
+
+    def test_other_errors(self):
+        assert not is_retryable(_HTTPError(401))
+        assert not is_retryable(ValueError("bad input"))
+        assert is_retryable(TimeoutError())
+
+    @pytest.mark.parametrize(
+        "exc",
+        [
+            httpx.ConnectError("reset"),
+            httpx.ReadTimeout("slow"),
+            httpx.RemoteProtocolError("stream closed"),
+        ],
+    )
+    def test_httpx_transport_errors(self, exc):
+        assert is_retryable(exc)
+
+    def test_non_transient_httpx_error(self):
+        assert not is_retryable(httpx.UnsupportedProtocol("ftp"))
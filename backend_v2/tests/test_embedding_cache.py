@@ -0,0 +1,194 @@
+"""Content-addressed embedding cache and its use in ``LLMClient.embed``.
+
+The provider and the ``embedding_cache`` table are fakes, so the tests count
+exactly which texts would have reached the embedding API.
+"""
+
+from typing import Any
+
+import pytest
+
+from aeva.llm.embedding_cache import (
+    EmbeddingCache,
+    embedding_cache_stats,
+    reset_embedding_cache,
+    text_sha256,
+)
+from aeva.llm.llm_client import LLMClient
+from aeva.llm.providers.base import LLMProvider
+
+
+class _FakeProvider(LLMProvider):
+    def __init__(self) -> None:
+        super().__init__("embed-model")
+        self.embedded: list[list[str]] = []
+
+    def generate(self, *_: Any, **__: Any) -> str:
+        raise NotImplementedError
+
+    def generate_structured(self, *_: Any, **__: Any) -> dict[str, Any]:
+        raise NotImplementedError
+
+    def generate_stream(self, *_: Any, **__: Any) -> Any:
+        raise NotImplementedError
+
+    def embed(
+        self,
+        texts: list[str],
+        *,
+        task_type: str = "RETRIEVAL_DOCUMENT",
+        output_dimensionality: int = 768,
+        on_progress: Any = None,
+    ) -> list[list[float]]:
+        self.embedded.append(list(texts))
+        if on_progress is not None:
+            on_progress(len(texts), len(texts))
+        return [[float(len(t)), float(output_dimensionality)] for t in texts]
+
+
+class _FakeStore:
+    """Stands in for SupabaseService's embedding-cache table methods."""
+
+    def __init__(self, *, broken: bool = False) -> None:
+        self.rows: dict[tuple[str, int, str, str], list[float]] = {}
+        self.broken = broken
+        self.lookups = 0
+
+    def get_cached_embeddings(
+        self, model: str, dimensions: int, task_type: str, hashes: list[str]
+    ) -> dict[str, list[float]]:
+        self.lookups += 1
+        if self.broken:
+            msg = 'relation "embedding_cache" does not exist'
+            raise RuntimeError(msg)
+        return {
+            h: self.rows[model, dimensions, task_type, h]
+            for h in hashes
+            if (model, dimensions, task_type, h) in self.rows
+        }
+
+    def save_cached_embeddings(self, rows: list[dict[str, Any]]) -> None:
+        if self.broken:
+            raise RuntimeError
+        for row in rows:
+            key = (
+                row["model"],
+                row["dimensions"],
+                row["task_type"],
+                row["text_sha256"],
+            )
+            self.rows[key] = row["embedding"]
+
+
+def _client() -> tuple[LLMClient, _FakeProvider]:
+    provider = _FakeProvider()
+    client = object.__new__(LLMClient)
+    client._config_key = "LLM_EMBEDDING_MODEL"
+    client._provider = provider
+    return client, provider
+
+
+@pytest.fixture
+def store():
+    fake = _FakeStore()
+    reset_embedding_cache(EmbeddingCache(64, supabase=fake))  # type: ignore[arg-type]
+    yield fake
+    reset_embedding_cache()
+
+
+class TestLLMClientEmbedCache:
+    def test_repeat_query_hits_memory(self, store):
+        client, provider = _client()
+        first = client.embed(["what is osmosis"], task_type="RETRIEVAL_QUERY")
+        second = client.embed(["what is osmosis"], task_type="RETRIEVAL_QUERY")
+        assert first == second
+        assert provider.embedded == [["what is osmosis"]]
+
+    def test_duplicates_in_one_call_embed_once(self, store):
+        client, provider = _client()
+        vectors = client.embed(["a", "bb", "a"])
+        assert provider.embedded == [["a", "bb"]]
+        assert vectors[0] == vectors[2]
+        assert len(vectors) == 3
+
+    def test_reindex_after_restart_costs_nothing(self, store):
+        client, _ = _client()
+        original = client.embed(["chunk one", "chunk two"])
+        # A new worker: empty memory tier, same table.
+        reset_embedding_cache(EmbeddingCache(64, supabase=store))  # type: ignore[arg-type]
+        client, provider = _client()
+        assert client.embed(["chunk one", "chunk two"]) == original
+        assert provider.embedded == []
+
+    def test_key_includes_task_and_dimensions(self, store):
+        client, provider = _client()
+        client.embed(["x"], task_type="RETRIEVAL_QUERY")
+        client.embed(["x"], task_type="RETRIEVAL_DOCUMENT")
+        client.embed(["x"], output_dimensionality=256)
+        assert len(provider.embedded) == 3
+
+    def test_partial_hit_keeps_order_and_progress(self, store):
+        client, provider = _client()
+        client.embed(["b"])
+        seen: list[tuple[int, int]] = []
+        vectors = client.embed(
+            ["a", "b", "ccc"],
+            on_progress=lambda done, total: seen.append((done, total)),
+        )
+        assert provider.embedded[-1] == ["a", "ccc"]
+        assert [v[0] for v in vectors] == [1.0, 1.0, 3.0]
+        assert seen == [(3, 3)]
+
+    def test_stats_split_by_tier(self, store):
+        client, _ = _client()
+        client.embed(["p", "q"])
+        client.embed(["p"])
+        stats = embedding_cache_stats()
+        assert (stats["memory_hits"], stats["misses"]) == (1, 2)
+        assert stats["hit_rate"] == 0.333
+
+        reset_embedding_cache(EmbeddingCache(64, supabase=store))  # type: ignore[arg-type]
+        client.embed(["q"])
+        assert embedding_cache_stats()["store_hits"] == 1
+
+
+class TestEmbeddingCacheTiers:
+    def test_table_keyed_by_text_hash(self):
+        store = _FakeStore()
+        cache = EmbeddingCache(8, supabase=store)  # type: ignore[arg-type]
+        cache.store("m", 768, "RETRIEVAL_DOCUMENT", ["hello"], [[1.0]])
+        key = ("m", 768, "RETRIEVAL_DOCUMENT", text_sha256("hello"))
+        assert key in store.rows
+
+    def test_queries_never_touch_table(self):
+        store = _FakeStore()
+        cache = EmbeddingCache(8, supabase=store)  # type: ignore[arg-type]
+        assert cache.lookup("m", 768, "RETRIEVAL_QUERY", ["q"]) == [None]
+        cache.store("m", 768, "RETRIEVAL_QUERY", ["q"], [[1.0]])
+        assert cache.lookup("m", 768, "RETRIEVAL_QUERY", ["q"]) == [[1.0]]
+        assert store.rows == {}
+        assert store.lookups == 0
+
+    def test_hits_are_copies(self):
+        cache = EmbeddingCache(8, persist=False)
+        cache.store("m", 768, "Q", ["hello"], [[1.0, 2.0]])
+        hit = cache.lookup("m", 768, "Q", ["hello"])[0]
+        assert hit is not None
+        hit[0] = 99.0
+        assert cache.lookup("m", 768, "Q", ["hello"]) == [[1.0, 2.0]]
+
+    def test_broken_table_degrades_to_memory(self):
+        cache = EmbeddingCache(8, supabase=_FakeStore(broken=True))  # type: ignore[arg-type]
+        assert cache.lookup("m", 768, "Q", ["hello"]) == [None]
+        cache.store("m", 768, "Q", ["hello"], [[1.0]])
+        assert cache.lookup("m", 768, "Q", ["hello"]) == [[1.0]]
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_persist_off_never_touches_table(self):
+        store = _FakeStore(broken=True)
+        cache = EmbeddingCache(8, persist=False, supabase=store)  # type: ignore[arg-type]
+        cache.store("m", 768, "Q", ["hello"], [[1.0]])
+        assert cache.lookup("m", 768, "Q", ["hello", "x"]) == [[1.0], None]
@@ -0,0 +1,140 @@
+"""Gemini file-handle reuse (``gemini_files``) through ``GeminiProvider``.
+
+The google-genai client is a fake that counts ``files.upload`` calls, so reuse
+and expiry are checked without network access.
+"""
+
+import threading
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from flask import Flask
+from google.genai import types
+
+from aeva.common.ttl_cache import TTLCache
+from aeva.llm.providers import gemini, gemini_files
+from aeva.llm.providers.gemini_files import (
+    file_registry_stats,
+    reset_file_registry,
+)
+
+
+class _Files:
+    def __init__(self) -> None:
+        self.uploads: list[bytes] = []
+        self.lock = threading.Lock()
+        self.expires_in = timedelta(hours=48)
+        self.state = types.FileState.ACTIVE
+        self.barrier: threading.Barrier | None = None
+
+    def upload(self, *, file: Any, config: Any) -> SimpleNamespace:
+        if self.barrier is not None:
+            self.barrier.wait()
+        data = file.read()
+        with self.lock:
+            self.uploads.append(data)
+            number = len(self.uploads)
+        return SimpleNamespace(
+            uri=f"files/{number}",
+            mime_type=config.mime_type,
+            expiration_time=datetime.now(UTC) + self.expires_in,
+            state=self.state,
+        )
+
+
+class _FakeClient:
+    files = _Files()
+
+    def __init__(self, api_key: str) -> None:
+        self.api_key = api_key
+
+
+@pytest.fixture
+def files(monkeypatch) -> Iterator[_Files]:
+    monkeypatch.setattr(_FakeClient, "files", _Files())
+    monkeypatch.setattr(gemini.genai, "Client", _FakeClient)
+    reset_file_registry(TTLCache(16, gemini_files._FILE_TTL_SECONDS))
+    yield _FakeClient.files
+    reset_file_registry()
+
+
+def _provider(api_key: str = "k1") -> gemini.GeminiProvider:
+    app = Flask(__name__)
+    app.config["GEMINI_API_KEY"] = api_key
+    with app.app_context():
+        return gemini.GeminiProvider("gemini-test")
+
+
+def _att(data: bytes, mime: str = "application/pdf") -> dict[str, Any]:
+    return {"data": data, "mime_type": mime}
+
+
+def _uris(contents: list[Any]) -> list[str]:
+    return [
+        part.file_data.file_uri
+        for part in contents[-1].parts
+        if part.file_data is not None
+    ]
+
+
+class TestFileReuse:
+    def test_repeated_turn_sends_only_uris(self, files):
+        provider = _provider()
+        attachments = [_att(b"a" * 10), _att(b"b" * 10), _att(b"c" * 10)]
+        first = _uris(provider._contents("q1", attachments))
+        again = _uris(provider._contents("q2", attachments))
+        assert len(files.uploads) == 3
+        assert again == first
+        assert file_registry_stats()["hits"] == 3
+
+    def test_new_bytes_upload_again(self, files):
+        provider = _provider()
+        provider._contents("q", [_att(b"v1")])
+        provider._contents("q", [_att(b"v2")])
+        assert files.uploads == [b"v1", b"v2"]
+
+    def test_duplicate_in_one_call_uploads_once(self, files):
+        uris = _uris(_provider()._contents("q", [_att(b"x"), _att(b"x")]))
+        assert len(files.uploads) == 1
+        assert uris[0] == uris[1]
+
+    def test_handles_keep_attachment_order(self, files):
+        provider = _provider()
+        provider._contents("q", [_att(b"second")])
+        uris = _uris(provider._contents("q", [_att(b"first"), _att(b"second")]))
+        assert uris == ["files/2", "files/1"]
+
+    def test_api_keys_do_not_share_files(self, files):
+        _provider("k1")._contents("q", [_att(b"x")])
+        _provider("k2")._contents("q", [_att(b"x")])
+        assert len(files.uploads) == 2
+
+    def test_nearly_expired_file_is_not_reused(self, files):
+        files.expires_in = timedelta(minutes=5)
+        provider = _provider()
+        provider._contents("q", [_att(b"x")])
+        provider._contents("q", [_att(b"x")])
+        assert len(files.uploads) == 2
+
+    def test_failed_upload_is_not_reused(self, files):
+        files.state = types.FileState.FAILED
+        provider = _provider()
+        provider._contents("q", [_att(b"x")])
+        provider._contents("q", [_att(b"x")])
+        assert len(files.uploads) == 2
+
+    def test_uploads_run_concurrently(self, files):
+        # Each upload blocks until all three are in flight at once.
+        files.barrier = threading.Barrier(3, timeout=5)
+        _provider()._contents("q", [_att(b"1"), _att(b"2"), _att(b"3")])
+        assert len(files.uploads) == 3
+
+    def test_size_zero_disables_reuse(self, files):
+        reset_file_registry(TTLCache(0, gemini_files._FILE_TTL_SECONDS))
+        provider = _provider()
+        provider._contents("q", [_att(b"x")])
+        provider._contents("q", [_att(b"x")])
+        assert len(files.uploads) == 2
@@ -0,0 +1,136 @@
+"""Hybrid (vector + full-text) retrieval for ``media_llm``.
+
+Covers the fusion and MMR helpers in ``aeva.media.retrieval`` and which
+search ``MediaLLMTool`` issues under ``RAG_RETRIEVAL``, against a fake
+Supabase. No database.
+"""
+
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from aeva.mcp.base import ToolContext
+from aeva.mcp.tools.media_llm import MediaLLMTool
+from aeva.media.retrieval import mmr_select, reciprocal_rank_fusion
+from aeva.supabase.supabase_service import SupabaseService
+
+
+def _row(chunk_id: str, content: str, score: float) -> dict[str, Any]:
+    return {"id": chunk_id, "content": content, "rrf_score": score}
+
+
+class TestReciprocalRankFusion:
+    def test_matches_the_sql_formula(self):
+        fused = dict(reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=60))
+        assert fused["b"] == pytest.approx(1 / 62 + 1 / 61)
+        assert fused["a"] == pytest.approx(1 / 61)
+        assert fused["c"] == pytest.approx(1 / 62)
+
+    def test_agreement_beats_a_single_top_rank(self):
+        fused = reciprocal_rank_fusion([["a", "b"], ["c", "b"]])
+        assert fused[0][0] == "b"
+
+
+class TestMMRSelect:
+    def test_pushes_near_duplicates_down(self):
+        rows = [
+            _row("a", "ohm's law states v equals i r", 1.0),
+            _row("b", "ohm's law states v equals i r here", 0.95),
+            _row("c", "resistivity depends on length and area", 0.8),
+        ]
+        assert [r["id"] for r in mmr_select(rows, 2)] == ["a", "c"]
+
+    def test_zero_diversity_keeps_fused_order(self):
+        rows = [_row(str(i), "same words", 1.0 - i / 10) for i in range(5)]
+        picked = mmr_select(rows, 3, diversity=0)
+        assert [r["id"] for r in picked] == ["0", "1", "2"]
+
+    def test_missing_scores_fall_back_to_rank(self):
+        rows = [{"id": str(i), "content": f"topic {i}"} for i in range(4)]
+        assert mmr_select(rows, 1)[0]["id"] == "0"
+
+
+class _FakeSupabase:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def match_chunks(self, *_: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        self.calls.append(("vector", kwargs))
+        return []
+
+    def match_chunks_hybrid(
+        self, _vector: Any, query: str, _user: str, **kwargs: Any
+    ) -> list[dict[str, Any]]:
+        self.calls.append(("hybrid", {"query": query, **kwargs}))
+        return [
+            _row(str(i), f"passage {i} " + "shared " * (i % 2), 1.0 - i / 100)
+            for i in range(kwargs["top_k"])
+        ]
+
+
+def _search(**config: Any) -> tuple[list[dict[str, Any]], _FakeSupabase]:
+    fake = _FakeSupabase()
+    tool = MediaLLMTool(supabase=fake)  # type: ignore[arg-type]
+    ctx = ToolContext(
+        user_id="u1",
+        session_id="s1",
+        message="q",
+        enriched_message="q",
+        media_ids=None,
+    )
+    app = Flask(__name__)
+    app.config.update({"RAG_TOP_K": 4, **config})
+    with app.app_context():
+        rows = tool._search(ctx, "what is KCL", [0.0], ["m1"])
+    return rows, fake
+
+
+class TestMediaToolSearch:
+    def test_vector_by_default(self):
+        _, fake = _search()
+        assert fake.calls == [("vector", {"media_ids": ["m1"], "top_k": 4})]
+
+    def test_hybrid_fetches_candidates_then_picks_top_k(self):
+        rows, fake = _search(RAG_RETRIEVAL="hybrid", RAG_HYBRID_CANDIDATES=12)
+        kind, call = fake.calls[0]
+        assert kind == "hybrid"
+        assert call["query"] == "what is KCL"
+        assert call["top_k"] == 12
+        assert len(rows) == 4
+
+
+class _RPCClient:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def rpc(self, name: str, params: dict[str, Any]) -> Any:
+        self.calls.append((name, params))
+        result = type("Result", (), {"data": []})()
+        return type("Request", (), {"execute": lambda _self: result})()
+
+
+@pytest.mark.parametrize(
+    ("transport", "function", "vector_param"),
+    [
+        ("text", "match_media_chunks_hybrid", "query_embedding"),
+        ("packed", "match_media_chunks_hybrid_packed", "query_packed"),
+    ],
+)
+def test_hybrid_rpc_follows_vector_transport(
+    monkeypatch, transport, function, vector_param
+):
+    client = _RPCClient()
+    monkeypatch.setattr(SupabaseService, "client", property(lambda _: client))
+    app = Flask(__name__)
+    app.config["VECTOR_TRANSPORT"] = transport
+    with app.app_context():
+        SupabaseService().match_chunks_hybrid(
+            [0.5], "kcl", "u1", media_ids=["m1"], top_k=30
+        )
+    name, params = client.calls[0]
+    assert name == function
+    assert vector_param in params
+    assert params["query_text"] == "kcl"
+    assert params["match_count"] == 30
+    assert params["p_media_ids"] == ["m1"]
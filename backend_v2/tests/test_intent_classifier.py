@@ -0,0 +1,213 @@
+"""Offline intent classifier tier (``aeva.orchestration.intent_classifier``).
+
+A tiny labelled corpus stands in for logged planner decisions; the
+orchestrator tests stub the planner so they show which turns the classifier
+takes and which still fall through to the LLM.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from aeva.feature_flag import feature_flag_service
+from aeva.orchestration.assistant_orchestrator import AssistantOrchestrator
+from aeva.orchestration.intent_classifier import (
+    IntentClassifier,
+    reset_intent_classifier,
+    turns_from_messages,
+)
+from aeva.orchestration.models import AssistantContext
+
+_TURNS = [
+    ("explain photosynthesis", "general"),
+    ("what is osmosis", "general"),
+    ("explain newton's second law", "general"),
+    ("what is a prime number", "general"),
+    ("latest news on the election", "web_search"),
+    ("today's weather in delhi", "web_search"),
+    ("latest ipl score today", "web_search"),
+    ("quiz me on cells", "quiz_generator"),
+    ("give me a quiz on fractions", "quiz_generator"),
+    ("quiz me on the mughal empire", "quiz_generator"),
+    ("summarise my uploaded notes", "media_llm"),
+    ("summarise the uploaded pdf", "media_llm"),
+]
+
+
+class _Registry:
+    def list_definitions(self) -> list[SimpleNamespace]:
+        return [
+            SimpleNamespace(name=n)
+            for n in ("general", "web_search", "quiz_generator", "media_llm")
+        ]
+
+
+@pytest.fixture(autouse=True)
+def _flags(monkeypatch):
+    monkeypatch.setattr(feature_flag_service, "get_flags", dict)
+    yield
+    reset_intent_classifier()
+
+
+def _install(threshold: float) -> IntentClassifier:
+    model = IntentClassifier.train(_TURNS, threshold=threshold)
+    reset_intent_classifier(model)
+    return model
+
+
+def _plan(message: str, **ctx: object) -> dict | None:
+    orch = AssistantOrchestrator(registry=_Registry())  # type: ignore[arg-type]
+    context = AssistantContext(
+        user_id="u1", session_id="s1", message=message, **ctx
+    )
+    return orch._classified_plan(context, message, [])
+
+
+class TestIntentClassifier:
+    def test_predicts_trained_intents(self):
+        model = IntentClassifier.train(_TURNS)
+        assert model.predict("quiz me on photosynthesis")[0] == "quiz_generator"
+        assert model.predict("latest score today")[0] == "web_search"
+        assert model.predict("explain osmosis")[0] == "general"
+
+    def test_unroutable_label_never_routes(self):
+        model = IntentClassifier.train(_TURNS, threshold=0.0)
+        assert model.predict("summarise my uploaded pdf")[0] == "media_llm"
+        assert model.route("summarise my uploaded pdf", {"media_llm"}) is None
+
+    def test_disabled_tool_never_routes(self):
+        model = IntentClassifier.train(_TURNS, threshold=0.0)
+        assert model.route("quiz me on cells", {"general"}) is None
+
+    def test_unknown_words_fall_back_to_priors(self):
+        model = IntentClassifier.train(_TURNS)
+        _, confidence = model.predict("zzz qqq")
+        assert confidence < 0.5
+
+    def test_round_trip(self, tmp_path):
+        model = IntentClassifier.train(_TURNS)
+        model.save(tmp_path / "m.json")
+        loaded = IntentClassifier.load(tmp_path / "m.json", threshold=0.5)
+        assert loaded.threshold == 0.5
+        for message, _ in _TURNS:
+            assert loaded.predict(message) == pytest.approx(
+                model.predict(message)
+            )
+
+    def test_empty_corpus_is_rejected(self):
+        with pytest.raises(ValueError, match="zero turns"):
+            IntentClassifier.train([])
+
+
+class TestTurnsFromMessages:
+    def test_pairs_user_with_next_reply(self):
+        rows = [
+            {"session_id": "a", "role": "user", "content": "hi"},
+            {
+                "session_id": "a",
+                "role": "assistant",
+                "metadata": {"tool_used": "general", "plan_source": "planner"},
+            },
+            {"session_id": "a", "role": "user", "content": "explain this"},
+            {
+                "session_id": "a",
+                "role": "assistant",
+                "metadata": {
+                    "status": "clarification_required",
+                    "plan_source": "planner",
+                },
+            },
+            # The answer to a clarification has no user row before it.
+            {
+                "session_id": "a",
+                "role": "assistant",
+                "metadata": {"tool_used": "general", "plan_source": "planner"},
+            },
+            {"session_id": "a", "role": "user", "content": "dangling"},
+            {
+                "session_id": "b",
+                "role": "assistant",
+                "metadata": {"tool_used": "general", "plan_source": "planner"},
+            },
+        ]
+        assert turns_from_messages(rows) == [
+            ("hi", "general"),
+            ("explain this", "clarify"),
+        ]
+
+    def test_non_planner_sources_are_skipped(self):
+        def reply(source: str) -> dict:
+            return {
+                "session_id": "a",
+                "role": "assistant",
+                "metadata": {
+                    "tool_used": "quiz_generator",
+                    "plan_source": source,
+                },
+            }
+
+        user = {"session_id": "a", "role": "user", "content": "quiz"}
+        rows = [
+            user, reply("forced"), user, reply("classifier"),
+            user, reply("plan_cache"),
+        ]
+        assert turns_from_messages(rows) == [("quiz", "quiz_generator")]
+
+    def test_rows_without_a_source_are_skipped(self):
+        user = {"session_id": "a", "role": "user", "content": "quiz"}
+        traced = {
+            "tool_used": "quiz_generator",
+            "content": {"debug": {"plan_source": "planner"}},
+        }
+        rows = [
+            user,
+            {"session_id": "a", "role": "assistant", "metadata": traced},
+            user,
+            {
+                "session_id": "a",
+                "role": "assistant",
+                "metadata": {"tool_used": "general"},
+            },
+            user,
+            {
+                "session_id": "a",
+                "role": "assistant",
+                "metadata": {"status": "clarification_required"},
+            },
+        ]
+        assert turns_from_messages(rows) == [("quiz", "quiz_generator")]
+
+
+class TestClassifiedPlan:
+    def test_confident_turn_skips_planner(self):
+        _install(0.6)
+        plan = _plan("quiz me on fractions")
+        assert plan == {
+            "action": "run_tool",
+            "tool": {
+                "name": "quiz_generator",
+                "params": {"topic": "quiz me on fractions"},
+            },
+        }
+        assert _plan("what is photosynthesis")["tool"]["params"] == {
+            "query": "what is photosynthesis"
+        }
+
+    def test_below_threshold_falls_back(self):
+        _install(0.999999)
+        assert _plan("what is gravity") is None
+
+    def test_off_without_a_model(self):
+        assert _plan("quiz me on fractions") is None
+
+    @pytest.mark.parametrize(
+        "ctx",
+        [{"media_ids": ["m1"]}, {"source_content": "card text"}],
+    )
+    def test_grounded_turns_need_the_planner(self, ctx):
+        _install(0.0)
+        assert _plan("quiz me on fractions", **ctx) is None
+
+    def test_unresolved_reference_needs_the_planner(self):
+        _install(0.0)
+        assert _plan("explain this") is None
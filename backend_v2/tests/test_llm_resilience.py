@@ -0,0 +1,256 @@
+"""Failover, circuit breakers and hedging (``aeva.llm.resilience``).
+
+Providers are scripted fakes: each call sleeps, then answers or raises. A
+429 is any exception carrying ``status_code=429``, which is what
+``embedding.is_retryable`` looks at.
+"""
+
+import threading
+import time
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from aeva.common.errors import CustomError
+from aeva.llm import resilience
+from aeva.llm.llm_client import LLMClient
+from aeva.llm.providers import factory
+from aeva.llm.providers.base import LLMProvider, token_usage
+from aeva.llm.resilience import (
+    Attempt,
+    CircuitBreaker,
+    ResiliencePolicy,
+    run_with_failover,
+)
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+
+class _BadRequest(Exception):
+    status_code = 400
+
+
+class _Scripted(LLMProvider):
+    """Sleeps ``delays[model]`` s, then raises ``errors[model]`` or answers."""
+
+    delays: dict[str, float] = {}
+    errors: dict[str, BaseException] = {}
+
+    def __init__(self, model: str) -> None:
+        super().__init__(model)
+        self.calls = 0
+        self.closed = threading.Event()
+
+    def _answer(self) -> str:
+        self.calls += 1
+        time.sleep(self.delays.get(self.model, 0))
+        error = self.errors.get(self.model)
+        if error is not None:
+            raise error
+        self.last_sources = [{"title": self.model}]
+        self.last_usage = token_usage(10, 0, 1)
+        return self.model
+
+    def generate(self, *args: Any, **kwargs: Any) -> str:
+        return self._answer()
+
+    def generate_structured(self, *args: Any, **kwargs: Any) -> dict:
+        return {"model": self._answer()}
+
+    def generate_stream(self, *args: Any, **kwargs: Any):
+        try:
+            yield self._answer()
+            yield "!"
+        finally:
+            self.closed.set()
+
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    monkeypatch.setattr(_Scripted, "delays", {})
+    monkeypatch.setattr(_Scripted, "errors", {})
+    resilience.reset_breakers()
+    yield
+    resilience.reset_breakers()
+
+
+def _attempts(*models: str) -> list[Attempt]:
+    return [Attempt("fake", _Scripted(model)) for model in models]
+
+
+def _generate(provider: LLMProvider) -> str:
+    return provider.generate("q")
+
+
+POLICY = ResiliencePolicy(failover=True, attempt_timeout_seconds=5)
+
+
+class TestFailover:
+    def test_transient_error_moves_to_the_next_attempt(self):
+        _Scripted.errors["a"] = _RateLimited("slow down")
+        attempt, value = run_with_failover(
+            _attempts("a", "b"), _generate, policy=POLICY
+        )
+        assert (attempt.label, value) == ("fake:b", "b")
+
+    def test_real_error_is_raised_at_once(self):
+        _Scripted.errors["a"] = _BadRequest("bad schema")
+        attempts = _attempts("a", "b")
+        with pytest.raises(_BadRequest):
+            run_with_failover(attempts, _generate, policy=POLICY)
+        assert attempts[1].provider.calls == 0
+
+    def test_last_transient_error_is_raised_when_all_fail(self):
+        _Scripted.errors.update(a=_RateLimited("a"), b=_RateLimited("b"))
+        with pytest.raises(_RateLimited, match="b"):
+            run_with_failover(_attempts("a", "b"), _generate, policy=POLICY)
+
+    def test_slow_attempt_times_out_and_fails_over(self):
+        _Scripted.delays["a"] = 1.0
+        policy = ResiliencePolicy(failover=True, attempt_timeout_seconds=0.1)
+        start = time.monotonic()
+        attempt, _ = run_with_failover(
+            _attempts("a", "b"), _generate, policy=policy
+        )
+        assert attempt.label == "fake:b"
+        assert time.monotonic() - start < 0.8
+
+    def test_budget_caps_the_whole_call(self):
+        _Scripted.delays.update(a=1.0, b=1.0)
+        policy = ResiliencePolicy(
+            failover=True, budget_seconds=0.2, attempt_timeout_seconds=0.15
+        )
+        with pytest.raises(CustomError):
+            run_with_failover(_attempts("a", "b"), _generate, policy=policy)
+
+
+class TestHedging:
+    def test_fast_second_attempt_wins(self):
+        _Scripted.delays["a"] = 1.0
+        policy = ResiliencePolicy(failover=True, hedge_after_ms=50)
+        start = time.monotonic()
+        attempt, _ = run_with_failover(
+            _attempts("a", "b"), _generate, policy=policy
+        )
+        assert attempt.label == "fake:b"
+        assert time.monotonic() - start < 0.8
+
+    def test_no_hedge_when_the_first_answers_in_time(self):
+        policy = ResiliencePolicy(failover=True, hedge_after_ms=500)
+        attempts = _attempts("a", "b")
+        run_with_failover(attempts, _generate, policy=policy)
+        assert attempts[1].provider.calls == 0
+
+    def test_late_loser_is_discarded(self):
+        _Scripted.delays["a"] = 0.3
+        policy = ResiliencePolicy(failover=True, hedge_after_ms=50)
+        discarded = threading.Event()
+        run_with_failover(
+            _attempts("a", "b"),
+            _generate,
+            policy=policy,
+            discard=lambda _: discarded.set(),
+        )
+        assert discarded.wait(2)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures_then_probes(self):
+        breaker = CircuitBreaker(2, cooldown=0.05)
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        time.sleep(0.06)
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_open_breaker_is_skipped(self):
+        resilience.get_breaker("fake", "a").failures = 1
+        resilience.get_breaker("fake", "a").record_failure()
+        attempts = _attempts("a", "b")
+        attempt, _ = run_with_failover(attempts, _generate, policy=POLICY)
+        assert attempt.label == "fake:b"
+        assert attempts[0].provider.calls == 0
+
+    def test_first_attempt_runs_when_every_breaker_is_open(self):
+        for model in ("a", "b"):
+            breaker = resilience.get_breaker("fake", model)
+            breaker.failures = 1
+            breaker.record_failure()
+        attempt, _ = run_with_failover(
+            _attempts("a", "b"), _generate, policy=POLICY
+        )
+        assert attempt.label == "fake:a"
+        assert resilience.breaker_stats()["fake:a"] == "closed"
+
+
+def _app(**config: Any) -> Flask:
+    app = Flask(__name__)
+    app.config.update(
+        {
+            "LLM_PROVIDER": "gemini",
+            "LLM_MODEL": "a",
+            "GEMINI_API_KEY": "k",
+            "GROQ_API_KEY": "k",
+            "LLM_FAILOVER": True,
+            "LLM_ATTEMPT_TIMEOUT_SECONDS": 5,
+            **config,
+        }
+    )
+    return app
+
+
+@pytest.fixture
+def pooled(monkeypatch):
+    monkeypatch.setitem(factory.PROVIDERS, "gemini", _Scripted)
+    monkeypatch.setitem(factory.PROVIDERS, "groq", _Scripted)
+    factory.clear_pool()
+    yield
+    factory.clear_pool()
+
+
+class TestLLMClient:
+    def test_policy_from_config(self):
+        models = ["groq:x", "bad", "openai:o:1"]
+        with _app(LLM_FAILOVER_MODELS=models).app_context():
+            policy = ResiliencePolicy.from_config()
+        assert policy.failover
+        assert policy.failover_models == (("groq", "x"), ("openai", "o:1"))
+        assert not ResiliencePolicy.from_config().failover
+
+    def test_sources_follow_the_serving_provider(self, pooled):
+        _Scripted.errors["a"] = _RateLimited("a")
+        with _app().app_context():
+            client = LLMClient(fallback_models=["b"])
+            assert client.generate("q") == "b"
+        assert client.last_sources == [{"title": "b"}]
+        assert client.model == "a"
+
+    def test_cross_vendor_model_is_tried_last(self, pooled):
+        _Scripted.errors.update(a=_RateLimited("a"), b=_RateLimited("b"))
+        with _app(LLM_FAILOVER_MODELS=["groq:c"]).app_context():
+            client = LLMClient(fallback_models=["b"])
+            assert client.generate_structured("q", {}) == {"model": "c"}
+
+    def test_stream_switches_before_the_first_chunk_only(self, pooled):
+        _Scripted.delays["a"] = 0.5
+        with _app(LLM_HEDGE_AFTER_MS=50).app_context():
+            client = LLMClient(fallback_models=["b"])
+            chunks = list(client.generate_stream("q"))
+            loser = factory.get_provider(model="a")
+        assert chunks == ["b", "!"]
+        assert loser.closed.wait(2)
+
+    def test_disabled_failover_calls_the_provider_directly(self, pooled):
+        _Scripted.errors["a"] = _RateLimited("a")
+        with _app(LLM_FAILOVER=False).app_context():
+            client = LLMClient(fallback_models=["b"])
+            with pytest.raises(_RateLimited):
+                client.generate("q")
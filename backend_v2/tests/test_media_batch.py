@@ -0,0 +1,186 @@
+"""Batched media record resolution and concurrent attachment downloads.
+
+A fake PostgREST chain applies the ``in_``/``eq`` filters it is given and
+counts queries; the fake storage records how many downloads overlap. No
+network.
+"""
+
+import threading
+import time
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from aeva.mcp.base import ToolContext
+from aeva.mcp.tools.media_llm import MediaLLMTool
+from aeva.media.attachment_cache import AttachmentCache, reset_attachment_cache
+from aeva.media.attachments import download_attachments
+from aeva.orchestration.assistant_orchestrator import AssistantOrchestrator
+from aeva.orchestration.models import AssistantContext
+from aeva.supabase.supabase_service import SupabaseService
+
+_MB = 1 << 20
+
+
+def _row(media_id: str, mime: str = "application/pdf", mb: int = 1) -> dict:
+    return {
+        "id": media_id,
+        "user_id": "u1",
+        "file_name": f"{media_id}.pdf",
+        "mime_type": mime,
+        "storage_path": f"u1/{media_id}",
+        "size_bytes": mb * _MB,
+    }
+
+
+class _Result:
+    def __init__(self, data: Any) -> None:
+        self.data = data
+
+
+class _Query:
+    def __init__(self, rows: list[dict[str, Any]], log: list[str]) -> None:
+        self._rows = rows
+        self._log = log
+        self.columns = "*"
+
+    def select(self, columns: str) -> "_Query":
+        self.columns = columns
+        return self
+
+    def in_(self, column: str, values: list[str]) -> "_Query":
+        self._rows = [r for r in self._rows if r[column] in values]
+        return self
+
+    def eq(self, column: str, value: str) -> "_Query":
+        self._rows = [r for r in self._rows if r[column] == value]
+        return self
+
+    def execute(self) -> _Result:
+        self._log.append(self.columns)
+        return _Result(self._rows)
+
+
+class _Service(SupabaseService):
+    """Real query-building methods over an in-memory ``media`` table."""
+
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = rows
+        self.queries: list[str] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:  # type: ignore[override]
+        service = self
+
+        class _Client:
+            def table(self, _name: str) -> _Query:
+                return _Query(service.rows, service.queries)
+
+        return _Client()
+
+    def get_media(self, *_: Any) -> dict[str, Any] | None:
+        raise AssertionError
+
+    def download_file(self, storage_path: str) -> bytes:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.03)
+        with self._lock:
+            self.active -= 1
+        return storage_path.encode()
+
+
+def _library() -> list[dict[str, Any]]:
+    return [
+        _row("a"),
+        _row("b", "image/png"),
+        _row("c", "text/plain"),
+        _row("d"),
+        {**_row("x"), "user_id": "someone-else"},
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _no_cache():
+    reset_attachment_cache(AttachmentCache(0))
+    yield
+    reset_attachment_cache()
+
+
+class TestGetMediaMany:
+    def test_one_query_in_request_order(self):
+        service = _Service(_library())
+        rows = service.get_media_many(["d", "a", "x", "a", "nope"], "u1")
+        assert [r["id"] for r in rows] == ["d", "a"]
+        assert len(service.queries) == 1
+
+    def test_no_ids_no_query(self):
+        service = _Service(_library())
+        assert service.get_media_many([], "u1") == []
+        assert service.queries == []
+
+    def test_column_subset_keeps_id(self):
+        service = _Service(_library())
+        service.get_media_many(["a"], "u1", columns="file_name")
+        assert service.queries == ["id,file_name"]
+
+
+class TestDownloadAttachments:
+    def test_concurrent_and_ordered(self):
+        service = _Service(_library())
+        with Flask(__name__).app_context():
+            attachments = download_attachments(
+                service, "u1", "s1", ["d", "c", "b", "a"]
+            )
+        assert [a["data"] for a in attachments] == [b"u1/d", b"u1/b", b"u1/a"]
+        assert attachments[1]["mime_type"] == "image/png"
+        assert service.peak > 1
+        assert len(service.queries) == 1
+
+    def test_byte_budget_skips_overflow(self):
+        service = _Service([_row("a", mb=3), _row("b", mb=3), _row("c", mb=1)])
+        app = Flask(__name__)
+        app.config["ATTACHMENT_BUDGET_MB"] = 4
+        with app.app_context():
+            attachments = download_attachments(
+                service, "u1", "s1", ["a", "b", "c"]
+            )
+        assert [a["data"] for a in attachments] == [b"u1/a", b"u1/c"]
+
+    def test_first_file_always_goes(self):
+        service = _Service([_row("big", mb=9)])
+        app = Flask(__name__)
+        app.config["ATTACHMENT_BUDGET_MB"] = 1
+        with app.app_context():
+            attachments = download_attachments(service, "u1", "s1", ["big"])
+        assert len(attachments) == 1
+
+
+class TestCallers:
+    def test_media_tool_resolves_in_one_query(self):
+        service = _Service(_library())
+        tool = MediaLLMTool(supabase=service)
+        ctx = ToolContext(
+            user_id="u1",
+            session_id="s1",
+            message="q",
+            enriched_message="q",
+            media_ids=None,
+        )
+        records = tool._candidate_records(ctx, ["a", "b", "d"])
+        assert [r["id"] for r in records] == ["a", "b", "d"]
+        assert len(service.queries) == 1
+
+    def test_selected_media_reads_only_the_selection(self):
+        service = _Service(_library())
+        orch = AssistantOrchestrator(supabase=service)
+        ctx = AssistantContext(
+            user_id="u1", session_id="s1", message="q", media_ids=["b", "x"]
+        )
+        assert orch._selected_media(ctx) == [{"id": "b", "name": "b.pdf"}]
+        assert service.queries == ["id,file_name"]
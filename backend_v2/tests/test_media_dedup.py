@@ -0,0 +1,132 @@
+"""Cloning an identical, already-indexed document in ``MediaProcessor``.
+
+The Supabase and LlamaParse clients are fakes; the tests check that a known
+content hash skips parsing and embedding entirely, and that anything short
+of a clean clone falls back to the normal pipeline.
+"""
+
+from typing import Any
+
+from flask import Flask
+
+from aeva.media.media_processor import MediaProcessingError, MediaProcessor
+
+
+class _FakeSupabase:
+    def __init__(self, donor: dict[str, Any] | None, cloned: int = 12) -> None:
+        self.donor = donor
+        self.cloned = cloned
+        self.lookups: list[tuple[str, str, str]] = []
+        self.copies: list[tuple[str, str]] = []
+        self.updates: list[dict[str, Any]] = []
+
+    def find_indexed_media(
+        self, content_sha256: str, index_signature: str, exclude_id: str
+    ) -> dict[str, Any] | None:
+        self.lookups.append((content_sha256, index_signature, exclude_id))
+        return self.donor
+
+    def delete_storage_file(self, path: str) -> None:
+        pass
+
+    def copy_storage_file(self, source: str, target: str) -> None:
+        self.copies.append((source, target))
+
+    def clone_media_index(self, source: str, target: str, user_id: str) -> int:
+        return self.cloned
+
+    def update_media_processing(
+        self, media_id: str, user_id: str, **fields: Any
+    ) -> None:
+        self.updates.append(fields)
+
+
+class _NoParse:
+    """Disabled LlamaParse: reaching the parse stage raises."""
+
+    enabled = False
+
+
+_DONOR = {
+    "id": "donor",
+    "page_count": 3,
+    "parsed_json_path": "u0/abc.parsed.json",
+    "parsed_md_path": "u0/abc.parsed.md",
+    "parsed_text_path": "u0/abc.parsed.txt",
+}
+
+
+def _record(**fields: Any) -> dict[str, Any]:
+    return {
+        "id": "m1",
+        "storage_path": "u1/new.pdf",
+        "processing_status": "pending",
+        "content_sha256": "f00d",
+        **fields,
+    }
+
+
+def _app(**config: Any) -> Flask:
+    app = Flask(__name__)
+    app.config.update({
+        "LLM_EMBEDDING_MODEL": "embed",
+        "RAG_EMBEDDING_DIM": 768,
+        "RAG_CHUNK_TOKENS": 512,
+        "RAG_CHUNK_OVERLAP": 64,
+        "MEDIA_DEDUP": True,
+        **config,
+    })
+    return app
+
+
+def _run(
+    supabase: _FakeSupabase, record: dict[str, Any], **config: Any
+) -> list[dict[str, Any]]:
+    """Events up to ``ready``, or up to the parse stage (marked ``parsed``)."""
+    processor = MediaProcessor(
+        supabase=supabase,  # type: ignore[arg-type]
+        llamaparse=_NoParse(),  # type: ignore[arg-type]
+    )
+    events: list[dict[str, Any]] = []
+    with _app(**config).app_context():
+        try:
+            events.extend(processor._run("u1", record))
+        except MediaProcessingError:
+            events.append({"stage": "parsed"})
+    return events
+
+
+class TestCloneKnownDocument:
+    def test_known_hash_is_cloned_without_parsing(self):
+        supabase = _FakeSupabase(_DONOR)
+        events = _run(supabase, _record())
+        assert events[-1]["stage"] == "ready"
+        assert supabase.lookups == [("f00d", "embed:768:512:64", "m1")]
+        assert ("u0/abc.parsed.md", "u1/new.parsed.md") in supabase.copies
+        final = supabase.updates[-1]
+        assert final["processing_status"] == "ready"
+        assert final["chunk_count"] == 12
+        assert final["page_count"] == 3
+        assert final["index_signature"] == "embed:768:512:64"
+        assert final["parsed_text_path"] == "u1/new.parsed.txt"
+
+    def test_unknown_hash_takes_the_normal_pipeline(self):
+        events = _run(_FakeSupabase(None), _record())
+        assert events[-1]["stage"] == "parsed"
+
+    def test_empty_clone_falls_back(self):
+        supabase = _FakeSupabase(_DONOR, cloned=0)
+        events = _run(supabase, _record())
+        assert events[-1]["stage"] == "parsed"
+        assert supabase.updates == []
+
+    def test_dedup_disabled_or_unhashed_never_looks_up(self):
+        supabase = _FakeSupabase(_DONOR)
+        _run(supabase, _record(), MEDIA_DEDUP=False)
+        _run(supabase, _record(content_sha256=None))
+        assert supabase.lookups == []
+
+    def test_resumed_index_run_is_not_cloned(self):
+        supabase = _FakeSupabase(_DONOR)
+        _run(supabase, _record(processing_status="indexing"))
+        assert supabase.lookups == []
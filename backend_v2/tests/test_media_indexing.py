@@ -0,0 +1,237 @@
+"""Streamed chunk -> embed -> insert indexing in ``MediaProcessor``.
+
+A synthetic multi-page document runs through ``_index_stream`` with a fake
+embedder and a fake Supabase, checking that work happens window by window
+and that a run interrupted mid-way resumes from its checkpoint.
+"""
+
+import threading
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from aeva.media.chunking import chunk_parsed_document, iter_chunks
+from aeva.media.llamaparse_service import ParsedDocument, ParsedPage
+from aeva.media.media_processor import MediaProcessingError, MediaProcessor
+
+
+def _doc(pages: int = 12) -> ParsedDocument:
+    parsed = [
+        ParsedPage(
+            page_number=n,
+            text="",
+            markdown="",
+            items=[
+                {"type": "heading", "lvl": 1, "value": f"Chapter {n}"},
+                {"type": "text", "value": f"Page {n} body. " * 60},
+            ],
+        )
+        for n in range(1, pages + 1)
+    ]
+    return ParsedDocument(
+        pages=parsed, markdown="", text="", page_count=pages, raw={}
+    )
+
+
+class _FakeEmbedder:
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+        self.threads: set[str] = set()
+
+    def embed(self, texts: list[str], **kwargs: Any) -> list[list[float]]:
+        self.calls.append(len(texts))
+        self.threads.add(threading.current_thread().name)
+        kwargs["on_progress"](len(texts), len(texts))
+        return [[0.0, 1.0] for _ in texts]
+
+
+class _FakeSupabase:
+    def __init__(self, fail_on_insert: int | None = None) -> None:
+        self.inserts: list[list[dict[str, Any]]] = []
+        self.trimmed: list[int] = []
+        self.fail_on_insert = fail_on_insert
+        self.media: dict[str, Any] = {}
+
+    def insert_media_chunks(self, rows: list[dict[str, Any]]) -> None:
+        if len(self.inserts) == self.fail_on_insert:
+            msg = "payload too large"
+            raise RuntimeError(msg)
+        self.inserts.append(rows)
+
+    def delete_media_chunks_from(
+        self, media_id: str, user_id: str, start_index: int
+    ) -> None:
+        self.trimmed.append(start_index)
+
+    def update_media_processing(
+        self, media_id: str, user_id: str, **fields: Any
+    ) -> None:
+        self.media.update(fields)
+
+
+def _app() -> Flask:
+    app = Flask(__name__)
+    app.config.update(
+        RAG_CHUNK_TOKENS=64,
+        RAG_CHUNK_OVERLAP=8,
+        RAG_INDEX_WINDOW=5,
+        RAG_EMBEDDING_DIM=2,
+    )
+    return app
+
+
+def _drain(gen: Any) -> tuple[list[dict[str, Any]], Any]:
+    events = []
+    while True:
+        try:
+            events.append(next(gen))
+        except StopIteration as stop:
+            return events, stop.value
+
+
+class TestIterChunks:
+    def test_matches_list_form(self):
+        doc = _doc()
+        assert list(
+            iter_chunks(doc, target_tokens=64, overlap_tokens=8)
+        ) == chunk_parsed_document(doc, target_tokens=64, overlap_tokens=8)
+
+    def test_is_lazy(self):
+        first = next(
+            iter_chunks(_doc(pages=500), target_tokens=64, overlap_tokens=8)
+        )
+        assert first.chunk_index == 0
+        assert first.page_number == 1
+
+    def test_overlap_not_below_target_still_terminates(self):
+        chunks = chunk_parsed_document(
+            _doc(pages=3), target_tokens=64, overlap_tokens=64
+        )
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+
+
+class TestIndexStream:
+    def test_embeds_and_inserts_window_by_window(self):
+        doc = _doc()
+        expected = chunk_parsed_document(
+            doc, target_tokens=64, overlap_tokens=8
+        )
+        embedder, supabase = _FakeEmbedder(), _FakeSupabase()
+        processor = MediaProcessor(
+            supabase=supabase,  # type: ignore[arg-type]
+            embed_llm=embedder,  # type: ignore[arg-type]
+        )
+        with _app().app_context():
+            events, count = _drain(processor._index_stream("u1", "m1", doc))
+
+        assert count == len(expected)
+        assert max(embedder.calls) <= 5
+        # Long embed jobs stay off the shared I/O pool chat turns rely on.
+        assert all(t.startswith("aeva-embed") for t in embedder.threads)
+        assert [len(rows) for rows in supabase.inserts] == embedder.calls
+        inserted = [row for rows in supabase.inserts for row in rows]
+        assert [r["chunk_index"] for r in inserted] == list(range(count))
+        pcts = [e["pct"] for e in events]
+        assert pcts == sorted(pcts)
+        assert pcts[-1] == 92
+
+    def test_checkpoints_every_window(self):
+        supabase = _FakeSupabase()
+        processor = MediaProcessor(
+            supabase=supabase,  # type: ignore[arg-type]
+            embed_llm=_FakeEmbedder(),  # type: ignore[arg-type]
+        )
+        with _app().app_context():
+            _, count = _drain(processor._index_stream("u1", "m1", _doc()))
+        assert supabase.media["indexed_chunk_count"] == count
+        assert len(supabase.media["indexed_batch_ids"]) == len(
+            supabase.inserts
+        )
+
+    def test_failure_after_checkpoint_is_recoverable(self):
+        supabase = _FakeSupabase(fail_on_insert=2)
+        processor = MediaProcessor(
+            supabase=supabase,  # type: ignore[arg-type]
+            embed_llm=_FakeEmbedder(),  # type: ignore[arg-type]
+        )
+        with (
+            _app().app_context(),
+            pytest.raises(MediaProcessingError) as raised,
+        ):
+            _drain(processor._index_stream("u1", "m1", _doc()))
+        assert raised.value.recoverable
+        assert len(supabase.media["indexed_batch_ids"]) == 2
+        assert supabase.trimmed == []
+
+    def test_failure_before_any_checkpoint_propagates(self):
+        processor = MediaProcessor(
+            supabase=_FakeSupabase(fail_on_insert=0),  # type: ignore[arg-type]
+            embed_llm=_FakeEmbedder(),  # type: ignore[arg-type]
+        )
+        with _app().app_context(), pytest.raises(RuntimeError):
+            _drain(processor._index_stream("u1", "m1", _doc()))
+
+    def test_resume_skips_checkpointed_windows(self):
+        doc = _doc()
+        first = _FakeSupabase(fail_on_insert=2)
+        processor = MediaProcessor(
+            supabase=first,  # type: ignore[arg-type]
+            embed_llm=_FakeEmbedder(),  # type: ignore[arg-type]
+        )
+        with _app().app_context(), pytest.raises(MediaProcessingError):
+            _drain(processor._index_stream("u1", "m1", doc))
+        done = list(first.media["indexed_batch_ids"])
+        already = sum(len(rows) for rows in first.inserts)
+
+        embedder, second = _FakeEmbedder(), _FakeSupabase()
+        processor = MediaProcessor(
+            supabase=second,  # type: ignore[arg-type]
+            embed_llm=embedder,  # type: ignore[arg-type]
+        )
+        with _app().app_context():
+            events, count = _drain(
+                processor._index_stream("u1", "m1", doc, done)
+            )
+
+        total = len(
+            chunk_parsed_document(doc, target_tokens=64, overlap_tokens=8)
+        )
+        assert count == total
+        assert sum(embedder.calls) == total - already
+        assert second.trimmed == [already]
+        resumed = [row for rows in second.inserts for row in rows]
+        assert resumed[0]["chunk_index"] == already
+        assert second.media["indexed_batch_ids"][:2] == done
+        assert events[0]["msg"] == f"Resuming after {already} passages…"
+
+    def test_changed_chunking_rebuilds_from_mismatch(self):
+        embedder, supabase = _FakeEmbedder(), _FakeSupabase()
+        processor = MediaProcessor(
+            supabase=supabase,  # type: ignore[arg-type]
+            embed_llm=embedder,  # type: ignore[arg-type]
+        )
+        with _app().app_context():
+            _, count = _drain(
+                processor._index_stream("u1", "m1", _doc(), ["0:stale"])
+            )
+        assert sum(embedder.calls) == count
+        assert supabase.trimmed == [0]
+
+    def test_empty_document_indexes_nothing(self):
+        doc = ParsedDocument(
+            pages=[ParsedPage(page_number=1, text="", markdown="")],
+            markdown="",
+            text="",
+            page_count=1,
+            raw={},
+        )
+        supabase = _FakeSupabase()
+        processor = MediaProcessor(
+            supabase=supabase,  # type: ignore[arg-type]
+            embed_llm=_FakeEmbedder(),  # type: ignore[arg-type]
+        )
+        with _app().app_context():
+            _, count = _drain(processor._index_stream("u1", "m1", doc))
+        assert count == 0
+        assert supabase.inserts == []
@@ -0,0 +1,134 @@
+"""Planner decision cache (``aeva.orchestration.plan_cache``).
+
+``_plan_turn`` is replaced by a counter, so the tests see exactly which turns
+would have paid for a planner LLM call.
+"""
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from aeva.feature_flag import feature_flag_service
+from aeva.orchestration.assistant_orchestrator import AssistantOrchestrator
+from aeva.orchestration.models import AssistantContext
+from aeva.orchestration.plan_cache import (
+    PlanCache,
+    plan_cache_stats,
+    reset_plan_cache,
+)
+
+_TOOLS = ["general", "quiz_generator", "web_search"]
+
+
+def _plan(name: str = "quiz_generator", **params: Any) -> dict[str, Any]:
+    return {"action": "run_tool", "tool": {"name": name, "params": params}}
+
+
+class _Registry:
+    def __init__(self, names: list[str]) -> None:
+        self.names = names
+
+    def list_definitions(self) -> list[SimpleNamespace]:
+        return [SimpleNamespace(name=n) for n in self.names]
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(feature_flag_service, "get_flags", dict)
+    fresh = PlanCache(16, 60)
+    reset_plan_cache(fresh)
+    yield fresh
+    reset_plan_cache()
+
+
+def _orchestrator(
+    plan: dict[str, Any], tools: list[str] = _TOOLS
+) -> tuple[AssistantOrchestrator, list[str]]:
+    orch = AssistantOrchestrator(registry=_Registry(tools))  # type: ignore[arg-type]
+    calls: list[str] = []
+
+    def plan_turn(_ctx, _history, message, _clarification):
+        calls.append(message)
+        return plan
+
+    orch._plan_turn = plan_turn  # type: ignore[method-assign]
+    return orch, calls
+
+
+def _turn(
+    orch: AssistantOrchestrator,
+    message: str,
+    history: list[dict[str, str]] | None = None,
+    **ctx: Any,
+) -> tuple[dict[str, Any], str]:
+    context = AssistantContext(
+        user_id="u1", session_id="s1", message=message, **ctx
+    )
+    return orch._cached_plan_turn(context, history or [], message)
+
+
+class TestCachedPlanTurn:
+    def test_repeat_message_skips_planner(self):
+        orch, calls = _orchestrator(_plan(topic="photosynthesis", count=5))
+        _turn(orch, "Quiz me on photosynthesis")
+        plan, source = _turn(orch, "  quiz me on   Photosynthesis! ")
+        assert calls == ["Quiz me on photosynthesis"]
+        assert source == "plan_cache"
+        assert plan["tool"]["params"] == {"topic": "photosynthesis", "count": 5}
+        assert plan_cache_stats()["saved_calls"] == 1
+
+    def test_hits_are_private_copies(self):
+        orch, _ = _orchestrator(_plan(topic="cells"))
+        first, _ = _turn(orch, "quiz on cells")
+        first["tool"]["params"]["topic"] = "mutated"
+        second, _ = _turn(orch, "quiz on cells")
+        assert second["tool"]["params"]["topic"] == "cells"
+
+    def test_context_rewritten_params_are_not_cached(self):
+        orch, calls = _orchestrator(
+            _plan("general", query="explain more about osmosis")
+        )
+        _turn(orch, "explain more")
+        _turn(orch, "explain more")
+        assert len(calls) == 2
+        assert plan_cache_stats()["skipped"] == 2
+
+    def test_clarify_plans_are_not_cached(self):
+        orch, calls = _orchestrator({"action": "clarify", "clarification": {}})
+        _turn(orch, "help")
+        _turn(orch, "help")
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            {"media_ids": ["m1"]},
+            {"history": [{"role": "assistant", "content": "x", "tool": "quiz"}]},
+        ],
+    )
+    def test_key_covers_media_and_last_tool(self, change):
+        orch, calls = _orchestrator(_plan("general", query="go on"))
+        _turn(orch, "go on")
+        _turn(orch, "go on", **change)
+        assert len(calls) == 2
+
+    def test_key_covers_enabled_tools(self):
+        orch, calls = _orchestrator(_plan("general", query="go on"))
+        _turn(orch, "go on")
+        orch._registry = _Registry(["general"])  # type: ignore[assignment]
+        _turn(orch, "go on")
+        assert len(calls) == 2
+
+    def test_grounded_turns_always_plan(self):
+        orch, calls = _orchestrator(_plan("general", query="summarise"))
+        _turn(orch, "summarise", source_content="card")
+        _turn(orch, "summarise", source_content="card")
+        assert len(calls) == 2
+
+    def test_disabled_cache_never_hits(self, cache):
+        reset_plan_cache(PlanCache(0, 60))
+        orch, calls = _orchestrator(_plan("general", query="go on"))
+        _turn(orch, "go on")
+        _turn(orch, "go on")
+        assert len(calls) == 2
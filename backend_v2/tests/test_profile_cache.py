@@ -0,0 +1,234 @@
+"""Profile and verified-token caches on ``SupabaseService``.
+
+A fake PostgREST chain counts ``profiles`` queries so the tests can assert
+how often the row is actually read. No network.
+"""
+
+import time
+from typing import Any
+
+from flask import Flask
+
+from aeva.orchestration.assistant_orchestrator import AssistantOrchestrator
+from aeva.orchestration.models import AssistantContext
+from aeva.revision.revision_repository import RevisionRepository
+from aeva.supabase import supabase_service
+from aeva.supabase.supabase_service import (
+    SupabaseService,
+    auth_cache_stats,
+    clear_auth_caches,
+    request_profile_cache,
+)
+
+
+class _Result:
+    def __init__(self, data: Any) -> None:
+        self.data = data
+
+
+class _Query:
+    """Just enough of the postgrest builder for the profile calls."""
+
+    def __init__(self, db: "_FakeClient") -> None:
+        self._db = db
+        self._patch: dict[str, Any] | None = None
+
+    def select(self, *_: Any) -> "_Query":
+        return self
+
+    def eq(self, *_: Any) -> "_Query":
+        return self
+
+    def maybe_single(self) -> "_Query":
+        return self
+
+    def update(self, patch: dict[str, Any]) -> "_Query":
+        self._patch = patch
+        return self
+
+    def execute(self) -> _Result:
+        self._db.queries += 1
+        if self._patch is None:
+            return _Result(dict(self._db.row))
+        self._db.row.update(self._patch)
+        return _Result([dict(self._db.row)])
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.queries = 0
+        self.row = {"id": "u1", "full_name": "Asha", "is_debug_user": False}
+
+    def table(self, _name: str) -> _Query:
+        return _Query(self)
+
+
+class _Service(SupabaseService):
+    def __init__(self) -> None:
+        self.fake = _FakeClient()
+        self.decodes = 0
+
+    @property
+    def client(self) -> Any:  # type: ignore[override]
+        return self.fake
+
+    def _decode_token(self, token: str) -> dict[str, Any]:
+        self.decodes += 1
+        if token == "bad":
+            raise ValueError("bad signature")
+        exp = time.time() + (-1 if token == "expired" else 600)
+        return {"sub": "u1", "email": "a@x.io", "exp": exp}
+
+
+def _app(**config: Any) -> Flask:
+    app = Flask(__name__)
+    app.config.update(config)
+    return app
+
+
+class _Base:
+    def setup_method(self):
+        clear_auth_caches()
+
+    def teardown_method(self):
+        clear_auth_caches()
+
+
+class TestRequestProfileCache(_Base):
+    def test_one_query_per_request(self):
+        svc = _Service()
+        with Flask(__name__).test_request_context():
+            assert svc.get_profile("u1")["full_name"] == "Asha"
+            assert svc.get_profile("u1")["full_name"] == "Asha"
+        assert svc.fake.queries == 1
+
+    def test_row_cache_disabled_by_zero_ttl(self):
+        svc = _Service()
+        app = _app(PROFILE_CACHE_TTL_SECONDS=0)
+        with app.test_request_context():
+            svc.get_profile("u1")
+        with app.test_request_context():
+            svc.get_profile("u1")
+        assert svc.fake.queries == 2
+
+    def test_callers_get_copies(self):
+        svc = _Service()
+        with Flask(__name__).test_request_context():
+            svc.get_profile("u1")["full_name"] = "mutated"
+            assert svc.get_profile("u1")["full_name"] == "Asha"
+
+    def test_update_refreshes_cached_row(self):
+        svc = _Service()
+        with Flask(__name__).test_request_context():
+            svc.get_profile("u1")
+            svc.update_learning_profile("u1", {"preferred_language": "hi"})
+            assert svc.get_profile("u1")["preferred_language"] == "hi"
+        assert svc.fake.queries == 2
+
+    def test_invalidate_forces_a_reread(self):
+        svc = _Service()
+        with Flask(__name__).test_request_context():
+            svc.get_profile("u1")
+            svc.invalidate_profile("u1")
+            assert svc.cached_profile("u1") is None
+            svc.get_profile("u1")
+        assert svc.fake.queries == 2
+
+    def test_no_app_context_still_uses_process_cache(self):
+        svc = _Service()
+        svc.get_profile("u1")
+        svc.get_profile("u1")
+        assert svc.fake.queries == 1
+
+
+class TestVerifyTokenCache(_Base):
+    def test_repeat_token_skips_decode_and_query(self):
+        svc = _Service()
+        app = _app()
+        for _ in range(3):
+            with app.test_request_context():
+                assert svc.verify_token("tok")["full_name"] == "Asha"
+        assert svc.decodes == 1
+        assert svc.fake.queries == 1
+        stats = auth_cache_stats()
+        assert stats["tokens"]["hits"] == 2
+        assert stats["profiles"]["hits"] == 2
+
+    def test_expired_token_is_not_cached(self):
+        svc = _Service()
+        with _app().test_request_context():
+            svc.verify_token("expired")
+            svc.verify_token("expired")
+        assert svc.decodes == 2
+
+    def test_bad_token_is_rejected_every_time(self):
+        svc = _Service()
+        with _app().test_request_context():
+            assert svc.verify_token("bad") is None
+            assert svc.verify_token("bad") is None
+        assert svc.decodes == 2
+
+    def test_raw_token_is_not_a_key(self):
+        svc = _Service()
+        with _app().test_request_context():
+            svc.verify_token("tok")
+        tokens, _ = supabase_service._auth_caches()
+        assert "tok" not in tokens._data
+
+    def test_invalidate_drops_shared_row(self):
+        svc = _Service()
+        app = _app()
+        with app.test_request_context():
+            svc.verify_token("tok")
+        svc.fake.row["full_name"] = "Renamed"
+        with app.test_request_context():
+            svc.invalidate_profile("u1")
+        with app.test_request_context():
+            assert svc.verify_token("tok")["full_name"] == "Renamed"
+
+
+class _PreludeSupabase:
+    def __init__(self) -> None:
+        self.profile_reads = 0
+
+    def get_session(self, session_id: str, user_id: str) -> dict[str, Any]:
+        return {"id": session_id, "user_id": user_id}
+
+    def get_profile(self, user_id: str) -> dict[str, Any]:
+        self.profile_reads += 1
+        return {"id": user_id, "full_name": "from db"}
+
+    def get_messages(self, *_: Any, **__: Any) -> list[dict[str, Any]]:
+        return []
+
+
+class TestPreludeUsesCache(_Base):
+    def test_cached_row_skips_profile_stage(self):
+        fake = _PreludeSupabase()
+        orch = AssistantOrchestrator(supabase=fake)
+        ctx = AssistantContext(user_id="u1", session_id="s1", message="hi")
+        with Flask(__name__).test_request_context():
+            request_profile_cache()["u1"] = {"id": "u1", "full_name": "Asha"}
+            prelude = orch._load_prelude(ctx)
+        assert prelude.profile["full_name"] == "Asha"
+        assert "profile" not in prelude.timings
+        assert fake.profile_reads == 0
+
+
+class TestRevisionSeededFlag(_Base):
+    def test_set_flag_is_served_from_the_cached_row(self):
+        svc = _Service()
+        svc.fake.row["revision_seeded_at"] = "2026-01-01T00:00:00+00:00"
+        repo = RevisionRepository(supabase=svc)
+        svc.get_profile("u1")
+        assert repo.seeded_at("u1") == "2026-01-01T00:00:00+00:00"
+        assert svc.fake.queries == 1
+
+    def test_missing_flag_is_reread_past_a_stale_row(self):
+        svc = _Service()
+        svc.fake.row["revision_seeded_at"] = None
+        repo = RevisionRepository(supabase=svc)
+        svc.get_profile("u1")
+        # Another worker ran the backfill; this worker's row is stale.
+        svc.fake.row["revision_seeded_at"] = "2026-01-01T00:00:00+00:00"
+        assert repo.seeded_at("u1") == "2026-01-01T00:00:00+00:00"
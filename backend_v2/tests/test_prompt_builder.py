@@ -0,0 +1,81 @@
+"""Compiled template rendering in ``PromptBuilder``.
+
+Test templates start their system channel with a placeholder, so they
+register an empty static prefix and never affect ``split_system_prompt``.
+"""
+
+import pytest
+
+from aeva.llm import prompts
+from aeva.llm.prompts import PromptBuilder, PromptError, PromptTemplate
+
+
+def _template(**overrides: object) -> PromptTemplate:
+    fields: dict[str, object] = {
+        "name": "builder_test",
+        "system": "{NAME}: {OUTER}{NOTE}",
+        "user": "{CONVERSATION_CONTEXT}Q: {QUESTION} {TRAILER}",
+        "defaults": {
+            "OUTER": "outer[{INNER}]",
+            "INNER": "inner",
+            "TRAILER": '{"meta": []}',
+        },
+        "optional": ("NOTE",),
+        "markers": ("CONVERSATION_CONTEXT",),
+    }
+    fields.update(overrides)
+    return PromptTemplate(**fields)  # type: ignore[arg-type]
+
+
+class TestCompiledRendering:
+    def test_renders_nested_blocks_and_literal_json(self):
+        rendered = PromptBuilder.build(_template(), NAME="Aeva", QUESTION="why")
+        assert rendered.system_prompt == "Aeva: outer[inner]"
+        assert rendered.user_message == 'Q: why {"meta": []}'
+
+    def test_values_are_never_rescanned(self):
+        rendered = PromptBuilder.build(
+            _template(), NAME="{INNER}", QUESTION="{QUESTION}"
+        )
+        assert rendered.system_prompt == "{INNER}: outer[inner]"
+        assert rendered.user_message.startswith("Q: {QUESTION} ")
+
+    def test_compiles_once_per_set_of_names(self):
+        template = _template()
+        PromptBuilder.build(template, NAME="a", QUESTION="b")
+        PromptBuilder.build(template, NAME="c", QUESTION="d")
+        assert len(template._compiled) == 1
+        rendered = PromptBuilder.build(
+            template, NAME="a", QUESTION="b", NOTE=" (note)"
+        )
+        assert rendered.system_prompt == "a: outer[inner] (note)"
+        assert len(template._compiled) == 2
+
+    def test_caller_value_overrides_a_default_block(self):
+        rendered = PromptBuilder.build(
+            _template(), NAME="a", QUESTION="b", OUTER="custom"
+        )
+        assert rendered.system_prompt == "a: custom"
+
+    def test_missing_value_raises_every_time(self):
+        template = _template()
+        for _ in range(2):
+            with pytest.raises(PromptError, match="QUESTION"):
+                PromptBuilder.build(template, NAME="a")
+        assert template._compiled == {}
+
+    def test_unused_value_raises(self):
+        with pytest.raises(PromptError, match="TYPO"):
+            PromptBuilder.build(_template(), NAME="a", QUESTION="b", TYPO="x")
+
+    def test_block_cycle_is_reported(self):
+        template = _template(defaults={"OUTER": "{OUTER}", "TRAILER": ""})
+        with pytest.raises(PromptError, match="OUTER"):
+            PromptBuilder.build(template, NAME="a", QUESTION="b")
+
+    def test_app_template_renders_the_same_twice(self):
+        values = {"USER_MESSAGE": "q", "USER_PROFILE": ""}
+        first = PromptBuilder.build(prompts.GENERAL_ANSWER_TEMPLATE, **values)
+        second = PromptBuilder.build(prompts.GENERAL_ANSWER_TEMPLATE, **values)
+        assert first == second
+        assert first.system_prompt.startswith(prompts.SYSTEM_PROMPT)
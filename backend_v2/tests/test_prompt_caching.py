@@ -0,0 +1,345 @@
+"""Prefix-stable prompt layout and provider prompt caching.
+
+Renders are pure. The OpenAI/Groq checks build real providers (no network:
+only ``_messages`` and the usage parsers run). Gemini runs against a fake
+``genai.Client`` that records ``caches.create`` and ``generate_content``.
+"""
+
+from collections.abc import Iterator
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from flask import Flask
+from google.genai import errors
+
+from aeva.common.ttl_cache import TTLCache
+from aeva.llm import prompts, usage
+from aeva.llm.prompts.builder import _PLACEHOLDER_RE, _STATIC_PREFIXES
+from aeva.llm.providers import gemini
+from aeva.llm.providers.gemini_context_cache import (
+    context_registry_stats,
+    reset_context_registry,
+)
+from aeva.llm.providers.groq import GroqProvider
+from aeva.llm.providers.openai_provider import OpenAIProvider
+
+TEMPLATES = [
+    value
+    for value in vars(prompts).values()
+    if isinstance(value, prompts.PromptTemplate)
+]
+ANSWER_TEMPLATES = [
+    prompts.GENERAL_ANSWER_TEMPLATE,
+    prompts.WEB_SEARCH_TEMPLATE,
+    prompts.MEDIA_TEMPLATE,
+]
+
+
+def _render(
+    template: prompts.PromptTemplate, profile: str = ""
+) -> prompts.RenderedPrompt:
+    """Render with every required runtime value set to a dummy."""
+    static = set(template.defaults) | set(template.markers)
+    names = {
+        match.group(1)
+        for text in (template.system, template.user)
+        for match in _PLACEHOLDER_RE.finditer(
+            prompts.PromptBuilder._expand_static(template, text, static)
+        )
+    }
+    values = dict.fromkeys(names, "x")
+    if "USER_PROFILE" in names:
+        values["USER_PROFILE"] = profile
+    return prompts.PromptBuilder.build(template, **values)
+
+
+def _profile(name: str) -> str:
+    return prompts.user_profile_segment(f"Student name: {name}")
+
+
+class TestStaticPrefix:
+    @pytest.mark.parametrize("template", TEMPLATES, ids=lambda t: t.name)
+    def test_identical_across_users(self, template):
+        prefix = _STATIC_PREFIXES[template.name]
+        for name in ("Zelphira", "Quorvin"):
+            system = _render(template, _profile(name)).system_prompt
+            assert system.startswith(prefix)
+            assert name not in prefix
+
+    def test_answer_templates_share_one_prefix(self):
+        prefixes = {_STATIC_PREFIXES[t.name] for t in ANSWER_TEMPLATES}
+        assert len(prefixes) == 1
+
+    def test_planner_system_channel_is_fully_static(self):
+        system = _render(prompts.PLAN_TURN_TEMPLATE).system_prompt
+        assert prompts.split_system_prompt(system) == (system, "")
+        assert len(system) > 4000
+
+    def test_planner_user_channel_carries_only_the_turn(self):
+        assert len(prompts.PLAN_TURN_TEMPLATE.user) < 500
+
+
+class TestSplitSystemPrompt:
+    def test_tail_is_the_user_profile(self):
+        profile = _profile("Zelphira")
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE, profile)
+        prefix, tail = prompts.split_system_prompt(system.system_prompt)
+        assert prefix == _STATIC_PREFIXES["general_answer"]
+        assert tail == profile
+
+    def test_unknown_prompt_is_all_tail(self):
+        assert prompts.split_system_prompt("custom") == ("", "custom")
+
+    def test_hint_goes_before_the_tail(self):
+        profile = _profile("Zelphira")
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE, profile)
+        out = prompts.insert_after_static_prefix(system.system_prompt, "HINT")
+        prefix, _ = prompts.split_system_prompt(system.system_prompt)
+        assert out == f"{prefix}\n\nHINT{profile}"
+
+    def test_hint_is_appended_to_unknown_prompts(self):
+        out = prompts.insert_after_static_prefix("custom", "HINT")
+        assert out == "custom\n\nHINT"
+
+
+def _app(**config: Any) -> Flask:
+    app = Flask(__name__)
+    app.config.update(
+        OPENAI_API_KEY="k",
+        OPENAI_BASE_URL="",
+        OPENAI_MAX_TOKENS=0,
+        OPENAI_REASONING_EFFORT="",
+        GROQ_API_KEY="k",
+        GROQ_BASE_URL="https://api.groq.com/openai/v1",
+        GROQ_MAX_TOKENS=1024,
+        GROQ_REASONING_EFFORT="",
+        GEMINI_API_KEY="k",
+        **config,
+    )
+    return app
+
+
+def _chat_usage(prompt: int, cached: int, out: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_tokens=prompt,
+        completion_tokens=out,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached),
+    )
+
+
+class TestOpenAICompatible:
+    @pytest.mark.parametrize("provider_cls", [OpenAIProvider, GroqProvider])
+    def test_schema_hint_stays_inside_the_prefix(self, provider_cls):
+        with _app().app_context():
+            provider = provider_cls("m")
+        profile = _profile("Zelphira")
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE, profile)
+        messages = provider._messages(
+            "q", system.system_prompt, None, None, schema_hint="HINT"
+        )
+        content = messages[0]["content"]
+        assert content.startswith(_STATIC_PREFIXES["general_answer"])
+        assert content.endswith(f"HINT{profile}")
+
+    def test_prompt_cache_key_follows_the_prefix(self):
+        with _app(OPENAI_PROMPT_CACHE_KEY=True).app_context():
+            provider = OpenAIProvider("m")
+        ana = _render(prompts.GENERAL_ANSWER_TEMPLATE, _profile("Zelphira"))
+        bo = _render(prompts.GENERAL_ANSWER_TEMPLATE, _profile("Quorvin"))
+        quiz = _render(prompts.QUIZ_GENERATION_TEMPLATE)
+        key = provider._cache_params(ana.system_prompt)
+        assert key == provider._cache_params(bo.system_prompt)
+        assert key != provider._cache_params(quiz.system_prompt)
+        assert provider._cache_params("custom") == {}
+
+    def test_prompt_cache_key_is_off_by_default(self):
+        with _app().app_context():
+            provider = OpenAIProvider("m")
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE).system_prompt
+        assert provider._cache_params(system) == {}
+
+    def test_usage_reports_cached_tokens(self):
+        assert OpenAIProvider._chat_usage(_chat_usage(2000, 1536, 80)) == {
+            "prompt_tokens": 2000,
+            "cached_tokens": 1536,
+            "output_tokens": 80,
+        }
+        assert GroqProvider._usage(None) == {}
+
+    def test_responses_usage(self):
+        response = SimpleNamespace(
+            usage=SimpleNamespace(
+                input_tokens=900,
+                output_tokens=40,
+                input_tokens_details=SimpleNamespace(cached_tokens=None),
+            )
+        )
+        assert OpenAIProvider._responses_usage(response)["cached_tokens"] == 0
+
+
+class _Caches:
+    def __init__(self) -> None:
+        self.created: list[Any] = []
+        self.fail = False
+
+    def create(self, *, model: str, config: Any) -> SimpleNamespace:
+        if self.fail:
+            raise errors.ClientError(400, {"error": {"message": "too small"}})
+        self.created.append(config)
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+
+class _Models:
+    def __init__(self) -> None:
+        self.configs: list[Any] = []
+        self.contents: list[Any] = []
+        self.reject_cache = False
+
+    def generate_content(
+        self, *, model: str, contents: Any, config: Any
+    ) -> SimpleNamespace:
+        if self.reject_cache and config.cached_content:
+            raise errors.ClientError(404, {"error": {"message": "gone"}})
+        self.configs.append(config)
+        self.contents.append(contents)
+        return SimpleNamespace(
+            text="ok",
+            candidates=[],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=1500,
+                cached_content_token_count=(
+                    1300 if config.cached_content else None
+                ),
+                candidates_token_count=20,
+            ),
+        )
+
+    def generate_content_stream(
+        self, *, model: str, contents: Any, config: Any
+    ) -> Iterator[SimpleNamespace]:
+        # Like the SDK, the request only goes out on the first read.
+        yield self.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+
+class _FakeClient:
+    def __init__(self, api_key: str) -> None:
+        self.caches = _Caches()
+        self.models = _Models()
+
+
+@pytest.fixture
+def registry(monkeypatch) -> Iterator[None]:
+    monkeypatch.setattr(gemini.genai, "Client", _FakeClient)
+    reset_context_registry(TTLCache(16, 3600))
+    yield
+    reset_context_registry()
+
+
+def _gemini(**config: Any) -> gemini.GeminiProvider:
+    with _app(GEMINI_CONTEXT_CACHE=True, **config).app_context():
+        return gemini.GeminiProvider("gemini-test")
+
+
+class TestGeminiContextCache:
+    def test_prefix_is_cached_once_and_tail_moves_to_the_turn(self, registry):
+        provider = _gemini()
+        profile = _profile("Zelphira")
+        for name in ("Zelphira", "Quorvin"):
+            system = _render(prompts.GENERAL_ANSWER_TEMPLATE, _profile(name))
+            provider.generate("q", system_prompt=system.system_prompt)
+        client = provider.client
+        assert len(client.caches.created) == 1
+        created = client.caches.created[0]
+        assert created.system_instruction == _STATIC_PREFIXES["general_answer"]
+        config = client.models.configs[0]
+        assert config.cached_content == "cachedContents/1"
+        assert config.system_instruction is None
+        assert config.tools is None
+        parts = client.models.contents[0][-1].parts
+        assert parts[0].text == profile.strip()
+        assert parts[-1].text == "q"
+        assert provider.last_usage == {
+            "prompt_tokens": 1500,
+            "cached_tokens": 1300,
+            "output_tokens": 20,
+        }
+
+    def test_search_gets_its_own_cache(self, registry):
+        provider = _gemini()
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE).system_prompt
+        provider.generate("q", system_prompt=system)
+        provider.generate("q", system_prompt=system, use_search=True)
+        created = provider.client.caches.created
+        assert [bool(c.tools) for c in created] == [False, True]
+
+    def test_short_prefix_is_sent_inline(self, registry):
+        provider = _gemini()
+        system = _render(prompts.QUIZ_GENERATION_TEMPLATE).system_prompt
+        provider.generate("q", system_prompt=system)
+        assert provider.client.caches.created == []
+        assert provider.client.models.configs[0].system_instruction == system
+
+    def test_failed_create_is_not_retried_every_call(self, registry):
+        provider = _gemini()
+        provider.client.caches.fail = True
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE).system_prompt
+        provider.generate("q", system_prompt=system)
+        provider.generate("q", system_prompt=system)
+        assert context_registry_stats()["hits"] == 1
+        config = provider.client.models.configs[-1]
+        assert config.system_instruction == system
+        assert provider.last_usage["cached_tokens"] == 0
+
+    def test_missing_cache_falls_back_and_is_recreated(self, registry):
+        provider = _gemini()
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE).system_prompt
+        provider.generate("q", system_prompt=system)
+        provider.client.models.reject_cache = True
+        assert provider.generate("q", system_prompt=system) == "ok"
+        assert provider.client.models.configs[-1].system_instruction == system
+        provider.client.models.reject_cache = False
+        provider.generate("q", system_prompt=system)
+        assert len(provider.client.caches.created) == 2
+
+    def test_missing_cache_is_recovered_when_streaming(self, registry):
+        provider = _gemini()
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE).system_prompt
+        provider.generate("q", system_prompt=system)
+        provider.client.models.reject_cache = True
+        chunks = list(provider.generate_stream("q", system_prompt=system))
+        assert chunks == ["ok"]
+        assert provider.client.models.configs[-1].system_instruction == system
+        provider.client.models.reject_cache = False
+        list(provider.generate_stream("q", system_prompt=system))
+        assert len(provider.client.caches.created) == 2
+
+    def test_disabled_by_default(self, registry):
+        with _app().app_context():
+            provider = gemini.GeminiProvider("gemini-test")
+        system = _render(prompts.GENERAL_ANSWER_TEMPLATE).system_prompt
+        provider.generate("q", system_prompt=system)
+        assert provider.client.caches.created == []
+
+
+class TestUsageTotals:
+    def test_totals_and_cached_share(self):
+        usage.reset_usage_stats()
+        for cached in (750, 250):
+            usage.record_usage(
+                "openai",
+                "m",
+                {
+                    "prompt_tokens": 1000,
+                    "cached_tokens": cached,
+                    "output_tokens": 5,
+                },
+            )
+        usage.record_usage("openai", "m", {})
+        stats = usage.usage_stats()["openai:m"]
+        assert stats["calls"] == 2
+        assert stats["cached_tokens"] == 1000
+        assert stats["cached_share"] == 0.5
+        usage.reset_usage_stats()
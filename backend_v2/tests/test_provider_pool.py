@@ -0,0 +1,94 @@
+"""Process-wide LLM provider pool (``factory.get_provider``).
+
+Swaps the real vendors for a counting fake so no SDK client is built.
+"""
+
+import threading
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from aeva.llm.providers import factory
+from aeva.llm.providers.base import LLMProvider
+
+
+class _FakeProvider(LLMProvider):
+    built = 0
+
+    def __init__(self, model: str) -> None:
+        super().__init__(model)
+        type(self).built += 1
+
+    def generate(self, *args: Any, **kwargs: Any) -> str:
+        return ""
+
+    def generate_structured(self, *args: Any, **kwargs: Any) -> dict:
+        return {}
+
+    def generate_stream(self, *args: Any, **kwargs: Any):
+        yield ""
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setitem(factory.PROVIDERS, "gemini", _FakeProvider)
+    factory.clear_pool()
+    _FakeProvider.built = 0
+    app = Flask(__name__)
+    app.config.update(
+        LLM_PROVIDER="gemini",
+        LLM_MODEL="m-default",
+        LLM_QUIZ_MODEL="m-default",
+        LLM_QUIZ_PROVIDER="gemini",
+        GEMINI_API_KEY="k1",
+    )
+    with app.app_context():
+        yield app
+    factory.clear_pool()
+
+
+class TestProviderPool:
+    def test_reuses_instance_and_counts(self, app):
+        first = factory.get_provider()
+        again = factory.get_provider(config_key="LLM_QUIZ_MODEL")
+        assert first is again
+        assert _FakeProvider.built == 1
+        assert factory.pool_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+    def test_model_and_credentials_split_the_pool(self, app):
+        base = factory.get_provider()
+        other_model = factory.get_provider(model="m-pro")
+        app.config["GEMINI_API_KEY"] = "k2"
+        rotated = factory.get_provider()
+        assert len({id(base), id(other_model), id(rotated)}) == 3
+        assert factory.pool_stats()["size"] == 3
+
+    def test_concurrent_first_use_builds_once(self, app):
+        barrier = threading.Barrier(8)
+        got: list[LLMProvider] = []
+
+        def worker() -> None:
+            with app.app_context():
+                barrier.wait()
+                got.append(factory.get_provider(model="m-race"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert _FakeProvider.built == 1
+        assert all(p is got[0] for p in got)
+
+    def test_last_sources_are_per_thread(self, app):
+        provider = factory.get_provider()
+        provider.last_sources = [{"title": "a", "url": "u"}]
+        seen: list[list[dict[str, str]]] = []
+        thread = threading.Thread(
+            target=lambda: seen.append(provider.last_sources)
+        )
+        thread.start()
+        thread.join()
+        assert seen == [[]]
+        assert provider.last_sources == [{"title": "a", "url": "u"}]
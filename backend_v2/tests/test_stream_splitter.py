@@ -0,0 +1,173 @@
+"""Answer-stream helpers: the sentinel split and SSE delta coalescing.
+
+Every split point of a sample answer is fed through the splitter, checking
+that the visible text is exactly the part before the sentinel and that the
+sentinel never leaks, however it straddles chunk boundaries. The coalescer
+runs on a fake clock, so its batching windows are deterministic.
+"""
+
+import random
+
+import pytest
+
+from aeva.common.streaming import (
+    DeltaCoalescer,
+    SentinelSplitter,
+    StreamMeter,
+)
+from aeva.llm import prompts
+from aeva.orchestration.assistant_orchestrator import AssistantOrchestrator
+
+SENTINEL = "@@META@@"
+ANSWER = "Osmosis moves water across a membrane."
+RAW = ANSWER + SENTINEL + '{"suggested_followups": ["More?"]}'
+
+
+def _run(chunks: list[str]) -> tuple[str, SentinelSplitter]:
+    splitter = SentinelSplitter(SENTINEL)
+    visible = "".join(splitter.feed(c) for c in chunks) + splitter.flush()
+    return visible, splitter
+
+
+def _split(text: str, cuts: list[int]) -> list[str]:
+    bounds = [0, *sorted(cuts), len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:], strict=False)]
+
+
+class TestSentinelSplitter:
+    @pytest.mark.parametrize("cut", range(len(RAW) + 1))
+    def test_any_two_way_split(self, cut):
+        visible, splitter = _run(_split(RAW, [cut]))
+        assert visible == ANSWER
+        assert splitter.found
+        assert splitter.text == RAW
+
+    def test_random_fine_splits(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            cuts = rng.sample(range(len(RAW)), rng.randint(1, 12))
+            assert _run(_split(RAW, cuts))[0] == ANSWER
+
+    def test_no_sentinel_releases_everything(self):
+        visible, splitter = _run(["partial @@ME", "TA but not quite"])
+        assert visible == "partial @@META but not quite"
+        assert not splitter.found
+
+    def test_holds_back_at_most_a_sentinel_prefix(self):
+        splitter = SentinelSplitter(SENTINEL)
+        assert splitter.feed("x" * 100) == "x" * (100 - len(SENTINEL) + 1)
+
+    def test_empty_chunks(self):
+        assert _run(["", ANSWER, "", SENTINEL, ""])[0] == ANSWER
+
+
+class TestStreamAnswer:
+    def test_answer_frames_coalesce_and_report(self):
+        def gen():
+            yield from ["a"] * 50
+            return "a" * 50, {"answer": "x"}
+
+        orch = AssistantOrchestrator(supabase=object())  # type: ignore[arg-type]
+        frames = orch._answer_frames(gen())
+        sent: list[str] = []
+        try:
+            while True:
+                sent.append(next(frames))
+        except StopIteration as stop:
+            raw, result, stats = stop.value
+        assert raw == "a" * 50
+        assert result == {"answer": "x"}
+        assert stats["deltas"] == 50
+        assert stats["frames"] == len(sent) < 50
+
+    def test_yields_visible_text_and_returns_raw(self):
+        def gen():
+            yield from _split(RAW.replace(SENTINEL, "@@AEVA_META@@"), [3, 20])
+            return {"answer": "x"}
+
+        orch = AssistantOrchestrator(supabase=object())  # type: ignore[arg-type]
+        stream = orch._stream_answer(gen())
+        chunks: list[str] = []
+        try:
+            while True:
+                chunks.append(next(stream))
+        except StopIteration as stop:
+            raw, result = stop.value
+        assert "".join(chunks) == ANSWER
+        assert raw.startswith(ANSWER + "@@AEVA_META@@")
+        assert result == {"answer": "x"}
+
+
+    def test_answer_is_released_before_the_trailer_is_generated(self):
+        pulled: list[str] = []
+        answer = ["Osmosis ", "moves ", "water."]
+
+        def gen():
+            for chunk in [*answer, prompts.META_SENTINEL, '{"a"', "}"]:
+                pulled.append(chunk)
+                yield chunk
+            return {}
+
+        orch = AssistantOrchestrator(supabase=object())  # type: ignore[arg-type]
+        frames = orch._answer_frames(orch._stream_answer(gen()))
+        sent = ""
+        while "water." not in sent:
+            sent += next(frames)
+        # The last batch went out as soon as the sentinel showed up.
+        assert pulled[-1] == prompts.META_SENTINEL
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestDeltaCoalescer:
+    def test_first_delta_is_immediate_then_batched_by_window(self):
+        clock = _Clock()
+        coalescer = DeltaCoalescer(0.03, 1000, clock=clock)
+        assert coalescer.push("Hel") == "Hel"
+        clock.now = 0.01
+        assert coalescer.push("lo") == ""
+        clock.now = 0.02
+        assert coalescer.push(" wor") == ""
+        clock.now = 0.031
+        assert coalescer.push("ld") == "lo world"
+        assert coalescer.push("!") == ""
+        assert coalescer.flush() == "!"
+        assert coalescer.deltas == 5
+
+    def test_size_limit_releases_early(self):
+        coalescer = DeltaCoalescer(10.0, 8, clock=_Clock())
+        coalescer.push("a")
+        assert coalescer.push("bcdef") == ""
+        assert coalescer.push("ghi") == "bcdefghi"
+
+    def test_zero_window_frames_every_delta(self):
+        coalescer = DeltaCoalescer(0, 512, clock=_Clock())
+        assert [coalescer.push(d) for d in ("a", "b", "c")] == ["a", "b", "c"]
+
+    def test_empty_deltas_are_ignored(self):
+        coalescer = DeltaCoalescer(0.03, 512, clock=_Clock())
+        assert coalescer.push("") == ""
+        assert coalescer.deltas == 0
+
+
+class TestStreamMeter:
+    def test_counts_frames_and_utf8_bytes(self):
+        clock = _Clock()
+        meter = StreamMeter(clock=clock)
+        assert meter.record("data: é\n\n") == "data: é\n\n"
+        meter.record("data: x\n\n")
+        clock.now = 0.5
+        summary = meter.summary(deltas=7)
+        assert summary == {
+            "frames": 2,
+            "bytes": 19,
+            "frames_per_s": 4.0,
+            "bytes_per_s": 38,
+            "deltas": 7,
+        }
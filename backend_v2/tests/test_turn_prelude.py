@@ -0,0 +1,175 @@
+"""Turn prelude: concurrent reads and the deferred user-message insert.
+
+Drives ``AssistantOrchestrator`` against a fake Supabase. Overlap is proven
+with a barrier (the reads only pass it if they are in flight together), and
+the insert can be held open to check it is joined before the assistant row.
+No network, no LLM calls.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from aeva.common import concurrency
+from aeva.orchestration.assistant_orchestrator import AssistantOrchestrator
+from aeva.orchestration.models import AssistantContext
+
+_DELAY = 0.1
+
+
+class _SlowSupabase:
+    """Fake SupabaseService whose reads can be made to rendezvous."""
+
+    def __init__(self, barrier: threading.Barrier | None = None) -> None:
+        self.barrier = barrier
+        self.inserted: list[tuple[str, str]] = []
+        self.metadata: list[dict[str, Any] | None] = []
+        self.insert_started = threading.Event()
+        self.release_insert = threading.Event()
+        self.release_insert.set()
+
+    def _read(self) -> None:
+        if self.barrier is not None:
+            # Raises BrokenBarrierError unless every read is in flight.
+            self.barrier.wait()
+        else:
+            time.sleep(_DELAY)
+
+    def get_session(self, session_id: str, user_id: str) -> dict[str, Any]:
+        self._read()
+        return {"id": session_id, "user_id": user_id, "title": "New chat"}
+
+    def get_profile(self, user_id: str) -> dict[str, Any]:
+        self._read()
+        return {"id": user_id, "full_name": "Asha"}
+
+    def get_messages(
+        self, session_id: str, limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        self._read()
+        return [{"role": "user", "content": "earlier", "metadata": {}}]
+
+    def add_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
+        if role == "user":
+            self.insert_started.set()
+            self.release_insert.wait(2)
+        self.inserted.append((role, content))
+        self.metadata.append(metadata)
+        return {"id": f"m{len(self.inserted)}"}
+
+    def update_session(self, *_: Any, **__: Any) -> None:
+        return None
+
+
+def _ctx(**overrides: Any) -> AssistantContext:
+    return AssistantContext(
+        user_id="u1", session_id="s1", message="hi", **overrides
+    )
+
+
+class TestLoadPrelude:
+    def test_reads_overlap(self):
+        # Serial reads would each block alone at the barrier and time out.
+        barrier = threading.Barrier(3, timeout=5)
+        orch = AssistantOrchestrator(supabase=_SlowSupabase(barrier))
+        prelude = orch._load_prelude(_ctx())
+
+        assert prelude.session["id"] == "s1"
+        assert prelude.profile["full_name"] == "Asha"
+        assert prelude.history == [{"role": "user", "content": "earlier"}]
+
+    def test_timings_cover_every_stage(self):
+        orch = AssistantOrchestrator(supabase=_SlowSupabase())
+        prelude = orch._load_prelude(_ctx())
+        assert set(prelude.timings) == {
+            "session", "profile", "history", "total",
+        }
+        assert prelude.timings["history"] >= int(_DELAY * 1000) - 5
+        assert orch._prelude_timings == prelude.timings
+
+    def test_source_content_skips_history(self):
+        orch = AssistantOrchestrator(supabase=_SlowSupabase())
+        prelude = orch._load_prelude(_ctx(source_content="card text"))
+        assert prelude.history == []
+        assert "history" not in prelude.timings
+
+
+def _held_turn() -> tuple[_SlowSupabase, AssistantOrchestrator]:
+    """Run ``_setup_and_plan`` with the user-message insert held open."""
+    fake = _SlowSupabase()
+    fake.release_insert.clear()
+    orch = AssistantOrchestrator(supabase=fake)
+    orch._forced_plan = lambda *_: {"tool": {"name": "general_chat"}}  # type: ignore[method-assign]
+    orch._setup_and_plan(_ctx())
+    assert fake.insert_started.wait(2)
+    return fake, orch
+
+
+def _release_later(fake: _SlowSupabase) -> threading.Thread:
+    """Release the held insert shortly after the writer starts.
+
+    The user row is only recorded on release, so an assistant row written
+    without joining the insert would land first and break the order checks.
+    """
+
+    def _release() -> None:
+        time.sleep(0.05)
+        fake.release_insert.set()
+
+    thread = threading.Thread(target=_release)
+    thread.start()
+    return thread
+
+
+class TestDeferredUserMessage:
+    def test_setup_submits_insert_and_answer_waits_for_it(self):
+        fake, orch = _held_turn()
+        assert orch._pending_user_message is not None
+        releaser = _release_later(fake)
+        orch._persist_answer(
+            _ctx(), {"title": "New chat"}, "general_chat", {}, "answer",
+            plan_source="fast_path",
+        )
+        releaser.join()
+        assert fake.inserted == [("user", "hi"), ("assistant", "answer")]
+        # Recorded for every user, not only in the Developer Mode trace.
+        assert fake.metadata[-1]["plan_source"] == "fast_path"
+
+    def test_clarification_waits_for_insert(self):
+        fake, orch = _held_turn()
+        orch._save_run = lambda *_: {"id": "r1"}  # type: ignore[method-assign]
+        releaser = _release_later(fake)
+        plan = {"clarification": {"reason": "Which one?", "questions": []}}
+        orch._handle_clarification(_ctx(), plan, "hi")
+        releaser.join()
+        assert [role for role, _ in fake.inserted] == ["user", "assistant"]
+
+    def test_insert_runs_in_background_and_is_joined(self):
+        fake = _SlowSupabase()
+        fake.release_insert.clear()
+        orch = AssistantOrchestrator(supabase=fake)
+        orch._pending_user_message = concurrency.submit(
+            fake.add_message, "s1", "user", "hi"
+        )
+        assert fake.insert_started.wait(2)
+        assert fake.inserted == []
+
+        fake.release_insert.set()
+        orch._await_user_message()
+        assert fake.inserted == [("user", "hi")]
+        assert orch._pending_user_message is None
+
+    def test_failed_insert_is_swallowed(self):
+        orch = AssistantOrchestrator(supabase=_SlowSupabase())
+        failed: Future[Any] = Future()
+        failed.set_exception(RuntimeError("db down"))
+        orch._pending_user_message = failed
+        orch._await_user_message()
+        assert orch._pending_user_message is None
@@ -0,0 +1,160 @@
+"""Vector serialisation for pgvector: text literals and the packed transport.
+
+The Supabase client is a fake that records which table or RPC each request
+hits, so routing by ``VECTOR_TRANSPORT`` and ``RAG_ANN_SCOPED`` is checked
+without a database.
+"""
+
+import base64
+import random
+import struct
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from aeva.supabase.supabase_service import (
+    SupabaseService,
+    _vec_to_packed,
+    _vec_to_str,
+)
+
+
+def _float32(values: list[float]) -> list[float]:
+    fmt = f"<{len(values)}f"
+    return list(struct.unpack(fmt, struct.pack(fmt, *values)))
+
+
+class _Request:
+    def __init__(self, log: list[tuple[str, str, Any]], kind: str, name: str):
+        self.log = log
+        self.kind = kind
+        self.name = name
+
+    def insert(self, payload: Any) -> "_Request":
+        self.log.append((self.kind, self.name, payload))
+        return self
+
+    def execute(self) -> Any:
+        return type("Result", (), {"data": []})()
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.log: list[tuple[str, str, Any]] = []
+
+    def table(self, name: str) -> _Request:
+        return _Request(self.log, "table", name)
+
+    def rpc(self, name: str, params: dict[str, Any]) -> _Request:
+        self.log.append(("rpc", name, params))
+        return _Request(self.log, "rpc", name)
+
+
+@pytest.fixture
+def fake(monkeypatch) -> _FakeClient:
+    client = _FakeClient()
+    monkeypatch.setattr(SupabaseService, "client", property(lambda _: client))
+    return client
+
+
+def _app(transport: str) -> Flask:
+    app = Flask(__name__)
+    app.config["VECTOR_TRANSPORT"] = transport
+    return app
+
+
+@pytest.fixture
+def vector() -> list[float]:
+    rng = random.Random(3)
+    return [rng.gauss(0, 0.04) for _ in range(768)]
+
+
+class TestSerialisation:
+    def test_text_literal_round_trips_float32(self, vector):
+        exact = _float32(vector)
+        parsed = [float(v) for v in _vec_to_str(exact)[1:-1].split(",")]
+        assert _float32(parsed) == exact
+
+    def test_text_literal_of_float64_is_within_an_ulp(self, vector):
+        parsed = [float(v) for v in _vec_to_str(vector)[1:-1].split(",")]
+        for got, want in zip(_float32(parsed), _float32(vector), strict=True):
+            assert got == pytest.approx(want, rel=1.2e-7)
+
+    def test_text_literal_is_shorter_than_repr(self, vector):
+        assert len(_vec_to_str(vector)) < len(str(vector))
+
+    def test_packed_is_little_endian_float32(self, vector):
+        raw = base64.b64decode(_vec_to_packed(vector))
+        assert len(raw) == 4 * len(vector)
+        assert list(struct.unpack(f"<{len(vector)}f", raw)) == _float32(vector)
+
+
+class TestTransportRouting:
+    @pytest.mark.parametrize("transport", ["text", "packed"])
+    def test_chunk_insert(self, transport, vector, fake):
+        rows = [{"chunk_index": i, "embedding": vector} for i in range(120)]
+        with _app(transport).app_context():
+            SupabaseService().insert_media_chunks(rows)
+        kinds = {(kind, name) for kind, name, _ in fake.log}
+        if transport == "packed":
+            assert kinds == {("rpc", "insert_media_chunks_packed")}
+            sent = fake.log[0][2]["p_rows"][0]["embedding"]
+            assert sent == _vec_to_packed(vector)
+        else:
+            assert kinds == {("table", "media_chunks")}
+            assert fake.log[0][2][0]["embedding"] == _vec_to_str(vector)
+        assert len(fake.log) == 3  # pages of 50
+
+    def test_packed_query(self, vector, fake):
+        with _app("packed").app_context():
+            SupabaseService().match_chunks(vector, "u1", top_k=4)
+        _, name, params = fake.log[0]
+        assert name == "match_media_chunks_packed"
+        assert params["query_packed"] == _vec_to_packed(vector)
+        assert "query_embedding" not in params
+
+
+class TestScopedSearch:
+    def _scoped_app(self, transport: str) -> Flask:
+        app = _app(transport)
+        app.config.update(
+            RAG_ANN_SCOPED=True, RAG_ANN_EF_SEARCH=100, RAG_ANN_EXACT_LIMIT=5000
+        )
+        return app
+
+    def test_default_stays_on_global_index(self, vector, fake):
+        with _app("text").app_context():
+            SupabaseService().match_chunks(vector, "u1", ["m1"], top_k=4)
+        _, name, params = fake.log[0]
+        assert name == "match_media_chunks"
+        assert "ef_search" not in params
+        assert "exact_limit" not in params
+
+    @pytest.mark.parametrize(
+        ("transport", "rpc"),
+        [
+            ("text", "match_media_chunks_scoped"),
+            ("packed", "match_media_chunks_scoped_packed"),
+        ],
+    )
+    def test_scoped_routing(self, transport, rpc, vector, fake):
+        with self._scoped_app(transport).app_context():
+            SupabaseService().match_chunks(vector, "u1", ["m1"], top_k=4)
+        _, name, params = fake.log[0]
+        assert name == rpc
+        assert params["ef_search"] == 100
+        assert params["exact_limit"] == 5000
+        assert params["p_media_ids"] == ["m1"]
+
+    def test_per_query_ef_search(self, vector, fake):
+        with self._scoped_app("text").app_context():
+            SupabaseService().match_chunks(vector, "u1", top_k=4, ef_search=400)
+        assert fake.log[0][2]["ef_search"] == 400
+
+    def test_zero_keeps_server_setting(self, vector, fake):
+        app = self._scoped_app("text")
+        app.config["RAG_ANN_EF_SEARCH"] = 0
+        with app.app_context():
+            SupabaseService().match_chunks(vector, "u1", top_k=4)
+        assert fake.log[0][2]["ef_search"] is None
@@ -0,0 +1,55 @@
+"""Embedding post-processing helpers (``aeva.llm.vectors``)."""
+
+import math
+import random
+from array import array
+
+import pytest
+
+from aeva.llm.embedding_cache import EmbeddingCache, text_sha256
+from aeva.llm.vectors import float32, l2_normalize, normalize_rows
+
+
+def _norm(values: list[float]) -> float:
+    return math.sqrt(sum(v * v for v in values))
+
+
+class TestNormalize:
+    def test_scales_to_unit_length(self):
+        rng = random.Random(7)
+        vector = [rng.gauss(0, 3) for _ in range(768)]
+        normalized = l2_normalize(vector)
+        assert _norm(normalized) == pytest.approx(1.0, abs=1e-12)
+        assert normalized[0] / vector[0] == pytest.approx(1 / _norm(vector))
+
+    def test_unit_vector_passes_through(self):
+        vector = [0.6, 0.8]
+        assert l2_normalize(vector) == vector
+
+    def test_zero_vector_passes_through(self):
+        assert l2_normalize([0.0, 0.0]) == [0.0, 0.0]
+
+    def test_rows_accept_any_iterable(self):
+        rows = normalize_rows(iter([(3.0, 4.0), [0.0, 2.0]]))
+        assert rows[0] == pytest.approx([0.6, 0.8])
+        assert rows[1] == [0.0, 1.0]
+        assert all(isinstance(row, list) for row in rows)
+
+
+class TestFloat32Storage:
+    def test_is_compact_float32(self):
+        packed = float32([0.1, 0.2])
+        assert packed.typecode == "f"
+        assert packed.itemsize == 4
+
+    def test_memory_tier_holds_arrays_and_hands_out_lists(self):
+        cache = EmbeddingCache(8, persist=False)
+        cache.store("m", 2, "RETRIEVAL_QUERY", ["q"], [[0.6, 0.8]])
+        held = cache._memory.get(("m", 2, "RETRIEVAL_QUERY", text_sha256("q")))
+        assert isinstance(held, array)
+
+        first = cache.lookup("m", 2, "RETRIEVAL_QUERY", ["q"])[0]
+        assert isinstance(first, list)
+        first[0] = 99.0
+        again = cache.lookup("m", 2, "RETRIEVAL_QUERY", ["q"])[0]
+        assert again == pytest.approx([0.6, 0.8], rel=1e-7)